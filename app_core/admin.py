@@ -3,9 +3,9 @@ from django.contrib import admin
 from .models import (
     Transaction, Rule, Budget, Label, RecurringTransaction,
     Project, ProjectTransaction, ProjectMilestone, ProjectBudgetCategory, ProjectActivity,
-    Client, Invoice, InvoiceItem, InvoicePayment, InvoiceTemplate, InvoiceTemplateItem
+    Client, Invoice, InvoiceItem, InvoicePayment, InvoiceDelivery, InvoiceTemplate, InvoiceTemplateItem
 )
-from .task_models import Task, TaskComment, TaskTimeEntry, TaskActivity
+from .task_models import Task, TaskComment, TaskTimeEntry, TaskActivity, TaskTimeRollup
 
 @admin.register(Label)
 class LabelAdmin(admin.ModelAdmin):
@@ -38,8 +38,8 @@ class BudgetAdmin(admin.ModelAdmin):
 
 @admin.register(RecurringTransaction)
 class RecurringTransactionAdmin(admin.ModelAdmin):
-    list_display = ("description", "amount", "direction", "frequency", "start_date", "end_date", "active", "user")
-    list_filter = ("frequency", "direction", "active", "user")
+    list_display = ("description", "amount", "direction", "frequency", "start_date", "end_date", "active", "organization", "user")
+    list_filter = ("frequency", "direction", "active", "organization", "user")
     search_fields = ("description", "category", "user__username")
     ordering = ("user", "-start_date")
 
@@ -140,6 +140,14 @@ class InvoicePaymentAdmin(admin.ModelAdmin):
     ordering = ("-payment_date",)
 
 
+@admin.register(InvoiceDelivery)
+class InvoiceDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("invoice", "kind", "recipient", "status", "batch_id", "created_at", "sent_at")
+    list_filter = ("kind", "status")
+    search_fields = ("invoice__invoice_number", "recipient", "batch_id")
+    ordering = ("-created_at",)
+
+
 class InvoiceTemplateItemInline(admin.TabularInline):
     model = InvoiceTemplateItem
     extra = 1
@@ -230,6 +238,14 @@ class TaskTimeEntryAdmin(admin.ModelAdmin):
     ordering = ("-date", "-created_at")
 
 
+@admin.register(TaskTimeRollup)
+class TaskTimeRollupAdmin(admin.ModelAdmin):
+    list_display = ("week", "project", "milestone", "user", "hours", "entry_count")
+    list_filter = ("organization", "project", "user")
+    ordering = ("-week",)
+    readonly_fields = ("organization", "project", "milestone", "user", "week", "hours", "entry_count")
+
+
 @admin.register(TaskActivity)
 class TaskActivityAdmin(admin.ModelAdmin):
     list_display = ("task", "activity_type", "user", "description", "created_at")
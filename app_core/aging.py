@@ -0,0 +1,154 @@
+# app_core/aging.py
+"""
+Accounts-receivable aging.
+
+Open invoices (sent, partially paid, overdue) are bucketed by days past due:
+Current (not yet due), 1–30, 31–60, 61–90 and 90+. The balance of each
+invoice is its total minus the payments recorded against it. All of this
+happens in one query: a correlated subquery sums the payments per invoice,
+and filtered aggregates group the balances by client and bucket. The
+organization row is the sum of the client rows.
+
+Results are cached under the org's invoice data version (see
+app_core.data_version). Invoice and payment writes invalidate them, and the
+key includes today's date because that is what the buckets are measured from.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .data_version import INVOICES, versioned_key
+from .invoicing import OPEN_STATUSES
+from .models import Invoice, InvoicePayment
+
+AGING_TIMEOUT = 60 * 60 * 24
+ZERO = Decimal("0.00")
+
+# (key, label, min days past due, max days past due); None = unbounded
+BUCKETS = [
+    ("current", "Current", None, 0),
+    ("days_1_30", "1–30", 1, 30),
+    ("days_31_60", "31–60", 31, 60),
+    ("days_61_90", "61–90", 61, 90),
+    ("days_90_plus", "90+", 91, None),
+]
+BUCKET_KEYS = [key for key, _, _, _ in BUCKETS]
+
+
+def _bucket_q(today, low, high):
+    # More days past due means an earlier due date
+    q = Q()
+    if low is not None:
+        q &= Q(due_date__lte=today - timedelta(days=low))
+    if high is not None:
+        q &= Q(due_date__gte=today - timedelta(days=high))
+    return q
+
+
+def _empty_row() -> dict:
+    row = {key: ZERO for key in BUCKET_KEYS}
+    row.update(total=ZERO, invoice_count=0)
+    return row
+
+
+def compute_aging(organization, today=None) -> dict:
+    """
+    Uncached aging from one grouped query.
+
+    Returns:
+        dict with 'as_of', 'buckets' ([(key, label)]), 'organization' (row)
+        and 'clients' (rows sorted by total outstanding, largest first), where
+        a row holds one Decimal per bucket key plus 'total' and 'invoice_count'
+    """
+    today = today or date.today()
+    money = DecimalField(max_digits=14, decimal_places=2)
+    paid = (
+        InvoicePayment.objects.filter(invoice=OuterRef("pk"))
+        .order_by()
+        .values("invoice")
+        .annotate(s=Sum("amount"))
+        .values("s")
+    )
+    balance = F("total") - Coalesce(Subquery(paid, output_field=money), Value(ZERO), output_field=money)
+    aggregates = {
+        key: Sum("balance", filter=_bucket_q(today, low, high))
+        for key, _, low, high in BUCKETS
+    }
+    rows = (
+        Invoice.objects.filter(organization=organization, status__in=OPEN_STATUSES)
+        .alias(balance=balance)
+        .order_by()
+        .values("client_id", "client__name", "client__company")
+        .annotate(total=Sum("balance"), invoice_count=Count("id"), **aggregates)
+    )
+
+    totals = _empty_row()
+    clients = []
+    for row in rows:
+        client = _empty_row()
+        client.update(
+            client_id=row["client_id"],
+            name=row["client__name"],
+            company=row["client__company"],
+            invoice_count=row["invoice_count"],
+            total=row["total"] or ZERO,
+        )
+        for key in BUCKET_KEYS:
+            client[key] = row[key] or ZERO
+        clients.append(client)
+        for key in BUCKET_KEYS + ["total", "invoice_count"]:
+            totals[key] += client[key]
+    clients.sort(key=lambda c: (-c["total"], c["name"]))
+
+    return {
+        "as_of": today,
+        "buckets": [(key, label) for key, label, _, _ in BUCKETS],
+        "organization": totals,
+        "clients": clients,
+    }
+
+
+def ar_aging(organization, today=None) -> dict:
+    """Aging for an organization, cached until its invoices or payments change."""
+    today = today or date.today()
+    key = versioned_key("ar-aging", organization, today.isoformat(), scope=INVOICES)
+    aging = cache.get(key)
+    if aging is None:
+        aging = compute_aging(organization, today)
+        cache.set(key, aging, AGING_TIMEOUT)
+    return aging
+
+
+def aging_display(aging) -> dict:
+    """JSON-ready aging (floats, ISO date)."""
+    def row(r):
+        return {k: float(v) if isinstance(v, Decimal) else v for k, v in r.items()}
+
+    return {
+        "as_of": aging["as_of"].isoformat(),
+        "buckets": [{"key": key, "label": label} for key, label in aging["buckets"]],
+        "organization": row(aging["organization"]),
+        "clients": [row(c) for c in aging["clients"]],
+    }
+
+
+def aging_csv(aging) -> str:
+    """One line per client plus a total line."""
+    def money(v):
+        return f"{v:.2f}"
+
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["client", "company"] + [label for _, label in aging["buckets"]] + ["total", "invoices"])
+    for c in aging["clients"]:
+        writer.writerow([c["name"], c["company"]] + [money(c[key]) for key in BUCKET_KEYS] + [money(c["total"]), c["invoice_count"]])
+    org = aging["organization"]
+    writer.writerow(["Total", ""] + [money(org[key]) for key in BUCKET_KEYS] + [money(org["total"]), org["invoice_count"]])
+    return out.getvalue()
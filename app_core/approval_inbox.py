@@ -0,0 +1,162 @@
+# app_core/approval_inbox.py
+"""
+Precomputed approvals inbox.
+
+An approval can be acted on by every role on its workflow's
+``approver_roles``. Finding a role's approvals used to mean joining Approval
+to that M2M on every page view, and again for the pending badge. Instead,
+ApprovalInboxEntry holds one row per (approval, role) with a copy of the
+approval's status and created_at:
+
+- signals (see app_core.signals) call ``sync_approval`` on every approval
+  save, and ``workflow_roles_changed`` when a workflow's approver roles
+  change;
+- ``inbox_approvals`` pages over the (organization, role, status,
+  created_at) index and loads only the approvals on the page;
+- ``pending_count`` caches a role's pending total under the org's approvals
+  data version, so the badge on every page is usually a cache hit.
+
+Members of the same role share an inbox, so counts are cached per role.
+``rebuild_approval_inbox`` recomputes everything from the workflows.
+"""
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction as dbtxn
+from django.utils.functional import cached_property
+
+from .data_version import APPROVALS, versioned_key
+from .team_models import Approval, ApprovalInboxEntry, ApprovalWorkflow
+
+PENDING_COUNT_TIMEOUT = 60 * 60
+
+
+def _entries(approval, role_ids):
+    return [
+        ApprovalInboxEntry(
+            organization_id=approval.organization_id,
+            approval_id=approval.pk,
+            role_id=role_id,
+            status=approval.status,
+            created_at=approval.created_at,
+        )
+        for role_id in role_ids
+    ]
+
+
+def sync_approval(approval, created=False):
+    """Bring an approval's inbox rows in line with its workflow's roles and its status."""
+    roles = set(ApprovalWorkflow.approver_roles.through.objects.filter(
+        approvalworkflow_id=approval.workflow_id,
+    ).values_list("organizationrole_id", flat=True))
+    if created:
+        ApprovalInboxEntry.objects.bulk_create(_entries(approval, roles), ignore_conflicts=True)
+        return
+    entries = ApprovalInboxEntry.objects.filter(approval=approval)
+    existing = set(entries.values_list("role_id", flat=True))
+    if existing - roles:
+        entries.filter(role_id__in=existing - roles).delete()
+    if roles - existing:
+        ApprovalInboxEntry.objects.bulk_create(_entries(approval, roles - existing), ignore_conflicts=True)
+    entries.exclude(status=approval.status).update(status=approval.status)
+
+
+def workflow_roles_changed(workflow_ids, role_ids, action):
+    """Apply an approver_roles m2m change (from either side) to the inbox."""
+    if action == "post_clear":
+        # A clear passes no pk_set: all roles of a workflow, or all workflows of a role
+        if workflow_ids is None:
+            ApprovalInboxEntry.objects.filter(role_id__in=role_ids).delete()
+        else:
+            ApprovalInboxEntry.objects.filter(approval__workflow_id__in=workflow_ids).delete()
+    elif action == "post_remove":
+        ApprovalInboxEntry.objects.filter(approval__workflow_id__in=workflow_ids, role_id__in=role_ids).delete()
+    elif action == "post_add":
+        approvals = Approval.objects.filter(workflow_id__in=workflow_ids).only(
+            "id", "organization_id", "status", "created_at",
+        )
+        for approval in approvals.iterator():
+            ApprovalInboxEntry.objects.bulk_create(_entries(approval, role_ids), ignore_conflicts=True)
+
+
+def rebuild_approval_inbox(organization=None) -> int:
+    """Recompute inbox rows from approvals and workflow roles; returns rows written."""
+    approvals = Approval.objects.all()
+    entries = ApprovalInboxEntry.objects.all()
+    if organization is not None:
+        approvals = approvals.filter(organization=organization)
+        entries = entries.filter(organization=organization)
+    through = ApprovalWorkflow.approver_roles.through.objects.filter(
+        approvalworkflow__approvals__in=approvals,
+    ).values_list("approvalworkflow_id", "organizationrole_id").distinct()
+    roles = {}
+    for workflow_id, role_id in through:
+        roles.setdefault(workflow_id, []).append(role_id)
+    with dbtxn.atomic():
+        entries.delete()
+        created = ApprovalInboxEntry.objects.bulk_create(
+            (
+                entry
+                for approval in approvals.only("id", "workflow_id", "organization_id", "status", "created_at").iterator()
+                for entry in _entries(approval, roles.get(approval.workflow_id, ()))
+            ),
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def pending_count(member) -> int:
+    """Pending approvals a member's role can act on (cached)."""
+    if member is None or not member.role_id:
+        return 0
+    key = versioned_key("approvals-pending", member.organization_id, member.role_id, scope=APPROVALS)
+    count = cache.get(key)
+    if count is None:
+        count = ApprovalInboxEntry.objects.filter(
+            organization_id=member.organization_id,
+            role_id=member.role_id,
+            status=Approval.STATUS_PENDING,
+        ).count()
+        cache.set(key, count, PENDING_COUNT_TIMEOUT)
+    return count
+
+
+class CountedPaginator(Paginator):
+    """Paginator that uses a known total instead of running COUNT(*)."""
+
+    def __init__(self, object_list, per_page, known_count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        return super().count
+
+
+def inbox_approvals(member, status=None, page=1, per_page=20):
+    """
+    One page of a member's approvals inbox, newest first.
+
+    ``status`` None or 'all' returns every status. The page's object_list
+    holds Approval objects with workflow, requester, rejecter and approvers
+    loaded.
+    """
+    inbox = ApprovalInboxEntry.objects.filter(organization_id=member.organization_id, role_id=member.role_id)
+    known_count = None
+    if status and status != "all":
+        inbox = inbox.filter(status=status)
+        if status == Approval.STATUS_PENDING:
+            known_count = pending_count(member)
+    ids = inbox.order_by("-created_at", "-approval_id").values_list("approval_id", flat=True)
+    page_obj = CountedPaginator(ids, per_page, known_count=known_count).get_page(page)
+
+    page_ids = list(page_obj.object_list)
+    approvals = Approval.objects.filter(id__in=page_ids).select_related(
+        "workflow", "requested_by", "rejected_by",
+    ).prefetch_related("approved_by")
+    by_id = {approval.id: approval for approval in approvals}
+    page_obj.object_list = [by_id[i] for i in page_ids if i in by_id]
+    return page_obj
@@ -1,6 +1,34 @@
+import logging
+
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_search_index(sender, using="default", **kwargs):
+    # SQLite drops triggers when Django rebuilds a table during a migration
+    from django.db import DatabaseError, connections
+    from app_core.search import install_search_index
+    try:
+        if "app_core_transaction" in connections[using].introspection.table_names():
+            install_search_index(connections[using])
+    except DatabaseError:
+        logger.exception("Could not install the transaction search index on %r", using)
 
 
 class AppCoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app_core"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(_ensure_search_index, sender=self)
+
+        # Request profiling counts queries on every connection (see app_core.profiling)
+        from django.db import connections
+        from app_core.profiling import install_query_recorder
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection=connection)
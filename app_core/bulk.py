@@ -0,0 +1,169 @@
+# app_core/bulk.py
+"""
+Chunked bulk operations on transactions.
+
+Operations take a filtered queryset (the same one the list view shows) and
+walk it in bounded primary-key ranges: each chunk selects the next N ids above
+the last one processed, applies the change in its own short database
+transaction and writes one audit-log entry. Nothing ever holds a lock on the
+whole result set, and the browser never has to send the ids.
+
+Both operations are generators yielding progress dicts so callers can stream
+progress to the client or simply exhaust them.
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterator, List
+
+from django.db import transaction as dbtxn
+from django.utils import timezone
+
+from .data_version import bump_data_version
+from .models import ActivityLog, Transaction
+
+CHUNK_SIZE = 1000
+
+
+def iter_id_chunks(qs, chunk_size: int = CHUNK_SIZE) -> Iterator[List[int]]:
+    """Yield ascending lists of ids from ``qs`` using keyset pagination on id."""
+    base = qs.order_by().values_list("id", flat=True)
+    last_id = 0
+    while True:
+        ids = list(base.filter(id__gt=last_id).order_by("id")[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def _log_chunk(organization, user, action, ids, description, metadata, request):
+    from .permissions import log_activity
+    log_activity(
+        organization,
+        user,
+        action,
+        entity_type=ActivityLog.ENTITY_TRANSACTION,
+        description=description,
+        metadata={**metadata, "transaction_ids": ids, "count": len(ids)},
+        request=request,
+    )
+
+
+def _changed_days(ids) -> Dict[int, set]:
+    """{org_id: dates} of the given transactions, for invalidating after a signal-less write."""
+    changed = {}
+    for org_id, day in Transaction.objects.filter(id__in=ids).values_list("organization_id", "date").distinct():
+        changed.setdefault(org_id, set()).add(day)
+    return changed
+
+
+def _bump_on_commit(changed):
+    for org_id, days in changed.items():
+        dbtxn.on_commit(lambda org_id=org_id, days=days: bump_data_version(org_id, days))
+
+
+def _delete_chunk(ids) -> int:
+    """
+    Delete transactions by id without loading them or sending per-row
+    signals. Rows pointing at them are handled as their on_delete says
+    (allocations cascade, payments are unlinked), as Django's collector would.
+    """
+    from django.db import models
+
+    for relation in Transaction._meta.related_objects:
+        related = relation.related_model._base_manager.filter(**{f"{relation.field.name}__in": ids})
+        if relation.on_delete is models.CASCADE:
+            related.delete()
+        elif relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+        elif relation.on_delete is not models.DO_NOTHING:
+            # PROTECT/RESTRICT/SET_DEFAULT: let the regular delete apply it
+            _, per_model = Transaction.objects.filter(id__in=ids).delete()
+            return per_model.get(Transaction._meta.label, 0)
+    rows = Transaction.objects.filter(id__in=ids)
+    return rows._raw_delete(rows.db)
+
+
+def _progress(done, total, chunk, count):
+    return {
+        "chunk": chunk,
+        "chunk_count": count,
+        "processed": done,
+        "total": total,
+        "percent": round(done * 100.0 / total, 1) if total else 100.0,
+        "done": False,
+    }
+
+
+def bulk_update_transactions(qs, updates: Dict, organization=None, user=None, request=None,
+                             chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Apply ``updates`` to every transaction in ``qs``, one id chunk at a time.
+    Each chunk is committed, audit-logged and invalidates the org's cached
+    analytics on its own.
+
+    Args:
+        qs: Filtered Transaction queryset (already scoped to the org/user)
+        updates: Field -> value mapping passed to ``QuerySet.update``
+        organization, user, request: Used for the per-chunk audit log
+
+    Yields:
+        Progress dicts; the last one has ``done=True``
+    """
+    updates = dict(updates)
+    updates.setdefault("updated_at", timezone.now())
+    total = qs.count()
+    done = 0
+    chunk = 0
+    # Chunks walk ids upwards, so a row that stops matching the filter because
+    # of this very update is never revisited and later rows are not skipped
+    for ids in iter_id_chunks(qs, chunk_size):
+        chunk += 1
+        with dbtxn.atomic():
+            # QuerySet.update() sends no signals, so note the days each org is
+            # about to change (old dates plus any new one) and invalidate below
+            changed = _changed_days(ids)
+            count = Transaction.objects.filter(id__in=ids).update(**updates)
+            _log_chunk(
+                organization, user, ActivityLog.ACTION_UPDATE, ids,
+                f"Bulk updated {count} transactions (chunk {chunk})",
+                {"fields": sorted(k for k in updates if k != "updated_at")},
+                request,
+            )
+            if "date" in updates:
+                for days in changed.values():
+                    days.add(updates["date"])
+            _bump_on_commit(changed)
+        done += count
+        yield _progress(done, total, chunk, count)
+    yield {**_progress(done, total, chunk, 0), "done": True}
+
+
+def bulk_delete_transactions(qs, organization=None, user=None, request=None,
+                             chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Delete every transaction in ``qs``, one id chunk at a time. Rows are
+    deleted without per-row signals; each chunk invalidates the org's cached
+    analytics once.
+
+    Yields:
+        Progress dicts; the last one has ``done=True``
+    """
+    total = qs.count()
+    done = 0
+    chunk = 0
+    for ids in iter_id_chunks(qs, chunk_size):
+        chunk += 1
+        with dbtxn.atomic():
+            changed = _changed_days(ids)
+            count = _delete_chunk(ids)
+            _log_chunk(
+                organization, user, ActivityLog.ACTION_DELETE, ids,
+                f"Bulk deleted {count} transactions (chunk {chunk})",
+                {},
+                request,
+            )
+            _bump_on_commit(changed)
+        done += count
+        yield _progress(done, total, chunk, count)
+    yield {**_progress(done, total, chunk, 0), "done": True}
@@ -0,0 +1,130 @@
+# app_core/changefeed.py
+"""
+Organization change notifications as server-sent events.
+
+Each write already bumps an org data version (see app_core.data_version), so
+the versions themselves are the pub/sub channel: a stream reads the org's
+versions for each change family every POLL_SECONDS (one ``get_many``) and
+emits an event naming the families that moved. Bursts of writes between two
+reads collapse into one event. The transport is whatever CACHES holds:
+
+- LocMemCache (the DEBUG default): in-process, so only writes served by the
+  same process are seen (fine for ``runserver``);
+- Redis (``REDIS_URL``, required outside DEBUG): shared by every worker.
+
+The event id is the snapshot of versions. EventSource sends it back as
+Last-Event-ID when it reconnects, so changes made while disconnected are
+reported straight away. Streams end after MAX_STREAM_SECONDS and the browser
+reconnects on its own.
+
+Streams are only served under ASGI (see the Procfile), where an idle stream
+holds no thread. Under WSGI each one would pin a worker for the whole stream,
+so the view answers 204 instead and the dashboard keeps polling.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .data_version import BUDGETS, INVOICES, PROJECTS, RECURRING, get_data_versions
+
+# Change family -> data version scope (None = transactions)
+FAMILIES = {
+    "transactions": None,
+    "invoices": INVOICES,
+    "budgets": BUDGETS,
+    "projects": PROJECTS,
+    "recurring": RECURRING,
+}
+RETRY_MS = 3000
+HEARTBEAT_SECONDS = 15
+
+
+def poll_seconds() -> float:
+    return getattr(settings, "CHANGEFEED_POLL_SECONDS", 2)
+
+
+def max_stream_seconds() -> float:
+    return getattr(settings, "CHANGEFEED_MAX_STREAM_SECONDS", 300)
+
+
+def snapshot(organization) -> dict:
+    """{family: version} for an organization."""
+    versions = get_data_versions(organization, list(FAMILIES.values()))
+    return {family: versions[scope] for family, scope in FAMILIES.items()}
+
+
+def encode(snap) -> str:
+    return ".".join(str(snap[family]) for family in FAMILIES)
+
+
+def decode(event_id):
+    """Snapshot from an event id, or None if it isn't one of ours."""
+    parts = (event_id or "").split(".")
+    if len(parts) != len(FAMILIES):
+        return None
+    try:
+        return dict(zip(FAMILIES, (int(p) for p in parts)))
+    except ValueError:
+        return None
+
+
+def changed_families(before, after) -> list:
+    return [family for family in FAMILIES if before.get(family) != after.get(family)]
+
+
+class ChangeStream:
+    """
+    SSE state for one connection. ``start`` and ``poll`` return the text to
+    send (possibly empty); ``aevent_stream`` only adds sleeping.
+    """
+
+    def __init__(self, organization, last_event_id=None, describe=None):
+        self.organization = organization
+        self.last_event_id = last_event_id
+        self.describe = describe or (lambda families: {})
+        self.current = None
+        self.last_sent = 0.0
+
+    def _event(self, name, families=()):
+        payload = {"families": list(families), **(self.describe(families) if families else {})}
+        return f"id: {encode(self.current)}\nevent: {name}\ndata: {json.dumps(payload)}\n\n"
+
+    def start(self) -> str:
+        self.current = snapshot(self.organization)
+        self.last_sent = time.monotonic()
+        out = f"retry: {RETRY_MS}\n\n"
+        previous = decode(self.last_event_id)
+        families = changed_families(previous, self.current) if previous else []
+        if families:
+            return out + self._event("change", families)
+        return out + self._event("ready")
+
+    def poll(self) -> str:
+        latest = snapshot(self.organization)
+        families = changed_families(self.current, latest)
+        self.current = latest
+        now = time.monotonic()
+        if families:
+            self.last_sent = now
+            return self._event("change", families)
+        if now - self.last_sent >= HEARTBEAT_SECONDS:
+            self.last_sent = now
+            return ": keepalive\n\n"
+        return ""
+
+
+async def aevent_stream(organization, last_event_id=None, describe=None):
+    """SSE text chunks for a StreamingHttpResponse (no thread held while idle)."""
+    stream = ChangeStream(organization, last_event_id, describe)
+    deadline = time.monotonic() + max_stream_seconds()
+    yield await sync_to_async(stream.start, thread_sensitive=False)()
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_seconds())
+        chunk = await sync_to_async(stream.poll, thread_sensitive=False)()
+        if chunk:
+            yield chunk
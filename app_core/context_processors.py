@@ -3,18 +3,21 @@
 Context processors to add organization data to all templates.
 """
 
+from app_core.approval_inbox import pending_count
 from app_core.models import OrganizationMember
 
 
 def organization_context(request):
     """
     Add organization context to all templates.
-    This makes current_organization and user_organizations available in all templates.
+    This makes current_organization and user_organizations available in all templates,
+    plus approvals_badge_count (cached pending approvals for the member's role).
     """
     context = {
         'current_organization': None,
         'organization_member': None,
         'user_organizations': [],
+        'approvals_badge_count': 0,
     }
 
     if request.user.is_authenticated:
@@ -24,6 +27,7 @@ def organization_context(request):
 
         if hasattr(request, 'organization_member'):
             context['organization_member'] = request.organization_member
+            context['approvals_badge_count'] = pending_count(request.organization_member)
 
         # Add all user's organizations for switcher
         context['user_organizations'] = OrganizationMember.objects.filter(
@@ -0,0 +1,144 @@
+# app_core/data_version.py
+"""
+Per-organization data version counters.
+
+Anything derived from an organization's transactions (frames, insights,
+stats) is cached under the org's current version. Writes bump the version,
+which invalidates every derived cache for that org at once without having
+to enumerate keys.
+
+- Versions live in Django's cache, which every web and background worker
+  must share, and a bump is the cache's incr, which must be atomic: Redis,
+  required outside DEBUG (see settings). With the local-memory cache each
+  process keeps its own counter.
+- Model signals (see app_core.signals) bump on save/delete; code paths that
+  bypass signals (bulk_create, QuerySet.update) call bump_data_version().
+- A bump can name the transaction dates it touched; they are stored under
+  the version the bump produced, and nothing ever deletes them. Incremental
+  consumers (app_core.insight_stats) ask changed_days_between() for the days
+  behind the versions they missed and redo only those; a bump without days
+  means "anything may have changed".
+- Invoices, tasks, approvals, budgets, projects and recurring templates
+  keep their own counters (``scope=INVOICES`` etc.) so those writes don't
+  throw away transaction frames and insight state, and vice versa.
+- A bump also pins the org's reads to the primary database for a few
+  seconds when a read replica is configured (see app_core.db_router), so
+  nothing gets cached under the new version from a replica that lags.
+"""
+from __future__ import annotations
+
+import time
+
+from django.core.cache import cache
+
+from app_core.db_router import pin_organization
+
+VERSION_TIMEOUT = None  # never expire; a lost key just means one cache miss
+CHANGED_DAYS_TIMEOUT = 60 * 60 * 24 * 7
+MAX_CHANGED_DAYS = 5000  # beyond this a full rebuild is cheaper anyway
+MAX_CHANGED_VERSIONS = 1000  # consumers further behind rebuild instead
+ALL_DAYS = "*"
+INVOICES = "invoices"
+TASKS = "tasks"
+APPROVALS = "approvals"
+BUDGETS = "budgets"
+PROJECTS = "projects"
+RECURRING = "recurring"
+
+
+def _org_id(organization):
+    if organization is None:
+        return None
+    return getattr(organization, "pk", organization)
+
+
+def _key(org_id, scope=None):
+    return f"org-data-version:{org_id}" + (f":{scope}" if scope else "")
+
+
+def _days_key(org_id, version):
+    return f"org-changed-days:{org_id}:{version}"
+
+
+def changed_days_between(organization, since, until) -> set:
+    """
+    Dates changed by the bumps that moved the transactions version from
+    ``since`` to ``until``. Readers never consume the records, so concurrent
+    readers all see the same days.
+
+    The set is {ALL_DAYS} when any of those bumps could not be attributed to
+    dates, its record is missing (evicted, or the bump is still writing it)
+    or ``since`` is unknown or too far behind.
+    """
+    org_id = _org_id(organization)
+    if since is None or not 0 <= until - since <= MAX_CHANGED_VERSIONS:
+        return {ALL_DAYS}
+    keys = [_days_key(org_id, version) for version in range(since + 1, until + 1)]
+    found = cache.get_many(keys)
+    if len(found) < len(keys):
+        return {ALL_DAYS}
+    changed = set().union(*found.values())
+    if ALL_DAYS in changed or len(changed) > MAX_CHANGED_DAYS:
+        return {ALL_DAYS}
+    return changed
+
+
+def get_data_version(organization, scope=None) -> int:
+    """Return the current data version for an organization (or org id)."""
+    org_id = _org_id(organization)
+    if org_id is None:
+        return 0
+    key = _key(org_id, scope)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a timestamp so a cache flush never resurrects old entries
+        version = time.time_ns()
+        if not cache.add(key, version, VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def get_data_versions(organization, scopes) -> dict:
+    """Current versions for several scopes in one cache round trip: {scope: version}."""
+    org_id = _org_id(organization)
+    if org_id is None:
+        return {scope: 0 for scope in scopes}
+    keys = {_key(org_id, scope): scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    return {
+        scope: found[key] if key in found else get_data_version(org_id, scope)
+        for key, scope in keys.items()
+    }
+
+
+def bump_data_version(organization, days=None, scope=None) -> int:
+    """
+    Invalidate everything cached for an organization's data.
+
+    Args:
+        organization: Organization or org id
+        days: Transaction dates whose rows changed, when known
+        scope: Counter to bump (None = transactions, or one of the scopes above)
+    """
+    org_id = _org_id(organization)
+    if org_id is None:
+        return 0
+    pin_organization(org_id)
+    key = _key(org_id, scope)
+    try:
+        version = cache.incr(key)
+    except ValueError:
+        # Missing: seed it (only one concurrent bump wins the add), then incr
+        cache.add(key, time.time_ns(), VERSION_TIMEOUT)
+        version = cache.incr(key)
+    if scope is None:
+        changed = {ALL_DAYS} if days is None else {d for d in days if d}
+        cache.set(_days_key(org_id, version), changed, CHANGED_DAYS_TIMEOUT)
+    return version
+
+
+def versioned_key(prefix, organization, *parts, scope=None) -> str:
+    """Build a cache key that changes whenever the org's data (in ``scope``) changes."""
+    org_id = _org_id(organization)
+    suffix = ":".join(str(p) for p in parts)
+    return f"{prefix}:{org_id}:{get_data_version(org_id, scope)}" + (f":{suffix}" if suffix else "")
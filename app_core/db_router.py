@@ -0,0 +1,144 @@
+# app_core/db_router.py
+"""
+Read-replica routing.
+
+When a replica is configured (REPLICA_DATABASE_URL, see settings), views
+marked with ``replica_reads`` (dashboard widgets, reports, the metrics
+dashboard) read from it and everything else stays on the primary:
+
+- The decorator sets a context variable for the duration of the view, and
+  ``ReplicaRouter.db_for_read`` sends reads to the replica while it is set.
+  ``sync_to_async`` copies the context, so the worker threads of async views
+  read from the replica too.
+- Writes always go to the primary, including saves of objects that were
+  read from the replica.
+- Reads inside a transaction on the primary stay on the primary, so a view
+  sees its own writes.
+
+Read-your-writes across requests ("stickiness") comes from two pins that
+last REPLICA_STICKY_SECONDS, which should exceed the replica's usual lag:
+
+- ``ReplicaPinMiddleware`` sets a cookie on the response to any unsafe
+  request (POST etc.), so the user who wrote reads from the primary;
+- ``bump_data_version`` pins the organization, so no one caches derived
+  data computed from a replica that hasn't caught up with the write that
+  bumped the version.
+
+Migrations only run on ``default``. Without a replica nothing changes: the
+decorator is a no-op and every query goes to ``default``.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+DEFAULT_ALIAS = "replica"
+DEFAULT_STICKY_SECONDS = 10
+PIN_COOKIE = "replica_pin"
+SAFE_METHODS = ("GET", "HEAD")
+PRIMARY_ONLY_APPS = {"sessions"}  # a lagging session store would log people out
+
+_reads: ContextVar[Optional[str]] = ContextVar("replica_reads", default=None)
+
+
+def replica_alias() -> Optional[str]:
+    """The replica's DATABASES alias, or None when no replica is configured."""
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", DEFAULT_ALIAS)
+    return alias if alias in settings.DATABASES else None
+
+
+def sticky_seconds() -> int:
+    return getattr(settings, "REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS)
+
+
+def _pin_key(org_id):
+    return f"replica-pin:{org_id}"
+
+
+def pin_organization(org_id):
+    """Keep an organization's reads on the primary for a while after a write."""
+    if org_id is not None and replica_alias() is not None:
+        cache.set(_pin_key(org_id), 1, sticky_seconds())
+
+
+def is_pinned(request) -> bool:
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    organization = getattr(request, "organization", None)
+    return organization is not None and bool(cache.get(_pin_key(organization.pk)))
+
+
+def read_alias(request, methods=SAFE_METHODS) -> Optional[str]:
+    """The alias this request may read from, or None for the primary."""
+    alias = replica_alias()
+    if alias is None or request.method not in methods or is_pinned(request):
+        return None
+    return alias
+
+
+def replica_reads(view_func=None, *, methods=SAFE_METHODS):
+    """
+    Let a read-only view read from the replica. ``methods`` lists the
+    request methods that qualify; a view that takes POST only to receive a
+    large query (the widget batch) can add it, and then that POST doesn't
+    pin the user either. Works on sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                token = _reads.set(await sync_to_async(read_alias)(request, methods))
+                try:
+                    return await view_func(request, *args, **kwargs)
+                finally:
+                    _reads.reset(token)
+
+            wrapper = async_wrapper
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                token = _reads.set(read_alias(request, methods))
+                try:
+                    return view_func(request, *args, **kwargs)
+                finally:
+                    _reads.reset(token)
+
+        wrapper.replica_methods = tuple(methods)
+        return wrapper
+
+    return decorator(view_func) if view_func is not None else decorator
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry; see the module docstring."""
+
+    def db_for_read(self, model, **hints):
+        alias = _reads.get()
+        if alias is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explicit, as Django would otherwise write an instance back to the database it came from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both, so objects from either may be related
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Schema changes reach the replica through replication (or refresh_replica locally)
+        if db == replica_alias():
+            return False
+        return None
@@ -0,0 +1,229 @@
+# app_core/export.py
+"""
+Streaming transaction exports (CSV, XLSX, Parquet).
+
+Rows are pulled with ``.values_list(...).iterator(chunk_size=...)`` so the
+database driver uses a server-side cursor on PostgreSQL and memory stays flat
+regardless of how many rows match.
+
+All writing happens inside the generator handed to StreamingHttpResponse,
+so the view returns (and the response starts) before any row is read.
+
+- CSV is generated row by row and streams straight to the client.
+- Parquet is written one row group per chunk with pyarrow; each row group's
+  bytes are sent as soon as it is written (the footer comes last).
+- XLSX is a zip that openpyxl can only assemble once every row is written,
+  so its first byte waits for the whole file. The write-only workbook
+  spools rows to disk, and a new sheet starts every XLSX_MAX_ROWS rows
+  (Excel's sheet limit).
+"""
+from __future__ import annotations
+
+import csv
+import tempfile
+from typing import Iterable, Iterator, List
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# (queryset lookup, column header)
+EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("date", "date"),
+    ("description", "description"),
+    ("amount", "amount"),
+    ("direction", "direction"),
+    ("label__name", "label"),
+    ("category", "category"),
+    ("subcategory", "subcategory"),
+    ("account", "account"),
+    ("source", "source"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+CHUNK_SIZE = 2000
+XLSX_MAX_ROWS = 1_048_576  # per sheet, header row included
+
+
+class ExportUnavailable(Exception):
+    """Raised when the requested format needs a library that is not installed."""
+
+
+def iter_rows(qs, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple]:
+    """Yield export rows from a Transaction queryset using a server-side cursor."""
+    lookups = [lookup for lookup, _ in EXPORT_COLUMNS]
+    return qs.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def headers() -> List[str]:
+    return [header for _, header in EXPORT_COLUMNS]
+
+
+class _Echo:
+    """File-like object whose write() just returns the value (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows: Iterable[tuple], batch_rows: int = 500) -> Iterator[str]:
+    """Yield CSV text in small batches so each chunk sent is a reasonable size."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers())
+    buf = []
+    for row in rows:
+        buf.append(writer.writerow(row))
+        if len(buf) >= batch_rows:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+def _iter_file(fh, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    try:
+        fh.seek(0)
+        while True:
+            block = fh.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        fh.close()
+
+
+def _excel_value(v):
+    # Excel has no timezone support; keep the wall-clock time
+    return v.replace(tzinfo=None) if getattr(v, "tzinfo", None) is not None else v
+
+
+def write_xlsx(rows: Iterable[tuple], max_rows: int | None = None):
+    """
+    Write rows to a write-only openpyxl workbook on disk, starting a new
+    sheet ("Transactions 2", ...) whenever one reaches ``max_rows``
+    (default XLSX_MAX_ROWS).
+
+    Returns:
+        Open temporary file positioned at 0 (deleted when closed)
+    """
+    from openpyxl import Workbook
+
+    max_rows = max_rows or XLSX_MAX_ROWS
+    wb = Workbook(write_only=True)
+    ws, used, sheets = None, max_rows, 0
+    for row in rows:
+        if used >= max_rows:
+            sheets += 1
+            ws = wb.create_sheet("Transactions" if sheets == 1 else f"Transactions {sheets}")
+            ws.append(headers())
+            used = 1
+        ws.append([_excel_value(v) for v in row])
+        used += 1
+    if ws is None:
+        wb.create_sheet("Transactions").append(headers())
+    fh = tempfile.TemporaryFile()
+    wb.save(fh)
+    fh.seek(0)
+    return fh
+
+
+def stream_xlsx(rows: Iterable[tuple]) -> Iterator[bytes]:
+    yield from _iter_file(write_xlsx(rows))
+
+
+class _Spool:
+    """Write-only file object that hands back what was written since the last drain()."""
+
+    def __init__(self):
+        self._parts = []
+        self.closed = False
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _parquet_modules():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailable("Parquet export requires the 'pyarrow' package.")
+    return pa, pq
+
+
+def stream_parquet(rows: Iterable[tuple], chunk_size: int = CHUNK_SIZE * 10) -> Iterator[bytes]:
+    """
+    Write rows as Parquet, one row group per chunk, yielding each row
+    group's bytes as soon as it is written.
+
+    Raises:
+        ExportUnavailable: if pyarrow is not installed
+    """
+    pa, pq = _parquet_modules()
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("date", pa.date32()),
+        ("description", pa.string()),
+        ("amount", pa.decimal128(12, 2)),
+        ("direction", pa.string()),
+        ("label", pa.string()),
+        ("category", pa.string()),
+        ("subcategory", pa.string()),
+        ("account", pa.string()),
+        ("source", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+    ])
+
+    sink = _Spool()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="snappy")
+    try:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, r)) for r in batch], schema=schema))
+                batch = []
+                data = sink.drain()
+                if data:
+                    yield data
+        if batch:
+            writer.write_table(pa.Table.from_pylist([dict(zip(schema.names, r)) for r in batch], schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_stream(qs, fmt: str) -> Iterator:
+    """
+    Return an iterator of response chunks for the given format. Nothing is
+    read or written until the iterator is consumed.
+
+    Raises:
+        ValueError: unknown format
+        ExportUnavailable: format dependency missing
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "csv":
+        return stream_csv(iter_rows(qs))
+    if fmt == "xlsx":
+        return stream_xlsx(iter_rows(qs))
+    _parquet_modules()  # fail before the response starts
+    return stream_parquet(iter_rows(qs))
@@ -0,0 +1,334 @@
+# app_core/forecast.py
+"""
+Cash-flow forecast per organization.
+
+The projected balance for each of the next ``days`` (90, 180 or 365) starts
+from today's balance (every transaction dated today or earlier) and adds
+four daily flows, all in integer pence:
+
+- recurring: occurrences of the org's active RecurringTransaction templates
+  after their last generated date. Templates are expanded together with
+  NumPy, one batch per kind of step. Monthly and yearly dates follow
+  generate_recurring_transactions, which steps from the previous occurrence
+  with relativedelta, so a template on the 31st moves to the 28th after
+  February and stays there.
+- invoices: open invoice balances (total less paid) on their due dates.
+  Balances already overdue are expected on the first day.
+- scheduled: transactions already dated after today (the generator books
+  templates a month ahead, and their last generated date moves with it).
+- run rate: the average daily net of the last RUN_RATE_DAYS days, leaving
+  out transactions booked from templates and those linked to invoice
+  payments, as the flows above already forecast those.
+
+Caching follows app_core.insight_stats: per-org state in Django's cache,
+updated incrementally.
+
+- The forecast is cached under today's date and the transaction, recurring
+  and invoice data versions.
+- Template expansions and open invoice balances are kept per org with each
+  row's ``updated_at``. When the recurring or invoice version moves, one
+  query lists the rows and their stamps, and only new or changed rows are
+  fetched and expanded. Rows that went away are dropped.
+- Expansions reach EXPANSION_DAYS past the day they were made, and are
+  redone from scratch once that no longer covers the longest horizon.
+"""
+from __future__ import annotations
+
+import datetime
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+from django.core.cache import cache
+
+from .data_version import INVOICES, RECURRING, get_data_versions
+from .frames import org_frame
+from .money import bincount_pence, to_display, to_pence
+
+HORIZONS = (90, 180, 365)
+RUN_RATE_DAYS = 90
+EXPANSION_DAYS = max(HORIZONS) + 62  # a state stays usable for two months of days
+RESULT_TIMEOUT = 60 * 60 * 24
+STATE_TIMEOUT = 60 * 60 * 24 * 7
+FLOWS = ("run_rate", "recurring", "invoices", "scheduled")
+TRANSACTIONS = None  # the transactions data version scope
+
+_DAY = np.timedelta64(1, "D")
+
+
+def _day(value) -> np.datetime64:
+    return np.datetime64(value, "D")
+
+
+# Occurrence expansion
+
+
+def _segments(counts):
+    """For runs of ``counts[i]`` items: (owner index, position within the run) of each item."""
+    owner = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return owner, np.arange(int(counts.sum())) - starts[owner]
+
+
+def _expand_days(base, first_k, step, last):
+    """Dates base + k*step (k >= first_k) up to ``last``, per template; returns (owner, dates)."""
+    span = (last - base).astype(np.int64)
+    counts = np.maximum(np.floor_divide(span, step) - first_k + 1, 0)
+    owner, k = _segments(counts)
+    k = k + first_k[owner]
+    return owner, base[owner] + k * step[owner] * _DAY
+
+
+def _days_in_month(months):
+    return ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+
+
+def _expand_months(base, first_k, step, last):
+    """
+    Monthly/yearly dates as chained relativedelta steps: the k-th date is in
+    month base + k*step, on the smallest of base's day and the lengths of
+    the months stepped through so far.
+    """
+    base_month = base.astype("datetime64[M]")
+    base_day = (base - base_month.astype("datetime64[D]")).astype(np.int64) + 1
+    span = (last.astype("datetime64[M]") - base_month).astype(np.int64)
+    counts = np.maximum(np.floor_divide(span, step) - first_k + 1, 0)
+    owner, k = _segments(counts)
+    k = k + first_k[owner]
+    months = base_month[owner] + k * step[owner]
+    # Running minimum of month lengths within each template: offsetting later templates
+    # below every earlier value lets one accumulate over the whole batch
+    offset = (len(base) - owner) * 64
+    lengths = np.minimum.accumulate(_days_in_month(months) + offset) - offset
+    days = np.minimum(base_day[owner], lengths)
+    dates = months.astype("datetime64[D]") + (days - 1) * _DAY
+    keep = dates <= last[owner]
+    return owner[keep], dates[keep]
+
+
+def expand_templates(templates, after, until):
+    """
+    Occurrences of templates in (after, until].
+
+    Args:
+        templates: dicts with frequency, start_date, end_date, last_generated_date
+        after, until: dates
+
+    Returns:
+        (owner, dates): index into ``templates`` and date of each occurrence
+    """
+    from .models import RecurringTransaction
+
+    steps = {
+        RecurringTransaction.FREQUENCY_DAILY: ("days", 1),
+        RecurringTransaction.FREQUENCY_WEEKLY: ("days", 7),
+        RecurringTransaction.FREQUENCY_MONTHLY: ("months", 1),
+        RecurringTransaction.FREQUENCY_YEARLY: ("months", 12),
+    }
+    owners, dates = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype="datetime64[D]")]
+    for kind, expand in (("days", _expand_days), ("months", _expand_months)):
+        index = np.array([i for i, t in enumerate(templates) if steps.get(t["frequency"], ("",))[0] == kind],
+                         dtype=np.int64)
+        if not len(index):
+            continue
+        chosen = [templates[i] for i in index]
+        base = np.array([t["last_generated_date"] or t["start_date"] for t in chosen], dtype="datetime64[D]")
+        first_k = np.array([1 if t["last_generated_date"] else 0 for t in chosen], dtype=np.int64)
+        step = np.array([steps[t["frequency"]][1] for t in chosen], dtype=np.int64)
+        last = np.array([min(t["end_date"] or until, until) for t in chosen], dtype="datetime64[D]")
+        owner, when = expand(base, first_k, step, last)
+        keep = when > _day(after)
+        owners.append(index[owner[keep]])
+        dates.append(when[keep])
+    return np.concatenate(owners), np.concatenate(dates)
+
+
+# Incremental per-org state
+
+
+@dataclass
+class _RowState:
+    """Per-row payloads with the ``updated_at`` they were built from."""
+    version: int
+    as_of: datetime.date
+    rows: dict = field(default_factory=dict)  # id -> (stamp, payload)
+
+
+def _refresh(key, version, today, stamps_qs, build, rebuild=False):
+    """
+    Bring a cached _RowState up to ``version``: list (id, updated_at) with
+    ``stamps_qs`` and ``build`` payloads for the ids that are new or changed.
+    """
+    state = None if rebuild else cache.get(key)
+    if state is not None and state.version == version:
+        return state
+    if state is None:
+        state = _RowState(version, today)
+    stamps = dict(stamps_qs.values_list("id", "updated_at"))
+    changed = [pk for pk, stamp in stamps.items() if pk not in state.rows or state.rows[pk][0] != stamp]
+    rows = {pk: row for pk, row in state.rows.items() if pk in stamps}
+    if changed:
+        rows.update({pk: (stamps[pk], payload) for pk, payload in build(changed, state.as_of).items()})
+    state = _RowState(version, state.as_of, rows)
+    cache.set(key, state, STATE_TIMEOUT)
+    return state
+
+
+def _recurring_state(org_id, version, today):
+    from .models import RecurringTransaction
+
+    def build(ids, as_of):
+        templates = list(
+            RecurringTransaction.objects.filter(pk__in=ids).values(
+                "id", "frequency", "start_date", "end_date", "last_generated_date", "amount", "direction",
+            )
+        )
+        owner, dates = expand_templates(templates, as_of, as_of + datetime.timedelta(days=EXPANSION_DAYS))
+        out = {}
+        for i, t in enumerate(templates):
+            sign = 1 if t["direction"] == "inflow" else -1
+            out[t["id"]] = (dates[owner == i], sign * to_pence(t["amount"]))
+        return out
+
+    key = f"forecast-recurring:{org_id}"
+    stamps = RecurringTransaction.objects.filter(organization_id=org_id, active=True)
+    state = _refresh(key, version, today, stamps, build)
+    if state.as_of + datetime.timedelta(days=EXPANSION_DAYS - max(HORIZONS)) < today:
+        state = _refresh(key, version, today, stamps, build, rebuild=True)
+    return state
+
+
+def _invoice_state(org_id, version, today):
+    from .invoicing import OPEN_STATUSES
+    from .models import Invoice
+
+    def build(ids, as_of):
+        return {
+            pk: (due, to_pence(total) - to_pence(paid))
+            for pk, due, total, paid in Invoice.objects.filter(pk__in=ids).values_list(
+                "id", "due_date", "total", "paid_amount")
+        }
+
+    stamps = Invoice.objects.filter(organization_id=org_id, status__in=OPEN_STATUSES)
+    return _refresh(f"forecast-invoices:{org_id}", version, today, stamps, build)
+
+
+# Forecast
+
+
+@dataclass
+class CashForecast:
+    as_of: datetime.date
+    opening: int  # pence, balance at the end of ``as_of``
+    dates: np.ndarray  # the forecast days, as_of + 1 onwards
+    flows: dict  # name -> int64 pence per day
+    overdue: int = 0  # pence of overdue invoices, included on the first day
+
+    @property
+    def days(self) -> int:
+        return len(self.dates)
+
+    @property
+    def net(self) -> np.ndarray:
+        return sum(self.flows.values(), np.zeros(self.days, dtype=np.int64))
+
+    @property
+    def balance(self) -> np.ndarray:
+        return self.opening + np.cumsum(self.net)
+
+    def horizon(self, days) -> "CashForecast":
+        return replace(self, dates=self.dates[:days], flows={k: v[:days] for k, v in self.flows.items()})
+
+    def display(self) -> dict:
+        balance = self.balance
+        low = int(np.argmin(balance)) if self.days else None
+        return {
+            "as_of": self.as_of.isoformat(),
+            "days": self.days,
+            "opening": to_display(self.opening),
+            "closing": to_display(int(balance[-1])) if self.days else to_display(self.opening),
+            "overdue": to_display(self.overdue),
+            "low_point": {
+                "date": str(self.dates[low]), "balance": to_display(int(balance[low])),
+            } if low is not None else None,
+            "labels": [str(d) for d in self.dates],
+            "balance": to_display(balance),
+            **{name: to_display(values) for name, values in self.flows.items()},
+        }
+
+
+def _run_rate(organization, frame, today):
+    """Average daily net (pence) of recent history, less what the other flows forecast."""
+    from django.db.models import Q, Sum
+
+    from .models import InvoicePayment, Transaction
+
+    if not len(frame.dates) or frame.dates[0] > _day(today):
+        return 0
+    span = int(min(RUN_RATE_DAYS, (_day(today) - frame.dates[0]).astype(np.int64) + 1))
+    start = today - datetime.timedelta(days=span - 1)
+    net = frame.window(start, today).totals()["net"]
+    # Only transactions are in ``net``: payments recorded without one were never counted
+    paid = InvoicePayment.objects.filter(transaction__isnull=False).values("transaction_id")
+    forecast_elsewhere = dict(
+        Transaction.objects.filter(organization=organization, date__gte=start, date__lte=today)
+        .filter(Q(source="recurring") | Q(id__in=paid))
+        .order_by().values_list("direction").annotate(total=Sum("amount"))
+    )
+    net -= to_pence(forecast_elsewhere.get(Transaction.INFLOW)) - to_pence(forecast_elsewhere.get(Transaction.OUTFLOW))
+    return round(net / span)
+
+
+def compute_cash_forecast(organization, today=None, days=max(HORIZONS), versions=None) -> CashForecast:
+    """Uncached forecast (the template and invoice states are still reused)."""
+    today = today or datetime.date.today()
+    org_id = getattr(organization, "pk", organization)
+    versions = versions or get_data_versions(org_id, [TRANSACTIONS, RECURRING, INVOICES])
+    first = _day(today) + _DAY
+    dates = first + np.arange(days) * _DAY
+
+    def daily(when, pence):
+        offset = (when - first).astype(np.int64)
+        keep = (offset >= 0) & (offset < days)
+        return bincount_pence(offset[keep], pence[keep], minlength=days)
+
+    frame = org_frame(org_id)
+    flows = {name: np.zeros(days, dtype=np.int64) for name in FLOWS}
+    flows["run_rate"][:] = _run_rate(org_id, frame, today)
+
+    upcoming = frame.window(today + datetime.timedelta(days=1), None)
+    flows["scheduled"] = daily(upcoming.dates, np.where(upcoming.inflow, upcoming.pence, -upcoming.pence))
+
+    recurring = _recurring_state(org_id, versions[RECURRING], today).rows.values()
+    if recurring:
+        flows["recurring"] = daily(
+            np.concatenate([when for _, (when, _) in recurring]),
+            np.concatenate([np.full(len(when), pence, dtype=np.int64) for _, (when, pence) in recurring]),
+        )
+
+    invoices = [row for _, row in _invoice_state(org_id, versions[INVOICES], today).rows.values() if row[1] > 0]
+    overdue = sum(balance for due, balance in invoices if due <= today)
+    if invoices:
+        due = np.maximum(np.array([d for d, _ in invoices], dtype="datetime64[D]"), first)
+        flows["invoices"] = daily(due, np.array([b for _, b in invoices], dtype=np.int64))
+
+    opening = frame.window(None, today).totals()["net"]
+    return CashForecast(today, int(opening), dates, flows, int(overdue))
+
+
+def cash_forecast(organization, days=90, today=None) -> CashForecast:
+    """
+    Projected daily balance for the next ``days`` (one of HORIZONS), cached
+    until transactions, recurring templates or invoices change, or the day does.
+    """
+    if days not in HORIZONS:
+        raise ValueError(f"days must be one of {', '.join(map(str, HORIZONS))}")
+    today = today or datetime.date.today()
+    org_id = getattr(organization, "pk", organization)
+    versions = get_data_versions(org_id, [TRANSACTIONS, RECURRING, INVOICES])
+    key = f"cash-forecast:{org_id}:{today.isoformat()}:" + ".".join(
+        str(versions[scope]) for scope in (TRANSACTIONS, RECURRING, INVOICES))
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = compute_cash_forecast(org_id, today, versions=versions)
+        cache.set(key, forecast, RESULT_TIMEOUT)
+    return forecast.horizon(days)
@@ -0,0 +1,210 @@
+# app_core/frames.py
+"""
+Columnar in-memory transaction frames.
+
+A TransactionFrame holds an organization's transactions as typed NumPy
+arrays sorted by date:
+
+- dates: datetime64[D]
+- pence: int64 amount in minor units (always positive; see ``inflow``)
+- inflow: bool, True for inflows
+- category / label: integer codes into small lookup arrays (categorical)
+- description / account: object arrays (only needed by a few consumers)
+
+Frames are built with one ``values_list`` query (amounts are converted to
+integer pence in SQL, so no Decimal objects are created) and cached per
+organization and data version. ``window(start, end)`` returns a zero-copy
+slice found by binary search on the sorted dates, so several date windows
+over the same org cost one query in total.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from django.db.models import BigIntegerField, F
+from django.db.models.functions import Cast, Round
+
+from .data_version import get_data_version
+from .models import Transaction
+
+FRAME_CACHE_SIZE = 32  # organizations kept in memory per process
+
+_COLUMNS = ("id", "date", "pence", "direction", "category", "label__name", "description", "account")
+
+
+def _to_day(value):
+    """Coerce a date/datetime/ISO string to numpy datetime64[D] (None passes through)."""
+    if value is None or value == "":
+        return None
+    try:
+        return np.datetime64(pd.Timestamp(value).date(), "D")
+    except Exception:
+        return None
+
+
+class TransactionFrame:
+    """Immutable column arrays for a set of transactions, sorted by (date, id)."""
+
+    __slots__ = (
+        "ids", "dates", "pence", "inflow",
+        "category_codes", "categories", "label_codes", "labels",
+        "description", "account",
+    )
+
+    def __init__(self, ids, dates, pence, inflow, category_codes, categories,
+                 label_codes, labels, description, account):
+        self.ids = ids
+        self.dates = dates
+        self.pence = pence
+        self.inflow = inflow
+        self.category_codes = category_codes
+        self.categories = categories
+        self.label_codes = label_codes
+        self.labels = labels
+        self.description = description
+        self.account = account
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[D]"),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=bool),
+            np.empty(0, dtype=np.int32), np.empty(0, dtype=object),
+            np.empty(0, dtype=np.int32), np.empty(0, dtype=object),
+            np.empty(0, dtype=object), np.empty(0, dtype=object),
+        )
+
+    @classmethod
+    def from_queryset(cls, qs):
+        """Build a frame with a single query; the queryset's own ordering is ignored."""
+        rows = list(
+            qs.order_by("date", "id")
+            .annotate(pence=Cast(Round(F("amount") * 100), BigIntegerField()))
+            .values_list(*_COLUMNS)
+        )
+        if not rows:
+            return cls.empty()
+        ids, dates, pence, direction, category, label, description, account = zip(*rows)
+        category_codes, categories = pd.factorize(pd.Series(category, dtype=object).fillna(""), sort=True)
+        label_codes, labels = pd.factorize(pd.Series(label, dtype=object), sort=True)  # None -> -1
+        return cls(
+            np.fromiter(ids, dtype=np.int64, count=len(ids)),
+            np.array(dates, dtype="datetime64[D]"),
+            np.fromiter((p or 0 for p in pence), dtype=np.int64, count=len(pence)),
+            np.fromiter((d == Transaction.INFLOW for d in direction), dtype=bool, count=len(direction)),
+            category_codes.astype(np.int32), np.asarray(categories, dtype=object),
+            label_codes.astype(np.int32), np.asarray(labels, dtype=object),
+            np.array(description, dtype=object), np.array(account, dtype=object),
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _take(self, index):
+        return TransactionFrame(
+            self.ids[index], self.dates[index], self.pence[index], self.inflow[index],
+            self.category_codes[index], self.categories,
+            self.label_codes[index], self.labels,
+            self.description[index], self.account[index],
+        )
+
+    def window(self, start=None, end=None) -> "TransactionFrame":
+        """Rows with start <= date <= end (either bound optional). Zero-copy."""
+        lo = 0
+        hi = len(self.dates)
+        start, end = _to_day(start), _to_day(end)
+        if start is not None:
+            lo = int(np.searchsorted(self.dates, start, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(self.dates, end, side="right"))
+        return self._take(slice(lo, max(lo, hi)))
+
+    def with_category(self, category) -> "TransactionFrame":
+        """Rows whose (legacy) category equals ``category``. Copies."""
+        if not category:
+            return self
+        matches = np.flatnonzero(self.categories == category)
+        if not len(matches):
+            return self._take(slice(0, 0))
+        return self._take(self.category_codes == matches[0])
+
+    @property
+    def signed_pence(self):
+        return np.where(self.inflow, self.pence, -self.pence)
+
+    def totals(self) -> dict:
+        """Exact inflow/outflow/net in integer pence plus the row count."""
+        inflow = int(self.pence[self.inflow].sum())
+        outflow = int(self.pence[~self.inflow].sum())
+        return {"inflow": inflow, "outflow": outflow, "net": inflow - outflow, "count": len(self)}
+
+    def daily_pence(self, start, end):
+        """
+        Per-day inflow and outflow pence for every day in [start, end]
+        (zero-filled). Returns (days datetime64[D], inflow int64, outflow int64).
+        """
+        from .buckets import daily_buckets
+        daily = daily_buckets(self, start, end)
+        return daily.dates, daily.inflow, daily.outflow
+
+    def to_df(self) -> pd.DataFrame:
+        """DataFrame with the same columns/dtypes as metrics.queryset_to_df."""
+        if not len(self):
+            return pd.DataFrame(columns=["date", "description", "amount", "direction", "category", "account", "signed_amount"])
+        amount = self.pence / 100.0
+        return pd.DataFrame({
+            "date": self.dates.astype(object),
+            "description": self.description,
+            "amount": amount,
+            "direction": np.where(self.inflow, Transaction.INFLOW, Transaction.OUTFLOW),
+            "category": self.categories[self.category_codes],
+            "account": self.account,
+            "signed_amount": np.where(self.inflow, amount, -amount),
+        })
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def org_frame(organization) -> TransactionFrame:
+    """
+    Return the cached frame of all transactions for an organization, rebuilding
+    it only when the org's data version has changed.
+    """
+    org_id = getattr(organization, "pk", organization)
+    version = get_data_version(org_id)
+    with _cache_lock:
+        hit = _cache.get(org_id)
+        if hit is not None and hit[0] == version:
+            _cache.move_to_end(org_id)
+            return hit[1]
+
+    frame = TransactionFrame.from_queryset(Transaction.objects.filter(organization_id=org_id))
+
+    with _cache_lock:
+        _cache[org_id] = (version, frame)
+        _cache.move_to_end(org_id)
+        while len(_cache) > FRAME_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return frame
+
+
+def frame_for(request, start=None, end=None) -> TransactionFrame:
+    """
+    Cached org frame for the request, or an uncached per-user frame without an
+    org. ``start``/``end`` only narrow the uncached query; callers still window
+    the result themselves.
+    """
+    org = getattr(request, "organization", None)
+    if org:
+        return org_frame(org)
+    qs = Transaction.objects.filter(user=request.user)
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    return TransactionFrame.from_queryset(qs)
@@ -152,7 +152,7 @@ def validate_and_preview(file_obj, filename: str) -> Dict:
         "rejected_csv_b64": rejected_csv_b64,  # base64 content, data URI produced in template
     }
 
-def dataframe_to_transactions(df, user) -> list[Transaction]:
+def dataframe_to_transactions(df, user, organization=None) -> list[Transaction]:
     """
     Map a validated/cleaned DataFrame into Transaction model instances (unsaved).
     Assumes columns: date, description, amount, direction, category?, subcategory?, account?, source?
@@ -169,6 +169,7 @@ def dataframe_to_transactions(df, user) -> list[Transaction]:
         rows.append(
             Transaction(
                 user=user,
+                organization=organization,
                 date=r.get("date"),
                 description=str(r.get("description") or "")[:512],
                 amount=amount.copy_abs(),  # store absolute; use direction for sign
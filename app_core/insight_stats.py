@@ -0,0 +1,282 @@
+# app_core/insight_stats.py
+"""
+Incremental per-organization insight statistics.
+
+Keeps, per organization, daily rollups (inflow/outflow pence per label per
+day) and Welford running mean/variance of daily net per label, per weekday and
+for the organization as a whole. Writes report the days they touched when
+bumping the data version; the next read re-aggregates only those days with
+one grouped query and updates the running statistics by removing each day's
+old value and adding its new one, so the cost is O(changed days) rather than
+O(history).
+
+State lives in Django's cache next to the data version. A missing state, a
+bump without days (label deletes, untracked paths), a missing changed-day
+record or a state older than ``STATE_MAX_AGE`` triggers a rebuild from
+scratch. The anomaly insights derived from the state are cached per data
+version.
+"""
+from __future__ import annotations
+
+import datetime
+import math
+import time
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db.models import BigIntegerField, Count, F, Sum
+from django.db.models.functions import Cast, Round
+
+from .data_version import ALL_DAYS, changed_days_between, get_data_version, versioned_key
+from .insights import Insight, _fmt_money
+from .models import Label, Transaction
+from .money import PENCE
+
+STATE_TIMEOUT = 60 * 60 * 24 * 7
+STATE_MAX_AGE = 60 * 60 * 24  # rebuild from scratch at least daily
+SPIKE_Z = 2.0
+MIN_SAMPLES = 5
+RECENT_DAYS = 7
+BASELINE_DAYS = 28
+STREAK_MIN = 3
+MAX_PER_KIND = 3
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@dataclass
+class Welford:
+    """Running mean/variance that supports removing a previously added value."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.n -= 1
+        self.mean -= delta / self.n
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    def zscore(self, x):
+        std = self.std
+        return (x - self.mean) / std if self.n >= MIN_SAMPLES and std > 0 else 0.0
+
+
+@dataclass
+class InsightState:
+    """Daily rollups and running statistics for one organization."""
+    version: int = 0
+    built_at: float = 0.0
+    # date -> label_id (None = unlabelled) -> [inflow pence, outflow pence, count]
+    days: dict = field(default_factory=dict)
+    # date -> org net pence for that day
+    day_net: dict = field(default_factory=dict)
+    label_stats: dict = field(default_factory=dict)
+    weekday_stats: list = field(default_factory=lambda: [Welford() for _ in range(7)])
+    daily_stats: Welford = field(default_factory=Welford)
+
+    def _unset_day(self, day):
+        for label_id, (inflow, outflow, _) in self.days.pop(day, {}).items():
+            self.label_stats[label_id].remove(inflow - outflow)
+        if day in self.day_net:
+            net = self.day_net.pop(day)
+            self.weekday_stats[day.weekday()].remove(net)
+            self.daily_stats.remove(net)
+
+    def _set_day(self, day, rollup):
+        if not rollup:
+            return
+        self.days[day] = rollup
+        net = 0
+        for label_id, (inflow, outflow, _) in rollup.items():
+            self.label_stats.setdefault(label_id, Welford()).add(inflow - outflow)
+            net += inflow - outflow
+        self.day_net[day] = net
+        self.weekday_stats[day.weekday()].add(net)
+        self.daily_stats.add(net)
+
+    def apply(self, rollups, days):
+        """Replace the rollups for ``days`` (days missing from ``rollups`` become empty)."""
+        for day in days:
+            self._unset_day(day)
+            self._set_day(day, rollups.get(day))
+
+
+def _state_key(org_id):
+    return f"insight-state:{org_id}"
+
+
+def _rollups(org_id, days=None):
+    """date -> label_id -> [inflow, outflow, count] for the given days (or all)."""
+    qs = Transaction.objects.filter(organization_id=org_id)
+    if days is not None:
+        qs = qs.filter(date__in=days)
+    rows = (
+        qs.order_by()
+        .values("date", "label_id", "direction")
+        .annotate(pence=Sum(Cast(Round(F("amount") * PENCE), BigIntegerField())), n=Count("id"))
+    )
+    out = {}
+    for row in rows:
+        cell = out.setdefault(row["date"], {}).setdefault(row["label_id"], [0, 0, 0])
+        cell[0 if row["direction"] == Transaction.INFLOW else 1] += row["pence"] or 0
+        cell[2] += row["n"]
+    return out
+
+
+def get_state(organization) -> InsightState:
+    """Current statistics for an organization, updating only changed days."""
+    org_id = getattr(organization, "pk", organization)
+    version = get_data_version(org_id)
+    state = cache.get(_state_key(org_id))
+    if state is not None and state.version == version:
+        return state
+
+    changed = changed_days_between(org_id, state.version if state is not None else None, version)
+    if state is None or ALL_DAYS in changed or time.time() - state.built_at > STATE_MAX_AGE:
+        state = InsightState(built_at=time.time())
+        rollups = _rollups(org_id)
+        state.apply(rollups, sorted(rollups))
+    elif changed:
+        state.apply(_rollups(org_id, changed), sorted(changed))
+    state.version = version
+    cache.set(_state_key(org_id), state, STATE_TIMEOUT)
+    return state
+
+
+def _label_names(org_id, label_ids):
+    names = dict(Label.objects.filter(organization_id=org_id, id__in=[i for i in label_ids if i]).values_list("id", "name"))
+    names[None] = "Unlabelled"
+    return names
+
+
+def label_spikes(state, today):
+    """Recent days where a label's net moved more than SPIKE_Z deviations from its own norm."""
+    found = []
+    for offset in range(RECENT_DAYS):
+        day = today - datetime.timedelta(days=offset)
+        for label_id, (inflow, outflow, _) in state.days.get(day, {}).items():
+            stats = state.label_stats.get(label_id)
+            z = stats.zscore(inflow - outflow) if stats else 0.0
+            if abs(z) > SPIKE_Z:
+                found.append((abs(z), day, label_id, inflow - outflow, stats.mean))
+    found.sort(key=lambda f: -f[0])
+    return found[:MAX_PER_KIND]
+
+
+def weekday_anomalies(state, today):
+    """Recent days whose net is unusual for that day of the week."""
+    found = []
+    for offset in range(RECENT_DAYS):
+        day = today - datetime.timedelta(days=offset)
+        if day in state.day_net:
+            stats = state.weekday_stats[day.weekday()]
+            z = stats.zscore(state.day_net[day])
+            if abs(z) > SPIKE_Z:
+                found.append((abs(z), day, state.day_net[day], stats.mean))
+    found.sort(key=lambda f: -f[0])
+    return found[:MAX_PER_KIND]
+
+
+def current_streak(state, today, lookback=90):
+    """(length, sign) of the run of active days ending most recently with the same net sign."""
+    length, sign = 0, 0
+    for offset in range(lookback):
+        day = today - datetime.timedelta(days=offset)
+        net = state.day_net.get(day)
+        if net is None:
+            continue
+        s = (net > 0) - (net < 0)
+        if s == 0 or (sign and s != sign):
+            break
+        sign = s
+        length += 1
+    return length, sign
+
+
+def trend_break(state, today):
+    """
+    Compare mean daily net over the last RECENT_DAYS with the BASELINE_DAYS
+    before them; returns (recent mean, baseline mean) when the gap exceeds
+    SPIKE_Z standard errors of the baseline, else None.
+    """
+    recent = [state.day_net.get(today - datetime.timedelta(days=i), 0) for i in range(RECENT_DAYS)]
+    base = [state.day_net.get(today - datetime.timedelta(days=i), 0)
+            for i in range(RECENT_DAYS, RECENT_DAYS + BASELINE_DAYS)]
+    if not any(base):
+        return None
+    base_stats = Welford()
+    for x in base:
+        base_stats.add(x)
+    recent_mean = sum(recent) / len(recent)
+    std_err = base_stats.std / math.sqrt(RECENT_DAYS)
+    if std_err > 0 and abs(recent_mean - base_stats.mean) > SPIKE_Z * std_err:
+        return recent_mean, base_stats.mean
+    return None
+
+
+def anomaly_insights(organization, today=None) -> list[Insight]:
+    """
+    Per-label spikes, weekday anomalies, streaks and trend breaks for an
+    organization, cached until its data changes.
+    """
+    org_id = getattr(organization, "pk", organization)
+    if not org_id:
+        return []
+    today = today or datetime.date.today()
+    key = versioned_key("insight-anomalies", org_id, today.isoformat())
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    state = get_state(org_id)
+    insights: list[Insight] = []
+
+    spikes = label_spikes(state, today)
+    names = _label_names(org_id, [s[2] for s in spikes])
+    for _, day, label_id, net, mean in spikes:
+        direction = "increase" if net > mean else "drop"
+        insights.append(Insight(
+            f"Unusual {names.get(label_id, 'label')} activity",
+            f"{day}: Net {_fmt_money(net / PENCE)} ({direction} vs typical {_fmt_money(mean / PENCE)} for this label).",
+            "warn",
+        ))
+
+    for _, day, net, mean in weekday_anomalies(state, today):
+        insights.append(Insight(
+            f"Unusual {WEEKDAYS[day.weekday()]}",
+            f"{day}: Net {_fmt_money(net / PENCE)} vs typical {_fmt_money(mean / PENCE)} on {WEEKDAYS[day.weekday()]}s.",
+            "warn",
+        ))
+
+    length, sign = current_streak(state, today)
+    if length >= STREAK_MIN:
+        if sign < 0:
+            insights.append(Insight("Spending streak", f"Net outflow on the last {length} active days.", "warn"))
+        else:
+            insights.append(Insight("Earning streak", f"Net inflow on the last {length} active days.", "good"))
+
+    trend = trend_break(state, today)
+    if trend is not None:
+        recent_mean, base_mean = trend
+        insights.append(Insight(
+            "Trend break",
+            f"Average daily net over the last {RECENT_DAYS} days is {_fmt_money(recent_mean / PENCE)} "
+            f"vs {_fmt_money(base_mean / PENCE)} over the previous {BASELINE_DAYS}.",
+            "good" if recent_mean > base_mean else "bad",
+        ))
+
+    cache.set(key, insights, STATE_TIMEOUT)
+    return insights
@@ -82,8 +82,9 @@ def generate_insights(df: pd.DataFrame, ts: pd.DataFrame, cats: pd.DataFrame) ->
             std = float(ts["net"].std() or 0.0)
             if std > 0:
                 spikes = ts[(ts["net"] - mean).abs() > 2 * std].copy()
-                if not spikes.empty:
-                    d = spikes.iloc[0]
+                # Report the largest few deviations, not just the first one found
+                spikes["dev"] = (spikes["net"] - mean).abs()
+                for _, d in spikes.sort_values("dev", ascending=False).head(3).iterrows():
                     direction = "increase" if float(d["net"]) > mean else "drop"
                     insights.append(
                         Insight("Notable variance",
@@ -0,0 +1,197 @@
+# app_core/invoice_dispatch.py
+"""
+Batch invoice and reminder email dispatch.
+
+The per-invoice send helpers render a PDF and open a mail connection for
+every invoice. ``dispatch_invoices`` instead:
+
+1. loads the invoices with client, user and items in three queries,
+2. renders the invoice PDFs in a process pool (``render_invoice_pdf`` needs
+   only ReportLab, so workers never touch the database),
+3. sends everything over one ``get_connection()``, one message per
+   ``send_messages`` call so a failure is pinned to its own invoice and
+   nothing already delivered is sent twice, stamping ``sent_at`` per chunk
+   of ``batch_size``, and
+4. records an InvoiceDelivery row per invoice with its outcome.
+
+Any EMAIL_BACKEND works, including locmem (tests) and filebased. Web
+requests dispatch at most REQUEST_MAX_INVOICES invoices; larger batches go
+through ``manage.py send_invoice_emails``.
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.utils import timezone
+
+from .data_version import INVOICES, bump_data_version
+from .invoice_pdf import invoice_pdf_data, render_invoice_pdf
+from .invoicing import build_invoice_email, build_reminder_email, overdue_q
+from .models import Invoice, InvoiceDelivery
+
+DEFAULT_BATCH_SIZE = 50
+REQUEST_MAX_INVOICES = 100
+MAX_PDF_WORKERS = 4
+POOL_MIN_PDFS = 16  # below this, starting worker processes costs more than it saves
+
+
+def default_workers():
+    return getattr(settings, "INVOICE_PDF_WORKERS", min(MAX_PDF_WORKERS, os.cpu_count() or 1))
+
+
+def render_pdfs(payloads, workers=None):
+    """
+    Render ``invoice_pdf_data`` payloads; returns bytes or the exception
+    raised, per payload and in order.
+    """
+    workers = default_workers() if workers is None else workers
+    if workers <= 1 or len(payloads) < POOL_MIN_PDFS:
+        results = []
+        for payload in payloads:
+            try:
+                results.append(render_invoice_pdf(payload))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(payloads))) as pool:
+        futures = [pool.submit(render_invoice_pdf, payload) for payload in payloads]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+    return results
+
+
+def _send(connection, pending):
+    """
+    Send (delivery, message) pairs over one connection, one message at a
+    time: a batched send_messages that fails partway gives no way to tell
+    which messages the server already accepted, so retrying the batch would
+    deliver some twice. Returns errors by position in ``pending``; positions
+    missing from it were sent.
+    """
+    errors = {}
+    for i, (_, message) in enumerate(pending):
+        try:
+            if not connection.send_messages([message]):
+                errors[i] = "Message was not sent"
+        except Exception as e:
+            errors[i] = str(e) or e.__class__.__name__
+            # A failure can leave the connection unusable; start a new one
+            try:
+                connection.close()
+                connection.open()
+            except Exception:
+                pass
+    return errors
+
+
+def overdue_invoices(organization):
+    return Invoice.objects.filter(organization=organization).filter(overdue_q())
+
+
+def dispatch_invoices(invoices, kind=InvoiceDelivery.KIND_INVOICE, custom_message=None,
+                      workers=None, batch_size=DEFAULT_BATCH_SIZE, connection=None):
+    """
+    Email many invoices (kind 'invoice', with PDF) or payment reminders.
+
+    Args:
+        invoices: Invoice queryset
+        kind: InvoiceDelivery.KIND_INVOICE or KIND_REMINDER
+        custom_message: Optional message for every email
+        workers: PDF rendering processes (default INVOICE_PDF_WORKERS setting,
+            else up to 4; 1 renders in this process)
+        batch_size: Messages sent (one send_messages call each) before their
+            deliveries are stamped with a shared sent_at
+        connection: Mail connection to reuse (default get_connection())
+
+    Returns:
+        (batch id, list of InvoiceDelivery)
+    """
+    batch_id = uuid.uuid4().hex
+    invoices = list(invoices.select_related("client", "user").prefetch_related("items").order_by("id"))
+    deliveries = InvoiceDelivery.objects.bulk_create([
+        InvoiceDelivery(
+            organization_id=invoice.organization_id,
+            invoice=invoice,
+            batch_id=batch_id,
+            kind=kind,
+            recipient=invoice.client.email or "",
+        )
+        for invoice in invoices
+    ])
+
+    ready = []
+    for invoice, delivery in zip(invoices, deliveries):
+        if invoice.client.email:
+            ready.append((invoice, delivery))
+        else:
+            delivery.status, delivery.error = InvoiceDelivery.STATUS_FAILED, "Client email address is required"
+
+    pending = []
+    connection = connection or get_connection(fail_silently=False)
+    if kind == InvoiceDelivery.KIND_INVOICE:
+        payloads = [invoice_pdf_data(invoice, settings.DEFAULT_FROM_EMAIL) for invoice, _ in ready]
+        for (invoice, delivery), pdf in zip(ready, render_pdfs(payloads, workers)):
+            if isinstance(pdf, Exception):
+                delivery.status, delivery.error = InvoiceDelivery.STATUS_FAILED, f"PDF rendering failed: {pdf}"
+                continue
+            pending.append((delivery, build_invoice_email(invoice, pdf, custom_message, connection=connection)))
+    else:
+        for invoice, delivery in ready:
+            pending.append((delivery, build_reminder_email(invoice, custom_message, connection=connection)))
+
+    if pending:
+        with connection:
+            for start in range(0, len(pending), batch_size):
+                chunk = pending[start:start + batch_size]
+                errors = _send(connection, chunk)
+                sent_at = timezone.now()
+                for i, (delivery, _) in enumerate(chunk):
+                    if i in errors:
+                        delivery.status, delivery.error = InvoiceDelivery.STATUS_FAILED, errors[i]
+                    else:
+                        delivery.status, delivery.sent_at = InvoiceDelivery.STATUS_SENT, sent_at
+
+    InvoiceDelivery.objects.bulk_update(deliveries, ["status", "error", "sent_at"])
+
+    if kind == InvoiceDelivery.KIND_INVOICE:
+        sent_ids = [d.invoice_id for d in deliveries if d.status == InvoiceDelivery.STATUS_SENT]
+        if sent_ids:
+            sent = Invoice.objects.filter(id__in=sent_ids)
+            sent.filter(status=Invoice.STATUS_DRAFT).update(status=Invoice.STATUS_SENT)
+            sent.update(sent_date=date.today())
+            # QuerySet.update skips signals
+            for org_id in {invoice.organization_id for invoice in invoices}:
+                bump_data_version(org_id, scope=INVOICES)
+
+    return batch_id, deliveries
+
+
+def delivery_summary(deliveries) -> dict:
+    """JSON-ready outcome of a dispatch batch."""
+    rows = [
+        {
+            "invoice_id": d.invoice_id,
+            "recipient": d.recipient,
+            "kind": d.kind,
+            "status": d.status,
+            "error": d.error,
+            "sent_at": d.sent_at.isoformat() if d.sent_at else None,
+        }
+        for d in deliveries
+    ]
+    return {
+        "sent": sum(1 for d in rows if d["status"] == InvoiceDelivery.STATUS_SENT),
+        "failed": sum(1 for d in rows if d["status"] == InvoiceDelivery.STATUS_FAILED),
+        "pending": sum(1 for d in rows if d["status"] == InvoiceDelivery.STATUS_PENDING),
+        "deliveries": rows,
+    }
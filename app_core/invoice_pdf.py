@@ -0,0 +1,133 @@
+# app_core/invoice_pdf.py
+"""
+Invoice PDF rendering.
+
+``invoice_pdf_data`` flattens an invoice into plain values in the calling
+process, and ``invoice_flowables`` lays them out with ReportLab alone.
+``render_invoice_pdf`` returns bytes; because it needs no database access it
+can run in a worker process (see app_core.invoice_dispatch).
+``invoice_pdf_response`` streams the same PDF through a spool file (see
+app_core.pdf_service).
+"""
+
+INVOICE_MARGINS = {"rightMargin": 50, "leftMargin": 50, "topMargin": 50, "bottomMargin": 50}
+
+
+def invoice_pdf_data(invoice, contact_email=""):
+    """
+    Everything the PDF shows, as picklable values (prefetch client, user and
+    items when doing this for many invoices).
+    """
+    client = invoice.client
+    return {
+        "invoice_number": invoice.invoice_number,
+        "status_display": invoice.get_status_display(),
+        "client_name": client.name,
+        "client_company": client.company or "",
+        "client_email": client.email or "",
+        "client_phone": client.phone or "",
+        "payment_terms": client.payment_terms,
+        "invoice_date": invoice.invoice_date,
+        "due_date": invoice.due_date,
+        "currency": invoice.currency,
+        "items": [
+            (item.description, item.quantity, item.unit_price, item.amount)
+            for item in invoice.items.all()
+        ],
+        "subtotal": invoice.subtotal,
+        "tax_rate": invoice.tax_rate,
+        "tax_amount": invoice.tax_amount,
+        "discount": invoice.discount,
+        "total": invoice.total,
+        "paid_amount": invoice.paid_amount,
+        "balance_due": invoice.balance_due,
+        "notes": invoice.notes,
+        "terms": invoice.terms,
+        "contact_email": invoice.user.email if invoice.user else contact_email,
+    }
+
+
+def invoice_flowables(data):
+    """Yield the invoice PDF flowables for ``invoice_pdf_data`` output."""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Table, Paragraph, Spacer
+
+    from .pdf_service import chunked_table, styles
+
+    st = styles()
+    currency = data["currency"]
+
+    yield Paragraph("INVOICE", st.invoice_title)
+    yield Paragraph(f"#{data['invoice_number']}", st.heading)
+    yield Spacer(1, 0.2*inch)
+
+    yield Paragraph(f"<b>Status:</b> {data['status_display']}", st.normal)
+    yield Spacer(1, 0.3*inch)
+
+    # Bill To and Invoice Details
+    info_data = [
+        [Paragraph("<b>BILL TO</b>", st.heading), Paragraph("<b>INVOICE DETAILS</b>", st.heading)],
+        [
+            Paragraph(f"<b>{data['client_name']}</b><br/>{data['client_company']}<br/>{data['client_email']}<br/>{data['client_phone']}", st.normal),
+            Paragraph(f"<b>Invoice Date:</b> {data['invoice_date'].strftime('%B %d, %Y')}<br/><b>Due Date:</b> {data['due_date'].strftime('%B %d, %Y')}<br/><b>Payment Terms:</b> {data['payment_terms']}", st.normal)
+        ]
+    ]
+
+    info_table = Table(info_data, colWidths=[3*inch, 3*inch])
+    info_table.setStyle(st.invoice_info)
+    yield info_table
+    yield Spacer(1, 0.4*inch)
+
+    # Line Items (page-sized tables, so long invoices never re-split one big table)
+    items = (
+        [description, str(quantity), f"{currency} {unit_price:.2f}", f"{currency} {amount:.2f}"]
+        for description, quantity, unit_price, amount in data["items"]
+    )
+    yield from chunked_table(['Description', 'Qty', 'Unit Price', 'Amount'], items,
+                             [3*inch, 0.75*inch, 1.25*inch, 1.25*inch], st.invoice_items, rows_per_table=25)
+    yield Spacer(1, 0.3*inch)
+
+    # Totals
+    totals_data = [['Subtotal:', f"{currency} {data['subtotal']:.2f}"]]
+    if data["tax_rate"] > 0:
+        totals_data.append(['Tax ({:.1f}%):'.format(data["tax_rate"]), f"{currency} {data['tax_amount']:.2f}"])
+    if data["discount"] > 0:
+        totals_data.append(['Discount:', f"-{currency} {data['discount']:.2f}"])
+    totals_data.append(['<b>Total:</b>', f"<b>{currency} {data['total']:.2f}</b>"])
+    if data["paid_amount"] > 0:
+        totals_data.append(['Paid:', f"-{currency} {data['paid_amount']:.2f}"])
+        totals_data.append(['<b>Balance Due:</b>', f"<b>{currency} {data['balance_due']:.2f}</b>"])
+
+    totals_data_formatted = []
+    for label, value in totals_data:
+        totals_data_formatted.append([Paragraph(label, st.normal if '<b>' not in label else st.heading), Paragraph(value, st.normal if '<b>' not in value else st.heading)])
+
+    totals_table = Table(totals_data_formatted, colWidths=[4.5*inch, 1.75*inch])
+    totals_table.setStyle(st.invoice_totals)
+    yield totals_table
+
+    if data["notes"]:
+        yield Spacer(1, 0.3*inch)
+        yield Paragraph("<b>Notes:</b>", st.heading)
+        yield Paragraph(data["notes"], st.normal)
+
+    if data["terms"]:
+        yield Spacer(1, 0.2*inch)
+        yield Paragraph("<b>Payment Terms & Conditions:</b>", st.heading)
+        yield Paragraph(data["terms"], st.normal)
+
+    yield Spacer(1, 0.5*inch)
+    footer_text = f"<i>Thank you for your business!<br/>For questions about this invoice, please contact {data['contact_email']}</i>"
+    yield Paragraph(footer_text, st.small)
+
+
+def render_invoice_pdf(data):
+    """Build the invoice PDF from ``invoice_pdf_data`` output; returns bytes."""
+    from .pdf_service import render_pdf
+    return render_pdf(invoice_flowables(data), **INVOICE_MARGINS)
+
+
+def invoice_pdf_response(data, filename):
+    """The invoice PDF as a streamed attachment rendered through a spool file."""
+    from .pdf_service import pdf_response
+    return pdf_response(invoice_flowables(data), filename, **INVOICE_MARGINS)
@@ -0,0 +1,110 @@
+# app_core/invoice_stats.py
+"""
+Invoice statistics for an organization and each of its clients.
+
+Every status bucket (invoiced, paid, outstanding, pending, overdue) is a
+filtered aggregate, and everything comes from a single ``GROUP BY client``
+query. The organization totals are the sum of the client rows. The result is
+cached under the org's invoice data version (bumped by invoice and payment
+writes and by the overdue sweeper). The key also includes today's date,
+because "overdue" depends on it.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .data_version import INVOICES, versioned_key
+from .invoicing import OPEN_STATUSES, overdue_q
+from .models import Invoice
+
+STATS_TIMEOUT = 60 * 60 * 24
+ZERO = Decimal("0.00")
+AMOUNT_FIELDS = ("total_invoiced", "total_paid", "paid_amount", "outstanding", "pending", "overdue")
+COUNT_FIELDS = ("invoice_count", "paid_count", "outstanding_count", "pending_count", "overdue_count")
+
+
+def empty_stats() -> dict:
+    stats = {name: ZERO for name in AMOUNT_FIELDS}
+    stats.update({name: 0 for name in COUNT_FIELDS})
+    return stats
+
+
+def _aggregates(today):
+    paid_q = Q(status=Invoice.STATUS_PAID)
+    open_q = Q(status__in=OPEN_STATUSES)
+    due_q = overdue_q(today)
+    # Sent/partially paid and not yet past due
+    pending_q = open_q & ~due_q
+    return {
+        "total_invoiced": Sum("total"),
+        "total_paid": Sum("total", filter=paid_q),
+        "received": Sum("paid_amount"),  # can't reuse a field name as an alias
+        "open_total": Sum("total", filter=open_q),
+        "open_paid": Sum("paid_amount", filter=open_q),
+        "pending": Sum("total", filter=pending_q),
+        "overdue": Sum("total", filter=due_q),
+        "invoice_count": Count("id"),
+        "paid_count": Count("id", filter=paid_q),
+        "outstanding_count": Count("id", filter=open_q),
+        "pending_count": Count("id", filter=pending_q),
+        "overdue_count": Count("id", filter=due_q),
+    }
+
+
+def _row_stats(row) -> dict:
+    stats = empty_stats()
+    for name in ("total_invoiced", "total_paid", "pending", "overdue"):
+        stats[name] = row[name] or ZERO
+    for name in COUNT_FIELDS:
+        stats[name] = row[name]
+    stats["paid_amount"] = row["received"] or ZERO
+    stats["outstanding"] = (row["open_total"] or ZERO) - (row["open_paid"] or ZERO)
+    return stats
+
+
+def compute_invoice_stats(organization, today=None) -> dict:
+    """
+    Uncached statistics, from one grouped query.
+
+    Returns:
+        dict with 'organization' (stats dict) and 'clients' (client id -> stats dict)
+    """
+    today = today or date.today()
+    rows = (
+        Invoice.objects.filter(organization=organization)
+        .order_by()
+        .values("client_id")
+        .annotate(**_aggregates(today))
+    )
+    totals = empty_stats()
+    clients = {}
+    for row in rows:
+        stats = _row_stats(row)
+        clients[row["client_id"]] = stats
+        for name in AMOUNT_FIELDS + COUNT_FIELDS:
+            totals[name] += stats[name]
+    return {"organization": totals, "clients": clients}
+
+
+def invoice_stats(organization, today=None) -> dict:
+    """Statistics for an organization and all its clients, cached until invoices change."""
+    today = today or date.today()
+    key = versioned_key("invoice-stats", organization, today.isoformat(), scope=INVOICES)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_invoice_stats(organization, today)
+        cache.set(key, stats, STATS_TIMEOUT)
+    return stats
+
+
+def organization_stats(organization, today=None) -> dict:
+    return invoice_stats(organization, today)["organization"]
+
+
+def client_stats(client, today=None) -> dict:
+    """One client's statistics (zeros when the client has no invoices)."""
+    return invoice_stats(client.organization_id, today)["clients"].get(client.pk) or empty_stats()
@@ -5,6 +5,7 @@ Helper functions for invoice management
 from decimal import Decimal
 from datetime import date, timedelta
 from django.db.models import Sum, Q
+from .data_version import INVOICES, bump_data_version
 from .models import Invoice, InvoiceItem, InvoicePayment, Client, InvoiceTemplate
 import uuid
 
@@ -137,34 +138,61 @@ def record_payment(invoice, amount, payment_date, payment_method, reference="",
     return payment
 
 
-def get_invoice_statistics(organization):
+OPEN_STATUSES = [Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID, Invoice.STATUS_OVERDUE]
+
+
+def overdue_q(today=None):
     """
-    Get invoice statistics for an organization
+    Invoices that are overdue, whether or not the sweeper has flagged them yet
+    (sent/partially paid and past due count as overdue).
     """
-    invoices = Invoice.objects.filter(organization=organization)
+    today = today or date.today()
+    return Q(status=Invoice.STATUS_OVERDUE) | Q(
+        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID],
+        due_date__lt=today,
+    )
 
-    total = invoices.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-    paid = invoices.filter(status=Invoice.STATUS_PAID).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-    outstanding = invoices.filter(
-        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID, Invoice.STATUS_OVERDUE]
-    ).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-    overdue = invoices.filter(status=Invoice.STATUS_OVERDUE).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
 
-    outstanding_paid_amount = invoices.filter(
-        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID, Invoice.STATUS_OVERDUE]
-    ).aggregate(total=Sum('paid_amount'))['total'] or Decimal('0.00')
+def sweep_overdue_invoices(today=None, organization=None, batch_size=500):
+    """
+    Flag sent/partially paid invoices past their due date as overdue.
 
-    outstanding_balance = outstanding - outstanding_paid_amount
+    Runs in short id-ordered batches so it never holds locks on a whole
+    organization's invoices; each UPDATE re-checks the status, so an invoice
+    paid in the meantime is left alone. Meant to run from the
+    ``sweep_overdue_invoices`` management command, not from requests.
 
-    return {
-        'total_invoiced': total,
-        'total_paid': paid,
-        'outstanding': outstanding_balance,
-        'overdue': overdue,
-        'invoice_count': invoices.count(),
-        'paid_count': invoices.filter(status=Invoice.STATUS_PAID).count(),
-        'overdue_count': invoices.filter(status=Invoice.STATUS_OVERDUE).count(),
-    }
+    Returns:
+        Number of invoices flagged
+    """
+    today = today or date.today()
+    candidates = Invoice.objects.filter(
+        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID],
+        due_date__lt=today,
+    )
+    if organization is not None:
+        candidates = candidates.filter(organization=organization)
+
+    flagged = 0
+    last_id = 0
+    while True:
+        batch = list(candidates.filter(id__gt=last_id).order_by('id').values_list('id', 'organization_id')[:batch_size])
+        if not batch:
+            return flagged
+        ids = [invoice_id for invoice_id, _ in batch]
+        flagged += candidates.filter(id__in=ids).update(status=Invoice.STATUS_OVERDUE)
+        # QuerySet.update skips signals
+        for org_id in {org_id for _, org_id in batch}:
+            bump_data_version(org_id, scope=INVOICES)
+        last_id = ids[-1]
+
+
+def get_invoice_statistics(organization):
+    """
+    Get invoice statistics for an organization (see app_core.invoice_stats)
+    """
+    from .invoice_stats import organization_stats
+    return organization_stats(organization)
 
 
 def create_recurring_invoices(organization, check_date=None):
@@ -249,22 +277,10 @@ def create_recurring_invoices(organization, check_date=None):
 
 def get_client_statistics(client):
     """
-    Get statistics for a specific client
+    Get statistics for a specific client (see app_core.invoice_stats)
     """
-    invoices = Invoice.objects.filter(client=client)
-
-    total = invoices.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-    paid = invoices.filter(status=Invoice.STATUS_PAID).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-    outstanding = invoices.filter(
-        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID, Invoice.STATUS_OVERDUE]
-    ).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-
-    return {
-        'total_invoiced': total,
-        'total_paid': paid,
-        'outstanding': outstanding,
-        'invoice_count': invoices.count(),
-    }
+    from .invoice_stats import client_stats
+    return client_stats(client)
 
 
 CURRENCY_SYMBOLS = {
@@ -279,6 +295,93 @@ CURRENCY_SYMBOLS = {
 }
 
 
+def build_invoice_email(invoice, pdf_content, custom_message=None, cc_emails=None, bcc_emails=None, connection=None):
+    """
+    Build (but don't send) the invoice email with its PDF attached
+
+    Returns:
+        EmailMultiAlternatives bound to ``connection`` when given
+    """
+    from django.core.mail import EmailMultiAlternatives
+    from django.template.loader import render_to_string
+    from django.conf import settings
+    from datetime import datetime
+
+    context = {
+        'invoice': invoice,
+        'custom_message': custom_message,
+        'from_email': settings.DEFAULT_FROM_EMAIL,
+        'current_year': datetime.now().year,
+        'view_online_url': None,  # Can be added later if we create public invoice links
+    }
+
+    # Render email templates
+    html_content = render_to_string('emails/invoice_email.html', context)
+    text_content = render_to_string('emails/invoice_email.txt', context)
+
+    email = EmailMultiAlternatives(
+        subject=f"Invoice {invoice.invoice_number} from Finance Insights",
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[invoice.client.email],
+        cc=cc_emails or [],
+        bcc=bcc_emails or [],
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    email.attach(f'Invoice_{invoice.invoice_number}.pdf', pdf_content, 'application/pdf')
+    return email
+
+
+def build_reminder_email(invoice, custom_message=None, connection=None):
+    """
+    Build (but don't send) a payment reminder email
+
+    Returns:
+        EmailMultiAlternatives bound to ``connection`` when given
+    """
+    from django.core.mail import EmailMultiAlternatives
+    from django.template.loader import render_to_string
+    from django.conf import settings
+    from datetime import datetime
+
+    # Calculate days overdue
+    days_overdue = (date.today() - invoice.due_date).days
+
+    # Default message based on status
+    if not custom_message:
+        if days_overdue > 0:
+            custom_message = f"This invoice is {days_overdue} day{'s' if days_overdue != 1 else ''} overdue. Please remit payment at your earliest convenience."
+        else:
+            custom_message = "This is a friendly reminder that payment is due soon. Please ensure payment is made by the due date to avoid any late fees."
+
+    context = {
+        'invoice': invoice,
+        'custom_message': custom_message,
+        'from_email': settings.DEFAULT_FROM_EMAIL,
+        'current_year': datetime.now().year,
+        'days_overdue': days_overdue if days_overdue > 0 else None,
+        'is_reminder': True,
+    }
+
+    html_content = render_to_string('emails/invoice_reminder.html', context)
+    text_content = render_to_string('emails/invoice_reminder.txt', context)
+
+    subject = f"Payment Reminder: Invoice {invoice.invoice_number}"
+    if days_overdue > 0:
+        subject = f"OVERDUE: Invoice {invoice.invoice_number}"
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[invoice.client.email],
+        connection=connection,
+    )
+    email.attach_alternative(html_content, "text/html")
+    return email
+
+
 def send_invoice_email(invoice, custom_message=None, cc_emails=None, bcc_emails=None):
     """
     Send invoice email to client with PDF attachment
@@ -292,158 +395,16 @@ def send_invoice_email(invoice, custom_message=None, cc_emails=None, bcc_emails=
     Returns:
         dict with 'success' bool and 'message' string
     """
-    from django.core.mail import EmailMultiAlternatives
-    from django.template.loader import render_to_string
     from django.conf import settings
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-    from reportlab.lib.enums import TA_LEFT, TA_RIGHT
-    from io import BytesIO
-    from datetime import datetime
+    from .invoice_pdf import invoice_pdf_data, render_invoice_pdf
 
     try:
         # Validate recipient
         if not invoice.client.email:
             return {'success': False, 'message': 'Client email address is required'}
 
-        # Generate PDF in memory
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Build PDF (same as invoice_pdf_download view)
-        title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, textColor=colors.HexColor('#2563eb'), spaceAfter=6, alignment=TA_LEFT)
-        heading_style = ParagraphStyle('CustomHeading', parent=styles['Heading2'], fontSize=14, textColor=colors.HexColor('#374151'), spaceAfter=12, spaceBefore=12)
-        normal_style = ParagraphStyle('CustomNormal', parent=styles['Normal'], fontSize=10, textColor=colors.HexColor('#111827'))
-        small_style = ParagraphStyle('CustomSmall', parent=styles['Normal'], fontSize=9, textColor=colors.HexColor('#6b7280'))
-
-        elements.append(Paragraph("INVOICE", title_style))
-        elements.append(Paragraph(f"#{invoice.invoice_number}", heading_style))
-        elements.append(Spacer(1, 0.2*inch))
-
-        status_text = invoice.get_status_display()
-        elements.append(Paragraph(f"<b>Status:</b> {status_text}", normal_style))
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Bill To and Invoice Details
-        info_data = [
-            [Paragraph("<b>BILL TO</b>", heading_style), Paragraph("<b>INVOICE DETAILS</b>", heading_style)],
-            [
-                Paragraph(f"<b>{invoice.client.name}</b><br/>{invoice.client.company if invoice.client.company else ''}<br/>{invoice.client.email}<br/>{invoice.client.phone if invoice.client.phone else ''}", normal_style),
-                Paragraph(f"<b>Invoice Date:</b> {invoice.invoice_date.strftime('%B %d, %Y')}<br/><b>Due Date:</b> {invoice.due_date.strftime('%B %d, %Y')}<br/><b>Payment Terms:</b> {invoice.client.payment_terms}", normal_style)
-            ]
-        ]
-
-        info_table = Table(info_data, colWidths=[3*inch, 3*inch])
-        info_table.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP'), ('LEFTPADDING', (0, 0), (-1, -1), 0), ('RIGHTPADDING', (0, 0), (-1, -1), 0)]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 0.4*inch))
-
-        # Line Items
-        items_data = [['Description', 'Qty', 'Unit Price', 'Amount']]
-        for item in invoice.items.all():
-            items_data.append([item.description, str(item.quantity), f"{invoice.currency} {item.unit_price:.2f}", f"{invoice.currency} {item.amount:.2f}"])
-
-        items_table = Table(items_data, colWidths=[3*inch, 0.75*inch, 1.25*inch, 1.25*inch])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#374151')),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#e5e7eb')),
-        ]))
-        elements.append(items_table)
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Totals
-        totals_data = [['Subtotal:', f"{invoice.currency} {invoice.subtotal:.2f}"]]
-        if invoice.tax_rate > 0:
-            totals_data.append(['Tax ({:.1f}%):'.format(invoice.tax_rate), f"{invoice.currency} {invoice.tax_amount:.2f}"])
-        if invoice.discount > 0:
-            totals_data.append(['Discount:', f"-{invoice.currency} {invoice.discount:.2f}"])
-        totals_data.append(['<b>Total:</b>', f"<b>{invoice.currency} {invoice.total:.2f}</b>"])
-        if invoice.paid_amount > 0:
-            totals_data.append(['Paid:', f"-{invoice.currency} {invoice.paid_amount:.2f}"])
-            totals_data.append(['<b>Balance Due:</b>', f"<b>{invoice.currency} {invoice.balance_due:.2f}</b>"])
-
-        totals_data_formatted = []
-        for label, value in totals_data:
-            totals_data_formatted.append([Paragraph(label, normal_style if '<b>' not in label else heading_style), Paragraph(value, normal_style if '<b>' not in value else heading_style)])
-
-        totals_table = Table(totals_data_formatted, colWidths=[4.5*inch, 1.75*inch])
-        totals_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('LINEABOVE', (0, -2), (-1, -2), 1, colors.HexColor('#e5e7eb')),
-        ]))
-        elements.append(totals_table)
-
-        if invoice.notes:
-            elements.append(Spacer(1, 0.3*inch))
-            elements.append(Paragraph("<b>Notes:</b>", heading_style))
-            elements.append(Paragraph(invoice.notes, normal_style))
-
-        if invoice.terms:
-            elements.append(Spacer(1, 0.2*inch))
-            elements.append(Paragraph("<b>Payment Terms & Conditions:</b>", heading_style))
-            elements.append(Paragraph(invoice.terms, normal_style))
-
-        elements.append(Spacer(1, 0.5*inch))
-        footer_text = f"<i>Thank you for your business!<br/>For questions about this invoice, please contact {invoice.user.email}</i>"
-        elements.append(Paragraph(footer_text, small_style))
-
-        doc.build(elements)
-        pdf_content = buffer.getvalue()
-        buffer.close()
-
-        # Prepare email context
-        context = {
-            'invoice': invoice,
-            'custom_message': custom_message,
-            'from_email': settings.DEFAULT_FROM_EMAIL,
-            'current_year': datetime.now().year,
-            'view_online_url': None,  # Can be added later if we create public invoice links
-        }
-
-        # Render email templates
-        html_content = render_to_string('emails/invoice_email.html', context)
-        text_content = render_to_string('emails/invoice_email.txt', context)
-
-        # Create email
-        subject = f"Invoice {invoice.invoice_number} from Finance Insights"
-        from_email = settings.DEFAULT_FROM_EMAIL
-        to_emails = [invoice.client.email]
-
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=from_email,
-            to=to_emails,
-            cc=cc_emails or [],
-            bcc=bcc_emails or []
-        )
-
-        email.attach_alternative(html_content, "text/html")
-        email.attach(f'Invoice_{invoice.invoice_number}.pdf', pdf_content, 'application/pdf')
-
-        # Send email
+        pdf_content = render_invoice_pdf(invoice_pdf_data(invoice, settings.DEFAULT_FROM_EMAIL))
+        email = build_invoice_email(invoice, pdf_content, custom_message, cc_emails, bcc_emails)
         email.send(fail_silently=False)
 
         # Update invoice status and sent date
@@ -475,50 +436,11 @@ def send_payment_reminder(invoice, custom_message=None):
     Returns:
         dict with 'success' bool and 'message' string
     """
-    from django.core.mail import EmailMultiAlternatives
-    from django.template.loader import render_to_string
-    from django.conf import settings
-    from datetime import datetime
-
     try:
         if not invoice.client.email:
             return {'success': False, 'message': 'Client email address is required'}
 
-        # Calculate days overdue
-        days_overdue = (date.today() - invoice.due_date).days
-
-        # Default message based on status
-        if not custom_message:
-            if days_overdue > 0:
-                custom_message = f"This invoice is {days_overdue} day{'s' if days_overdue != 1 else ''} overdue. Please remit payment at your earliest convenience."
-            else:
-                custom_message = "This is a friendly reminder that payment is due soon. Please ensure payment is made by the due date to avoid any late fees."
-
-        context = {
-            'invoice': invoice,
-            'custom_message': custom_message,
-            'from_email': settings.DEFAULT_FROM_EMAIL,
-            'current_year': datetime.now().year,
-            'days_overdue': days_overdue if days_overdue > 0 else None,
-            'is_reminder': True,
-        }
-
-        html_content = render_to_string('emails/invoice_reminder.html', context)
-        text_content = render_to_string('emails/invoice_reminder.txt', context)
-
-        subject = f"Payment Reminder: Invoice {invoice.invoice_number}"
-        if days_overdue > 0:
-            subject = f"OVERDUE: Invoice {invoice.invoice_number}"
-
-        email = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=[invoice.client.email]
-        )
-
-        email.attach_alternative(html_content, "text/html")
-        email.send(fail_silently=False)
+        build_reminder_email(invoice, custom_message).send(fail_silently=False)
 
         return {
             'success': True,
@@ -0,0 +1,211 @@
+# app_core/kpi_engine.py
+"""
+Windowed KPI engine for the legacy dashboard.
+
+The dashboard needs the same transactions cut several ways: the chart window,
+the KPI window, the prior comparison window, top-category shares for the KPI
+window and the one before it, and a 7-day sparkline. Rather than one query per
+cut, ``dashboard_metrics`` takes the union span of all windows from a single
+TransactionFrame once and computes every figure from slices of it with NumPy
+(integer pence throughout, converted with ``to_display`` at the end).
+"""
+from __future__ import annotations
+
+import calendar
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from .buckets import bucket_series
+from .metrics import frame_kpis
+from .money import bincount_pence, to_display
+
+UNCATEGORISED = "Uncategorised"
+TOP_CATEGORIES = 3
+CHART_CATEGORIES = 10
+SPARKLINE_DAYS = 7
+# Year-to-date charts read better as months than as a single yearly bar
+CHART_BUCKETS = {"D": "D", "W": "W", "M": "M", "Y": "M"}
+
+
+def previous_window(start, end, calendar_month: bool = True):
+    """
+    The comparison window before [start, end]: the previous calendar month when
+    the window is exactly one month (and ``calendar_month`` is set), otherwise
+    the same number of days immediately before ``start``. (None, None) when
+    either bound is missing.
+    """
+    if not start or not end:
+        return None, None
+    if calendar_month and start.day == 1 and (start.year, start.month) == (end.year, end.month) \
+            and end.day == calendar.monthrange(end.year, end.month)[1]:
+        prev_end = start - datetime.timedelta(days=1)
+        return prev_end.replace(day=1), prev_end
+    period_len = (end - start).days + 1
+    prev_end = start - datetime.timedelta(days=1)
+    return prev_end - datetime.timedelta(days=period_len - 1), prev_end
+
+
+def union_span(*windows):
+    """Smallest (start, end) covering every window; an open bound stays open."""
+    starts = [w[0] for w in windows]
+    ends = [w[1] for w in windows]
+    start = None if any(s is None for s in starts) else min(starts)
+    end = None if any(e is None for e in ends) else max(ends)
+    return start, end
+
+
+def _delta(cur, prev):
+    abs_delta = round(cur - prev, 2)
+    pct = round((abs_delta / abs(prev)) * 100.0, 1) if prev != 0 else None
+    return {"abs": abs_delta, "pct": pct}
+
+
+def _category_name(frame, code):
+    return frame.categories[code] or UNCATEGORISED
+
+
+def _category_pence(window, inflow: bool):
+    """Per-category-code pence totals and row counts for one direction."""
+    mask = window.inflow if inflow else ~window.inflow
+    codes = window.category_codes[mask]
+    size = len(window.categories)
+    return bincount_pence(codes, window.pence[mask], size), np.bincount(codes, minlength=size)
+
+
+def top_categories(window, prev_window, inflow: bool, limit: int = TOP_CATEGORIES) -> list:
+    """
+    Largest categories by total for one direction, with their share of the
+    direction total and the change in share (percentage points) versus
+    ``prev_window`` when the category also appeared there.
+    """
+    totals, counts = _category_pence(window, inflow)
+    total = int(totals.sum())
+    prev_totals = prev_counts = None
+    prev_total = 0
+    if prev_window is not None:
+        prev_totals, prev_counts = _category_pence(prev_window, inflow)
+        prev_total = int(prev_totals.sum())
+
+    present = np.flatnonzero(counts)
+    order = present[np.argsort(-totals[present], kind="stable")][:limit]
+    rows = []
+    for code in order:
+        value = int(totals[code])
+        pct = round(value * 100.0 / total, 1) if total > 0 else None
+        change = None
+        if prev_counts is not None and prev_counts[code] and prev_total > 0 and pct is not None:
+            prev_pct = round(int(prev_totals[code]) * 100.0 / prev_total, 1)
+            change = round(pct - prev_pct, 1)
+        rows.append({
+            "name": _category_name(window, code),
+            "value": to_display(value),
+            "percent": pct,
+            "change": change,
+            "change_abs": round(abs(change), 1) if change is not None else None,
+        })
+    return rows
+
+
+def chart_categories(window, limit: int = CHART_CATEGORIES):
+    """
+    Top categories by absolute signed total for the category chart.
+
+    Returns (labels, absolute values, signs, by-category DataFrame for insights).
+    """
+    signed = bincount_pence(window.category_codes, window.signed_pence, len(window.categories))
+    present = np.flatnonzero(np.bincount(window.category_codes, minlength=len(window.categories)))
+    order = present[np.argsort(-np.abs(signed[present]), kind="stable")][:limit]
+    labels = [str(_category_name(window, code)) for code in order]
+    values = to_display(np.abs(signed[order]))
+    signs = [int(s) for s in np.sign(signed[order])]
+    bc = pd.DataFrame({"category": labels, "amount": values}, columns=["category", "amount"])
+    return labels, values, signs, bc
+
+
+def sparklines(frame, end, days: int = SPARKLINE_DAYS) -> dict:
+    """Daily inflow/outflow/net for the ``days`` ending on ``end`` (zero-filled)."""
+    start = end - datetime.timedelta(days=days - 1)
+    _, inflow, outflow = frame.daily_pence(start, end)
+    return {
+        "inflow": to_display(inflow),
+        "outflow": to_display(outflow),
+        "net": to_display(inflow - outflow),
+    }
+
+
+def dashboard_windows(chart=(None, None), kpi=(None, None), top=(None, None), today=None) -> dict:
+    """
+    Resolve every date window the dashboard uses, plus ``span``: the union of
+    them all, which is the only range that has to be fetched.
+
+    Args:
+        chart: (start, end) of the transactions behind the charts
+        kpi: (start, end) for the headline KPIs
+        top: (start, end) for the KPI comparison and top-category shares
+    """
+    today = today or datetime.date.today()
+    windows = {
+        "chart": chart,
+        "kpi": kpi,
+        "top": top,
+        # KPI comparison honours calendar months, top-category shares do not
+        "prev": previous_window(*top),
+        "top_prev": previous_window(*top, calendar_month=False),
+        "spark": (today - datetime.timedelta(days=SPARKLINE_DAYS - 1), today),
+    }
+    windows["span"] = union_span(
+        chart, kpi, top, windows["spark"],
+        *(w for w in (windows["prev"], windows["top_prev"]) if w[0] is not None),
+    )
+    return windows
+
+
+def dashboard_metrics(frame, windows: dict, category="", freq="D", series=None) -> dict:
+    """
+    Every figure the legacy dashboard shows, from one frame.
+
+    Args:
+        frame: TransactionFrame covering at least ``windows['span']``
+        windows: Result of ``dashboard_windows``
+        category: Optional category filter (applied to everything but the KPIs)
+        freq: Chart bucket ('D', 'W', 'M', 'Y')
+        series: (start, end) the zero-filled time series spans (default chart window)
+
+    Returns:
+        dict with kpi, kpi_prev, kpi_delta, top_outflows, top_inflows,
+        series (BucketSeries for the chart), df/ts/bc (for generate_insights),
+        cat_labels/cat_vals/cat_signs and sparkline (inflow/outflow/net lists)
+    """
+    span = frame.window(*windows["span"])
+    span_cat = span.with_category(category)
+
+    result = {"kpi": frame_kpis(span.window(*windows["kpi"])), "kpi_prev": None, "kpi_delta": {}}
+    if windows["prev"][0] is not None:
+        # Same category filter as the charts so the comparison is like for like
+        kpi_prev = frame_kpis(span_cat.window(*windows["prev"]))
+        result["kpi_prev"] = kpi_prev
+        result["kpi_delta"] = {
+            key: _delta(result["kpi"].get(key, 0.0), kpi_prev.get(key, 0.0))
+            for key in ("inflow", "outflow", "net")
+        }
+
+    top_window = span_cat.window(*windows["top"])
+    top_prev = windows["top_prev"]
+    top_prev_window = span_cat.window(*top_prev) if top_prev[0] is not None else None
+    result["top_outflows"] = top_categories(top_window, top_prev_window, inflow=False)
+    result["top_inflows"] = top_categories(top_window, top_prev_window, inflow=True)
+
+    chart_window = span_cat.window(*windows["chart"])
+    df = chart_window.to_df()
+    result["df"] = df
+    series = series or windows["chart"]
+    buckets = bucket_series(chart_window, series[0], series[1], CHART_BUCKETS.get(freq, "D"))
+    result["series"] = buckets
+    result["ts"] = buckets.to_df()
+    (result["cat_labels"], result["cat_vals"], result["cat_signs"],
+     result["bc"]) = chart_categories(chart_window)
+
+    result["sparkline"] = sparklines(span_cat, windows["spark"][1])
+    return result
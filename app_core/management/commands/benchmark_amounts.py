@@ -0,0 +1,72 @@
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from app_core.money import bincount_pence, to_display
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-day income/expense aggregation over N in-memory amounts: "
+        "Decimal and float loops vs int64 pence bincount."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows, days, repeat = options["rows"], options["days"], options["repeat"]
+        rng = np.random.default_rng(options["seed"])
+
+        pence = rng.integers(1, 500_000, rows, dtype=np.int64)
+        inflow = rng.random(rows) < 0.4
+        offsets = rng.integers(0, days, rows, dtype=np.int64)
+        # What the ORM hands the old code paths
+        decimals = [Decimal(int(p)) / 100 for p in pence]
+        floats = (pence / 100.0).tolist()
+        offsets_list = offsets.tolist()
+        inflow_list = inflow.tolist()
+
+        def decimal_loop():
+            income, expense = defaultdict(Decimal), defaultdict(Decimal)
+            for d, amount, is_in in zip(offsets_list, decimals, inflow_list):
+                (income if is_in else expense)[d] += amount
+            return [float(income.get(d, 0)) for d in range(days)]
+
+        def float_loop():
+            income, expense = defaultdict(float), defaultdict(float)
+            for d, amount, is_in in zip(offsets_list, floats, inflow_list):
+                (income if is_in else expense)[d] += amount
+            return [income.get(d, 0) for d in range(days)]
+
+        def pandas_groupby():
+            df = pd.DataFrame({"day": offsets, "amount": pence / 100.0, "inflow": inflow})
+            return df[df["inflow"]].groupby("day")["amount"].sum().reindex(range(days), fill_value=0).tolist()
+
+        def pence_bincount():
+            income = bincount_pence(offsets, np.where(inflow, pence, 0), days)
+            bincount_pence(offsets, np.where(inflow, 0, pence), days)
+            return to_display(income)
+
+        results = {}
+        for name, fn in (("decimal loop", decimal_loop), ("float loop", float_loop),
+                         ("pandas groupby", pandas_groupby), ("pence bincount", pence_bincount)):
+            best = float("inf")
+            for _ in range(repeat):
+                t = time.perf_counter()
+                out = fn()
+                best = min(best, time.perf_counter() - t)
+            results[name] = out
+            self.stdout.write(f"{name:>15}: {best * 1000:9.1f}ms")
+
+        exact = [round(v, 2) for v in results["decimal loop"]]
+        for name in ("float loop", "pandas groupby", "pence bincount"):
+            drift = sum(1 for a, b in zip(exact, results[name]) if a != b)
+            self.stdout.write(f"{name:>15}: {drift} of {days} daily totals differ from Decimal")
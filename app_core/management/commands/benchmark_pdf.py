@@ -0,0 +1,168 @@
+import random
+import re
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from app_core.frames import TransactionFrame
+from app_core.invoice_pdf import INVOICE_MARGINS, invoice_flowables
+from app_core.pdf_service import A4_WIDTH, spool_pdf, styles
+from app_core.reports import (
+    APPENDIX_STYLE, REPORT_MARGINS, REPORTS, _appendix_rows, build_report, report_flowables,
+)
+
+PAGE = re.compile(rb"/Type /Page\b")
+READ_CHUNK = 64 * 1024  # FileResponse's block size
+
+
+class Command(BaseCommand):
+    help = (
+        "Time and measure peak memory of long PDFs (a report with a transaction "
+        "appendix and a long invoice), rendered the old way (whole story, one "
+        "table, BytesIO) and streamed through a spool file. Uses synthetic "
+        "in-memory data, so nothing touches the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=6000, help="Appendix transactions (about 40 per page)")
+        parser.add_argument("--items", type=int, default=2500, help="Invoice line items (about 23 per page)")
+        parser.add_argument("--min-pages", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--skip-legacy", action="store_true")
+
+    def _frame(self, rows, rng):
+        labels = np.array(sorted(f"Label {i:02d}" for i in range(30)), dtype=object)
+        start = np.datetime64(date.today() - timedelta(days=364), "D")
+        return TransactionFrame(
+            np.arange(1, rows + 1, dtype=np.int64),
+            np.sort(start + np.array([rng.randrange(365) for _ in range(rows)], dtype="timedelta64[D]")),
+            np.array([rng.randrange(100, 500000) for _ in range(rows)], dtype=np.int64),
+            np.array([rng.random() < 0.4 for _ in range(rows)], dtype=bool),
+            np.zeros(rows, dtype=np.int32), np.array([""], dtype=object),
+            np.array([rng.randrange(-1, len(labels)) for _ in range(rows)], dtype=np.int32), labels,
+            np.array([f"Synthetic transaction #{i}" for i in range(rows)], dtype=object),
+            np.array([""] * rows, dtype=object),
+        )
+
+    def _invoice(self, items, rng):
+        lines = []
+        for i in range(items):
+            quantity = rng.randrange(1, 20)
+            price = Decimal(rng.randrange(500, 50000)) / 100
+            lines.append((f"Consulting item {i}", quantity, price, price * quantity))
+        subtotal = sum(line[3] for line in lines)
+        return {
+            "invoice_number": "BENCH-0001", "status_display": "Sent",
+            "client_name": "Benchmark Ltd", "client_company": "Benchmark Ltd",
+            "client_email": "accounts@example.com", "client_phone": "",
+            "payment_terms": "Net 30", "invoice_date": date.today(), "due_date": date.today() + timedelta(days=30),
+            "currency": "GBP", "items": lines, "subtotal": subtotal, "tax_rate": Decimal("20"),
+            "tax_amount": subtotal / 5, "discount": Decimal("0"), "total": subtotal * Decimal("1.2"),
+            "paid_amount": Decimal("0"), "balance_due": subtotal * Decimal("1.2"),
+            "notes": "", "terms": "", "contact_email": "billing@example.com",
+        }
+
+    def _legacy(self, story, **doc_kwargs):
+        """The previous approach: a fully built story into a BytesIO, copied out as bytes."""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate
+
+        buffer = BytesIO()
+        SimpleDocTemplate(buffer, pagesize=A4, **doc_kwargs).build(story())
+        return buffer.getvalue()
+
+    def _legacy_report(self, report, appendix):
+        from reportlab.platypus import PageBreak, Paragraph, Table, TableStyle
+
+        def story():
+            st = styles.__wrapped__()  # styles used to be rebuilt per request
+            flowables = list(report_flowables(report, "Benchmark Ltd", "benchmark"))
+            width = A4_WIDTH - REPORT_MARGINS["leftMargin"] - REPORT_MARGINS["rightMargin"]
+            table = Table([["Date", "Description", "Label", "Amount"]] + list(_appendix_rows(appendix, len(appendix))),
+                          colWidths=[0.14 * width, 0.46 * width, 0.22 * width, 0.18 * width], repeatRows=1)
+            table.setStyle(st.report_table)
+            table.setStyle(TableStyle(APPENDIX_STYLE))
+            return flowables + [PageBreak(), Paragraph("Appendix: Transactions", st.section), table]
+
+        return self._legacy(story, **REPORT_MARGINS)
+
+    def _legacy_invoice(self, data):
+        from reportlab.platypus import Table
+
+        def story():
+            st = styles.__wrapped__()
+            flowables = list(invoice_flowables(data))
+            # The chunked item tables are the ones headed 'Description'; the old view used one table
+            chunks = [i for i, f in enumerate(flowables) if isinstance(f, Table) and f._cellvalues[0][0] == "Description"]
+            first, last = chunks[0], chunks[-1]
+            currency = data["currency"]
+            items = Table(
+                [["Description", "Qty", "Unit Price", "Amount"]] + [
+                    [d, str(q), f"{currency} {p:.2f}", f"{currency} {a:.2f}"] for d, q, p, a in data["items"]
+                ],
+                colWidths=flowables[first]._colWidths, repeatRows=1,
+            )
+            items.setStyle(st.invoice_items)
+            return flowables[:first] + [items] + flowables[last + 1:]
+
+        return self._legacy(story, **INVOICE_MARGINS)
+
+    def _streamed(self, flowables, **doc_kwargs):
+        """Spool, then read back in FileResponse-sized blocks; returns the byte count and pages."""
+        spool = spool_pdf(flowables, **doc_kwargs)
+        size, pages, tail = 0, 0, b""
+        with spool:
+            while chunk := spool.read(READ_CHUNK):
+                size += len(chunk)
+                pages += len(PAGE.findall(tail + chunk)) - len(PAGE.findall(tail))
+                tail = chunk[-16:]
+        return size, pages
+
+    def _measure(self, fn):
+        t = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return elapsed, peak, result
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        frame = self._frame(options["rows"], rng)
+        report = build_report(REPORTS["expenses"], frame, None, None, organization=None)
+        invoice = self._invoice(options["items"], rng)
+        styles()  # built once per process, as in a running server
+
+        cases = [
+            ("report + appendix",
+             lambda: self._streamed(report_flowables(report, "Benchmark Ltd", "benchmark", appendix=frame),
+                                    **REPORT_MARGINS),
+             lambda: self._legacy_report(report, frame)),
+            ("invoice",
+             lambda: self._streamed(invoice_flowables(invoice), **INVOICE_MARGINS),
+             lambda: self._legacy_invoice(invoice)),
+        ]
+        short = []
+        self.stdout.write(f"{'document':>18} {'method':>9} {'pages':>6} {'size':>9} {'time':>9} {'peak mem':>10}")
+        for name, streamed, legacy in cases:
+            elapsed, peak, (size, pages) = self._measure(streamed)
+            self.stdout.write(f"{name:>18} {'streamed':>9} {pages:6d} {size / 1024:7.0f}KB "
+                              f"{elapsed * 1000:7.0f}ms {peak / 1024 / 1024:8.1f}MB")
+            if pages < options["min_pages"]:
+                short.append(f"{name} ({pages} pages)")
+            if not options["skip_legacy"]:
+                elapsed, peak, pdf = self._measure(legacy)
+                self.stdout.write(f"{name:>18} {'legacy':>9} {len(PAGE.findall(pdf)):6d} {len(pdf) / 1024:7.0f}KB "
+                                  f"{elapsed * 1000:7.0f}ms {peak / 1024 / 1024:8.1f}MB")
+
+        if short:
+            raise CommandError(f"Fewer than {options['min_pages']} pages: {', '.join(short)}; raise --rows/--items")
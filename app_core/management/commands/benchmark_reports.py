@@ -0,0 +1,144 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as dbtxn
+from django.db.models import Sum
+from django.template.loader import render_to_string
+
+from app_core.frames import org_frame
+from app_core.models import Budget, Label, Organization, Project, ProjectTransaction, Transaction
+from app_core.reports import REPORTS, build_report, previous_window, report_csv, report_pdf, report_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every report (HTML, CSV and PDF) over synthetic transactions and "
+        "check each against a per-report time budget. Rows are inserted inside a "
+        "transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--labels", type=int, default=40)
+        parser.add_argument("--budgets", type=int, default=24)
+        parser.add_argument("--projects", type=int, default=12)
+        parser.add_argument("--budget-ms", type=float, default=500.0,
+                            help="Time budget per report for build + HTML + CSV + PDF with a warm frame")
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--legacy", action="store_true",
+                            help="Also time the old per-label query loop for the P&L")
+
+    def _best(self, fn, repeat):
+        best, result = float("inf"), None
+        for _ in range(repeat):
+            t = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - t)
+        return best, result
+
+    def _legacy_pnl(self, org, labels, start, end):
+        """The previous P&L: one aggregate per label, direction and window."""
+        for w_start, w_end in ((start, end), previous_window(start, end)):
+            qs = Transaction.objects.filter(organization=org, date__gte=w_start, date__lte=w_end)
+            for label in labels:
+                for direction in (Transaction.INFLOW, Transaction.OUTFLOW):
+                    qs.filter(label=label, direction=direction).aggregate(total=Sum("amount"))
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        rows, repeat, budget_ms = options["rows"], options["repeat"], options["budget_ms"]
+        over = []
+
+        class Rollback(Exception):
+            pass
+
+        try:
+            with dbtxn.atomic():
+                owner = User.objects.create(username=f"report-bench-{time.time_ns()}")
+                org = Organization.objects.create(name="Report benchmark", slug=owner.username, owner=owner)
+                labels = Label.objects.bulk_create([
+                    Label(organization=org, user=owner, name=f"Label {i:02d}") for i in range(options["labels"])
+                ])
+                today = date.today()
+                span = 3 * 365
+                start = today - timedelta(days=span - 1)
+                t0 = time.perf_counter()
+                batch = []
+                for i in range(rows):
+                    batch.append(Transaction(
+                        organization=org,
+                        user=owner,
+                        date=start + timedelta(days=rng.randrange(span)),
+                        description=f"Synthetic #{i}",
+                        amount=rng.randrange(100, 500000) / 100,
+                        direction=Transaction.INFLOW if rng.random() < 0.4 else Transaction.OUTFLOW,
+                        label=rng.choice(labels) if rng.random() < 0.9 else None,
+                    ))
+                    if len(batch) == 5000:
+                        Transaction.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    Transaction.objects.bulk_create(batch)
+                self.stdout.write(f"Inserted {rows:,} rows in {time.perf_counter() - t0:.1f}s")
+
+                periods = [Budget.PERIOD_MONTHLY, Budget.PERIOD_WEEKLY, Budget.PERIOD_YEARLY]
+                for i in range(options["budgets"]):
+                    budget = Budget.objects.create(
+                        organization=org, user=owner, name=f"Budget {i:02d}",
+                        amount=Decimal(rng.randrange(1000, 100000)), period=periods[i % len(periods)],
+                    )
+                    budget.labels.set(rng.sample(labels, 2))
+                parents = []
+                for i in range(options["projects"]):
+                    project = Project.objects.create(
+                        organization=org, user=owner, name=f"Project {i:02d}", budget=Decimal(rng.randrange(10000, 500000)),
+                        start_date=start + timedelta(days=rng.randrange(span // 2)),
+                        parent_project=rng.choice(parents) if parents and i % 3 == 2 else None,
+                    )
+                    project.labels.set(rng.sample(labels, 3))
+                    parents.append(project)
+                tx_ids = list(Transaction.objects.filter(organization=org).values_list("id", flat=True)[:2000])
+                ProjectTransaction.objects.bulk_create([
+                    ProjectTransaction(project=rng.choice(parents), transaction_id=tx_id, allocation_percentage=Decimal("50"))
+                    for tx_id in rng.sample(tx_ids, min(len(tx_ids), 500))
+                ], ignore_conflicts=True)
+
+                cold, frame = self._best(lambda: org_frame(org), 1)
+                self.stdout.write(f"Frame load (cold, once per data version): {cold * 1000:.0f}ms")
+
+                windows = {"default": (None, None), "3 years": (start, today)}
+                header = f"{'report':>20} {'window':>8} {'build':>9} {'html':>9} {'csv':>9} {'pdf':>9} {'total':>9}"
+                self.stdout.write(header)
+                for spec in REPORTS.values():
+                    for window_name, (w_start, w_end) in windows.items():
+                        r_start, r_end = report_range(spec, w_start, w_end)
+                        build_t, report = self._best(
+                            lambda: build_report(spec, org_frame(org), r_start, r_end, organization=org), repeat,
+                        )
+                        html_t, _ = self._best(lambda: render_to_string(spec.template, report.context), repeat)
+                        csv_t, _ = self._best(lambda: report_csv(report), repeat)
+                        pdf_t, _ = self._best(lambda: report_pdf(report, generated_by=owner.username), repeat)
+                        total = (build_t + html_t + csv_t + pdf_t) * 1000
+                        flag = "" if total <= budget_ms else "  OVER BUDGET"
+                        if flag:
+                            over.append(f"{spec.key} ({window_name})")
+                        self.stdout.write(
+                            f"{spec.key:>20} {window_name:>8} {build_t * 1000:7.1f}ms {html_t * 1000:7.1f}ms "
+                            f"{csv_t * 1000:7.1f}ms {pdf_t * 1000:7.1f}ms {total:7.1f}ms{flag}"
+                        )
+
+                if options["legacy"]:
+                    legacy_t, _ = self._best(lambda: self._legacy_pnl(org, labels, *report_range(REPORTS["pnl"])), 1)
+                    self.stdout.write(f"{'legacy P&L queries':>20} {'default':>8} {legacy_t * 1000:7.1f}ms")
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Benchmark data rolled back")
+
+        if over:
+            raise CommandError(f"Over the {budget_ms:.0f}ms budget: {', '.join(over)}")
+        self.stdout.write(f"All reports within {budget_ms:.0f}ms")
@@ -0,0 +1,85 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction as dbtxn
+from django.db.models import Q
+
+from django.contrib.auth.models import User
+
+from app_core.models import Organization, Transaction
+from app_core.search import install_search_index, search_backend, search_transactions
+
+WORDS = [
+    "tesco", "sainsburys", "amazon", "uber", "deliveroo", "netflix", "spotify", "rent", "payroll",
+    "invoice", "refund", "transfer", "coffee", "fuel", "insurance", "council", "water", "electric",
+    "broadband", "mobile", "hotel", "flight", "train", "parking", "stationery", "software", "hosting",
+]
+QUERIES = ["tesco", "tes", "coffee shop", "invoice refund", "zzz-no-match"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare indexed search against icontains on N synthetic transactions. "
+        "Rows are inserted inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        rng = random.Random(options["seed"])
+
+        class Rollback(Exception):
+            pass
+
+        try:
+            with dbtxn.atomic():
+                owner = User.objects.create(username=f"search-bench-{time.time_ns()}")
+                org = Organization.objects.create(name="Search benchmark", slug=owner.username, owner=owner)
+                start = date.today() - timedelta(days=3 * 365)
+                t0 = time.perf_counter()
+                batch = []
+                for i in range(rows):
+                    batch.append(Transaction(
+                        organization=org,
+                        date=start + timedelta(days=rng.randrange(3 * 365)),
+                        description=" ".join(rng.sample(WORDS, 3)) + f" #{i}",
+                        amount=rng.randrange(100, 500000) / 100,
+                        direction=rng.choice([Transaction.INFLOW, Transaction.OUTFLOW]),
+                        account=rng.choice(["current", "savings", "card"]),
+                    ))
+                    if len(batch) == 5000:
+                        Transaction.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    Transaction.objects.bulk_create(batch)
+                install_search_index(connection)
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE app_core_transaction")  # refresh planner stats
+                self.stdout.write(f"Inserted {rows:,} rows in {time.perf_counter() - t0:.1f}s (backend: {search_backend()})")
+
+                base = Transaction.objects.filter(organization=org)
+                for q in QUERIES:
+                    legacy = base.filter(Q(description__icontains=q) | Q(category__icontains=q))
+                    indexed = search_transactions(base, q)
+                    results = {}
+                    for name, qs in (("icontains", legacy), ("indexed", indexed)):
+                        best = float("inf")
+                        for _ in range(repeat):
+                            t = time.perf_counter()
+                            count = qs.count()
+                            list(qs[:20])
+                            best = min(best, time.perf_counter() - t)
+                        results[name] = (best, count)
+                    self.stdout.write(
+                        f"{q!r:>18}: icontains {results['icontains'][0] * 1000:8.1f}ms ({results['icontains'][1]:,} rows)"
+                        f" | indexed {results['indexed'][0] * 1000:8.1f}ms ({results['indexed'][1]:,} rows)"
+                    )
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Benchmark data rolled back")
@@ -0,0 +1,235 @@
+import base64
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction as dbtxn
+from django.test import Client
+from django.test.utils import override_settings
+
+from app_core.budgets import get_budget_summary
+from app_core.models import Transaction
+from app_core.profiling import start_profile, stop_profile
+from app_core.projects import get_project_summary
+from app_core.synthetic import Scale, generate_organization, invalidate_organization
+
+SUITE = "analytics-hot-paths"
+SCHEMA_VERSION = 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the analytics hot paths (upload ingest, every dashboard widget, P&L "
+        "report, budget and project summaries, invoices page) against synthetic "
+        "organizations at several scales, and write a JSON report for "
+        "regression tracking. Each organization is generated inside a "
+        "transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="10000,100000,1000000",
+                            help="Comma-separated transaction counts")
+        parser.add_argument("--repeat", type=int, default=5, help="Warm runs per benchmark")
+        parser.add_argument("--upload-max", type=int, default=100_000,
+                            help="Rows in the uploaded CSV (the scale, capped at this)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="Write the JSON report to this file ('-' for stdout)")
+        parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+        parser.add_argument("--tolerance", type=float, default=1.25,
+                            help="Fail if a warm time or query count exceeds the baseline by this factor")
+
+    # Measuring
+
+    def _run(self, fn):
+        """Run once; returns (seconds, queries, sql ms, result). Queries in worker threads count too."""
+        profile, token = start_profile(force=True)
+        t = time.perf_counter()
+        try:
+            result = fn()
+        finally:
+            elapsed = time.perf_counter() - t
+            stop_profile(token)
+        return elapsed, profile.queries, profile.sql_ms, result
+
+    def _bench(self, fn, repeat, cold=None, check=None):
+        """Cold run (after ``cold()`` invalidates caches) plus ``repeat`` warm runs."""
+        if cold:
+            cold()
+        cold_s, queries, sql_ms, result = self._run(fn)
+        if check:
+            check(result)
+        warm = [self._run(fn) for _ in range(repeat)]
+        times = [w[0] * 1000 for w in warm]
+        return {
+            "cold_ms": round(cold_s * 1000, 2),
+            "warm_ms": round(min(times), 2) if times else None,
+            "warm_p50_ms": round(statistics.median(times), 2) if times else None,
+            "queries": queries,
+            "warm_queries": warm[-1][1] if warm else None,
+            "sql_ms": round(sql_ms, 2),
+        }
+
+    def _ok(self, response):
+        if response.status_code != 200:
+            raise CommandError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+
+    # Benchmarks
+
+    def _client(self, generated):
+        client = Client(SERVER_NAME="localhost")
+        client.force_login(generated.owner)
+        session = client.session
+        session["current_organization_id"] = generated.organization.pk
+        session.save()
+        return client
+
+    def _upload_csv(self, rows):
+        lines = ["date,description,amount,direction,category,account"]
+        for i in range(rows):
+            day = f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+            direction = "inflow" if i % 3 == 0 else "outflow"
+            lines.append(f"{day},Uploaded row {i},{(i % 5000) / 7 + 1:.2f},{direction},Upload,Current")
+        return ("\n".join(lines) + "\n").encode()
+
+    def _scale(self, rows, options):
+        from app_web.dashboard_views import WIDGET_DATA_FUNCTIONS
+
+        repeat = options["repeat"]
+        generated = generate_organization(
+            Scale.for_transactions(rows), seed=options["seed"],
+            progress=lambda message: self.stdout.write(f"    generate {message}"),
+        )
+        org = generated.organization
+        client = self._client(generated)
+        invalidate = lambda: invalidate_organization(org)  # noqa: E731
+
+        def dashboard():
+            # One request per widget: the batch endpoint runs widgets in worker threads, which
+            # can't see the uncommitted benchmark org
+            return [client.get(f"/api/dashboard/widget/{widget_id}/") for widget_id in WIDGET_DATA_FUNCTIONS]
+
+        def all_ok(responses):
+            for response in responses:
+                self._ok(response)
+
+        results = {}
+        results["dashboard_widgets"] = {
+            **self._bench(dashboard, repeat, cold=invalidate, check=all_ok), "widgets": len(WIDGET_DATA_FUNCTIONS),
+        }
+        results["report_pnl_view"] = self._bench(lambda: client.get("/reports/pnl/"), repeat,
+                                                 cold=invalidate, check=self._ok)
+        results["get_budget_summary"] = self._bench(lambda: get_budget_summary(org, Transaction), repeat,
+                                                    cold=invalidate)
+        results["get_project_summary"] = self._bench(lambda: get_project_summary(org, Transaction), repeat,
+                                                     cold=invalidate)
+        results["invoices_view"] = self._bench(lambda: client.get("/invoices/"), repeat,
+                                               cold=invalidate, check=self._ok)
+
+        # Last, as saving adds rows to the org; each step runs once
+        upload_rows = min(rows, options["upload_max"])
+        csv = self._upload_csv(upload_rows)
+        preview = self._bench(
+            lambda: client.post("/upload/", {"file": SimpleUploadedFile("bench.csv", csv, "text/csv")}),
+            0, check=self._ok,
+        )
+        save = self._bench(
+            lambda: client.post("/upload/", {"action": "save", "filename": "bench.csv",
+                                             "file_b64": base64.b64encode(csv).decode()}),
+            0, check=self._ok,
+        )
+        results["upload_preview"] = {**preview, "rows": upload_rows}
+        results["upload_save"] = {**save, "rows": upload_rows}
+        return {"transactions": rows, "generate_seconds": round(generated.seconds, 2),
+                "counts": generated.counts, "benchmarks": results}
+
+    # Reporting
+
+    def _environment(self):
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                    cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            commit = None
+        return {
+            "git_commit": commit,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "platform": platform.platform(),
+        }
+
+    def _regressions(self, report, baseline, tolerance):
+        def flatten(data):
+            return {
+                (scale["transactions"], name): values
+                for scale in data.get("scales", []) for name, values in scale["benchmarks"].items()
+            }
+
+        before, after = flatten(baseline), flatten(report)
+        out = []
+        for key, values in after.items():
+            old = before.get(key)
+            if not old:
+                continue
+            for metric in ("warm_ms", "queries"):
+                if old.get(metric) and values.get(metric) and values[metric] > old[metric] * tolerance:
+                    out.append(f"{key[1]} @ {key[0]:,} rows: {metric} {old[metric]} -> {values[metric]}")
+        return out
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(s.replace("_", "")) for s in options["scales"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError("--scales must be comma-separated integers")
+
+        report = {
+            "suite": SUITE,
+            "schema": SCHEMA_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": options["seed"],
+            "repeat": options["repeat"],
+            **self._environment(),
+            "scales": [],
+        }
+
+        class Rollback(Exception):
+            pass
+
+        # Budgets describe single requests in production; the suite measures, it doesn't enforce
+        with override_settings(PROFILING_ENFORCE_BUDGETS=False):
+            for rows in scales:
+                self.stdout.write(f"Scale {rows:,} transactions")
+                try:
+                    with dbtxn.atomic():
+                        result = self._scale(rows, options)
+                        raise Rollback
+                except Rollback:
+                    pass
+                report["scales"].append(result)
+                self.stdout.write(f"  {'benchmark':>20} {'cold':>10} {'warm':>10} {'p50':>10} {'queries':>8}")
+                for name, values in result["benchmarks"].items():
+                    warm = f"{values['warm_ms']:8.1f}ms" if values["warm_ms"] is not None else f"{'-':>10}"
+                    p50 = f"{values['warm_p50_ms']:8.1f}ms" if values["warm_p50_ms"] is not None else f"{'-':>10}"
+                    self.stdout.write(f"  {name:>20} {values['cold_ms']:8.1f}ms {warm} {p50} {values['queries']:8d}")
+
+        text = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(text)
+        elif options["output"]:
+            Path(options["output"]).write_text(text + "\n")
+            self.stdout.write(f"Wrote {options['output']}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = self._regressions(report, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+            self.stdout.write(f"No regressions beyond x{options['tolerance']:g} against {options['baseline']}")
@@ -0,0 +1,120 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction as dbtxn
+from django.db.models import Sum
+from django.db.models.functions import TruncWeek
+
+from app_core.models import Organization, Project, ProjectMilestone
+from app_core.task_models import Task, TaskTimeEntry
+from app_core.time_rollups import burn_series, rebuild_time_rollups, utilisation
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare weekly hour reads from task time rollups against scanning "
+        "TaskTimeEntry, and time incremental entry writes. Rows are inserted "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entries", type=int, default=200_000)
+        parser.add_argument("--tasks", type=int, default=500)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--weeks", type=int, default=104)
+        parser.add_argument("--writes", type=int, default=200, help="Entries saved one by one through the ORM")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _best(self, fn, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t)
+        return best
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        repeat = options["repeat"]
+
+        class Rollback(Exception):
+            pass
+
+        try:
+            with dbtxn.atomic():
+                stamp = time.time_ns()
+                users = User.objects.bulk_create([User(username=f"time-bench-{stamp}-{i}") for i in range(options["users"])])
+                org = Organization.objects.create(name="Time benchmark", slug=f"time-bench-{stamp}", owner=users[0])
+                start = date.today() - timedelta(weeks=options["weeks"])
+                project = Project.objects.create(organization=org, name="Benchmark", start_date=start)
+                milestones = [
+                    ProjectMilestone.objects.create(project=project, name=f"M{i}", due_date=start + timedelta(weeks=13 * (i + 1)))
+                    for i in range(4)
+                ]
+                tasks = Task.objects.bulk_create([
+                    Task(project=project, organization=org, title=f"Task {i}", task_number=i + 1,
+                         milestone=rng.choice(milestones + [None]), estimated_hours=Decimal(rng.randint(1, 80)))
+                    for i in range(options["tasks"])
+                ])
+                days = options["weeks"] * 7
+                t0 = time.perf_counter()
+                batch = []
+                for _ in range(options["entries"]):
+                    batch.append(TaskTimeEntry(
+                        task=rng.choice(tasks), user=rng.choice(users),
+                        hours=Decimal(rng.randint(25, 800)) / 100, date=start + timedelta(days=rng.randrange(days)),
+                    ))
+                    if len(batch) == 5000:
+                        TaskTimeEntry.objects.bulk_create(batch)
+                        batch = []
+                if batch:
+                    TaskTimeEntry.objects.bulk_create(batch)
+                self.stdout.write(f"Inserted {options['entries']:,} entries in {time.perf_counter() - t0:.1f}s")
+
+                t = time.perf_counter()
+                rows = rebuild_time_rollups(org)
+                self.stdout.write(f"Rebuilt {rows:,} rollup rows in {(time.perf_counter() - t) * 1000:.0f}ms")
+
+                entries = TaskTimeEntry.objects.filter(task__project=project).order_by()
+
+                def scan_weekly():
+                    return list(entries.annotate(week=TruncWeek("date")).values("week").annotate(h=Sum("hours")))
+
+                def scan_utilisation():
+                    cutoff = date.today() - timedelta(weeks=12)
+                    return list(
+                        TaskTimeEntry.objects.filter(task__organization=org, date__gte=cutoff).order_by()
+                        .annotate(week=TruncWeek("date")).values("user_id", "week").annotate(h=Sum("hours"))
+                    )
+
+                cases = [
+                    ("project weekly hours", scan_weekly, lambda: burn_series(project)),
+                    ("milestone weekly hours", lambda: list(
+                        entries.filter(task__milestone=milestones[0]).annotate(week=TruncWeek("date"))
+                        .values("week").annotate(h=Sum("hours"))
+                    ), lambda: burn_series(project, milestones[0])),
+                    ("12-week utilisation", scan_utilisation, lambda: utilisation(org)),
+                ]
+                for name, scan, rollup in cases:
+                    scan_t, rollup_t = self._best(scan, repeat), self._best(rollup, repeat)
+                    self.stdout.write(
+                        f"{name:>24}: scan {scan_t * 1000:8.1f}ms | rollup {rollup_t * 1000:8.1f}ms"
+                        f" | {scan_t / rollup_t:6.1f}x"
+                    )
+
+                writes = options["writes"]
+                t = time.perf_counter()
+                for _ in range(writes):
+                    TaskTimeEntry.objects.create(
+                        task=rng.choice(tasks), user=rng.choice(users),
+                        hours=Decimal("1.50"), date=date.today() - timedelta(days=rng.randrange(days)),
+                    )
+                self.stdout.write(f"{'incremental writes':>24}: {(time.perf_counter() - t) / writes * 1000:8.2f}ms per entry")
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Benchmark data rolled back")
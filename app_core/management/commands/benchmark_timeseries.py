@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from app_core.buckets import FREQS, daily_from_arrays
+
+LEGACY_FREQ = {"D": "D", "W": "W-SUN", "M": "ME", "Y": "YE"}
+
+
+def legacy_timeseries(df, freq, start, end):
+    """The previous metrics.timeseries approach: copy, mask-resample three times, reindex."""
+    d = df.copy()
+    d.set_index("date", inplace=True)
+    rule = LEGACY_FREQ[freq]
+    inflow = d.loc[d["signed_amount"] > 0, "signed_amount"].resample(rule).sum()
+    outflow = -d.loc[d["signed_amount"] < 0, "signed_amount"].resample(rule).sum()
+    net = d["signed_amount"].resample(rule).sum()
+    full_idx = pd.date_range(start=start, end=end, freq=rule)
+    return pd.DataFrame({
+        "inflow": pd.to_numeric(inflow, errors="coerce").fillna(0.0).reindex(full_idx, fill_value=0.0),
+        "outflow": pd.to_numeric(outflow, errors="coerce").fillna(0.0).reindex(full_idx, fill_value=0.0),
+        "net": pd.to_numeric(net, errors="coerce").fillna(0.0).reindex(full_idx, fill_value=0.0),
+    })
+
+
+class Command(BaseCommand):
+    help = (
+        "Time D/W/M/Y series over synthetic in-memory rows: the legacy pandas "
+        "resample path per frequency vs one daily bincount re-bucketed per frequency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="10000,100000,1000000,10000000",
+                            help="Comma-separated row counts")
+        parser.add_argument("--days", type=int, default=3 * 365)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        days, repeat = options["days"], options["repeat"]
+        rng = np.random.default_rng(options["seed"])
+        start = np.datetime64("2023-01-01", "D")
+        end = start + days - 1
+
+        self.stdout.write(f"{'rows':>12} {'legacy D/W/M/Y':>16} {'bincount D/W/M/Y':>18} {'speedup':>8}")
+        for rows in [int(r) for r in options["rows"].split(",") if r.strip()]:
+            dates = start + rng.integers(0, days, rows)
+            pence = rng.integers(1, 500_000, rows, dtype=np.int64)
+            inflow = rng.random(rows) < 0.4
+            df = pd.DataFrame({
+                "date": dates.astype("datetime64[ns]"),
+                "signed_amount": np.where(inflow, pence, -pence) / 100.0,
+            })
+
+            def legacy():
+                return [legacy_timeseries(df, f, str(start), str(end)) for f in FREQS]
+
+            def engine():
+                daily = daily_from_arrays(dates, pence, inflow, start, end)
+                return [daily.resample(f) for f in FREQS]
+
+            timings = {}
+            for name, fn in (("legacy", legacy), ("engine", engine)):
+                best = float("inf")
+                for _ in range(repeat):
+                    t = time.perf_counter()
+                    fn()
+                    best = min(best, time.perf_counter() - t)
+                timings[name] = best
+
+            self.stdout.write(
+                f"{rows:>12,} {timings['legacy'] * 1000:>14.1f}ms {timings['engine'] * 1000:>16.1f}ms "
+                f"{timings['legacy'] / timings['engine']:>7.1f}x"
+            )
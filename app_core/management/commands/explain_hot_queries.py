@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from app_core.models import Organization
+from app_core.query_plans import check_hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the per-request transaction sums of the analytics pages and "
+        "fail unless every read of the transaction table is index-only "
+        "(PostgreSQL 'Index Only Scan', SQLite 'COVERING INDEX'), against a "
+        "real database; the test suite runs the same check on the test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Organization id (default: the one with most transactions)")
+        parser.add_argument("--days", type=int, default=90, help="Date range to query")
+        parser.add_argument("--database", help="Database alias (default: where these reads are routed)")
+        parser.add_argument("--plans", action="store_true", help="Print the full plans")
+
+    def handle(self, *args, **options):
+        orgs = Organization.objects.all()
+        if options["organization"]:
+            orgs = orgs.filter(pk=options["organization"])
+        organization = orgs.annotate(n=Count("transactions")).order_by("-n", "pk").first()
+        if organization is None:
+            raise CommandError("No organization to query; create one (e.g. generate_synthetic_data)")
+
+        checks = check_hot_queries(organization, options["days"], using=options["database"])
+        for check in checks:
+            status = self.style.SUCCESS("index-only") if check.ok else self.style.ERROR("TABLE READ")
+            self.stdout.write(f"{check.name:>18}  {status}  {check.scans[0] if check.scans else '(no scan found)'}")
+            if options["plans"] or not check.ok:
+                for line in check.plan.splitlines():
+                    self.stdout.write(f"{'':20}{line}")
+
+        failed = [check.name for check in checks if not check.ok]
+        if failed:
+            raise CommandError(f"Not index-only: {', '.join(failed)}")
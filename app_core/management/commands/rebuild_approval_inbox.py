@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_core.approval_inbox import rebuild_approval_inbox
+from app_core.data_version import APPROVALS, bump_data_version
+from app_core.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Recompute the approvals inbox (one row per approval and approver role) from the workflows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", default=None, help="Organization id or slug (default: all)")
+
+    def handle(self, *args, **options):
+        org = None
+        org_ref = options["org"]
+        if org_ref:
+            org = Organization.objects.filter(**({"id": org_ref} if org_ref.isdigit() else {"slug": org_ref})).first()
+            if org is None:
+                raise CommandError(f"Organization {org_ref!r} not found")
+        rows = rebuild_approval_inbox(org)
+        org_ids = [org.pk] if org else Organization.objects.values_list("pk", flat=True)
+        for org_id in org_ids:
+            bump_data_version(org_id, scope=APPROVALS)
+        self.stdout.write(self.style.SUCCESS(f"Approval inbox rebuilt: {rows:,} rows"))
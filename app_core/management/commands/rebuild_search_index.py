@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app_core.search import rebuild_search_index, search_backend
+
+
+class Command(BaseCommand):
+    help = "Create (if missing) and repopulate the transaction full-text search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        rebuild_search_index(using)
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt (backend: {search_backend(using)})"))
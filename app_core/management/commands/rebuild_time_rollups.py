@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_core.models import Organization
+from app_core.time_rollups import rebuild_time_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute task time rollups (hours per project, milestone, user and week) from the time entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", default=None, help="Organization id or slug (default: all)")
+
+    def handle(self, *args, **options):
+        org = None
+        org_ref = options["org"]
+        if org_ref:
+            org = Organization.objects.filter(**({"id": org_ref} if org_ref.isdigit() else {"slug": org_ref})).first()
+            if org is None:
+                raise CommandError(f"Organization {org_ref!r} not found")
+        rows = rebuild_time_rollups(org)
+        self.stdout.write(self.style.SUCCESS(f"Time rollups rebuilt: {rows:,} rows"))
@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from app_core.db_router import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database into the replica file, to try read "
+        "replica routing locally (REPLICA_DATABASE_URL=sqlite:///...). The "
+        "copy is a snapshot: until the next refresh the replica lags, and "
+        "only the stickiness pins keep recent writes visible. PostgreSQL "
+        "replicas are kept up to date by replication, not by this command."
+    )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No replica configured; set REPLICA_DATABASE_URL")
+        primary, replica = settings.DATABASES[DEFAULT_DB_ALIAS], settings.DATABASES[alias]
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite" or connections[alias].vendor != "sqlite":
+            raise CommandError(
+                "Only SQLite replicas can be refreshed here; for two local PostgreSQL databases use "
+                "`pg_dump <primary> | psql <replica>` or set up streaming replication"
+            )
+        if str(primary["NAME"]) == str(replica["NAME"]):
+            raise CommandError("The replica is the primary's own file")
+
+        connections.close_all()
+        t = time.perf_counter()
+        source = sqlite3.connect(primary["NAME"])
+        target = sqlite3.connect(replica["NAME"])
+        try:
+            with target:
+                source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {primary['NAME']} to {replica['NAME']} in {time.perf_counter() - t:.2f}s"
+        ))
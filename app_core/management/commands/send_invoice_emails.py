@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_core.invoice_dispatch import DEFAULT_BATCH_SIZE, delivery_summary, dispatch_invoices, overdue_invoices
+from app_core.models import Invoice, InvoiceDelivery, Organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Email invoices or payment reminders in bulk: PDFs rendered in a process "
+        "pool, messages sent over one reused mail connection."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org", required=True, help="Organization id or slug")
+        parser.add_argument("--ids", default="", help="Comma-separated invoice ids")
+        parser.add_argument("--overdue", action="store_true", help="Every overdue invoice in the organization")
+        parser.add_argument("--kind", choices=[k for k, _ in InvoiceDelivery.KIND_CHOICES],
+                            default=InvoiceDelivery.KIND_REMINDER)
+        parser.add_argument("--message", default=None, help="Custom message for every email")
+        parser.add_argument("--workers", type=int, default=None, help="PDF rendering processes")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        org_ref = options["org"]
+        org = Organization.objects.filter(**({"id": org_ref} if org_ref.isdigit() else {"slug": org_ref})).first()
+        if org is None:
+            raise CommandError(f"Organization {org_ref!r} not found")
+
+        if options["overdue"]:
+            invoices = overdue_invoices(org)
+        elif options["ids"]:
+            ids = [int(i) for i in options["ids"].split(",") if i.strip()]
+            invoices = Invoice.objects.filter(organization=org, id__in=ids)
+        else:
+            raise CommandError("Pass --ids or --overdue")
+
+        batch_id, deliveries = dispatch_invoices(
+            invoices,
+            kind=options["kind"],
+            custom_message=options["message"],
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+        )
+        summary = delivery_summary(deliveries)
+        for row in summary["deliveries"]:
+            if row["status"] == InvoiceDelivery.STATUS_FAILED or options["verbosity"] > 1:
+                self.stdout.write(f"invoice {row['invoice_id']} -> {row['recipient'] or '-'}: {row['status']} {row['error']}")
+        self.stdout.write(f"Batch {batch_id}: {summary['sent']} sent, {summary['failed']} failed")
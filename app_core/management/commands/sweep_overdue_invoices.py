@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app_core.invoicing import sweep_overdue_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag sent/partially paid invoices past their due date as overdue. "
+        "Run once (e.g. from cron) or with --loop as a background worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, sweeping every --interval seconds")
+        parser.add_argument("--interval", type=int, default=900)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        while True:
+            flagged = sweep_overdue_invoices(batch_size=options["batch_size"])
+            if flagged or options["verbosity"] > 1:
+                self.stdout.write(f"Flagged {flagged} invoice(s) as overdue")
+            if not options["loop"]:
+                return
+            # Don't hold a connection open across long sleeps
+            close_old_connections()
+            time.sleep(options["interval"])
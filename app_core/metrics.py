@@ -6,22 +6,14 @@ from django.db.models import QuerySet
 from .models import Transaction
 
 def queryset_to_df(qs: QuerySet[Transaction]) -> pd.DataFrame:
-    data = list(qs.values(
-        "date", "description", "amount", "direction", "category", "account"
-    ))
-    if not data:
-        return pd.DataFrame(columns=["date","description","amount","direction","category","account","signed_amount"])
+    """Materialise a Transaction queryset as a DataFrame (sorted by date).
 
-    df = pd.DataFrame(data)
-
-    # Ensure proper dtypes
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-    # Decimal -> float
-    df["amount"] = pd.to_numeric(df["amount"], errors="coerce").fillna(0.0).astype(float)
-
-    # Compute signed amounts as float
-    df["signed_amount"] = np.where(df["direction"] == "inflow", df["amount"], -df["amount"]).astype(float)
-    return df
+    Goes through the columnar TransactionFrame so amounts arrive as integer
+    pence from SQL instead of Decimal objects. For whole-org date windows use
+    app_core.frames.org_frame(org).window(...) which is cached.
+    """
+    from .frames import TransactionFrame
+    return TransactionFrame.from_queryset(qs).to_df()
 
 def kpis(df: pd.DataFrame) -> dict:
     if df.empty:
@@ -31,89 +23,35 @@ def kpis(df: pd.DataFrame) -> dict:
     net = float(df["signed_amount"].sum())
     return {"inflow": round(inflow,2), "outflow": round(outflow,2), "net": round(net,2), "tx_count": int(len(df))}
 
+def frame_kpis(frame) -> dict:
+    """Same shape as kpis() but summed exactly in pence from a TransactionFrame."""
+    from .money import to_display
+    t = frame.totals()
+    return {"inflow": to_display(t["inflow"]), "outflow": to_display(t["outflow"]),
+            "net": to_display(t["net"]), "tx_count": t["count"]}
+
 def timeseries(df: pd.DataFrame, freq: str = "D", start: object = None, end: object = None) -> pd.DataFrame:
     """
-    Produce a time series aggregated by freq ('D','W','M' etc.).
-    If start/end are provided (date or parsable string), the returned frame will cover the full inclusive range
-    and fill missing periods with zeros so charts span the requested range.
-    """
-    # Normalize freq code (allow 'D','W','M','Y') to pandas-compatible resample alias
-    # Use week frequency that ends on Sunday so weeks are Mon-Sun
-    freq_code = (freq or 'D').upper()
-    if freq_code == 'W':
-        resample_freq = 'W-SUN'
-    elif freq_code in {'M', 'Y'}:
-        # monthly aggregation for both monthly and yearly charts
-        resample_freq = 'M'
-    else:
-        resample_freq = 'D'
-
-    # If start and end provided, create an index across the range; else return empty frame
-    if start is not None:
-        try:
-            start_ts = pd.to_datetime(start)
-        except Exception:
-            start_ts = None
-    else:
-        start_ts = None
-    if end is not None:
-        try:
-            end_ts = pd.to_datetime(end)
-        except Exception:
-            end_ts = None
-    else:
-        end_ts = None
+    Produce a time series aggregated by freq ('D', 'W' weeks ending Sunday,
+    'M' months, 'Y' years). The frame covers every bucket overlapping the
+    inclusive start/end range (or the data's own range) with zeros for gaps.
 
+    Computed with app_core.buckets; callers holding a TransactionFrame should
+    use buckets.bucket_series directly and skip the DataFrame round trip.
+    """
+    from .buckets import daily_from_arrays
     if df.empty:
-        # If start and end provided, create an index across the range; else return empty frame
-        if start_ts is not None and end_ts is not None:
-            try:
-                full_idx = pd.date_range(start=start_ts, end=end_ts, freq=resample_freq)
-            except Exception:
-                # fallback to daily
-                full_idx = pd.date_range(start=start_ts, end=end_ts, freq='D')
-            out = pd.DataFrame({"inflow": 0.0, "outflow": 0.0, "net": 0.0}, index=full_idx)
-            out = out.reset_index().rename(columns={"index": "date"})
-            out["date"] = out["date"].dt.date
-            return out
-        return pd.DataFrame(columns=["date", "inflow", "out"])
-
-    d = df.copy()
-    d["date"] = pd.to_datetime(d["date"])  # ensure datetime dtype
-    d.set_index("date", inplace=True)
-
-    inflow = d.loc[d["signed_amount"] > 0, "signed_amount"].resample(resample_freq).sum()
-    outflow = -d.loc[d["signed_amount"] < 0, "signed_amount"].resample(resample_freq).sum()
-    net = d["signed_amount"].resample(resample_freq).sum()
-
-    # Coerce to float and fill gaps
-    inflow = pd.to_numeric(inflow, errors="coerce").fillna(0.0).astype(float)
-    outflow = pd.to_numeric(outflow, errors="coerce").fillna(0.0).astype(float)
-    net = pd.to_numeric(net, errors="coerce").fillna(0.0).astype(float)
-
-    # Determine full index to cover requested start/end (or current series bounds)
+        dates = np.empty(0, dtype="datetime64[D]")
+        signed = np.empty(0, dtype=float)
+    else:
+        dates = pd.to_datetime(df["date"]).to_numpy().astype("datetime64[D]")
+        signed = pd.to_numeric(df["signed_amount"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    pence = np.rint(np.abs(signed) * 100).astype(np.int64)
     try:
-        idx_start = start_ts if start_ts is not None else (inflow.index.min() if not inflow.empty else None)
-        idx_end = end_ts if end_ts is not None else (inflow.index.max() if not inflow.empty else None)
-        if idx_start is None or idx_end is None:
-            full_idx = inflow.index.union(outflow.index).union(net.index).sort_values()
-        else:
-            try:
-                full_idx = pd.date_range(start=idx_start, end=idx_end, freq=resample_freq)
-            except Exception:
-                full_idx = pd.date_range(start=idx_start, end=idx_end, freq='D')
-    except Exception:
-        full_idx = inflow.index.union(outflow.index).union(net.index).sort_values()
-
-    # Reindex series to full index so missing periods show zeros
-    inflow = inflow.reindex(full_idx, fill_value=0.0)
-    outflow = outflow.reindex(full_idx, fill_value=0.0)
-    net = net.reindex(full_idx, fill_value=0.0)
-
-    out = pd.DataFrame({"inflow": inflow, "outflow": outflow, "net": net}, index=full_idx)
-    out = out.reset_index().rename(columns={"index": "date"})
-    out["date"] = out["date"].dt.date
-    return out
+        daily = daily_from_arrays(dates, pence, signed > 0, start, end)
+    except (ValueError, TypeError):
+        daily = daily_from_arrays(dates, pence, signed > 0)
+    return daily.resample(freq).to_df()
 
 
 def by_category(df: pd.DataFrame) -> pd.DataFrame:
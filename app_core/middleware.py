@@ -4,8 +4,11 @@ Team Collaboration Middleware
 - Organization context provider
 - Permission checking
 - Activity logging
+- Request profiling (see app_core.profiling)
+- Read-replica stickiness (see app_core.db_router)
 """
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils.deprecation import MiddlewareMixin
 from django.shortcuts import redirect
 from django.contrib import messages
@@ -17,16 +20,34 @@ def organization_required(view_func):
     """
     Decorator that ensures user has an organization context.
     Redirects to organization creation if user has no organization.
+    Works on sync and async views.
     """
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        if not request.user.is_authenticated:
+    def _missing(request, user):
+        if not user.is_authenticated:
             return redirect('login')
 
         if not hasattr(request, 'organization') or request.organization is None:
             messages.warning(request, 'You need to be part of an organization to access this page.')
             return redirect('home')
 
+        return None
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            response = _missing(request, await request.auser())
+            if response is not None:
+                return response
+            return await view_func(request, *args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = _missing(request, request.user)
+        if response is not None:
+            return response
+
         return view_func(request, *args, **kwargs)
 
     return wrapper
@@ -122,3 +143,63 @@ class ActivityLoggingMiddleware(MiddlewareMixin):
         return ip
 
 
+class ProfilingMiddleware:
+    """
+    Records SQL count, SQL time, Python time and response size for a sample
+    of requests, by URL name, and checks views' query budgets. Put it near
+    the top of MIDDLEWARE so the queries of the middleware below it count.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        from app_core.profiling import enforce_budgets, record, start_profile, stop_profile
+
+        profile, token = start_profile(force=enforce_budgets())
+        if profile is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_profile(token)
+        return record(request, profile, response)
+
+    async def __acall__(self, request):
+        from app_core.profiling import enforce_budgets, record, start_profile, stop_profile
+
+        profile, token = start_profile(force=enforce_budgets())
+        if profile is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profile(token)
+        return record(request, profile, response)
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """
+    After an unsafe request (POST etc.) keep the user's reads on the primary
+    for REPLICA_STICKY_SECONDS with a cookie, so they see their own writes
+    while the replica catches up. Views that take POST as a read (see
+    ``replica_reads``) don't pin. Does nothing without a replica.
+    """
+
+    def process_response(self, request, response):
+        from app_core.db_router import PIN_COOKIE, SAFE_METHODS, replica_alias, sticky_seconds
+
+        if request.method in SAFE_METHODS or replica_alias() is None:
+            return response
+        match = getattr(request, "resolver_match", None)
+        if match and request.method in getattr(match.func, "replica_methods", ()):
+            return response
+        response.set_cookie(PIN_COOKIE, "1", max_age=sticky_seconds(), httponly=True, samesite="Lax")
+        return response
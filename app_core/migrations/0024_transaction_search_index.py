@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from app_core.search import install_search_index
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from app_core.search import drop_search_index
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("app_core", "0023_dashboard_layout"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
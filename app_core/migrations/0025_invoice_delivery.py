@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_core', '0024_transaction_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(help_text='Dispatch batch this delivery belongs to', max_length=32)),
+                ('kind', models.CharField(choices=[('invoice', 'Invoice'), ('reminder', 'Reminder')], default='invoice', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('recipient', models.EmailField(blank=True, default='', max_length=254)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='app_core.invoice')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='invoice_deliveries', to='app_core.organization')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['batch_id'], name='app_core_in_batch_i_66dd1c_idx'), models.Index(fields=['invoice', 'created_at'], name='app_core_in_invoice_2b3307_idx')],
+            },
+        ),
+    ]
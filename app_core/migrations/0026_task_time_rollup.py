@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_rollups(apps, schema_editor):
+    from datetime import timedelta
+
+    from django.db.models import Count, Sum
+    from django.db.models.functions import TruncWeek
+
+    TaskTimeEntry = apps.get_model("app_core", "TaskTimeEntry")
+    TaskTimeRollup = apps.get_model("app_core", "TaskTimeRollup")
+    rows = (
+        TaskTimeEntry.objects.order_by()
+        .annotate(week=TruncWeek("date"))
+        .values("task__organization_id", "task__project_id", "task__milestone_id", "user_id", "week")
+        .annotate(hours=Sum("hours"), n=Count("id"))
+    )
+    TaskTimeRollup.objects.bulk_create(
+        [
+            TaskTimeRollup(
+                organization_id=row["task__organization_id"],
+                project_id=row["task__project_id"],
+                milestone_id=row["task__milestone_id"],
+                user_id=row["user_id"],
+                week=row["week"] - timedelta(days=row["week"].weekday()),
+                hours=row["hours"],
+                entry_count=row["n"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_core', '0025_invoice_delivery'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField(help_text='Monday of the ISO week')),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('milestone', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_rollups', to='app_core.projectmilestone')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_time_rollups', to='app_core.organization')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to='app_core.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_time_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['week'],
+                'indexes': [models.Index(fields=['project', 'week'], name='app_core_ta_project_ebef2f_idx'), models.Index(fields=['milestone', 'week'], name='app_core_ta_milesto_014ce6_idx'), models.Index(fields=['organization', 'week', 'user'], name='app_core_ta_organiz_456b01_idx')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_inbox(apps, schema_editor):
+    Approval = apps.get_model("app_core", "Approval")
+    ApprovalWorkflow = apps.get_model("app_core", "ApprovalWorkflow")
+    ApprovalInboxEntry = apps.get_model("app_core", "ApprovalInboxEntry")
+    roles = {}
+    for workflow_id, role_id in ApprovalWorkflow.approver_roles.through.objects.values_list(
+        "approvalworkflow_id", "organizationrole_id"
+    ):
+        roles.setdefault(workflow_id, []).append(role_id)
+    ApprovalInboxEntry.objects.bulk_create(
+        [
+            ApprovalInboxEntry(
+                organization_id=approval.organization_id,
+                approval_id=approval.id,
+                role_id=role_id,
+                status=approval.status,
+                created_at=approval.created_at,
+            )
+            for approval in Approval.objects.all()
+            for role_id in roles.get(approval.workflow_id, ())
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_core', '0026_task_time_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('approval', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='app_core.approval')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox', to='app_core.organization')),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox', to='app_core.organizationrole')),
+            ],
+            options={
+                'verbose_name_plural': 'Approval inbox entries',
+                'ordering': ['-created_at', '-approval_id'],
+                'indexes': [models.Index(fields=['organization', 'role', 'status', '-created_at'], name='app_core_ap_organiz_e8364b_idx')],
+                'unique_together': {('approval', 'role')},
+            },
+        ),
+        migrations.RunPython(populate_inbox, migrations.RunPython.noop),
+    ]
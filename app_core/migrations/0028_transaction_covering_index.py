@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_core', '0027_approval_inbox'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['organization', 'direction', 'date', 'label', 'amount'], name='app_core_tx_org_dir_date_cov'),
+        ),
+    ]
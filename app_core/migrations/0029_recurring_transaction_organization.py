@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_organizations(apps, schema_editor):
+    """A template belongs to its label's organization, else its creator's first organization."""
+    RecurringTransaction = apps.get_model("app_core", "RecurringTransaction")
+    OrganizationMember = apps.get_model("app_core", "OrganizationMember")
+    memberships = {}
+    for user_id, org_id in (
+        OrganizationMember.objects.filter(is_active=True).order_by("-id").values_list("user_id", "organization_id")
+    ):
+        memberships[user_id] = org_id  # lowest id wins
+    for template in RecurringTransaction.objects.filter(organization__isnull=True).select_related("label"):
+        org_id = (template.label.organization_id if template.label else None) or memberships.get(template.user_id)
+        if org_id:
+            RecurringTransaction.objects.filter(pk=template.pk).update(organization_id=org_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_core', '0028_transaction_covering_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringtransaction',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurring_transactions', to='app_core.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringtransaction',
+            index=models.Index(fields=['organization', 'active'], name='app_core_re_organiz_db4482_idx'),
+        ),
+        migrations.RunPython(assign_organizations, migrations.RunPython.noop),
+    ]
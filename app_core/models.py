@@ -11,6 +11,7 @@ from .team_models import (
     PermissionRequest,
     ApprovalWorkflow,
     Approval,
+    ApprovalInboxEntry,
     ActivityLog,
 )
 
@@ -81,6 +82,11 @@ class Transaction(models.Model):
             models.Index(fields=["user", "date"]),
             models.Index(fields=["user", "label"]),
             models.Index(fields=["organization", "date"]),
+            # Covers the analytics sums (org + direction + date range, by label) so they
+            # are index-only; label and amount are key columns, not INCLUDE, because
+            # SQLite has no INCLUDE (see app_core.query_plans)
+            models.Index(fields=["organization", "direction", "date", "label", "amount"],
+                         name="app_core_tx_org_dir_date_cov"),
         ]
         ordering = ["-date", "-id"]
 
@@ -190,6 +196,13 @@ class RecurringTransaction(models.Model):
     ]
 
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="recurring_transactions", help_text="User who created this recurring transaction")
+    organization = models.ForeignKey(
+        'Organization',
+        on_delete=models.CASCADE,
+        related_name="recurring_transactions",
+        null=True,  # Temporarily nullable for migration
+        blank=True
+    )
     description = models.CharField(max_length=512, help_text="Transaction description")
     amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Transaction amount")
     direction = models.CharField(max_length=10, choices=Transaction.DIRECTION_CHOICES, help_text="Inflow or Outflow")
@@ -213,6 +226,7 @@ class RecurringTransaction(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["user", "active"]),
+            models.Index(fields=["organization", "active"]),
             models.Index(fields=["start_date", "end_date"]),
             models.Index(fields=["last_generated_date"]),
         ]
@@ -223,6 +237,21 @@ class RecurringTransaction(models.Model):
         label_name = self.label.name if self.label else self.category or "Uncategorized"
         return f"{sign}£{self.amount} [{label_name}] {self.description[:30]} ({self.get_frequency_display()})"
 
+    def save(self, *args, **kwargs):
+        """Default the organization to the label's, else the creator's first (as migration 0029 did)"""
+        if self.organization_id is None:
+            if self.label_id:
+                self.organization_id = Label.objects.filter(pk=self.label_id).values_list("organization_id", flat=True).first()
+            if self.organization_id is None and self.user_id:
+                self.organization_id = (
+                    OrganizationMember.objects.filter(user_id=self.user_id, is_active=True)
+                    .order_by("id").values_list("organization_id", flat=True).first()
+                )
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and self.organization_id is not None:
+                kwargs["update_fields"] = {*update_fields, "organization"}
+        super().save(*args, **kwargs)
+
 
 class Project(models.Model):
     """
@@ -683,6 +712,56 @@ class InvoicePayment(models.Model):
         return f"Payment {self.amount} for {self.invoice.invoice_number} on {self.payment_date}"
 
 
+class InvoiceDelivery(models.Model):
+    """
+    Delivery record for one invoice or reminder email sent in a batch dispatch.
+    """
+    KIND_INVOICE = "invoice"
+    KIND_REMINDER = "reminder"
+
+    KIND_CHOICES = [
+        (KIND_INVOICE, "Invoice"),
+        (KIND_REMINDER, "Reminder"),
+    ]
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    organization = models.ForeignKey(
+        'Organization',
+        on_delete=models.CASCADE,
+        related_name="invoice_deliveries",
+        null=True,
+        blank=True
+    )
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="deliveries")
+    batch_id = models.CharField(max_length=32, help_text="Dispatch batch this delivery belongs to")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=KIND_INVOICE)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    recipient = models.EmailField(blank=True, default="")
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["batch_id"]),
+            models.Index(fields=["invoice", "created_at"]),
+        ]
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.invoice.invoice_number} to {self.recipient} ({self.status})"
+
+
 class InvoiceTemplate(models.Model):
     """
     Reusable invoice templates for common services/products.
@@ -731,4 +810,4 @@ class InvoiceTemplateItem(models.Model):
 
 
 # Import Task models to register them with Django
-from .task_models import Task, TaskComment, TaskTimeEntry, TaskActivity
+from .task_models import Task, TaskComment, TaskTimeEntry, TaskActivity, TaskTimeRollup
@@ -0,0 +1,62 @@
+# app_core/money.py
+"""
+Integer minor-unit (pence) helpers for the analytics path.
+
+Amounts move through analytics as int64 pence (NumPy arrays or Python ints),
+so sums are exact and vectorised. Conversion to display currency happens
+only at serialization time via ``to_display``.
+
+Float64 holds every integer up to 2**53 exactly, so NumPy routines that
+accumulate in float64 (e.g. ``np.bincount`` weights) are still exact for any
+total below ~90 trillion pounds; results are rounded back to int64.
+"""
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+PENCE = 100
+
+
+def to_pence(value) -> int:
+    """Convert a Decimal/str/int/float amount in major units to integer pence."""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, np.integer)):
+        return int(value) * PENCE
+    d = value if isinstance(value, Decimal) else Decimal(str(value))
+    return int((d * PENCE).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_pence(pence) -> Decimal:
+    """Integer pence to a 2dp Decimal (for model fields and exact display)."""
+    return (Decimal(int(pence)) / PENCE).quantize(Decimal("0.01"))
+
+
+def to_display(pence):
+    """
+    Pence -> float in major units, rounded to 2dp, for JSON/chart payloads.
+
+    Accepts an int, a NumPy integer array or a sequence; arrays come back as
+    plain lists of floats.
+    """
+    if isinstance(pence, (int, np.integer)):
+        return round(int(pence) / PENCE, 2)
+    arr = np.asarray(pence, dtype=np.int64)
+    return np.round(arr / PENCE, 2).tolist()
+
+
+def bincount_pence(index, pence, minlength: int = 0) -> np.ndarray:
+    """Sum int64 pence into integer buckets exactly (see module docstring)."""
+    if not len(index):
+        return np.zeros(minlength, dtype=np.int64)
+    sums = np.bincount(index, weights=pence, minlength=minlength)
+    return np.rint(sums).astype(np.int64)
+
+
+def pct_change(current, previous):
+    """Percentage change between two pence values (0 when there is no baseline)."""
+    if not previous:
+        return 0.0
+    return (int(current) - int(previous)) * 100.0 / int(previous)
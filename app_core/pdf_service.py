@@ -0,0 +1,223 @@
+# app_core/pdf_service.py
+"""
+Incremental PDF rendering shared by reports and invoices.
+
+Building a whole ReportLab story up front keeps every flowable alive until
+the document is finished, and one long table is re-split on every page
+break, re-wrapping all of the rows still to come. Here:
+
+- callers yield flowables from a generator; ``FlowableStream`` feeds them
+  to ReportLab a few at a time, so only the current page's flowables are in
+  memory;
+- ``chunked_table`` cuts long tables into page-sized tables with the header
+  repeated, so a page break only splits a small table;
+- the document is written to a ``SpooledTemporaryFile`` (in memory up to
+  PDF_SPOOL_MAX_MEMORY bytes, then on disk) and ``pdf_response`` streams it
+  back with FileResponse, rather than copying the finished PDF into one
+  bytes object;
+- paragraph and base table styles are built once per process by ``styles``
+  and reused by every document.
+
+``python manage.py benchmark_pdf`` measures time and peak memory for long
+outputs.
+"""
+from __future__ import annotations
+
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.conf import settings
+
+DEFAULT_SPOOL_MAX_MEMORY = 1024 * 1024
+A4_WIDTH = 595.27  # points
+ROWS_PER_TABLE = 40  # roughly one A4 page of 9pt rows
+LOOKAHEAD = 8  # flowables kept ahead of ReportLab (keepWithNext looks a few ahead)
+
+
+def spool_max_memory() -> int:
+    return getattr(settings, "PDF_SPOOL_MAX_MEMORY", DEFAULT_SPOOL_MAX_MEMORY)
+
+
+@lru_cache(maxsize=None)
+def styles() -> SimpleNamespace:
+    """Paragraph styles and base TableStyles, built once per process."""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_LEFT, TA_RIGHT
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    sheet = getSampleStyleSheet()
+    s = SimpleNamespace()
+
+    # Reports
+    s.company = ParagraphStyle("Company", parent=sheet["Normal"], fontSize=10, textColor=colors.HexColor("#6b7280"))
+    s.title = ParagraphStyle("ReportTitle", parent=sheet["Heading1"], fontName="Helvetica-Bold", fontSize=20,
+                             textColor=colors.HexColor("#111827"), spaceAfter=6)
+    s.subtitle = ParagraphStyle("Subtitle", parent=sheet["Normal"], fontSize=10, textColor=colors.HexColor("#6b7280"))
+    s.section = ParagraphStyle("Section", parent=sheet["Heading3"], textColor=colors.HexColor("#111827"))
+    s.footer = ParagraphStyle("Footer", parent=sheet["Normal"], fontSize=8, textColor=colors.HexColor("#9ca3af"))
+    s.note = ParagraphStyle("Note", parent=s.footer, fontName="Helvetica-Oblique")
+    s.header_left = ParagraphStyle("HeaderCell", parent=sheet["Normal"], fontName="Helvetica-Bold", fontSize=9,
+                                   textColor=colors.white)
+    s.header_right = ParagraphStyle("HeaderCellNum", parent=s.header_left, alignment=TA_RIGHT)
+    s.report_table = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e40af")),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LINEBELOW", (0, 1), (-1, -1), 0.25, colors.HexColor("#e6e9ef")),
+        ("TOPPADDING", (0, 0), (-1, -1), 5),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
+    ])
+    s.report_total = TableStyle([
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("LINEABOVE", (0, -1), (-1, -1), 1, colors.HexColor("#111827")),
+    ])
+
+    # Invoices
+    s.invoice_title = ParagraphStyle("CustomTitle", parent=sheet["Heading1"], fontSize=24,
+                                     textColor=colors.HexColor("#2563eb"), spaceAfter=6, alignment=TA_LEFT)
+    s.heading = ParagraphStyle("CustomHeading", parent=sheet["Heading2"], fontSize=14,
+                               textColor=colors.HexColor("#374151"), spaceAfter=12, spaceBefore=12)
+    s.normal = ParagraphStyle("CustomNormal", parent=sheet["Normal"], fontSize=10, textColor=colors.HexColor("#111827"))
+    s.small = ParagraphStyle("CustomSmall", parent=sheet["Normal"], fontSize=9, textColor=colors.HexColor("#6b7280"))
+    s.invoice_info = TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+    ])
+    s.invoice_items = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f3f4f6")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#374151")),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("TOPPADDING", (0, 0), (-1, 0), 12),
+        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), 8),
+        ("TOPPADDING", (0, 1), (-1, -1), 8),
+        ("ALIGN", (1, 0), (1, -1), "CENTER"),
+        ("ALIGN", (2, 0), (-1, -1), "RIGHT"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#e5e7eb")),
+        ("LINEBELOW", (0, 0), (-1, 0), 2, colors.HexColor("#e5e7eb")),
+    ])
+    s.invoice_totals = TableStyle([
+        ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+        ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("LINEABOVE", (0, -2), (-1, -2), 1, colors.HexColor("#e5e7eb")),
+    ])
+    return s
+
+
+class FlowableStream(list):
+    """
+    A list that ReportLab can consume (``len``, ``[0]``, ``del [0]``,
+    ``insert``) while it is refilled from a generator, keeping only
+    LOOKAHEAD flowables buffered.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+        self._done = False
+
+    def _fill(self, upto=LOOKAHEAD):
+        while not self._done and list.__len__(self) < upto:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._done = True
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._fill(max(LOOKAHEAD, index + 1))
+        elif not isinstance(index, int):
+            self._fill(float("inf"))  # slices and negative indexes need the rest
+        return list.__getitem__(self, index)
+
+    def __iter__(self):
+        self._fill(float("inf"))
+        return list.__iter__(self)
+
+
+def chunked_table(header, rows, col_widths, style, total=None, extra_style=(), rows_per_table=ROWS_PER_TABLE):
+    """
+    Yield a long table as tables of at most ``rows_per_table`` body rows,
+    each with ``header`` repeated. ``total`` is appended to the last chunk
+    and styled with ``extra_style`` commands plus the report total style.
+    ``rows`` may be any iterable; it is consumed one chunk at a time.
+    """
+    from reportlab.platypus import Table, TableStyle
+
+    def table(body, last):
+        data = [header] + body + ([total] if last and total else [])
+        t = Table(data, colWidths=col_widths, repeatRows=1)
+        t.setStyle(style)
+        if extra_style:
+            t.setStyle(TableStyle(list(extra_style)))
+        if last and total:
+            t.setStyle(styles().report_total)
+        return t
+
+    # One chunk is held back so that the total always lands on the last table
+    pending, chunk = None, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == rows_per_table:
+            if pending is not None:
+                yield table(pending, last=False)
+            pending, chunk = chunk, []
+    if chunk:
+        if pending is not None:
+            yield table(pending, last=False)
+        pending = chunk
+    yield table(pending or [], last=True)
+
+
+def build_pdf(flowables, out, **doc_kwargs):
+    """Render ``flowables`` (any iterable) into the binary file ``out``."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc_kwargs.setdefault("pagesize", A4)
+    doc = SimpleDocTemplate(out, **doc_kwargs)
+    doc.build(FlowableStream(flowables))
+    return out
+
+
+def render_pdf(flowables, **doc_kwargs) -> bytes:
+    """Render to bytes (for email attachments and worker processes)."""
+    buffer = BytesIO()
+    build_pdf(flowables, buffer, **doc_kwargs)
+    return buffer.getvalue()
+
+
+def spool_pdf(flowables, **doc_kwargs):
+    """Render into a spooled temporary file, rewound and ready to read."""
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max_memory(), suffix=".pdf")
+    try:
+        build_pdf(flowables, spool, **doc_kwargs)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def pdf_response(flowables, filename, **doc_kwargs):
+    """A streaming attachment response; the spool file is closed (and deleted) when it's been sent."""
+    from django.http import FileResponse
+
+    return FileResponse(spool_pdf(flowables, **doc_kwargs), as_attachment=True,
+                        filename=filename, content_type="application/pdf")
@@ -0,0 +1,242 @@
+# app_core/profiling.py
+"""
+Per-request SQL and latency profiling.
+
+``ProfilingMiddleware`` (see app_core.middleware) profiles a sample of
+requests (PROFILING_SAMPLE_RATE) and records, by URL name:
+
+- SQL queries and SQL time, counted by a database execute wrapper that is
+  installed on every connection as it is opened and reports to the profile
+  of the current request through a context variable, so queries run in
+  ``sync_to_async`` threads by async views are counted too;
+- Python time (wall time less SQL time) and response size.
+
+Samples are kept in a bounded window per view (PROFILING_WINDOW) in this
+process; ``stats.summary()`` gives percentiles for the JSON endpoint.
+Sampled responses also carry a Server-Timing header, which browser dev tools
+show next to the request.
+
+Views declare budgets with ``query_budget``. A request over budget is logged
+and counted, and raises QueryBudgetExceeded when PROFILING_ENFORCE_BUDGETS is
+on (the default under ``manage.py test``), so a test that requests the view
+fails. Enforcing profiles every request regardless of the sample rate.
+
+Time spent producing a streaming response's body after the view returns
+(e.g. the dashboard change stream) is not included.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 500  # samples kept per view
+PERCENTILES = (50, 95, 99)
+UNRESOLVED = "<unresolved>"
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+def sample_rate() -> float:
+    return getattr(settings, "PROFILING_SAMPLE_RATE", 1.0 if settings.DEBUG else 0.05)
+
+
+def enforce_budgets() -> bool:
+    return getattr(settings, "PROFILING_ENFORCE_BUDGETS", False)
+
+
+def window_size() -> int:
+    return getattr(settings, "PROFILING_WINDOW", DEFAULT_WINDOW)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view went over its ``query_budget`` while budgets are enforced."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: Optional[int] = None
+    sql_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+
+    def breaches(self, profile) -> list:
+        out = []
+        if self.queries is not None and profile.queries > self.queries:
+            out.append(f"{profile.queries} queries > {self.queries}")
+        if self.sql_ms is not None and profile.sql_ms > self.sql_ms:
+            out.append(f"{profile.sql_ms:.1f}ms SQL > {self.sql_ms:g}ms")
+        if self.total_ms is not None and profile.total_ms > self.total_ms:
+            out.append(f"{profile.total_ms:.1f}ms total > {self.total_ms:g}ms")
+        return out
+
+
+def query_budget(queries=None, sql_ms=None, total_ms=None):
+    """
+    Declare a view's per-request budget. The budget is stored on the view
+    function, and ``functools.wraps`` carries it through other decorators
+    such as ``login_required``, so the order doesn't matter.
+    """
+    budget = Budget(queries, sql_ms, total_ms)
+
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+
+    return decorator
+
+
+@dataclass
+class RequestProfile:
+    parent: Optional["RequestProfile"] = None  # an enclosing profile (e.g. a benchmark) that counts too
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    sql_seconds: float = 0.0
+    total_ms: float = 0.0
+    size: Optional[int] = None
+
+    @property
+    def sql_ms(self) -> float:
+        return self.sql_seconds * 1000
+
+    @property
+    def python_ms(self) -> float:
+        return max(self.total_ms - self.sql_ms, 0.0)
+
+    def finish(self, response):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        if not getattr(response, "streaming", False):
+            self.size = len(response.content)
+        elif response.has_header("Content-Length"):
+            self.size = int(response["Content-Length"])
+        return self
+
+    def server_timing(self) -> str:
+        return (f'sql;dur={self.sql_ms:.1f};desc="{self.queries} queries", '
+                f"app;dur={self.python_ms:.1f}, total;dur={self.total_ms:.1f}")
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        while profile is not None:
+            profile.sql_seconds += elapsed
+            profile.queries += 1
+            profile = profile.parent
+
+
+def install_query_recorder(sender=None, connection=None, **kwargs):
+    """``connection_created`` handler: add the recorder to a new connection (once)."""
+    if connection is not None and _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def start_profile(force=False):
+    """Begin profiling this request (or not, per the sample rate); returns (profile, token)."""
+    if not force and random.random() >= sample_rate():
+        return None, None
+    profile = RequestProfile(parent=_current.get())
+    return profile, _current.set(profile)
+
+
+def stop_profile(token):
+    if token is not None:
+        _current.reset(token)
+
+
+def view_budget(request) -> Optional[Budget]:
+    match = getattr(request, "resolver_match", None)
+    return getattr(match.func, "query_budget", None) if match else None
+
+
+def view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return (match.view_name or match._func_path) if match else UNRESOLVED
+
+
+class ProfileStats:
+    """Bounded per-view sample windows for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        self._budgets = {}
+
+    def add(self, name, profile, budget=None, over_budget=False):
+        sample = (profile.total_ms, profile.queries, profile.sql_ms, profile.python_ms,
+                  profile.size if profile.size is not None else np.nan)
+        with self._lock:
+            window = self._samples.get(name)
+            if window is None or window.maxlen != window_size():
+                window = self._samples[name] = deque(window or (), maxlen=window_size())
+            window.append(sample)
+            requests, over = self._counts.get(name, (0, 0))
+            self._counts[name] = (requests + 1, over + int(over_budget))
+            if budget is not None:
+                self._budgets[name] = budget
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._budgets.clear()
+
+    def summary(self) -> dict:
+        """{view name: {requests, over_budget, samples, budget, <metric>: {p50, p95, p99, max}}}"""
+        with self._lock:
+            windows = {name: np.array(window, dtype=float) for name, window in self._samples.items()}
+            counts = dict(self._counts)
+            budgets = dict(self._budgets)
+        out = {}
+        for name, values in sorted(windows.items()):
+            requests, over = counts[name]
+            entry = {"requests": requests, "over_budget": over, "samples": len(values)}
+            if name in budgets:
+                entry["budget"] = {k: v for k, v in asdict(budgets[name]).items() if v is not None}
+            for i, metric in enumerate(("total_ms", "queries", "sql_ms", "python_ms", "bytes")):
+                column = values[:, i]
+                column = column[~np.isnan(column)]
+                if not len(column):
+                    continue
+                entry[metric] = {
+                    **{f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(column, PERCENTILES))},
+                    "max": round(float(column.max()), 1),
+                }
+            out[name] = entry
+        return out
+
+
+stats = ProfileStats()
+
+
+def record(request, profile, response):
+    """Finish a request's profile: store it, add Server-Timing and check the view's budget."""
+    profile.finish(response)
+    name = view_name(request)
+    budget = view_budget(request)
+    breaches = budget.breaches(profile) if budget else []
+    stats.add(name, profile, budget, over_budget=bool(breaches))
+    response["Server-Timing"] = profile.server_timing()
+    if breaches:
+        message = f"{name} over budget: {', '.join(breaches)}"
+        if enforce_budgets():
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+    return response
+
@@ -0,0 +1,104 @@
+# app_core/query_plans.py
+"""
+EXPLAIN checks for the transaction queries the analytics pages run per
+request (the frame-backed widgets and reports read the cached org frame
+instead; see app_core.frames).
+
+Each of these filters an organization's transactions on direction and a
+date range (and sometimes labels) and sums ``amount``, so the covering
+index ``app_core_tx_org_dir_date_cov`` answers them without touching the
+table:
+
+- PostgreSQL reports an "Index Only Scan". Tiny test tables would be
+  sequentially scanned anyway, so seq and bitmap scans are switched off
+  for the EXPLAIN; the check is about whether the index *can* serve the
+  query.
+- SQLite reports "USING COVERING INDEX".
+
+``aggregate()`` runs immediately and can't be explained, so sums are
+written as a one-group ``values().annotate()``, which reads the same rows.
+
+``app_core.tests.HotQueryPlanTests`` runs the check under ``manage.py test``;
+``manage.py explain_hot_queries`` runs it against a real database.
+
+The index is a plain composite index with label and amount as trailing key
+columns, not ``INCLUDE`` columns: Django drops ``Index.include`` on SQLite,
+which would leave SQLite reading the table.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import connections, router, transaction as dbtxn
+from django.db.models import Sum
+
+TABLE = "app_core_transaction"
+COVERING_INDEX = "app_core_tx_org_dir_date_cov"
+
+
+def hot_queries(organization, start, end, label_ids=()):
+    """{name: queryset} mirroring the per-request sums over an org's transactions."""
+    from app_core.models import Transaction
+
+    base = Transaction.objects.filter(organization=organization, date__gte=start, date__lte=end).order_by()
+    outflows = base.filter(direction=Transaction.OUTFLOW)
+    return {
+        # app_core.budgets.calculate_budget_usage, the budget progress/performance widgets
+        "budget_spent": outflows.filter(label__in=list(label_ids) or [0]).values("direction").annotate(
+            total=Sum("amount")),
+        # get_chart_category_heatmap (one label at a time)
+        "label_spent": outflows.filter(label=label_ids[0] if label_ids else 0).values("direction").annotate(
+            total=Sum("amount")),
+        # get_chart_expense_pie, get_chart_money_flow_sankey, reports_view top categories
+        "expenses_by_label": outflows.filter(label__isnull=False).values("label__name", "label__color").annotate(
+            total=Sum("amount")),
+        "income_by_label": base.filter(direction=Transaction.INFLOW, label__isnull=False).values(
+            "label__name").annotate(total=Sum("amount")),
+    }
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    plan: str
+    scans: list  # plan lines that read the transaction table
+    ok: bool
+
+
+def _explain(queryset, using):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with dbtxn.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+        return queryset.explain()
+
+
+def transaction_scans(plan, vendor):
+    if vendor == "postgresql":
+        return [line.strip() for line in plan.splitlines() if f" on {TABLE}" in line and "Scan" in line]
+    return [line.strip() for line in plan.splitlines() if f"SCAN {TABLE}" in line or f"SEARCH {TABLE}" in line]
+
+
+def is_index_only(scan, vendor):
+    return "Index Only Scan" in scan if vendor == "postgresql" else "COVERING INDEX" in scan
+
+
+def check_hot_queries(organization, days=90, using=None) -> list:
+    """EXPLAIN every hot query for the last ``days`` days; returns PlanChecks."""
+    from app_core.models import Label, Transaction
+
+    using = using or router.db_for_read(Transaction)
+    vendor = connections[using].vendor
+    end = date.today()
+    label_ids = list(
+        Label.objects.using(using).filter(organization=organization).order_by("id").values_list("id", flat=True)[:5]
+    )
+    out = []
+    for name, queryset in hot_queries(organization, end - timedelta(days=days), end, label_ids).items():
+        plan = _explain(queryset.using(using), using)
+        scans = transaction_scans(plan, vendor)
+        out.append(PlanCheck(name, plan, scans, bool(scans) and all(is_index_only(s, vendor) for s in scans)))
+    return out
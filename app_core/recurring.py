@@ -73,6 +73,7 @@ def generate_recurring_transactions(user=None, days_ahead=30):
                 # Create the transaction
                 Transaction.objects.create(
                     user=recurring_tx.user,
+                    organization=recurring_tx.organization,
                     date=next_date,
                     description=recurring_tx.description,
                     amount=recurring_tx.amount,
@@ -0,0 +1,810 @@
+# app_core/reports.py
+"""
+Declarative financial reports.
+
+Each report under /reports/ is a ReportSpec: the dimension it groups by
+(label, month, budget, project, or none for plain totals), the measures it
+needs (inflow/outflow pence, row counts), its default date window and whether
+it compares against the previous window. A layout function turns the grouped
+measures into the template context plus a format-neutral ReportTable, which
+``report_csv`` and ``report_pdf`` render. HTML, CSV and PDF therefore always
+show the same numbers.
+
+Measures come from the org's cached TransactionFrame (see app_core.frames):
+the window is a zero-copy slice and each measure is one ``np.bincount`` over
+the dimension codes, so a report runs no transaction queries once the frame
+is warm. Budgets and projects add one query each for their definitions;
+budget and project actuals are masks over their own date windows of the same
+frame. Amounts stay integer pence until the layout converts them for display.
+"""
+from __future__ import annotations
+
+import calendar
+import csv
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+from io import StringIO
+from typing import Callable, Optional
+
+import numpy as np
+
+from .buckets import bucket_series
+from .kpi_engine import previous_window as _previous_window
+from .money import bincount_pence, from_pence, to_pence
+
+# Dimensions
+LABEL = "label"
+MONTH = "month"
+BUDGET = "budget"
+PROJECT = "project"
+
+# Measures
+INFLOW = "inflow"
+OUTFLOW = "outflow"
+COUNT = "count"
+
+# Default windows
+WEEK = "week"
+LAST_12_MONTHS = "last_12_months"
+
+# Column kinds
+TEXT = "text"
+MONEY = "money"
+PCT = "pct"
+
+UNCATEGORIZED = "Uncategorized"
+COMPANY_NAME = "Finance Insights"
+
+# Simplified UK income tax (rest of UK, no allowance taper) and standard-rate VAT
+PERSONAL_ALLOWANCE = Decimal("12570")
+TAX_BANDS = (
+    (Decimal("50270"), Decimal("0.20")),
+    (Decimal("125140"), Decimal("0.40")),
+    (None, Decimal("0.45")),
+)
+VAT_RATE = Decimal("0.20")
+BUDGET_WARNING_PCT = 80.0
+
+# PDF layout (points): 0.75in left/right, 0.5in top/bottom
+REPORT_MARGINS = {"leftMargin": 54, "rightMargin": 54, "topMargin": 36, "bottomMargin": 36}
+DEFAULT_APPENDIX_MAX_ROWS = 20000
+APPENDIX_ROWS_PER_TABLE = 50
+APPENDIX_STYLE = [
+    ("ALIGN", (1, 1), (2, -1), "LEFT"), ("FONTSIZE", (0, 1), (-1, -1), 8),
+    ("TOPPADDING", (0, 1), (-1, -1), 3), ("BOTTOMPADDING", (0, 1), (-1, -1), 3),
+]
+
+
+# ---------------------------------------------------------------------------
+# Date windows
+# ---------------------------------------------------------------------------
+
+def parse_report_date(value):
+    """A date from ISO or common human formats ('Jan 1, 2025', '1 January 2025'); None if unparseable."""
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    value = str(value).strip()
+    try:
+        return datetime.datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    for fmt in ("%b %d, %Y", "%b. %d, %Y", "%B %d, %Y", "%d %b %Y", "%d %B %Y"):
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def default_window(kind, today=None):
+    today = today or datetime.date.today()
+    if kind == WEEK:
+        monday = today - datetime.timedelta(days=today.weekday())
+        return monday, monday + datetime.timedelta(days=6)
+    if kind == LAST_12_MONTHS:
+        month = today.month - 11
+        year = today.year
+        if month <= 0:
+            month += 12
+            year -= 1
+        return datetime.date(year, month, 1), today
+    return None, None
+
+
+def report_range(spec, start=None, end=None, today=None):
+    """
+    The (start, end) a report covers. One given bound means a single day;
+    neither means the spec's default window ((None, None) = all time).
+    """
+    start, end = parse_report_date(start), parse_report_date(end)
+    if start and not end:
+        end = start
+    if end and not start:
+        start = end
+    if not start:
+        return default_window(spec.default_window, today)
+    if end < start:
+        start, end = end, start
+    return start, end
+
+
+def _is_full_year(start, end):
+    return (start.year == end.year and (start.month, start.day) == (1, 1)
+            and (end.month, end.day) == (12, 31))
+
+
+def _is_full_month(start, end):
+    return ((start.year, start.month) == (end.year, end.month) and start.day == 1
+            and end.day == calendar.monthrange(end.year, end.month)[1])
+
+
+def previous_window(start, end):
+    """The comparison window: the previous year/month for whole years/months, else the same length before."""
+    if start and end and _is_full_year(start, end):
+        return start.replace(year=start.year - 1), end.replace(year=end.year - 1)
+    return _previous_window(start, end)
+
+
+def window_label(start, end):
+    """'2025' for a whole year, 'Dec 25' for a whole month, else the full range."""
+    if not start or not end:
+        return "All time"
+    if _is_full_year(start, end):
+        return str(start.year)
+    if _is_full_month(start, end):
+        return start.strftime("%b %y")
+    return f"{start.strftime('%b %d, %Y')} – {end.strftime('%b %d, %Y')}"
+
+
+def _overlaps(start, end, window_start, window_end):
+    return (window_end is None or start is None or start <= window_end) and \
+        (window_start is None or end is None or end >= window_start)
+
+
+def _clip(start, end, window_start, window_end):
+    """Intersection of two optional-bound date ranges."""
+    if window_start and (start is None or window_start > start):
+        start = window_start
+    if window_end and (end is None or window_end < end):
+        end = window_end
+    return start, end
+
+
+# ---------------------------------------------------------------------------
+# Grouped measures
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Grouped:
+    """Measures per group: parallel arrays of int64 pence / counts, one entry per name."""
+    names: list
+    inflow: np.ndarray
+    outflow: np.ndarray
+    count: np.ndarray
+    extra: list = field(default_factory=list)  # per-group objects (budgets, projects)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _measure(codes, window, size, measures) -> dict:
+    zeros = np.zeros(size, dtype=np.int64)
+    return {
+        INFLOW: bincount_pence(codes, np.where(window.inflow, window.pence, 0), size) if INFLOW in measures else zeros,
+        OUTFLOW: bincount_pence(codes, np.where(window.inflow, 0, window.pence), size) if OUTFLOW in measures else zeros,
+        COUNT: np.bincount(codes, minlength=size).astype(np.int64) if COUNT in measures else zeros,
+    }
+
+
+def group_total(frame, start, end, measures, **kwargs) -> Grouped:
+    window = frame.window(start, end)
+    return Grouped(["Total"], **_measure(np.zeros(len(window), dtype=np.int64), window, 1, measures))
+
+
+def group_by_label(frame, start, end, measures, **kwargs) -> Grouped:
+    """One group per label present in the frame (sorted by name), plus Uncategorized first."""
+    window = frame.window(start, end)
+    size = len(frame.labels) + 1
+    codes = window.label_codes.astype(np.int64) + 1  # no label (-1) -> 0
+    return Grouped([UNCATEGORIZED, *frame.labels], **_measure(codes, window, size, measures))
+
+
+def group_by_month(frame, start, end, measures, **kwargs) -> Grouped:
+    """Zero-filled calendar months over [start, end] (the frame's span when open)."""
+    months = bucket_series(frame, start, end, "M")
+    return Grouped(
+        [str(month) for month in months.dates],
+        months.inflow, months.outflow, np.zeros(len(months), dtype=np.int64),
+    )
+
+
+def _label_mask(frame, window, names):
+    """Rows of ``window`` whose label is one of ``names`` (a lookup table over label codes)."""
+    lookup = np.zeros(len(frame.labels) + 1, dtype=bool)
+    wanted = set(names)
+    lookup[1:] = [name in wanted for name in frame.labels]
+    return lookup[window.label_codes + 1]
+
+
+def _masked_pence(window, mask):
+    """(inflow, outflow) pence of the window rows selected by ``mask``."""
+    pence = window.pence[mask]
+    inflow = window.inflow[mask]
+    return int(pence[inflow].sum()), int(pence[~inflow].sum())
+
+
+def group_by_budget(frame, start, end, measures, organization=None, **kwargs) -> Grouped:
+    """
+    Active budgets whose period overlaps [start, end], with outflow over each
+    budget's own period for its labels (or legacy category).
+    """
+    from .budgets import get_period_dates
+    from .models import Budget
+
+    names, outflow, budgets = [], [], []
+    if organization is not None:
+        for budget in Budget.objects.filter(organization=organization, active=True).prefetch_related("labels").order_by("name"):
+            period_start, period_end = get_period_dates(budget.period, budget)
+            if not _overlaps(period_start, period_end, start, end):
+                continue
+            window = frame.window(period_start, period_end)
+            label_names = [label.name for label in budget.labels.all()]
+            if label_names:
+                mask = _label_mask(frame, window, label_names)
+            elif budget.category:
+                mask = window.categories[window.category_codes] == budget.category
+            else:
+                mask = np.zeros(len(window), dtype=bool)
+            names.append(budget.name)
+            outflow.append(_masked_pence(window, mask & ~window.inflow)[1])
+            budgets.append(budget)
+    size = len(names)
+    return Grouped(
+        names, np.zeros(size, dtype=np.int64), np.array(outflow, dtype=np.int64),
+        np.zeros(size, dtype=np.int64), budgets,
+    )
+
+
+def group_by_project(frame, start, end, measures, organization=None, **kwargs) -> Grouped:
+    """
+    Top-level projects with their sub-projects rolled in. A project's actuals
+    are its allocated transactions (scaled by allocation percentage) plus
+    transactions carrying its labels within its dates, clipped to [start, end].
+    """
+    from .models import Project, ProjectTransaction
+
+    if organization is None:
+        return Grouped([], *(np.zeros(0, dtype=np.int64) for _ in range(3)))
+    projects = list(Project.objects.filter(organization=organization).prefetch_related("labels").order_by("name"))
+    allocations = {}
+    rows = ProjectTransaction.objects.filter(project__organization=organization).values_list(
+        "project_id", "transaction_id", "allocation_percentage",
+        "transaction__amount", "transaction__direction", "transaction__date",
+    )
+    for project_id, tx_id, pct, amount, direction, day in rows:
+        allocations.setdefault(project_id, []).append((tx_id, pct, amount, direction, day))
+
+    own = {}
+    for project in projects:
+        inflow = outflow = 0
+        allocated = allocations.get(project.pk, ())
+        for _, pct, amount, direction, day in allocated:
+            if (start and day < start) or (end and day > end):
+                continue
+            pence = to_pence(amount * pct / 100)
+            if direction == "inflow":
+                inflow += pence
+            else:
+                outflow += pence
+        label_names = [label.name for label in project.labels.all()]
+        if label_names:
+            window = frame.window(*_clip(project.start_date, project.end_date, start, end))
+            mask = _label_mask(frame, window, label_names)
+            if allocated:
+                candidates = np.flatnonzero(mask)
+                mask[candidates[np.isin(window.ids[candidates], [a[0] for a in allocated])]] = False
+            label_in, label_out = _masked_pence(window, mask)
+            inflow += label_in
+            outflow += label_out
+        own[project.pk] = (inflow, outflow)
+
+    children = {}
+    for project in projects:
+        children.setdefault(project.parent_project_id, []).append(project)
+
+    def rolled_up(project):
+        inflow, outflow = own[project.pk]
+        for child in children.get(project.pk, ()):
+            child_in, child_out = rolled_up(child)
+            inflow += child_in
+            outflow += child_out
+        return inflow, outflow
+
+    top = children.get(None, [])
+    totals = [rolled_up(project) for project in top]
+    return Grouped(
+        [project.name for project in top],
+        np.array([t[0] for t in totals], dtype=np.int64),
+        np.array([t[1] for t in totals], dtype=np.int64),
+        np.zeros(len(top), dtype=np.int64),
+        top,
+    )
+
+
+DIMENSIONS = {
+    None: group_total,
+    LABEL: group_by_label,
+    MONTH: group_by_month,
+    BUDGET: group_by_budget,
+    PROJECT: group_by_project,
+}
+
+
+# ---------------------------------------------------------------------------
+# Specs and results
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ReportSpec:
+    key: str
+    title: str
+    dimension: Optional[str]
+    measures: tuple
+    layout: Callable
+    default_window: Optional[str] = WEEK
+    compare: bool = False
+
+    @property
+    def template(self):
+        return f"app_web/report_{self.key}.html"
+
+    @property
+    def url_name(self):
+        return f"report_{self.key}"
+
+
+@dataclass
+class Section:
+    title: Optional[str]
+    rows: list
+    total: Optional[list] = None
+
+
+@dataclass
+class ReportTable:
+    """Format-neutral report body: (title, kind) columns and titled sections of cell rows."""
+    columns: list
+    sections: list
+    notes: list = field(default_factory=list)
+
+
+@dataclass
+class Report:
+    spec: ReportSpec
+    start: Optional[datetime.date]
+    end: Optional[datetime.date]
+    context: dict
+    table: ReportTable
+
+    @property
+    def period(self):
+        if self.start and self.end:
+            return f"{self.start:%b %d, %Y} – {self.end:%b %d, %Y}"
+        return "All time"
+
+    def filename(self, ext):
+        span = f"{self.start}_{self.end}" if self.start else "all"
+        return f"{self.spec.key}_{span}.{ext}"
+
+
+def build_report(spec, frame, start=None, end=None, organization=None) -> Report:
+    """Compute a report over [start, end] (either bound None = open) from a TransactionFrame."""
+    group = DIMENSIONS[spec.dimension]
+    current = group(frame, start, end, spec.measures, organization=organization)
+    previous = prev_start = prev_end = None
+    if spec.compare and start and end:
+        prev_start, prev_end = previous_window(start, end)
+        previous = group(frame, prev_start, prev_end, spec.measures, organization=organization)
+    context, table = spec.layout(current, previous, frame=frame, start=start, end=end,
+                                 prev_start=prev_start, prev_end=prev_end)
+    context.update({
+        "title": spec.title,
+        "active_report": spec.key,
+        "start_date": start,
+        "end_date": end,
+    })
+    return Report(spec, start, end, context, table)
+
+
+# ---------------------------------------------------------------------------
+# Layouts
+# ---------------------------------------------------------------------------
+
+def _pct(cur, prev):
+    """Percentage change, None without a baseline."""
+    if not prev:
+        return None
+    return (int(cur) - int(prev)) * 100.0 / abs(int(prev))
+
+
+def _share(part, total):
+    return int(part) * 100.0 / int(total) if total else 0.0
+
+
+def _usage(actual, budget):
+    return int(actual) * 100.0 / int(budget) if budget > 0 else 0.0
+
+
+def _comparison_rows(current, previous, measure):
+    """P&L rows for one measure: groups with activity in either window, Uncategorized last."""
+    cur = getattr(current, measure)
+    prev = getattr(previous, measure) if previous is not None else np.zeros_like(cur)
+    rows = []
+    order = list(range(1, len(current))) + [0]
+    for code in order:
+        if not cur[code] and not prev[code]:
+            continue
+        rows.append({
+            "label": current.names[code],
+            "cur": from_pence(cur[code]),
+            "prev": from_pence(prev[code]),
+            "change": from_pence(cur[code] - prev[code]),
+            "pct": _pct(cur[code], prev[code]),
+        })
+    return rows, int(cur.sum()), int(prev.sum())
+
+
+def pnl_layout(current, previous, start=None, end=None, prev_start=None, prev_end=None, **kwargs):
+    revenue_rows, revenue_cur, revenue_prev = _comparison_rows(current, previous, INFLOW)
+    expense_rows, expense_cur, expense_prev = _comparison_rows(current, previous, OUTFLOW)
+    income_before_tax = revenue_cur - expense_cur
+    income_before_tax_prev = revenue_prev - expense_prev
+    tax_amount = 0  # placeholder until tax rules are wired in
+    net_change = income_before_tax - income_before_tax_prev
+    curr_label = window_label(start, end)
+    prev_label = window_label(prev_start, prev_end) if prev_start else "–"
+
+    context = {
+        "revenue_rows": revenue_rows,
+        "expense_rows": expense_rows,
+        "total_revenue_cur": from_pence(revenue_cur),
+        "total_revenue_prev": from_pence(revenue_prev),
+        "total_revenue_change": from_pence(revenue_cur - revenue_prev),
+        "total_revenue_pct": _pct(revenue_cur, revenue_prev),
+        "total_expense_cur": from_pence(expense_cur),
+        "total_expense_prev": from_pence(expense_prev),
+        "total_expense_change": from_pence(expense_cur - expense_prev),
+        "total_expense_pct": _pct(expense_cur, expense_prev),
+        "income_before_tax": from_pence(income_before_tax),
+        "income_before_tax_prev": from_pence(income_before_tax_prev),
+        "net_profit": from_pence(income_before_tax - tax_amount),
+        "net_profit_prev": from_pence(income_before_tax_prev),
+        "tax_amount": from_pence(tax_amount),
+        "net_change": from_pence(net_change),
+        "curr_label": curr_label,
+        "prev_label": prev_label,
+    }
+
+    def cells(row):
+        return [row["label"], row["cur"], row["prev"], row["change"], row["pct"]]
+
+    c = context
+    table = ReportTable(
+        columns=[("Category", TEXT), (curr_label, MONEY), (prev_label, MONEY), ("Change", MONEY), ("Change %", PCT)],
+        sections=[
+            Section("Revenue", [cells(r) for r in revenue_rows], [
+                "Total Revenue & Gains", c["total_revenue_cur"], c["total_revenue_prev"],
+                c["total_revenue_change"], c["total_revenue_pct"],
+            ]),
+            Section("Expenses", [cells(e) for e in expense_rows], [
+                "Total Expenses", c["total_expense_cur"], c["total_expense_prev"],
+                c["total_expense_change"], c["total_expense_pct"],
+            ]),
+            Section(None, [
+                ["Income before tax", c["income_before_tax"], c["income_before_tax_prev"], c["net_change"], None],
+                ["Income tax expense", c["tax_amount"], None, None, None],
+            ], ["Net Profit (Loss)", c["net_profit"], c["net_profit_prev"], c["net_change"], None]),
+        ],
+    )
+    return context, table
+
+
+def cashflow_layout(current, previous, frame=None, start=None, **kwargs):
+    opening = 0
+    if start is not None and frame is not None:
+        opening = frame.window(None, start - datetime.timedelta(days=1)).totals()["net"]
+    balance = np.cumsum(current.inflow - current.outflow) + opening
+    rows = []
+    for i, month_end in enumerate(current.names):
+        rows.append({
+            "month": datetime.date.fromisoformat(month_end).strftime("%b %Y"),
+            "inflow": from_pence(current.inflow[i]),
+            "outflow": from_pence(current.outflow[i]),
+            "net_flow": from_pence(current.inflow[i] - current.outflow[i]),
+            "balance": from_pence(balance[i]),
+        })
+    total_in, total_out = int(current.inflow.sum()), int(current.outflow.sum())
+    context = {
+        "rows": rows,
+        "opening_balance": from_pence(opening),
+        "total_inflow": from_pence(total_in),
+        "total_outflow": from_pence(total_out),
+        "net_change": from_pence(total_in - total_out),
+    }
+    table = ReportTable(
+        columns=[("Month", TEXT), ("Inflows", MONEY), ("Outflows", MONEY), ("Net Flow", MONEY), ("Balance", MONEY)],
+        sections=[Section(None, [
+            [r["month"], r["inflow"], r["outflow"], r["net_flow"], r["balance"]] for r in rows
+        ], ["Total", context["total_inflow"], context["total_outflow"], context["net_change"], None])],
+    )
+    return context, table
+
+
+def _share_layout(measure, name_column, total_title):
+    def layout(current, previous, **kwargs):
+        values = getattr(current, measure)
+        total = int(values.sum())
+        present = np.flatnonzero(values)
+        order = present[np.argsort(-values[present], kind="stable")]
+        rows = [
+            {"name": current.names[code], "amount": from_pence(values[code]), "percent": _share(values[code], total)}
+            for code in order
+        ]
+        context = {"rows": rows, "total": from_pence(total)}
+        table = ReportTable(
+            columns=[(name_column, TEXT), ("Amount", MONEY), ("Percentage", PCT)],
+            sections=[Section(None, [[r["name"], r["amount"], r["percent"]] for r in rows],
+                              [total_title, context["total"], 100.0 if total else 0.0])],
+        )
+        return context, table
+    return layout
+
+
+def income_tax(taxable: Decimal) -> Decimal:
+    """Income tax on ``taxable`` profit after the personal allowance, across TAX_BANDS."""
+    tax, lower = Decimal("0"), PERSONAL_ALLOWANCE
+    for upper, rate in TAX_BANDS:
+        if taxable <= lower:
+            break
+        band_top = taxable if upper is None else min(taxable, upper)
+        tax += (band_top - lower) * rate
+        lower = upper if upper is not None else lower
+    return tax.quantize(Decimal("0.01"))
+
+
+def tax_layout(current, previous, **kwargs):
+    total_income = from_pence(current.inflow[0])
+    total_expenses = from_pence(current.outflow[0])
+    taxable_income = max(total_income - total_expenses, Decimal("0"))
+    tax = income_tax(taxable_income)
+    vat_fraction = VAT_RATE / (1 + VAT_RATE)  # VAT contained in VAT-inclusive amounts
+    vat_on_income = (total_income * vat_fraction).quantize(Decimal("0.01"))
+    vat_on_expenses = (total_expenses * vat_fraction).quantize(Decimal("0.01"))
+    context = {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "taxable_income": taxable_income,
+        "personal_allowance": PERSONAL_ALLOWANCE,
+        "income_tax": tax,
+        "vat_on_income": vat_on_income,
+        "vat_on_expenses": vat_on_expenses,
+        "vat_payable": vat_on_income - vat_on_expenses,
+    }
+    table = ReportTable(
+        columns=[("Item", TEXT), ("Amount", MONEY)],
+        sections=[
+            Section("Income Tax Calculation", [
+                ["Total Income", total_income],
+                ["Total Expenses", total_expenses],
+                ["Taxable Income", taxable_income],
+                ["Personal Allowance", PERSONAL_ALLOWANCE],
+            ], ["Income Tax Payable", tax]),
+            Section("VAT Calculation (20% Standard Rate)", [
+                ["VAT on Income", vat_on_income],
+                ["VAT on Expenses", vat_on_expenses],
+            ], ["VAT Payable", context["vat_payable"]]),
+        ],
+        notes=["This is a simplified tax calculation. Please consult a tax professional for accurate tax advice."],
+    )
+    return context, table
+
+
+def _budget_status(usage_pct):
+    if usage_pct > 100:
+        return "over"
+    if usage_pct >= BUDGET_WARNING_PCT:
+        return "warning"
+    return "good"
+
+
+def _performance_layout(name_column, budget_of, status_of=None):
+    """Budget vs actual outflow per group; ``budget_of`` reads the planned amount from each group object."""
+    def layout(current, previous, **kwargs):
+        rows = []
+        for i, obj in enumerate(current.extra):
+            budget = to_pence(budget_of(obj) or 0)
+            actual = int(current.outflow[i])
+            usage = _usage(actual, budget)
+            rows.append({
+                "name": current.names[i],
+                "budget": from_pence(budget),
+                "actual": from_pence(actual),
+                "variance": from_pence(budget - actual),
+                "usage_pct": usage,
+                "status": status_of(obj) if status_of else _budget_status(usage),
+            })
+        if status_of is None:
+            rows.sort(key=lambda r: -r["usage_pct"])
+        total_budget = sum(to_pence(r["budget"]) for r in rows)
+        total_actual = int(current.outflow.sum())
+        context = {
+            "rows": rows,
+            "total_budget": from_pence(total_budget),
+            "total_actual": from_pence(total_actual),
+            "total_variance": from_pence(total_budget - total_actual),
+            "total_usage_pct": _usage(total_actual, total_budget),
+        }
+        with_status = status_of is not None
+        columns = [(name_column, TEXT), ("Budget" if with_status else "Budgeted", MONEY), ("Actual", MONEY),
+                   ("Variance", MONEY), ("Usage %", PCT)] + ([("Status", TEXT)] if with_status else [])
+        extra = (lambda r: [r["status"]]) if with_status else (lambda r: [])
+        table = ReportTable(
+            columns=columns,
+            sections=[Section(None, [
+                [r["name"], r["budget"], r["actual"], r["variance"], r["usage_pct"], *extra(r)] for r in rows
+            ], ["Total", context["total_budget"], context["total_actual"], context["total_variance"],
+                context["total_usage_pct"], *([""] if with_status else [])])],
+        )
+        return context, table
+    return layout
+
+
+REPORTS = {spec.key: spec for spec in (
+    ReportSpec("pnl", "Profit & Loss (P&L)", LABEL, (INFLOW, OUTFLOW), pnl_layout,
+               default_window=LAST_12_MONTHS, compare=True),
+    ReportSpec("cashflow", "Cash Flow Statement", MONTH, (INFLOW, OUTFLOW), cashflow_layout,
+               default_window=LAST_12_MONTHS),
+    ReportSpec("expenses", "Expense Report by Category", LABEL, (OUTFLOW,),
+               _share_layout(OUTFLOW, "Category", "Total Expenses")),
+    ReportSpec("income", "Income Report by Source", LABEL, (INFLOW,),
+               _share_layout(INFLOW, "Source", "Total Income")),
+    ReportSpec("tax", "Tax Summary", None, (INFLOW, OUTFLOW), tax_layout),
+    ReportSpec("budget_performance", "Budget Performance", BUDGET, (OUTFLOW,),
+               _performance_layout("Budget", lambda budget: budget.amount), default_window=None),
+    ReportSpec("project_performance", "Project Performance", PROJECT, (INFLOW, OUTFLOW),
+               _performance_layout("Project", lambda project: project.budget,
+                                   lambda project: project.get_status_display()),
+               default_window=None),
+)}
+
+
+# ---------------------------------------------------------------------------
+# Renderers
+# ---------------------------------------------------------------------------
+
+def _cell_text(value, kind, currency="£"):
+    if value is None:
+        return "–"
+    if kind == MONEY:
+        value = Decimal(value)
+        sign = "-" if value < 0 else ""
+        return f"{sign}{currency}{abs(value):,.2f}"
+    if kind == PCT:
+        return f"{value:.1f}%"
+    return str(value)
+
+
+def _cell_raw(value, kind):
+    if value is None:
+        return ""
+    if kind == PCT:
+        return f"{value:.1f}"
+    return str(value)
+
+
+def report_csv(report) -> str:
+    """The report table as CSV; a leading Section column appears when the table has titled sections."""
+    table = report.table
+    kinds = [kind for _, kind in table.columns]
+    titled = any(section.title for section in table.sections)
+    out = StringIO()
+    writer = csv.writer(out)
+    writer.writerow((["Section"] if titled else []) + [title for title, _ in table.columns])
+    for section in table.sections:
+        prefix = [section.title or ""] if titled else []
+        for row in section.rows + ([section.total] if section.total else []):
+            writer.writerow(prefix + [_cell_raw(value, kind) for value, kind in zip(row, kinds)])
+    return out.getvalue()
+
+
+def _appendix_rows(window, limit):
+    """Transaction rows (newest first) for a PDF appendix, generated lazily from a frame window."""
+    labels = window.labels
+    for i in range(len(window) - 1, max(len(window) - limit, 0) - 1, -1):
+        code = window.label_codes[i]
+        pence = int(window.pence[i])
+        yield [
+            str(window.dates[i]),
+            str(window.description[i])[:60],
+            labels[code] if code >= 0 else UNCATEGORIZED,
+            _cell_text(from_pence(pence if window.inflow[i] else -pence), MONEY),
+        ]
+
+
+def appendix_limit() -> int:
+    from django.conf import settings
+    return getattr(settings, "REPORT_APPENDIX_MAX_ROWS", DEFAULT_APPENDIX_MAX_ROWS)
+
+
+def report_flowables(report, company_name=COMPANY_NAME, generated_by="", appendix=None):
+    """
+    Yield the report's PDF flowables: company header, period, one chunked
+    table per section, notes, an optional transaction appendix (a frame
+    window) and the generated-by footer.
+    """
+    from reportlab.lib.units import inch
+    from reportlab.platypus import PageBreak, Paragraph, Spacer
+
+    from .pdf_service import A4_WIDTH, chunked_table, styles
+
+    st = styles()
+    table = report.table
+    kinds = [kind for _, kind in table.columns]
+    width = A4_WIDTH - REPORT_MARGINS["leftMargin"] - REPORT_MARGINS["rightMargin"]
+    first = width * (0.4 if len(kinds) > 2 else 0.7)
+    col_widths = [first] + [(width - first) / (len(kinds) - 1)] * (len(kinds) - 1)
+    header = [Paragraph(str(title), st.header_left if kind == TEXT else st.header_right) for title, kind in table.columns]
+    text_columns = [("ALIGN", (i, 1), (i, -1), "LEFT") for i, kind in enumerate(kinds) if kind == TEXT and i]
+
+    yield Paragraph(company_name, st.company)
+    yield Paragraph(report.spec.title, st.title)
+    yield Paragraph(f"Period: {report.period}", st.subtitle)
+    yield Spacer(1, 0.2 * inch)
+    for section in table.sections:
+        if section.title:
+            yield Paragraph(section.title, st.section)
+        rows = ([_cell_text(value, kind) for value, kind in zip(row, kinds)] for row in section.rows)
+        total = [_cell_text(value, kind) for value, kind in zip(section.total, kinds)] if section.total else None
+        yield from chunked_table(header, rows, col_widths, st.report_table, total=total, extra_style=text_columns)
+        yield Spacer(1, 0.25 * inch)
+
+    for note in table.notes:
+        yield Paragraph(f"Note: {note}", st.note)
+
+    if appendix is not None and len(appendix):
+        limit = appendix_limit()
+        yield PageBreak()
+        yield Paragraph("Appendix: Transactions", st.section)
+        if len(appendix) > limit:
+            yield Paragraph(f"Showing the latest {limit:,} of {len(appendix):,} transactions.", st.subtitle)
+        widths = [0.14 * width, 0.46 * width, 0.22 * width, 0.18 * width]
+        appendix_header = [Paragraph(t, st.header_left) for t in ("Date", "Description", "Label")] + \
+            [Paragraph("Amount", st.header_right)]
+        yield from chunked_table(
+            appendix_header, _appendix_rows(appendix, limit), widths, st.report_table,
+            extra_style=APPENDIX_STYLE,
+            rows_per_table=APPENDIX_ROWS_PER_TABLE,
+        )
+
+    generated = datetime.datetime.now().strftime("%B %d, %Y at %I:%M %p")
+    yield Spacer(1, 0.3 * inch)
+    yield Paragraph(f"Generated by: {generated_by} on {generated}" if generated_by else f"Generated on {generated}",
+                    st.footer)
+
+
+def report_pdf(report, company_name=COMPANY_NAME, generated_by="", appendix=None) -> bytes:
+    """The report as A4 PDF bytes (see ``report_flowables``)."""
+    from .pdf_service import render_pdf
+    return render_pdf(report_flowables(report, company_name, generated_by, appendix), **REPORT_MARGINS)
+
+
+def report_pdf_response(report, company_name=COMPANY_NAME, generated_by="", appendix=None):
+    """The report as a streamed PDF attachment rendered through a spool file."""
+    from .pdf_service import pdf_response
+    return pdf_response(report_flowables(report, company_name, generated_by, appendix),
+                        report.filename("pdf"), **REPORT_MARGINS)
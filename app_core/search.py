@@ -0,0 +1,222 @@
+# app_core/search.py
+"""
+Indexed full-text search over transaction descriptions.
+
+- PostgreSQL: GIN index on a ``to_tsvector('simple', ...)`` expression, ranked
+  with ``ts_rank``. Postgres maintains the index itself, so it stays in sync
+  with every insert/update/delete (including ``bulk_create`` and ``qs.update``).
+- SQLite: an external-content FTS5 shadow table kept in sync by triggers and
+  ranked with ``bm25``.
+- Anything else (or SQLite built without FTS5) falls back to ``icontains``.
+
+Every search term is treated as a prefix, so "tes" matches "Tesco".
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "app_core_transaction_fts"
+PG_INDEX = "app_core_tx_search_gin"
+
+# Must match the indexed expression exactly or Postgres will not use the index
+PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(app_core_transaction.description, '') "
+    "|| ' ' || coalesce(app_core_transaction.category, '') "
+    "|| ' ' || coalesce(app_core_transaction.account, ''))"
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_TRIGGERS = {
+    f"{FTS_TABLE}_ai": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON app_core_transaction BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, description, category, account)
+            VALUES (new.id, new.description, new.category, new.account);
+        END
+    """,
+    f"{FTS_TABLE}_ad": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON app_core_transaction BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, category, account)
+            VALUES ('delete', old.id, old.description, old.category, old.account);
+        END
+    """,
+    f"{FTS_TABLE}_au": f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description, category, account ON app_core_transaction BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, category, account)
+            VALUES ('delete', old.id, old.description, old.category, old.account);
+            INSERT INTO {FTS_TABLE}(rowid, description, category, account)
+            VALUES (new.id, new.description, new.category, new.account);
+        END
+    """,
+}
+
+
+def tokenize(q):
+    """Split a free-text query into safe search terms (punctuation is dropped)."""
+    return _TOKEN_RE.findall((q or "").lower())[:16]
+
+
+def _sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Some builds load FTS5 without the compile option being reported
+        cursor.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def install_search_index(connection):
+    """
+    Create (or repair) the search index for the given connection.
+
+    Idempotent. On SQLite, Django rebuilds a table when certain columns change,
+    which silently drops its triggers; running this again after migrate
+    restores them and repopulates the shadow table.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON app_core_transaction USING gin ({PG_DOCUMENT})"
+            )
+            return True
+
+        if connection.vendor == "sqlite":
+            if not _sqlite_has_fts5(cursor):
+                return False
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join(['%s'] * len(_SQLITE_TRIGGERS))})",
+                list(_SQLITE_TRIGGERS),
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "description, category, account, "
+                "content='app_core_transaction', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            for sql in _SQLITE_TRIGGERS.values():
+                cursor.execute(sql)
+            if len(existing) < len(_SQLITE_TRIGGERS):
+                # Triggers were missing, so the shadow table may be stale
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                # Without stats SQLite assumes organization_id is selective and
+                # probes the FTS table once per row instead of driving from it.
+                # Only when the index is (re)created: ANALYZE scans the table.
+                cursor.execute("ANALYZE app_core_transaction")
+            return True
+
+    return False
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+        elif connection.vendor == "sqlite":
+            for name in _SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_search_index(using="default"):
+    """Repopulate the index from scratch (SQLite) or reindex it (PostgreSQL)."""
+    connection = connections[using]
+    install_search_index(connection)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"REINDEX INDEX {PG_INDEX}")
+        elif connection.vendor == "sqlite" and search_backend(using) == "fts5":
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+_backend_cache = {}
+
+
+def search_backend(using="default"):
+    """Return 'postgres', 'fts5' or 'icontains' for the given database alias."""
+    if using in _backend_cache:
+        return _backend_cache[using]
+    connection = connections[using]
+    backend = "icontains"
+    if connection.vendor == "postgresql":
+        backend = "postgres"
+    elif connection.vendor == "sqlite":
+        try:
+            if FTS_TABLE in connection.introspection.table_names():
+                backend = "fts5"
+        except Exception:
+            backend = "icontains"
+    # Only remember a positive answer so a later migrate is picked up
+    if backend != "icontains":
+        _backend_cache[using] = backend
+    return backend
+
+
+def search_transactions(qs, q, label=None, account=None, ranked=True):
+    """
+    Filter a Transaction queryset by a free-text query.
+
+    Args:
+        qs: Transaction queryset (already scoped to the user/organization)
+        q: Search text; every term must match, each as a prefix
+        label: Optional Label id (or 'none' for unlabelled transactions);
+            anything else is ignored
+        account: Optional exact account name
+        ranked: Annotate ``search_rank`` and order best matches first
+
+    Returns:
+        QuerySet
+    """
+    if label:
+        if str(label).lower() == "none":
+            qs = qs.filter(label__isnull=True)
+        elif str(label).isdigit():
+            qs = qs.filter(label_id=int(label))
+    if account:
+        qs = qs.filter(account=account)
+
+    terms = tokenize(q)
+    if not terms:
+        return qs
+
+    backend = search_backend(qs.db)
+
+    if backend == "postgres":
+        tsquery = " & ".join(f"{t}:*" for t in terms)
+        # Filter on the bare expression so the planner can combine the GIN
+        # index with the (organization, date) index in a bitmap scan
+        qs = qs.extra(where=[f"{PG_DOCUMENT} @@ to_tsquery('simple', %s)"], params=[tsquery])
+        if ranked:
+            qs = qs.annotate(
+                search_rank=RawSQL(f"ts_rank({PG_DOCUMENT}, to_tsquery('simple', %s))", (tsquery,))
+            ).order_by(F("search_rank").desc(), "-date", "-id")
+        return qs
+
+    if backend == "fts5":
+        match = " AND ".join(f'"{t}"*' for t in terms)
+        if ranked:
+            # Join the shadow table so FTS5 computes bm25 (its hidden ``rank``
+            # column) once per hit instead of once per row in a subquery
+            return qs.extra(
+                select={"search_rank": f"-{FTS_TABLE}.rank"},
+                tables=[FTS_TABLE],
+                where=[f"{FTS_TABLE}.rowid = app_core_transaction.id", f"{FTS_TABLE} MATCH %s"],
+                params=[match],
+            ).order_by("-search_rank", "-date", "-id")
+        return qs.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+        )
+
+    for term in terms:
+        qs = qs.filter(
+            Q(description__icontains=term) | Q(category__icontains=term) | Q(account__icontains=term)
+        )
+    return qs
@@ -0,0 +1,185 @@
+# app_core/signals.py
+"""
+Model signal handlers.
+
+Keeps per-organization data versions (see app_core.data_version) in step with
+writes so cached analytics are invalidated as soon as data changes, and keeps
+task time rollups (see app_core.time_rollups) and the approvals inbox (see
+app_core.approval_inbox) in step with the rows they are derived from.
+"""
+from django.db import transaction as dbtxn
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .data_version import APPROVALS, BUDGETS, INVOICES, PROJECTS, RECURRING, TASKS, bump_data_version
+from .models import (
+    Approval, ApprovalWorkflow, Budget, Client, Invoice, InvoicePayment, Label, OrganizationRole, Project,
+    ProjectMilestone, RecurringTransaction, Transaction,
+)
+from .task_models import Task, TaskComment, TaskTimeEntry
+from . import approval_inbox, time_rollups
+
+
+def _bump_on_commit(org_id, days=None, scope=None):
+    if org_id:
+        # Bump after commit so a reader can't cache pre-commit data under the new version
+        dbtxn.on_commit(lambda: bump_data_version(org_id, days, scope))
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_date(sender, instance, raw=False, **kwargs):
+    # An edit can move a transaction to another day; both days change
+    instance._previous_date = None
+    if instance.pk and not raw:
+        instance._previous_date = sender.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_data_changed(sender, instance, **kwargs):
+    days = {instance.date, getattr(instance, "_previous_date", None)} - {None}
+    _bump_on_commit(instance.organization_id, days)
+
+
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+def label_data_changed(sender, instance, **kwargs):
+    # Deleting a label un-labels its transactions without per-row signals
+    _bump_on_commit(instance.organization_id)
+    # Task cards show label names and colours too
+    _bump_on_commit(instance.organization_id, scope=TASKS)
+
+
+@receiver(post_save, sender=Invoice)
+@receiver(post_delete, sender=Invoice)
+def invoice_data_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.organization_id, scope=INVOICES)
+
+
+@receiver(post_save, sender=InvoicePayment)
+@receiver(post_delete, sender=InvoicePayment)
+def invoice_payment_changed(sender, instance, **kwargs):
+    # Payments normally re-save their invoice too, but not on every path
+    org_id = Invoice.objects.filter(pk=instance.invoice_id).values_list("organization_id", flat=True).first()
+    _bump_on_commit(org_id, scope=INVOICES)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_changed(sender, instance, **kwargs):
+    # Invoice stats and aging carry client names
+    _bump_on_commit(instance.organization_id, scope=INVOICES)
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def budget_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.organization_id, scope=BUDGETS)
+
+
+@receiver(m2m_changed, sender=Budget.labels.through)
+def budget_labels_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        _bump_on_commit(getattr(instance, "organization_id", None), scope=BUDGETS)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.organization_id, scope=PROJECTS)
+
+
+@receiver(post_save, sender=RecurringTransaction)
+@receiver(post_delete, sender=RecurringTransaction)
+def recurring_template_changed(sender, instance, **kwargs):
+    # The cash-flow forecast re-expands only templates whose updated_at moved
+    _bump_on_commit(instance.organization_id, scope=RECURRING)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.organization_id, scope=TASKS)
+
+
+@receiver(post_save, sender=ProjectMilestone)
+@receiver(post_delete, sender=ProjectMilestone)
+def milestone_changed(sender, instance, **kwargs):
+    # Task cards show milestone names
+    org_id = Project.objects.filter(pk=instance.project_id).values_list("organization_id", flat=True).first()
+    _bump_on_commit(org_id, scope=TASKS)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def task_labels_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        _bump_on_commit(getattr(instance, "organization_id", None), scope=TASKS)
+
+
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+@receiver(post_save, sender=TaskTimeEntry)
+@receiver(post_delete, sender=TaskTimeEntry)
+def task_child_changed(sender, instance, **kwargs):
+    org_id = Task.objects.filter(pk=instance.task_id).values_list("organization_id", flat=True).first()
+    _bump_on_commit(org_id, scope=TASKS)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_placement(sender, instance, raw=False, **kwargs):
+    instance._previous_placement = None
+    if instance.pk and not raw:
+        instance._previous_placement = (
+            sender.objects.filter(pk=instance.pk).values_list("project_id", "milestone_id").first()
+        )
+
+
+@receiver(post_save, sender=Task)
+def task_placement_changed(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, "_previous_placement", None)
+    if not created and not raw and previous and previous != (instance.project_id, instance.milestone_id):
+        time_rollups.task_moved(instance, *previous)
+
+
+@receiver(pre_save, sender=TaskTimeEntry)
+def remember_time_entry(sender, instance, raw=False, **kwargs):
+    instance._previous_contribution = None
+    if instance.pk and not raw:
+        instance._previous_contribution = time_rollups.entry_contribution(instance.pk)
+
+
+@receiver(post_save, sender=TaskTimeEntry)
+def time_entry_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        time_rollups.entry_saved(instance, getattr(instance, "_previous_contribution", None))
+
+
+@receiver(pre_delete, sender=TaskTimeEntry)
+def time_entry_deleted(sender, instance, **kwargs):
+    # pre_delete: the task (and its placement) may be gone by post_delete
+    time_rollups.entry_deleted(instance)
+
+
+@receiver(post_save, sender=Approval)
+def approval_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        approval_inbox.sync_approval(instance, created)
+    _bump_on_commit(instance.organization_id, scope=APPROVALS)
+
+
+@receiver(post_delete, sender=Approval)
+@receiver(post_delete, sender=OrganizationRole)
+def approval_inbox_rows_deleted(sender, instance, **kwargs):
+    _bump_on_commit(instance.organization_id, scope=APPROVALS)
+
+
+@receiver(m2m_changed, sender=ApprovalWorkflow.approver_roles.through)
+def approver_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # role.approval_workflows.add/remove/clear(...)
+        approval_inbox.workflow_roles_changed(pk_set, [instance.pk], action)
+    else:
+        approval_inbox.workflow_roles_changed([instance.pk], pk_set, action)
+    _bump_on_commit(instance.organization_id, scope=APPROVALS)
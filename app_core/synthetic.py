@@ -0,0 +1,429 @@
+# app_core/synthetic.py
+"""
+Synthetic organizations for benchmarks and load testing.
+
+``generate_organization`` builds one organization at a given ``Scale`` with
+data shaped like a small business's books:
+
+- members with Owner and Member roles;
+- labels with their own direction, typical amount and merchants, and
+  transactions spread over ``years`` with log-normal amounts. Rent and
+  payroll land on fixed days each month, and a share of rows is
+  unlabelled;
+- monthly, weekly and yearly budgets, plus recurring budget groups
+  expanded by app_core.recurring_budgets;
+- projects nested up to three levels, with labels and percentage
+  allocations of individual transactions;
+- clients and invoices with line items and full or partial payments;
+- tasks with estimates and time entries (the time rollups are rebuilt).
+
+Rows are written with ``bulk_create`` and no signals fire, so derived state
+is rebuilt and the org's data versions are bumped at the end. Everything is
+seeded, so the same scale and seed give the same books.
+``python manage.py generate_synthetic_data`` wraps this, and
+``python manage.py benchmark_suite`` times the hot paths against it.
+"""
+from __future__ import annotations
+
+import calendar
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+from .data_version import BUDGETS, INVOICES, PROJECTS, TASKS, bump_data_version
+from .models import (
+    Budget, Client, Invoice, InvoiceItem, InvoicePayment, Label, Organization, OrganizationMember,
+    OrganizationRole, Project, ProjectTransaction, Transaction,
+)
+from .task_models import Task, TaskPriority, TaskStatus, TaskTimeEntry
+
+BATCH_SIZE = 5000
+CENTS = Decimal("0.01")
+
+# name, direction, median amount (GBP), log-normal sigma, relative frequency, merchants
+LABEL_PROFILES = [
+    ("Sales", Transaction.INFLOW, 850, 0.9, 14, ["Stripe payout", "Shopify payout", "Card sales", "BACS receipt"]),
+    ("Consulting", Transaction.INFLOW, 2400, 0.6, 3, ["Client payment", "Retainer", "Faster payment"]),
+    ("Interest", Transaction.INFLOW, 12, 0.8, 1, ["Savings interest"]),
+    ("Rent", Transaction.OUTFLOW, 2200, 0.05, 0, ["Landlord standing order"]),
+    ("Payroll", Transaction.OUTFLOW, 3100, 0.3, 0, ["Salary", "PAYE", "Pension contribution"]),
+    ("Software", Transaction.OUTFLOW, 45, 0.9, 8, ["GitHub", "Slack", "Google Workspace", "Xero", "Figma", "AWS"]),
+    ("Travel", Transaction.OUTFLOW, 60, 1.0, 7, ["Trainline", "Uber", "British Airways", "Premier Inn", "TfL"]),
+    ("Meals", Transaction.OUTFLOW, 18, 0.7, 9, ["Pret", "Deliveroo", "Costa", "Itsu", "Wagamama"]),
+    ("Office Supplies", Transaction.OUTFLOW, 35, 0.8, 5, ["Amazon", "Viking", "Staples", "Ryman"]),
+    ("Utilities", Transaction.OUTFLOW, 120, 0.4, 3, ["Octopus Energy", "Thames Water", "BT Broadband"]),
+    ("Marketing", Transaction.OUTFLOW, 300, 1.1, 4, ["Google Ads", "Meta Ads", "LinkedIn Ads", "Mailchimp"]),
+    ("Insurance", Transaction.OUTFLOW, 90, 0.3, 1, ["Hiscox", "Simply Business"]),
+    ("Professional Fees", Transaction.OUTFLOW, 650, 0.7, 1, ["Accountant", "Solicitor", "Companies House"]),
+    ("Equipment", Transaction.OUTFLOW, 480, 0.9, 2, ["Apple", "Dell", "Currys"]),
+    ("Bank Fees", Transaction.OUTFLOW, 6, 0.5, 3, ["Monthly account fee", "FX fee", "Card fee"]),
+    ("Tax", Transaction.OUTFLOW, 1800, 0.6, 1, ["HMRC VAT", "HMRC Corporation Tax"]),
+]
+FIXED_DAYS = {"Rent": 1, "Payroll": 25}  # label -> day of month
+UNLABELLED_SHARE = 0.08
+ACCOUNTS = ["Current", "Current", "Current", "Savings", "Credit card"]
+PROJECT_NAMES = ["Website rebuild", "Client onboarding", "Q{} campaign", "Office move", "Mobile app",
+                 "Data migration", "Brand refresh", "Trade show", "Partner programme", "Support portal"]
+TASK_VERBS = ["Draft", "Review", "Build", "Test", "Ship", "Plan", "Design", "Fix", "Document", "Estimate"]
+TASK_NOUNS = ["homepage", "invoice flow", "API", "report", "budget", "onboarding email", "dashboard",
+              "pricing page", "migration", "release notes"]
+COMPANY_WORDS = ["North", "Bright", "Blue", "Oak", "Summit", "Harbour", "Pixel", "Crown", "Maple", "River"]
+COMPANY_SUFFIXES = ["Ltd", "Studio", "Partners", "Group", "Labs", "& Co"]
+
+
+@dataclass
+class Scale:
+    """How much of everything to generate for one organization."""
+
+    transactions: int = 10_000
+    years: int = 3
+    labels: int = len(LABEL_PROFILES)
+    members: int = 4
+    budgets: int = 24
+    recurring_groups: int = 4
+    recurrence_count: int = 6
+    projects: int = 10
+    allocations: int = 500
+    clients: int = 30
+    invoices: int = 300
+    tasks: int = 200
+    time_entries: int = 2000
+
+    @classmethod
+    def for_transactions(cls, rows, **overrides) -> "Scale":
+        """A scale whose other volumes grow with the transaction count (within sensible caps)."""
+        values = dict(
+            transactions=rows,
+            allocations=min(max(rows // 100, 50), 20_000),
+            clients=min(max(rows // 2000, 10), 500),
+            invoices=min(max(rows // 50, 50), 20_000),
+            tasks=min(max(rows // 200, 50), 5_000),
+            time_entries=min(max(rows // 20, 500), 100_000),
+        )
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+
+@dataclass
+class GeneratedOrganization:
+    organization: Organization
+    owner: User
+    users: list
+    counts: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def _money(value) -> Decimal:
+    return Decimal(str(max(value, 0.01))).quantize(CENTS)
+
+
+def _bulk(model, objects):
+    created = []
+    for i in range(0, len(objects), BATCH_SIZE):
+        created.extend(model.objects.bulk_create(objects[i:i + BATCH_SIZE]))
+    return created
+
+
+def _month_starts(start, end):
+    day = start.replace(day=1)
+    while day <= end:
+        yield day
+        day = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class _Generator:
+    def __init__(self, scale, rng, name, username):
+        self.scale = scale
+        self.rng = rng
+        self.name = name
+        self.username = username
+        self.today = date.today()
+        self.start = self.today - timedelta(days=365 * scale.years - 1)
+        self.counts = {}
+
+    # People and labels
+
+    def organization(self):
+        stamp = time.time_ns()
+        owner = User.objects.create(username=self.username or f"synthetic-{stamp}", first_name="Synthetic",
+                                    last_name="Owner", email=f"owner-{stamp}@example.com")
+        org = Organization.objects.create(name=self.name or "Synthetic Ltd", slug=f"synthetic-{stamp}",
+                                          owner=owner, max_users=self.scale.members + 1)
+        owner_role = OrganizationRole.objects.create(
+            organization=org, name="Owner", is_owner=True, is_system=True,
+            **{f.name: True for f in OrganizationRole._meta.fields if f.name.startswith("can_")},
+        )
+        member_role = OrganizationRole.objects.create(
+            organization=org, name="Member", is_system=True, can_view_transactions=True,
+            can_create_transactions=True, can_view_budgets=True, can_view_projects=True,
+            can_view_invoices=True, can_view_reports=True,
+        )
+        members = User.objects.bulk_create([
+            User(username=f"{owner.username}-m{i}", first_name="Member", last_name=str(i),
+                 email=f"member{i}-{stamp}@example.com")
+            for i in range(self.scale.members)
+        ])
+        OrganizationMember.objects.bulk_create(
+            [OrganizationMember(organization=org, user=owner, role=owner_role)]
+            + [OrganizationMember(organization=org, user=user, role=member_role) for user in members]
+        )
+        self.org, self.owner, self.users = org, owner, [owner] + members
+        self.counts["members"] = len(self.users)
+
+    def labels(self):
+        profiles = list(LABEL_PROFILES[:self.scale.labels])
+        for i in range(len(profiles), self.scale.labels):
+            profiles.append((f"Cost centre {i:02d}", Transaction.OUTFLOW, self.rng.choice([40, 150, 600]), 0.8, 1,
+                             [f"Supplier {i:02d}-{j}" for j in range(3)]))
+        self.profiles = profiles
+        self.label_objs = _bulk(Label, [
+            Label(organization=self.org, user=self.owner, name=name,
+                  color="#{:06x}".format(self.rng.randrange(0x1000000)))
+            for name, *_ in profiles
+        ])
+        self.counts["labels"] = len(self.label_objs)
+
+    # Transactions
+
+    def _transaction(self, index, day, profile_index):
+        name, direction, median, sigma, _, merchants = self.profiles[profile_index]
+        label = self.label_objs[profile_index]
+        if self.rng.random() < UNLABELLED_SHARE and name not in FIXED_DAYS:
+            label = None
+        return Transaction(
+            organization=self.org, user=self.rng.choice(self.users), date=day,
+            description=f"{self.rng.choice(merchants)} {index:07d}",
+            amount=_money(self.rng.lognormvariate(0, sigma) * median),
+            direction=direction, label=label, account=self.rng.choice(ACCOUNTS), source="synthetic",
+        )
+
+    def transactions(self):
+        rows = self.scale.transactions
+        fixed = [(i, day) for i, (name, *_) in enumerate(self.profiles) if name in FIXED_DAYS
+                 for day in _month_starts(self.start, self.today)]
+        fixed = [(i, day.replace(day=FIXED_DAYS[self.profiles[i][0]])) for i, day in fixed]
+        fixed = [(i, day) for i, day in fixed if self.start <= day <= self.today][:rows]
+        weights = [profile[4] for profile in self.profiles]
+        days = (self.today - self.start).days + 1
+        batch, index = [], 0
+        for profile_index, day in fixed:
+            batch.append(self._transaction(index, day, profile_index))
+            index += 1
+        choices = self.rng.choices(range(len(self.profiles)), weights=weights, k=rows - len(fixed))
+        for profile_index in choices:
+            batch.append(self._transaction(index, self.start + timedelta(days=self.rng.randrange(days)),
+                                           profile_index))
+            index += 1
+            if len(batch) == BATCH_SIZE:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Transaction.objects.bulk_create(batch)
+        self.counts["transactions"] = index
+
+    # Budgets
+
+    def budgets(self):
+        from .recurring_budgets import generate_recurring_budgets
+
+        outflow = [label for label, profile in zip(self.label_objs, self.profiles)
+                   if profile[1] == Transaction.OUTFLOW]
+        medians = {label.pk: profile[2] * max(profile[4], 1) for label, profile in zip(self.label_objs, self.profiles)}
+        periods = [(Budget.PERIOD_MONTHLY, 4), (Budget.PERIOD_WEEKLY, 1), (Budget.PERIOD_YEARLY, 48)]
+        budgets, label_sets = [], []
+        for i in range(self.scale.budgets):
+            period, multiplier = periods[i % len(periods)]
+            labels = self.rng.sample(outflow, min(len(outflow), self.rng.randint(1, 3)))
+            typical = sum(medians[label.pk] for label in labels) * multiplier
+            budgets.append(Budget(organization=self.org, user=self.owner, name=f"{labels[0].name} {period} #{i}",
+                                  amount=_money(typical * self.rng.uniform(0.7, 1.3)), period=period))
+            label_sets.append(labels)
+        month = self.today.replace(day=1)
+        first = month - timedelta(days=1)
+        for i in range(self.scale.recurring_groups):
+            labels = self.rng.sample(outflow, min(len(outflow), 2))
+            start = first.replace(day=1) if i % 2 else month
+            budgets.append(Budget(
+                organization=self.org, user=self.owner, name=f"Recurring {labels[0].name} #{i}",
+                amount=_money(sum(medians[label.pk] for label in labels) * 4), period=Budget.PERIOD_MONTHLY,
+                start_date=start, end_date=start.replace(day=calendar.monthrange(start.year, start.month)[1]),
+                is_recurring=True, recurrence_count=self.scale.recurrence_count,
+                recurring_group_id=uuid.UUID(int=self.rng.getrandbits(128)).hex,
+            ))
+            label_sets.append(labels)
+        budgets = _bulk(Budget, budgets)
+        Budget.labels.through.objects.bulk_create([
+            Budget.labels.through(budget_id=budget.pk, label_id=label.pk)
+            for budget, labels in zip(budgets, label_sets) for label in labels
+        ])
+        generated = generate_recurring_budgets(self.owner) if self.scale.recurring_groups else 0
+        self.counts["budgets"] = len(budgets) + generated
+
+    # Projects
+
+    def projects(self):
+        span = (self.today - self.start).days
+        projects, parents = [], []
+        for i in range(self.scale.projects):
+            start = self.start + timedelta(days=self.rng.randrange(max(span - 60, 1)))
+            name = self.rng.choice(PROJECT_NAMES).format(self.rng.randint(1, 4))
+            project = Project.objects.create(
+                organization=self.org, user=self.owner, name=f"{name} {i + 1}", start_date=start,
+                end_date=start + timedelta(days=self.rng.randint(60, 400)) if self.rng.random() < 0.6 else None,
+                budget=_money(self.rng.randrange(5_000, 150_000)),
+                status=self.rng.choice([Project.STATUS_ACTIVE] * 3 + [Project.STATUS_COMPLETED]),
+            )
+            project.labels.set(self.rng.sample(self.label_objs, min(len(self.label_objs), 2)))
+            projects.append(project)
+            parents.append(project)
+            # Sub-projects, and now and then a third level below one of them
+            for j in range(self.rng.randint(0, 3)):
+                child = Project.objects.create(
+                    organization=self.org, user=self.owner, name=f"{project.name} / Phase {j + 1}",
+                    parent_project=project, level=1, start_date=start,
+                    budget=_money(float(project.budget) / 4),
+                )
+                child.labels.set(self.rng.sample(self.label_objs, 1))
+                projects.append(child)
+                if self.rng.random() < 0.3:
+                    projects.append(Project.objects.create(
+                        organization=self.org, user=self.owner, name=f"{child.name} / Workstream",
+                        parent_project=child, level=2, start_date=start,
+                    ))
+        self.projects_all, self.top_projects = projects, parents
+
+        ids = list(Transaction.objects.filter(organization=self.org).values_list("id", flat=True))
+        sample = self.rng.sample(ids, min(len(ids), self.scale.allocations))
+        ProjectTransaction.objects.bulk_create([
+            ProjectTransaction(project=self.rng.choice(projects), transaction_id=tx_id,
+                               allocation_percentage=Decimal(self.rng.choice([25, 50, 75, 100])))
+            for tx_id in sample
+        ], batch_size=BATCH_SIZE)
+        self.counts["projects"] = len(projects)
+        self.counts["allocations"] = len(sample)
+
+    # Invoicing
+
+    def invoicing(self):
+        clients = _bulk(Client, [
+            Client(organization=self.org, user=self.owner,
+                   name=f"{self.rng.choice(COMPANY_WORDS)} {self.rng.choice(COMPANY_WORDS)} {i}",
+                   email=f"accounts{i}@client{i}.example.com",
+                   company=f"{self.rng.choice(COMPANY_WORDS)} {self.rng.choice(COMPANY_SUFFIXES)}",
+                   payment_terms=self.rng.choice(["Net 14", "Net 30", "Net 30", "Net 60"]))
+            for i in range(self.scale.clients)
+        ])
+        span = (self.today - self.start).days
+        invoices, item_sets = [], []
+        for i in range(self.scale.invoices):
+            invoice_date = self.start + timedelta(days=self.rng.randrange(span + 1))
+            due_date = invoice_date + timedelta(days=self.rng.choice([14, 30, 30, 60]))
+            items = [
+                (self.rng.choice(["Consulting", "Design", "Development", "Support", "Licence"]) + f" ({k + 1})",
+                 Decimal(self.rng.randint(1, 20)), _money(self.rng.randrange(50, 1500)))
+                for k in range(self.rng.randint(1, 5))
+            ]
+            subtotal = sum((quantity * price for _, quantity, price in items), Decimal(0))
+            tax_rate = Decimal(self.rng.choice([0, 20, 20]))
+            tax = (subtotal * tax_rate / 100).quantize(CENTS)
+            total = subtotal + tax
+            roll = self.rng.random()
+            if invoice_date > self.today - timedelta(days=7) and roll < 0.5:
+                status, paid = Invoice.STATUS_DRAFT, Decimal(0)
+            elif roll < 0.6:
+                status, paid = Invoice.STATUS_PAID, total
+            elif roll < 0.75:
+                status, paid = Invoice.STATUS_PARTIALLY_PAID, (total * Decimal("0.4")).quantize(CENTS)
+            else:
+                status = Invoice.STATUS_OVERDUE if due_date < self.today else Invoice.STATUS_SENT
+                paid = Decimal(0)
+            invoices.append(Invoice(
+                organization=self.org, user=self.owner, client=self.rng.choice(clients),
+                invoice_number=f"SYN-{self.org.pk}-{i + 1:06d}", invoice_date=invoice_date, due_date=due_date,
+                sent_date=invoice_date if status != Invoice.STATUS_DRAFT else None,
+                paid_date=min(due_date, self.today) if status == Invoice.STATUS_PAID else None,
+                status=status, subtotal=subtotal, tax_rate=tax_rate, tax_amount=tax, total=total, paid_amount=paid,
+                project=self.rng.choice(self.top_projects) if self.top_projects and self.rng.random() < 0.3 else None,
+            ))
+            item_sets.append(items)
+        invoices = _bulk(Invoice, invoices)
+        _bulk(InvoiceItem, [
+            InvoiceItem(invoice=invoice, description=description, quantity=quantity, unit_price=price,
+                        amount=(quantity * price).quantize(CENTS), order=k)
+            for invoice, items in zip(invoices, item_sets)
+            for k, (description, quantity, price) in enumerate(items)
+        ])
+        payments = _bulk(InvoicePayment, [
+            InvoicePayment(invoice=invoice, amount=invoice.paid_amount,
+                           payment_date=min(invoice.invoice_date + timedelta(days=self.rng.randint(3, 45)), self.today),
+                           reference=f"PAY-{invoice.invoice_number}")
+            for invoice in invoices if invoice.paid_amount > 0
+        ])
+        self.counts.update(clients=len(clients), invoices=len(invoices), invoice_payments=len(payments))
+
+    # Tasks
+
+    def tasks(self):
+        from .time_rollups import rebuild_time_rollups
+
+        if not self.projects_all or not self.scale.tasks:
+            self.counts.update(tasks=0, time_entries=0)
+            return
+        numbers = {}
+        tasks = []
+        for i in range(self.scale.tasks):
+            project = self.rng.choice(self.projects_all)
+            numbers[project.pk] = numbers.get(project.pk, 0) + 1
+            status = self.rng.choice(list(TaskStatus.values))
+            tasks.append(Task(
+                project=project, organization=self.org, task_number=numbers[project.pk],
+                title=f"{self.rng.choice(TASK_VERBS)} {self.rng.choice(TASK_NOUNS)}",
+                status=status, priority=self.rng.choice(list(TaskPriority.values)),
+                assignee=self.rng.choice(self.users), created_by=self.owner,
+                estimated_hours=Decimal(self.rng.randint(1, 40)), position=i,
+                due_date=self.today + timedelta(days=self.rng.randint(-60, 90)),
+            ))
+        tasks = _bulk(Task, tasks)
+        span = (self.today - self.start).days
+        entries = _bulk(TaskTimeEntry, [
+            TaskTimeEntry(task=self.rng.choice(tasks), user=self.rng.choice(self.users),
+                          hours=Decimal(self.rng.randint(1, 32)) / 4,
+                          date=self.today - timedelta(days=min(int(self.rng.expovariate(1 / 90)), span)))
+            for _ in range(self.scale.time_entries)
+        ])
+        rebuild_time_rollups(self.org)
+        self.counts.update(tasks=len(tasks), time_entries=len(entries))
+
+    def finish(self):
+        # bulk_create sent no signals
+        invalidate_organization(self.org)
+
+
+def invalidate_organization(organization):
+    """Bump every data version of an org, so nothing cached for it is reused."""
+    bump_data_version(organization)
+    for scope in (INVOICES, BUDGETS, PROJECTS, TASKS):
+        bump_data_version(organization, scope=scope)
+
+
+def generate_organization(scale: Scale, seed=42, name=None, username=None, progress=None) -> GeneratedOrganization:
+    """
+    Create one synthetic organization (call inside a transaction to be able
+    to roll it back). ``progress`` is called with a message after each step.
+    """
+    started = time.perf_counter()
+    gen = _Generator(scale, random.Random(seed), name, username)
+    steps = [("organization", gen.organization), ("labels", gen.labels), ("transactions", gen.transactions),
+             ("budgets", gen.budgets), ("projects", gen.projects), ("invoices", gen.invoicing),
+             ("tasks", gen.tasks), ("versions", gen.finish)]
+    for step, fn in steps:
+        t = time.perf_counter()
+        fn()
+        if progress:
+            progress(f"{step}: {time.perf_counter() - t:.1f}s")
+    return GeneratedOrganization(gen.org, gen.owner, gen.users, gen.counts, time.perf_counter() - started)
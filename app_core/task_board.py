@@ -0,0 +1,123 @@
+# app_core/task_board.py
+"""
+Task board data for a project's table, kanban and roadmap views.
+
+All of a project's tasks are fetched once. Comment counts, sub-task counts
+(total and done) and logged hours come from correlated subqueries rather than
+joins, so one aggregate can't multiply another. Labels take one prefetch
+query. Columns and the roadmap list are then built in memory from that list,
+so a board costs two queries however many columns the template shows.
+
+The board's ETag comes from the org's task data version (see
+app_core.data_version), which is bumped by task, comment, time-entry,
+task-label, label and milestone writes, plus the date that ``is_overdue``
+compares against. Clients can therefore poll the JSON API and get a 304
+until something changes.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .data_version import TASKS, get_data_version
+from .task_models import Task, TaskComment, TaskStatus, TaskTimeEntry
+
+
+def _count(qs, fk):
+    """Correlated COUNT(*) of ``qs`` grouped on ``fk`` (0 when there are none)."""
+    return Coalesce(
+        Subquery(qs.order_by().values(fk).annotate(n=Count("id")).values("n"), output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def board_queryset(project):
+    """A project's tasks annotated with comment_count, subtask_count, subtasks_done and logged_hours."""
+    subtasks = Task.objects.filter(parent_task=OuterRef("pk"))
+    hours = DecimalField(max_digits=10, decimal_places=2)
+    return (
+        Task.objects.filter(project=project, organization_id=project.organization_id)
+        .select_related("project", "assignee", "milestone", "parent_task", "created_by")
+        .prefetch_related("labels")
+        .annotate(
+            comment_count=_count(TaskComment.objects.filter(task=OuterRef("pk")), "task_id"),
+            subtask_count=_count(subtasks, "parent_task_id"),
+            subtasks_done=_count(subtasks.filter(status=TaskStatus.DONE), "parent_task_id"),
+            logged_hours=Coalesce(
+                Subquery(
+                    TaskTimeEntry.objects.filter(task=OuterRef("pk")).order_by().values("task_id")
+                    .annotate(h=Sum("hours")).values("h"),
+                    output_field=hours,
+                ),
+                Value(Decimal("0")),
+                output_field=hours,
+            ),
+        )
+    )
+
+
+@dataclass
+class TaskBoard:
+    """One fetch of a project's tasks, bucketed for every view."""
+    tasks: list
+    by_status: dict = field(default_factory=dict)
+    with_dates: list = field(default_factory=list)
+
+    @classmethod
+    def for_project(cls, project) -> "TaskBoard":
+        tasks = list(board_queryset(project))
+        by_status = {status: [] for status in TaskStatus.values}
+        with_dates = []
+        for task in tasks:
+            by_status.setdefault(task.status, []).append(task)
+            if task.start_date and task.due_date:
+                with_dates.append(task)
+        return cls(tasks=tasks, by_status=by_status, with_dates=with_dates)
+
+
+def board_etag(project) -> str:
+    """
+    ETag for a project's board; changes whenever the org's task data
+    (including label and milestone names) changes, and daily because
+    ``is_overdue`` depends on today's date.
+    """
+    version = get_data_version(project.organization_id, TASKS)
+    return f'"board-{project.pk}-{version}-{timezone.now().date().isoformat()}"'
+
+
+def serialize_task(task) -> dict:
+    """Card/row data for one board task (expects board_queryset annotations)."""
+    return {
+        "id": task.id,
+        "task_number": task.task_number,
+        "title": task.title,
+        "status": task.status,
+        "priority": task.priority,
+        "position": task.position,
+        "assignee": {"id": task.assignee_id, "username": task.assignee.username} if task.assignee else None,
+        "milestone": {"id": task.milestone_id, "name": task.milestone.name} if task.milestone else None,
+        "parent_task": task.parent_task_id,
+        "labels": [{"id": label.id, "name": label.name, "color": label.color} for label in task.labels.all()],
+        "start_date": task.start_date.isoformat() if task.start_date else None,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+        "is_overdue": task.is_overdue,
+        "estimated_hours": float(task.estimated_hours) if task.estimated_hours is not None else None,
+        "logged_hours": float(task.logged_hours),
+        "comment_count": task.comment_count,
+        "subtask_count": task.subtask_count,
+        "subtasks_done": task.subtasks_done,
+        "progress_percentage": task.progress_percentage,
+        "updated_at": task.updated_at.isoformat(),
+    }
+
+
+def board_payload(board: TaskBoard) -> dict:
+    return {
+        "tasks": [serialize_task(task) for task in board.tasks],
+        "columns": {status: [task.id for task in tasks] for status, tasks in board.by_status.items()},
+        "roadmap": [task.id for task in board.with_dates],
+    }
@@ -150,16 +150,21 @@ class Task(models.Model):
     @property
     def progress_percentage(self):
         """Calculate progress based on sub-tasks"""
-        if not self.sub_tasks.exists():
+        # Board querysets (app_core.task_board) annotate the counts
+        if hasattr(self, 'subtask_count'):
+            total, completed = self.subtask_count, self.subtasks_done
+        else:
+            total = self.sub_tasks.count()
+            completed = self.sub_tasks.filter(status=TaskStatus.DONE).count() if total else 0
+        if not total:
             return 100 if self.status == TaskStatus.DONE else 0
-
-        total = self.sub_tasks.count()
-        completed = self.sub_tasks.filter(status=TaskStatus.DONE).count()
         return int((completed / total) * 100)
 
     @property
     def completed_subtasks_count(self):
         """Get count of completed sub-tasks"""
+        if hasattr(self, 'subtasks_done'):
+            return self.subtasks_done
         return self.sub_tasks.filter(status=TaskStatus.DONE).count()
 
     @property
@@ -258,3 +263,38 @@ class TaskActivity(models.Model):
     def __str__(self):
         return f"{self.activity_type} on {self.task} by {self.user.username}"
 
+
+
+class TaskTimeRollup(models.Model):
+    """
+    Logged hours per project, milestone, user and ISO week.
+
+    Maintained incrementally from TaskTimeEntry writes (see
+    app_core.time_rollups); rebuild with ``manage.py rebuild_time_rollups``.
+    A key may be split across more than one row, so always sum when reading.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='task_time_rollups')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='time_rollups')
+    milestone = models.ForeignKey(
+        'ProjectMilestone',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='time_rollups'
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_time_rollups')
+    week = models.DateField(help_text="Monday of the ISO week")
+
+    hours = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    entry_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'week']),
+            models.Index(fields=['milestone', 'week']),
+            models.Index(fields=['organization', 'week', 'user']),
+        ]
+        ordering = ['week']
+
+    def __str__(self):
+        return f"{self.hours}h on {self.project} by {self.user.username} w/c {self.week}"
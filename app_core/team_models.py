@@ -395,6 +395,34 @@ class Approval(models.Model):
         self.save()
 
 
+
+class ApprovalInboxEntry(models.Model):
+    """
+    One row per (approval, approver role): the approvals inbox, precomputed.
+
+    Mirrors Approval.workflow.approver_roles so a role's inbox and its
+    pending count are single indexed lookups rather than joins through the
+    workflow's M2M. Maintained by app_core.approval_inbox.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='approval_inbox')
+    approval = models.ForeignKey(Approval, on_delete=models.CASCADE, related_name='inbox_entries')
+    role = models.ForeignKey(OrganizationRole, on_delete=models.CASCADE, related_name='approval_inbox')
+
+    # Copied from the approval
+    status = models.CharField(max_length=20, choices=Approval.STATUS_CHOICES, default=Approval.STATUS_PENDING)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at', '-approval_id']
+        unique_together = ['approval', 'role']
+        indexes = [
+            models.Index(fields=['organization', 'role', 'status', '-created_at']),
+        ]
+        verbose_name_plural = 'Approval inbox entries'
+
+    def __str__(self):
+        return f"Approval {self.approval_id} for {self.role} ({self.status})"
+
 class ActivityLog(models.Model):
     """
     Audit trail of all actions within an organization.
@@ -24,6 +24,8 @@ from app_core.models import (
     PermissionRequest, ApprovalWorkflow, Approval, ActivityLog
 )
 from app_core.permissions import require_permission, require_permission_ajax, log_activity
+from app_core.approval_inbox import inbox_approvals, pending_count
+from app_core.profiling import query_budget
 
 User = get_user_model()
 
@@ -382,6 +384,7 @@ def activity_log(request):
 # ==================== APPROVALS ====================
 
 @login_required
+@query_budget(queries=12)
 def approvals_view(request):
     """View and manage approval requests"""
     if not request.organization:
@@ -394,10 +397,11 @@ def approvals_view(request):
     # Get filter
     status_filter = request.GET.get('status', 'pending')
 
-    # Get approvals where user can approve (based on their role)
-    my_approvals = Approval.objects.filter(
-        organization=org,
-        workflow__approver_roles=user_member.role
+    # Approvals the user's role can act on, from the precomputed inbox
+    approvals_page_obj = inbox_approvals(
+        user_member,
+        status=status_filter,
+        page=request.GET.get('approvals_page', 1),
     )
 
     # Get approvals requested by user
@@ -405,35 +409,19 @@ def approvals_view(request):
         organization=org,
         requested_by=request.user
     )
-
-    # Apply status filter
     if status_filter and status_filter != 'all':
-        my_approvals = my_approvals.filter(status=status_filter)
         my_requests = my_requests.filter(status=status_filter)
 
-    my_approvals = my_approvals.select_related(
-        'workflow', 'requested_by', 'rejected_by'
-    ).prefetch_related('approved_by').order_by('-created_at')
-
     my_requests = my_requests.select_related(
         'workflow', 'requested_by', 'rejected_by'
     ).prefetch_related('approved_by').order_by('-created_at')
 
-    # Paginate
-    approvals_paginator = Paginator(my_approvals, 20)
-    approvals_page = request.GET.get('approvals_page', 1)
-    approvals_page_obj = approvals_paginator.get_page(approvals_page)
-
     requests_paginator = Paginator(my_requests, 20)
     requests_page = request.GET.get('requests_page', 1)
     requests_page_obj = requests_paginator.get_page(requests_page)
 
-    # Get counts
-    pending_approvals_count = Approval.objects.filter(
-        organization=org,
-        workflow__approver_roles=user_member.role,
-        status=Approval.STATUS_PENDING
-    ).count()
+    # Cached; also shown as the nav badge
+    pending_approvals_count = pending_count(user_member)
 
     context = {
         'title': 'Approvals',
@@ -1,3 +1,404 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import connections, router, transaction as dbtxn
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app_core import insight_stats
+from app_core.bulk import bulk_delete_transactions, bulk_update_transactions
+from app_core.data_version import _days_key, bump_data_version, changed_days_between, get_data_version
+from app_core.db_router import PIN_COOKIE, read_alias, replica_reads
+from app_core.forecast import compute_cash_forecast
+from app_core.invoice_dispatch import dispatch_invoices
+from app_core.middleware import ReplicaPinMiddleware
+from app_core.invoice_pdf import render_invoice_pdf
+from app_core.models import (
+    ActivityLog, Client, Invoice, InvoiceDelivery, InvoiceItem, InvoicePayment, Label, Organization,
+    OrganizationMember, OrganizationRole, Project, ProjectMilestone, ProjectTransaction, RecurringTransaction,
+    Transaction,
+)
+from app_core.query_plans import COVERING_INDEX, check_hot_queries
+from app_core.task_board import board_etag
+
+
+def make_invoices(organization, user, count, email="client@example.com"):
+    client = Client.objects.create(organization=organization, user=user, name="Client", email=email)
+    invoices = []
+    for i in range(count):
+        invoice = Invoice.objects.create(
+            organization=organization,
+            user=user,
+            client=client,
+            invoice_number=f"INV-{organization.pk}-{i:04d}",
+            invoice_date=date.today(),
+            due_date=date.today() + timedelta(days=30),
+            subtotal=100,
+            total=100,
+        )
+        InvoiceItem.objects.create(invoice=invoice, description="Consulting", quantity=1, unit_price=100, amount=100)
+        invoices.append(invoice)
+    return invoices
+
+
+class FailingEmailBackend(EmailBackend):
+    """locmem backend that, like SMTP, delivers messages in order until one is refused."""
+
+    fail_subject = None
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.subject == self.fail_subject:
+                raise ConnectionError("recipient refused")
+            super().send_messages([message])
+        return len(messages)
+
+
+class InvoiceDispatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        cls.invoices = make_invoices(cls.org, cls.user, 5)
+
+    def test_one_email_and_one_pdf_per_invoice(self):
+        with mock.patch("app_core.invoice_dispatch.render_invoice_pdf", wraps=render_invoice_pdf) as render:
+            _, deliveries = dispatch_invoices(Invoice.objects.filter(organization=self.org), workers=1, batch_size=2)
+
+        self.assertEqual(render.call_count, 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertTrue(all(len(message.attachments) == 1 for message in mail.outbox))
+        self.assertEqual({d.status for d in deliveries}, {InvoiceDelivery.STATUS_SENT})
+        self.assertEqual(Invoice.objects.filter(organization=self.org, status=Invoice.STATUS_SENT).count(), 5)
+
+    def test_failure_is_recorded_without_resending_delivered_messages(self):
+        connection = FailingEmailBackend()
+        with mock.patch("app_core.invoice_dispatch.render_invoice_pdf", return_value=b"%PDF"):
+            # Learn the subject of the second invoice's email, then fail it
+            dispatch_invoices(Invoice.objects.filter(pk=self.invoices[1].pk), workers=1)
+            connection.fail_subject = mail.outbox.pop().subject
+            _, deliveries = dispatch_invoices(
+                Invoice.objects.filter(organization=self.org), workers=1, batch_size=5, connection=connection,
+            )
+
+        subjects = [message.subject for message in mail.outbox]
+        self.assertEqual(len(subjects), 4)
+        self.assertEqual(len(set(subjects)), 4)
+        failed = [d for d in deliveries if d.status == InvoiceDelivery.STATUS_FAILED]
+        self.assertEqual([d.invoice_id for d in failed], [self.invoices[1].pk])
+        self.assertIn("recipient refused", failed[0].error)
+
+
+class BoardEtagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        cls.project = Project.objects.create(organization=cls.org, user=cls.user, name="Launch")
+
+    def assertEtagChanges(self, change):
+        before = board_etag(self.project)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        self.assertNotEqual(board_etag(self.project), before)
+
+    def test_label_and_milestone_edits_change_the_etag(self):
+        label = Label.objects.create(organization=self.org, user=self.user, name="Design")
+        milestone = ProjectMilestone.objects.create(project=self.project, name="Beta", due_date=date.today())
+
+        label.name = "UX"
+        self.assertEtagChanges(label.save)
+        milestone.name = "GA"
+        self.assertEtagChanges(milestone.save)
+
+    def test_etag_changes_with_the_date(self):
+        today = board_etag(self.project)
+        with mock.patch("app_core.task_board.timezone.now", return_value=timezone.now() + timedelta(days=1)):
+            self.assertNotEqual(board_etag(self.project), today)
+
+
+@override_settings(REPLICA_DATABASE_ALIAS="replica")
+class ReplicaRoutingTests(TransactionTestCase):
+    # "replica" mirrors the test database (see settings); TransactionTestCase
+    # commits, so rows written on default are visible through it
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()  # organization pins
+        self.user = User.objects.create_user("owner", password="pw")
+        self.org = Organization.objects.create(name="Acme", slug="acme", owner=self.user)
+        self.factory = RequestFactory()
+
+    def request(self, method="get", **cookies):
+        request = getattr(self.factory, method)("/")
+        request.COOKIES.update(cookies)
+        request.organization = self.org
+        request.user = self.user
+        return request
+
+    def test_reads_in_replica_views_use_the_replica(self):
+        @replica_reads
+        def view(request):
+            return Organization.objects.get(pk=self.org.pk)
+
+        with CaptureQueriesContext(connections["replica"]) as replica, \
+                CaptureQueriesContext(connections["default"]) as default:
+            org = view(self.request())
+        self.assertEqual(org._state.db, "replica")
+        self.assertEqual((len(replica), len(default)), (1, 0))
+        # Outside such a view reads stay on the primary
+        self.assertEqual(Organization.objects.get(pk=self.org.pk)._state.db, "default")
+
+    def test_writes_and_transactions_stay_on_default(self):
+        @replica_reads
+        def view(request):
+            org = Organization.objects.get(pk=self.org.pk)
+            org.name = "Acme Ltd"
+            org.save()
+            with dbtxn.atomic():
+                inside = Organization.objects.get(pk=self.org.pk)
+            return org, inside
+
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            org, inside = view(self.request())
+        self.assertEqual(router.db_for_write(Organization, instance=org), "default")
+        self.assertEqual(inside._state.db, "default")
+        self.assertEqual(len(replica), 1)
+        self.assertEqual(Organization.objects.using("default").get(pk=self.org.pk).name, "Acme Ltd")
+
+    def test_writes_pin_later_reads_to_default(self):
+        self.assertEqual(read_alias(self.request()), "replica")
+
+        # The writer gets a cookie...
+        response = ReplicaPinMiddleware(lambda r: HttpResponse()).process_response(self.request("post"), HttpResponse())
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertIsNone(read_alias(self.request(**{PIN_COOKIE: "1"})))
+
+        # ...and a data-version bump pins the organization for everyone
+        bump_data_version(self.org)
+        self.assertIsNone(read_alias(self.request()))
+
+    def test_migrations_stay_on_default(self):
+        self.assertFalse(router.allow_migrate("replica", "app_core", model_name="transaction"))
+        self.assertTrue(router.allow_migrate("default", "app_core", model_name="transaction"))
+
+
+class HotQueryPlanTests(TestCase):
+    """The org/date transaction sums must be answered from the covering index alone."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        labels = [Label.objects.create(organization=cls.org, user=cls.user, name=f"Label {i}") for i in range(3)]
+        Transaction.objects.bulk_create([
+            Transaction(
+                organization=cls.org, user=cls.user, label=labels[i % 3], description=f"Row {i}", amount=10 + i,
+                date=date.today() - timedelta(days=i % 120),
+                direction=Transaction.OUTFLOW if i % 4 else Transaction.INFLOW,
+            )
+            for i in range(400)
+        ])
+
+    def test_hot_queries_are_index_only(self):
+        for check in check_hot_queries(self.org, days=90):
+            with self.subTest(query=check.name):
+                self.assertTrue(check.ok, check.plan)
+                self.assertTrue(all(COVERING_INDEX in scan for scan in check.scans), check.plan)
+
+
+class CashForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        cls.today = date.today()
+        # 90 days of history: 10.00 in every day
+        Transaction.objects.bulk_create([
+            Transaction(organization=cls.org, user=cls.user, description="Sale", amount=10,
+                        direction=Transaction.INFLOW, date=cls.today - timedelta(days=i))
+            for i in range(90)
+        ])
+
+    def setUp(self):
+        cache.clear()  # data versions, so no frame or template state outlives its test
+
+    def run_rate(self):
+        return compute_cash_forecast(self.org, self.today).flows["run_rate"][0]
+
+    def test_payments_without_a_transaction_do_not_lower_the_run_rate(self):
+        invoice = make_invoices(self.org, self.user, 1)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            InvoicePayment.objects.create(invoice=invoice, amount=900, payment_date=self.today)
+        self.assertEqual(self.run_rate(), 1000)
+
+    def test_payments_booked_as_transactions_are_left_out_of_the_run_rate(self):
+        invoice = make_invoices(self.org, self.user, 1)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            received = Transaction.objects.create(organization=self.org, user=self.user, description="Invoice paid",
+                                                  amount=900, direction=Transaction.INFLOW, date=self.today)
+            InvoicePayment.objects.create(invoice=invoice, transaction=received, amount=900, payment_date=self.today)
+        self.assertEqual(self.run_rate(), 1000)
+
+    def test_templates_default_to_their_creators_organization(self):
+        role = OrganizationRole.objects.create(organization=self.org, name="Owner")
+        OrganizationMember.objects.create(organization=self.org, user=self.user, role=role)
+        with self.captureOnCommitCallbacks(execute=True):
+            template = RecurringTransaction.objects.create(
+                user=self.user, description="Rent", amount=500, direction=Transaction.OUTFLOW,
+                frequency=RecurringTransaction.FREQUENCY_MONTHLY, start_date=self.today + timedelta(days=1),
+            )
+        self.assertEqual(template.organization_id, self.org.pk)
+        self.assertEqual(compute_cash_forecast(self.org, self.today, days=90).flows["recurring"].sum(), -3 * 50000)
+
+
+class BulkTransactionTests(TestCase):
+    """Select-all bulk edit and delete, walked in chunks of 4 over 10 matching rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        Transaction.objects.bulk_create([
+            Transaction(organization=cls.org, user=cls.user, description=f"Row {i}", amount=10, category="Old",
+                        direction=Transaction.OUTFLOW if i < 10 else Transaction.INFLOW,
+                        date=date.today() - timedelta(days=i % 5))
+            for i in range(12)
+        ])
+        cls.matching = Transaction.objects.filter(organization=cls.org, direction=Transaction.OUTFLOW)
+        cls.ids = list(cls.matching.order_by("id").values_list("id", flat=True))
+        cls.days = set(cls.matching.values_list("date", flat=True))
+
+        project = Project.objects.create(organization=cls.org, user=cls.user, name="Launch")
+        cls.allocation = ProjectTransaction.objects.create(project=project, transaction_id=cls.ids[0])
+        invoice = make_invoices(cls.org, cls.user, 1)[0]
+        cls.payment = InvoicePayment.objects.create(
+            invoice=invoice, transaction_id=cls.ids[-1], amount=10, payment_date=date.today(),
+        )
+
+    def setUp(self):
+        cache.clear()  # data versions
+
+    def run_bulk(self, operation, *args):
+        before = get_data_version(self.org)
+        with self.captureOnCommitCallbacks(execute=True):
+            progress = list(operation(self.matching, *args, organization=self.org, user=self.user, chunk_size=4))
+        return progress, before, get_data_version(self.org)
+
+    def assertChunked(self, progress, action):
+        self.assertEqual([p["chunk_count"] for p in progress[:-1]], [4, 4, 2])
+        self.assertEqual(progress[-1], {**progress[-1], "done": True, "processed": 10, "total": 10})
+        logs = ActivityLog.objects.filter(organization=self.org, action=action).order_by("id")
+        self.assertEqual([log.metadata["transaction_ids"] for log in logs],
+                         [self.ids[:4], self.ids[4:8], self.ids[8:]])
+
+    def test_delete_by_filter(self):
+        progress, before, after = self.run_bulk(bulk_delete_transactions)
+
+        self.assertChunked(progress, ActivityLog.ACTION_DELETE)
+        self.assertFalse(Transaction.objects.filter(id__in=self.ids).exists())
+        self.assertEqual(Transaction.objects.filter(organization=self.org).count(), 2)
+        # One bump per chunk, recording the days each chunk touched
+        self.assertEqual(after - before, 3)
+        self.assertEqual(changed_days_between(self.org, before, after), self.days)
+        # Related rows follow their on_delete
+        self.assertFalse(ProjectTransaction.objects.filter(pk=self.allocation.pk).exists())
+        self.payment.refresh_from_db()
+        self.assertIsNone(self.payment.transaction_id)
+
+    def test_update_by_filter(self):
+        moved_to = date.today() - timedelta(days=30)
+        # The update takes rows out of the filter; no chunk may skip the rest
+        self.matching = self.matching.filter(category="Old")
+        progress, before, after = self.run_bulk(bulk_update_transactions, {"category": "New", "date": moved_to})
+
+        self.assertChunked(progress, ActivityLog.ACTION_UPDATE)
+        self.assertEqual(Transaction.objects.filter(id__in=self.ids, category="New", date=moved_to).count(), 10)
+        self.assertEqual(Transaction.objects.filter(organization=self.org, category="Old").count(), 2)
+        self.assertEqual(after - before, 3)
+        self.assertEqual(changed_days_between(self.org, before, after), self.days | {moved_to})
+        self.assertTrue(ProjectTransaction.objects.filter(pk=self.allocation.pk).exists())
+
+
+class InsightStateTests(TestCase):
+    """The incrementally maintained insight state must match a rebuild from scratch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner", password="pw")
+        cls.org = Organization.objects.create(name="Acme", slug="acme", owner=cls.user)
+        cls.labels = [Label.objects.create(organization=cls.org, user=cls.user, name=f"Label {i}") for i in range(3)]
+        cls.today = date.today()
+        Transaction.objects.bulk_create([
+            Transaction(
+                organization=cls.org, user=cls.user, label=cls.labels[i % 3] if i % 4 else None,
+                description=f"Row {i}", amount=5 + (i * 7) % 40, date=cls.today - timedelta(days=i % 20),
+                direction=Transaction.OUTFLOW if i % 3 else Transaction.INFLOW,
+            )
+            for i in range(60)
+        ])
+
+    def setUp(self):
+        cache.clear()  # data versions and insight state
+        insight_stats.get_state(self.org)
+
+    def write(self):
+        """Insert, edit and delete on several days, with the signals' bumps."""
+        rows = list(Transaction.objects.filter(organization=self.org).order_by("id"))
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(organization=self.org, user=self.user, label=self.labels[0],
+                                       description="New", amount=99, direction=Transaction.OUTFLOW,
+                                       date=self.today - timedelta(days=3))
+            Transaction.objects.create(organization=self.org, user=self.user, description="New day",
+                                       amount=15, direction=Transaction.INFLOW, date=self.today - timedelta(days=25))
+            rows[0].amount = 250
+            rows[0].save()
+            rows[1].date = self.today - timedelta(days=11)
+            rows[1].label = self.labels[2]
+            rows[1].save()
+            rows[2].delete()
+            for row in rows[40:]:  # empties some days entirely
+                row.delete()
+
+    def get_state(self):
+        with mock.patch.object(insight_stats, "_rollups", wraps=insight_stats._rollups) as rollups:
+            state = insight_stats.get_state(self.org)
+        return state, [call.args[1:] for call in rollups.call_args_list]
+
+    def assertMatchesRebuild(self, state):
+        rollups = insight_stats._rollups(self.org.pk)
+        fresh = insight_stats.InsightState()
+        fresh.apply(rollups, sorted(rollups))
+
+        self.assertEqual(state.days, fresh.days)
+        self.assertEqual(state.day_net, fresh.day_net)
+        pairs = [(state.daily_stats, fresh.daily_stats), *zip(state.weekday_stats, fresh.weekday_stats)]
+        pairs += [(stats, fresh.label_stats[label_id]) for label_id, stats in state.label_stats.items() if stats.n]
+        self.assertEqual({k for k, v in state.label_stats.items() if v.n}, set(fresh.label_stats))
+        for incremental, rebuilt in pairs:
+            self.assertEqual(incremental.n, rebuilt.n)
+            self.assertAlmostEqual(incremental.mean, rebuilt.mean, places=6)
+            self.assertAlmostEqual(incremental.m2, rebuilt.m2, delta=1e-6 * max(rebuilt.m2, 1))
+
+    def test_incremental_update_matches_a_rebuild(self):
+        self.write()
+        state, calls = self.get_state()
+        # Only the changed days were re-aggregated
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(calls[0] and calls[0][0])
+        self.assertMatchesRebuild(state)
+
+    def test_missing_changed_days_record_forces_a_rebuild(self):
+        version = get_data_version(self.org)
+        self.write()
+        # Lose one bump's record, as if it had expired or been evicted
+        cache.delete(_days_key(self.org.pk, version + 2))
+        state, calls = self.get_state()
+        self.assertEqual(calls, [()])
+        self.assertMatchesRebuild(state)
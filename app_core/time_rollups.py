@@ -0,0 +1,268 @@
+# app_core/time_rollups.py
+"""
+Task time rollups: logged hours per (project, milestone, user, ISO week).
+
+Each TaskTimeEntry write adjusts a single TaskTimeRollup row with an F()
+update in the same transaction (see app_core.signals). Creating, editing or
+deleting an entry, or moving its task to another project or milestone, costs
+a few small queries and never rescans the entries. Burn-down/burn-up and
+utilisation reads then touch one row per week (times users) instead of
+every entry.
+
+``bulk_create``, ``QuerySet.update`` and raw SQL skip signals. After loading
+entries that way, run ``manage.py rebuild_time_rollups``.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction as dbtxn
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncWeek
+
+from .task_models import Task, TaskTimeEntry, TaskTimeRollup
+
+DEFAULT_WEEKLY_CAPACITY = 40
+ZERO = Decimal("0")
+
+
+def week_start(day) -> date:
+    """Monday of the ISO week containing ``day``."""
+    if isinstance(day, datetime):
+        day = day.date()
+    return day - timedelta(days=day.weekday())
+
+
+def weekly_capacity() -> Decimal:
+    return Decimal(str(getattr(settings, "TASK_WEEKLY_CAPACITY_HOURS", DEFAULT_WEEKLY_CAPACITY)))
+
+
+# ---------------------------------------------------------------------------
+# Incremental maintenance
+# ---------------------------------------------------------------------------
+
+def _key(task, user_id, day) -> dict:
+    return {
+        "organization_id": task["organization_id"],
+        "project_id": task["project_id"],
+        "milestone_id": task["milestone_id"],
+        "user_id": user_id,
+        "week": week_start(day),
+    }
+
+
+def _task_placement(task_id):
+    return Task.objects.filter(pk=task_id).values("organization_id", "project_id", "milestone_id").first()
+
+
+def apply_delta(key, hours, count):
+    """Add ``hours`` and ``count`` to one rollup row for ``key``."""
+    row_id = TaskTimeRollup.objects.filter(**key).values_list("pk", flat=True).first()
+    if row_id is not None:
+        TaskTimeRollup.objects.filter(pk=row_id).update(
+            hours=F("hours") + hours, entry_count=F("entry_count") + count,
+        )
+        if count < 0:
+            TaskTimeRollup.objects.filter(pk=row_id, entry_count__lte=0, hours=0).delete()
+    elif count > 0:
+        # A concurrent insert may split the key across two rows; reads sum them
+        TaskTimeRollup.objects.create(**key, hours=hours, entry_count=count)
+
+
+def entry_contribution(entry_id):
+    """(key, hours) an entry currently contributes, read from the database."""
+    row = (
+        TaskTimeEntry.objects.filter(pk=entry_id)
+        .values("task__organization_id", "task__project_id", "task__milestone_id", "user_id", "date", "hours")
+        .first()
+    )
+    if row is None:
+        return None
+    task = {
+        "organization_id": row["task__organization_id"],
+        "project_id": row["task__project_id"],
+        "milestone_id": row["task__milestone_id"],
+    }
+    return _key(task, row["user_id"], row["date"]), row["hours"]
+
+
+def entry_saved(entry, previous=None):
+    """Move an entry's hours from its previous contribution (if any) to its current one."""
+    task = _task_placement(entry.task_id)
+    if task is None:
+        return
+    key, hours = _key(task, entry.user_id, entry.date), Decimal(str(entry.hours))
+    if previous is not None:
+        old_key, old_hours = previous
+        if old_key == key:
+            if old_hours != hours:
+                apply_delta(key, hours - old_hours, 0)
+            return
+        apply_delta(old_key, -old_hours, -1)
+    apply_delta(key, hours, 1)
+
+
+def entry_deleted(entry):
+    contribution = entry_contribution(entry.pk)
+    if contribution is not None:
+        key, hours = contribution
+        apply_delta(key, -hours, -1)
+
+
+def task_moved(task, old_project_id, old_milestone_id):
+    """Re-file a task's hours after its project or milestone changed."""
+    weeks = (
+        TaskTimeEntry.objects.filter(task=task)
+        .order_by()
+        .annotate(week=TruncWeek("date"))
+        .values("user_id", "week")
+        .annotate(hours=Sum("hours"), n=Count("id"))
+    )
+    old = {"organization_id": task.organization_id, "project_id": old_project_id, "milestone_id": old_milestone_id}
+    new = {"organization_id": task.organization_id, "project_id": task.project_id, "milestone_id": task.milestone_id}
+    for row in weeks:
+        apply_delta(_key(old, row["user_id"], row["week"]), -row["hours"], -row["n"])
+        apply_delta(_key(new, row["user_id"], row["week"]), row["hours"], row["n"])
+
+
+def rebuild_time_rollups(organization=None) -> int:
+    """Recompute rollups from the entries (for one organization or all); returns rows written."""
+    entries = TaskTimeEntry.objects.all()
+    rollups = TaskTimeRollup.objects.all()
+    if organization is not None:
+        entries = entries.filter(task__organization=organization)
+        rollups = rollups.filter(organization=organization)
+    rows = (
+        entries.order_by()
+        .annotate(week=TruncWeek("date"))
+        .values("task__organization_id", "task__project_id", "task__milestone_id", "user_id", "week")
+        .annotate(hours=Sum("hours"), n=Count("id"))
+    )
+    with dbtxn.atomic():
+        rollups.delete()
+        created = TaskTimeRollup.objects.bulk_create(
+            (
+                TaskTimeRollup(
+                    organization_id=row["task__organization_id"],
+                    project_id=row["task__project_id"],
+                    milestone_id=row["task__milestone_id"],
+                    user_id=row["user_id"],
+                    week=week_start(row["week"]),
+                    hours=row["hours"],
+                    entry_count=row["n"],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=1000,
+        )
+    return len(created)
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def weekly_hours(rollups) -> dict:
+    """{week: hours} summed over a TaskTimeRollup queryset."""
+    return dict(rollups.order_by().values("week").annotate(h=Sum("hours")).values_list("week", "h"))
+
+
+def _weeks(first, last):
+    weeks, week = [], first
+    while week <= last:
+        weeks.append(week)
+        week += timedelta(weeks=1)
+    return weeks
+
+
+def burn_series(project, milestone=None, today=None) -> dict:
+    """
+    Weekly burn-up (cumulative logged hours) and burn-down (estimate left)
+    for a project or one of its milestones.
+
+    The series runs from the project start (or first logged week) to the
+    later of this week, the last logged week and the deadline (milestone due
+    date, else project end date). ``ideal`` burns the estimate down linearly
+    to the deadline and is None when there is no deadline.
+    """
+    today = today or date.today()
+    rollups = TaskTimeRollup.objects.filter(project=project)
+    tasks = Task.objects.filter(project=project)
+    deadline = project.end_date
+    if milestone is not None:
+        rollups = rollups.filter(milestone=milestone)
+        tasks = tasks.filter(milestone=milestone)
+        deadline = milestone.due_date
+    by_week = weekly_hours(rollups)
+    estimate = tasks.aggregate(e=Sum("estimated_hours"))["e"] or ZERO
+
+    starts = [w for w in (project.start_date, min(by_week, default=None)) if w]
+    first = week_start(min(starts) if starts else today)
+    last = max([week_start(today)] + list(by_week) + ([week_start(deadline)] if deadline else []))
+    weeks = _weeks(first, last)
+
+    span = len(_weeks(first, week_start(deadline))) if deadline and deadline >= first else 0
+    series, cumulative = [], ZERO
+    for i, week in enumerate(weeks):
+        hours = by_week.get(week, ZERO)
+        cumulative += hours
+        ideal = None
+        if span:
+            ideal = float(max(estimate - estimate * (i + 1) / span, ZERO))
+        series.append({
+            "week": week.isoformat(),
+            "hours": float(hours),
+            "cumulative": float(cumulative),
+            "remaining": float(max(estimate - cumulative, ZERO)),
+            "ideal": round(ideal, 2) if ideal is not None else None,
+        })
+    return {
+        "estimate": float(estimate),
+        "logged": float(cumulative),
+        "deadline": deadline.isoformat() if deadline else None,
+        "weeks": series,
+    }
+
+
+def utilisation(organization, weeks=12, today=None, capacity=None) -> dict:
+    """
+    Hours logged per user per week over the last ``weeks`` weeks, against a
+    weekly capacity (TASK_WEEKLY_CAPACITY_HOURS, default 40).
+    """
+    today = today or date.today()
+    capacity = Decimal(str(capacity)) if capacity is not None else weekly_capacity()
+    last = week_start(today)
+    first = last - timedelta(weeks=weeks - 1)
+    week_list = _weeks(first, last)
+    index = {week: i for i, week in enumerate(week_list)}
+
+    rows = (
+        TaskTimeRollup.objects.filter(organization=organization, week__range=(first, last))
+        .order_by()
+        .values("user_id", "user__username", "week")
+        .annotate(h=Sum("hours"))
+    )
+    users = {}
+    for row in rows:
+        user = users.setdefault(row["user_id"], {
+            "id": row["user_id"],
+            "username": row["user__username"],
+            "hours": [0.0] * len(week_list),
+            "total": ZERO,
+        })
+        user["hours"][index[row["week"]]] = float(row["h"])
+        user["total"] += row["h"]
+
+    available = capacity * len(week_list)
+    result = []
+    for user in sorted(users.values(), key=lambda u: (-u["total"], u["username"])):
+        user["utilisation"] = round(float(user["total"] / available * 100), 1) if available else 0.0
+        user["total"] = float(user["total"])
+        result.append(user)
+    return {
+        "weeks": [week.isoformat() for week in week_list],
+        "capacity": float(capacity),
+        "users": result,
+    }
@@ -2,23 +2,38 @@
 Dashboard Widget Views
 Handles widget data and layout management
 """
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_http_methods
 from django.db.models import Sum, Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta, date, datetime
 from decimal import Decimal
+import asyncio
 import json
 
 from app_core.models import Transaction, Budget, Project, Invoice, Client, Label
 from app_core.dashboard_models import DashboardLayout
+from app_core.db_router import replica_reads
 from app_core.middleware import organization_required
+from app_core.profiling import query_budget
+from app_core.buckets import bucket_series
+from app_core.frames import org_frame
+from app_core.aging import ar_aging
+from app_core.changefeed import FAMILIES, aevent_stream
+from app_core.data_version import BUDGETS, INVOICES, PROJECTS, RECURRING, get_data_version
+from app_core.invoice_stats import organization_stats
+from app_core.money import PENCE, pct_change, to_display
 
 
 @login_required
 @organization_required
+@query_budget(queries=10)
 def dashboard_view(request):
     """Main dashboard view with customizable widgets"""
     return render(request, 'app_web/dashboard_widgets.html', {
@@ -26,9 +41,20 @@ def dashboard_view(request):
     })
 
 
+def _layout_etag(request):
+    updated_at = DashboardLayout.objects.filter(
+        user=request.user, organization=request.organization
+    ).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None  # the view creates the default layout
+    return f'"layout-{request.user.pk}-{request.organization.pk}-{updated_at.timestamp()}"'
+
+
 @login_required
 @organization_required
 @require_http_methods(["GET"])
+@condition(etag_func=_layout_etag)
+@query_budget(queries=10)
 def get_dashboard_layout(request):
     """Get user's dashboard layout configuration"""
     layout = DashboardLayout.get_or_create_default(
@@ -97,73 +123,82 @@ def reset_dashboard_layout(request):
         }, status=400)
 
 
+WIDGET_BATCH_CONCURRENCY = 4
+
+# Data versions (see app_core.data_version) each widget reads. None is the
+# transactions version, which label changes also bump.
+TRANSACTIONS = None
+WIDGET_SOURCES = {
+    'kpi-budget-progress': (TRANSACTIONS, BUDGETS),
+    'kpi-active-projects': (PROJECTS,),
+    'kpi-pending-invoices': (INVOICES,),
+    'kpi-overdue-invoices': (INVOICES,),
+    'chart-budget-performance': (TRANSACTIONS, BUDGETS),
+    'list-budget-alerts': (TRANSACTIONS, BUDGETS),
+    'list-recent-invoices': (INVOICES,),
+    'summary-ar-aging': (INVOICES,),
+    'chart-cash-forecast': (TRANSACTIONS, RECURRING, INVOICES),
+}
+
+
+def widget_date_range(request):
+    """(start, end) from ?start=&end= or ?dateRange=; raises ValueError on a bad date."""
+    start_param = request.GET.get('start')
+    end_param = request.GET.get('end')
+    if start_param and end_param:
+        return (
+            datetime.strptime(start_param, '%Y-%m-%d').date(),
+            datetime.strptime(end_param, '%Y-%m-%d').date(),
+        )
+    return parse_date_range(request.GET.get('dateRange', 'last30days'))
+
+
+def widget_etag(organization, widget_id, start_date, end_date):
+    """
+    ETag from the versions of the data the widget reads, its date range and
+    today's date (relative ranges, overdue and aging move with the day).
+    Computing it costs cache reads only, so a matching If-None-Match gets a
+    304 before any widget query runs.
+    """
+    versions = '.'.join(
+        str(get_data_version(organization, scope)) for scope in WIDGET_SOURCES.get(widget_id, (TRANSACTIONS,))
+    )
+    return f'"widget-{widget_id}-{organization.pk}-{start_date}-{end_date}-{date.today()}-{versions}"'
+
+
+def _widget_etag(request, widget_id):
+    if widget_id not in WIDGET_DATA_FUNCTIONS:
+        return None
+    try:
+        start_date, end_date = widget_date_range(request)
+    except ValueError:
+        return None
+    return widget_etag(request.organization, widget_id, start_date, end_date)
+
+
 @login_required
 @organization_required
 @require_http_methods(["GET"])
+@condition(etag_func=_widget_etag)
+@replica_reads
 def get_widget_data(request, widget_id):
     """Get data for a specific widget"""
     try:
-        # Check if custom start/end dates are provided
-        start_param = request.GET.get('start')
-        end_param = request.GET.get('end')
-
-        if start_param and end_param:
-            # Use custom date range
-            try:
-                start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
-            except ValueError:
-                return JsonResponse({
-                    'success': False,
-                    'error': 'Invalid date format. Use YYYY-MM-DD'
-                }, status=400)
-        else:
-            # Parse date range from query params
-            date_range = request.GET.get('dateRange', 'last30days')
-            start_date, end_date = parse_date_range(date_range)
-
-        # Route to appropriate widget data function
-        widget_data_functions = {
-            # KPI Widgets
-            'kpi-total-income': get_kpi_total_income,
-            'kpi-total-expenses': get_kpi_total_expenses,
-            'kpi-net-cash-flow': get_kpi_net_cash_flow,
-            'kpi-avg-transaction': get_kpi_avg_transaction,
-            'kpi-transaction-count': get_kpi_transaction_count,
-            'kpi-budget-progress': get_kpi_budget_progress,
-            'kpi-burn-rate': get_kpi_burn_rate,
-            'kpi-active-projects': get_kpi_active_projects,
-            'kpi-pending-invoices': get_kpi_pending_invoices,
-            'kpi-overdue-invoices': get_kpi_overdue_invoices,
-
-            # Chart Widgets
-            'chart-revenue-expense': get_chart_revenue_expense,
-            'chart-expense-pie': get_chart_expense_pie,
-            'chart-income-pie': get_chart_income_pie,
-            'chart-trend-line': get_chart_trend_line,
-            'chart-waterfall': get_chart_waterfall,
-            'chart-budget-performance': get_chart_budget_performance,
-            'chart-category-heatmap': get_chart_category_heatmap,
-            'chart-money-flow-sankey': get_chart_money_flow_sankey,
-
-            # List Widgets
-            'list-recent-transactions': get_list_recent_transactions,
-            'list-upcoming-bills': get_list_upcoming_bills,
-            'list-budget-alerts': get_list_budget_alerts,
-            'list-recent-invoices': get_list_recent_invoices,
-
-            # Summary Widgets
-            'summary-financial': get_summary_financial,
-            'summary-month-comparison': get_summary_month_comparison,
-        }
-
-        if widget_id not in widget_data_functions:
+        try:
+            start_date, end_date = widget_date_range(request)
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'error': 'Invalid date format. Use YYYY-MM-DD'
+            }, status=400)
+
+        if widget_id not in WIDGET_DATA_FUNCTIONS:
             return JsonResponse({
                 'success': False,
                 'error': f'Unknown widget: {widget_id}'
             }, status=404)
 
-        data = widget_data_functions[widget_id](request, start_date, end_date)
+        data = WIDGET_DATA_FUNCTIONS[widget_id](request, start_date, end_date)
 
         return JsonResponse({
             'success': True,
@@ -178,6 +213,104 @@ def get_widget_data(request, widget_id):
         }, status=500)
 
 
+def _run_widget(request, widget_id, start_date, end_date, known_etag):
+    """One widget for the batch view, in a worker thread: {'etag', 'data'}, {'not_modified'} or {'error'}."""
+    try:
+        etag = widget_etag(request.organization, widget_id, start_date, end_date)
+        if known_etag == etag:
+            return {'not_modified': True}
+        return {'etag': etag, 'data': WIDGET_DATA_FUNCTIONS[widget_id](request, start_date, end_date)}
+    except Exception as e:
+        return {'error': str(e)}
+    finally:
+        # Worker threads open their own connections; don't leave them behind
+        connections.close_all()
+
+
+def _warm_frame(organization):
+    try:
+        org_frame(organization)
+    finally:
+        connections.close_all()
+
+
+@login_required
+@organization_required
+@require_http_methods(["POST"])
+@replica_reads(methods=["POST"])
+async def get_widgets_batch(request):
+    """
+    Data for several widgets at once, computed concurrently.
+
+    Body: {"widgets": {widget_id: etag shown or null}}; the date range comes
+    from the query string as for get_widget_data. Each widget runs in a
+    worker thread (at most WIDGET_BATCH_CONCURRENCY at a time), so the batch
+    takes about as long as its slowest widget rather than the sum. Widgets
+    whose ETag still matches come back as {"not_modified": true}.
+    """
+    try:
+        requested = json.loads(request.body or b'{}').get('widgets') or {}
+        start_date, end_date = widget_date_range(request)
+    except (ValueError, AttributeError):
+        requested = None
+    if not isinstance(requested, dict):
+        return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+
+    known = {widget_id: etag for widget_id, etag in requested.items() if widget_id in WIDGET_DATA_FUNCTIONS}
+    results = {
+        widget_id: {'error': f'Unknown widget: {widget_id}'}
+        for widget_id in requested if widget_id not in known
+    }
+
+    if any(TRANSACTIONS in WIDGET_SOURCES.get(widget_id, (TRANSACTIONS,)) for widget_id in known):
+        # Build the shared transaction frame once instead of in every thread
+        await sync_to_async(_warm_frame, thread_sensitive=False)(request.organization)
+
+    limit = asyncio.Semaphore(getattr(settings, 'WIDGET_BATCH_CONCURRENCY', WIDGET_BATCH_CONCURRENCY))
+
+    async def run(widget_id):
+        async with limit:
+            return await sync_to_async(_run_widget, thread_sensitive=False)(
+                request, widget_id, start_date, end_date, known[widget_id],
+            )
+
+    computed = await asyncio.gather(*(run(widget_id) for widget_id in known))
+    results.update(zip(known, computed))
+
+    return JsonResponse({'success': True, 'widgets': results})
+
+
+def widgets_for_families(families):
+    """Widget ids that read any of the given change families (see app_core.changefeed)."""
+    scopes = {FAMILIES[family] for family in families}
+    return [
+        widget_id for widget_id in WIDGET_DATA_FUNCTIONS
+        if scopes.intersection(WIDGET_SOURCES.get(widget_id, (TRANSACTIONS,)))
+    ]
+
+
+@login_required
+@organization_required
+@require_http_methods(["GET"])
+def dashboard_changes(request):
+    """Server-sent events naming the widgets whose data changed, for this organization."""
+    if not isinstance(request, ASGIRequest):
+        # A stream would hold a WSGI worker for minutes. 204 tells EventSource
+        # not to reconnect, so the dashboard falls back to polling.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        aevent_stream(
+            request.organization.pk,
+            last_event_id=request.headers.get('Last-Event-ID'),
+            describe=lambda families: {'widgets': widgets_for_families(families)},
+        ),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx buffering the stream
+    return response
+
+
 def parse_date_range(date_range):
     """Convert date range string to start and end dates"""
     today = date.today()
@@ -199,140 +332,80 @@ def parse_date_range(date_range):
 
 def get_kpi_total_income(request, start_date, end_date):
     """Total income in period"""
-    total = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    frame = org_frame(request.organization)
+    total = frame.window(start_date, end_date).totals()['inflow']
 
     # Previous period for comparison
     days_diff = (end_date - start_date).days
     prev_start = start_date - timedelta(days=days_diff)
     prev_end = start_date - timedelta(days=1)
 
-    prev_total = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=prev_start,
-        date__lte=prev_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    change = total - prev_total
-    change_pct = (change / prev_total * 100) if prev_total else 0
+    prev_total = frame.window(prev_start, prev_end).totals()['inflow']
 
     return {
-        'value': float(total),
-        'prev_value': float(prev_total),
-        'change': float(change),
-        'change_pct': float(change_pct),
+        'value': to_display(total),
+        'prev_value': to_display(prev_total),
+        'change': to_display(total - prev_total),
+        'change_pct': pct_change(total, prev_total),
         'currency': '£'
     }
 
 
 def get_kpi_total_expenses(request, start_date, end_date):
     """Total expenses in period"""
-    total = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    frame = org_frame(request.organization)
+    total = frame.window(start_date, end_date).totals()['outflow']
 
     days_diff = (end_date - start_date).days
     prev_start = start_date - timedelta(days=days_diff)
     prev_end = start_date - timedelta(days=1)
 
-    prev_total = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=prev_start,
-        date__lte=prev_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    change = total - prev_total
-    change_pct = (change / prev_total * 100) if prev_total else 0
+    prev_total = frame.window(prev_start, prev_end).totals()['outflow']
 
     return {
-        'value': float(total),
-        'prev_value': float(prev_total),
-        'change': float(change),
-        'change_pct': float(change_pct),
+        'value': to_display(total),
+        'prev_value': to_display(prev_total),
+        'change': to_display(total - prev_total),
+        'change_pct': pct_change(total, prev_total),
         'currency': '£'
     }
 
 
 def get_kpi_net_cash_flow(request, start_date, end_date):
     """Net cash flow (income - expenses)"""
-    income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    net = income - expenses
+    frame = org_frame(request.organization)
+    net = frame.window(start_date, end_date).totals()['net']
 
     # Previous period
     days_diff = (end_date - start_date).days
     prev_start = start_date - timedelta(days=days_diff)
     prev_end = start_date - timedelta(days=1)
 
-    prev_income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=prev_start,
-        date__lte=prev_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    prev_expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=prev_start,
-        date__lte=prev_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    prev_net = prev_income - prev_expenses
-    change = net - prev_net
-    change_pct = (change / prev_net * 100) if prev_net else 0
+    prev_net = frame.window(prev_start, prev_end).totals()['net']
 
     return {
-        'value': float(net),
-        'prev_value': float(prev_net),
-        'change': float(change),
-        'change_pct': float(change_pct),
+        'value': to_display(net),
+        'prev_value': to_display(prev_net),
+        'change': to_display(net - prev_net),
+        'change_pct': pct_change(net, prev_net),
         'currency': '£'
     }
 
 
 def get_kpi_avg_transaction(request, start_date, end_date):
     """Average transaction amount"""
-    avg = Transaction.objects.filter(
-        organization=request.organization,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(avg=Avg('amount'))['avg'] or Decimal('0.00')
+    window = org_frame(request.organization).window(start_date, end_date)
+    avg = int(window.pence.sum()) / len(window) if len(window) else 0
 
     return {
-        'value': float(avg),
+        'value': round(avg / PENCE, 2),
         'currency': '£'
     }
 
 
 def get_kpi_transaction_count(request, start_date, end_date):
     """Total transaction count"""
-    count = Transaction.objects.filter(
-        organization=request.organization,
-        date__gte=start_date,
-        date__lte=end_date
-    ).count()
+    count = len(org_frame(request.organization).window(start_date, end_date))
 
     return {
         'value': count
@@ -377,19 +450,13 @@ def get_kpi_budget_progress(request, start_date, end_date):
 
 def get_kpi_burn_rate(request, start_date, end_date):
     """Daily burn rate (average daily spending)"""
-    total_expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    total_expenses = org_frame(request.organization).window(start_date, end_date).totals()['outflow']
 
     days = (end_date - start_date).days or 1
-    burn_rate = total_expenses / days
 
     return {
-        'value': float(burn_rate),
-        'total_expenses': float(total_expenses),
+        'value': round(total_expenses / days / PENCE, 2),
+        'total_expenses': to_display(total_expenses),
         'days': days,
         'currency': '£'
     }
@@ -408,35 +475,23 @@ def get_kpi_active_projects(request, start_date, end_date):
 
 
 def get_kpi_pending_invoices(request, start_date, end_date):
-    """Pending invoices count and amount"""
-    pending = Invoice.objects.filter(
-        organization=request.organization,
-        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID]
-    )
-
-    count = pending.count()
-    total = pending.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
+    """Pending invoices count and amount (sent, not yet past due)"""
+    stats = organization_stats(request.organization)
 
     return {
-        'count': count,
-        'value': float(total),
+        'count': stats['pending_count'],
+        'value': float(stats['pending']),
         'currency': '£'
     }
 
 
 def get_kpi_overdue_invoices(request, start_date, end_date):
     """Overdue invoices count and amount"""
-    overdue = Invoice.objects.filter(
-        organization=request.organization,
-        status=Invoice.STATUS_OVERDUE
-    )
-
-    count = overdue.count()
-    total = overdue.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
+    stats = organization_stats(request.organization)
 
     return {
-        'count': count,
-        'value': float(total),
+        'count': stats['overdue_count'],
+        'value': float(stats['overdue']),
         'currency': '£'
     }
 
@@ -445,27 +500,13 @@ def get_kpi_overdue_invoices(request, start_date, end_date):
 
 def get_chart_revenue_expense(request, start_date, end_date):
     """Revenue vs Expenses bar chart data"""
-    income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    net = income - expenses
+    totals = org_frame(request.organization).window(start_date, end_date).totals()
 
     return {
         'labels': ['Income', 'Expenses', 'Net'],
         'datasets': [{
             'label': 'Amount (£)',
-            'data': [float(income), float(expenses), float(net)],
+            'data': to_display([totals['inflow'], totals['outflow'], totals['net']]),
             'backgroundColor': ['#10b981', '#ef4444', '#3b82f6']
         }]
     }
@@ -552,34 +593,13 @@ def get_chart_income_pie(request, start_date, end_date):
 
 def get_chart_trend_line(request, start_date, end_date):
     """Income/Expense trend line chart"""
-    # Generate daily data points
-    from collections import defaultdict
-
-    transactions = Transaction.objects.filter(
-        organization=request.organization,
-        date__gte=start_date,
-        date__lte=end_date
-    ).values('date', 'direction', 'amount')
+    # Zero-filled daily buckets summed in integer pence from the cached frame
+    series = bucket_series(org_frame(request.organization), start_date, end_date, 'D').display()
 
-    daily_income = defaultdict(float)
-    daily_expense = defaultdict(float)
-
-    for txn in transactions:
-        if txn['direction'] == Transaction.INFLOW:
-            daily_income[txn['date'].isoformat()] += float(txn['amount'])
-        else:
-            daily_expense[txn['date'].isoformat()] += float(txn['amount'])
-
-    # Get all dates in range
-    dates = []
-    current = start_date
-    while current <= end_date:
-        dates.append(current.isoformat())
-        current += timedelta(days=1)
-
-    income_data = [daily_income.get(d, 0) for d in dates]
-    expense_data = [daily_expense.get(d, 0) for d in dates]
-    net_data = [daily_income.get(d, 0) - daily_expense.get(d, 0) for d in dates]
+    dates = series['labels']
+    income_data = series['inflow']
+    expense_data = series['outflow']
+    net_data = series['net']
 
     return {
         'labels': dates,
@@ -609,47 +629,59 @@ def get_chart_trend_line(request, start_date, end_date):
     }
 
 
+def get_chart_cash_forecast(request, start_date, end_date):
+    """Projected balance line: the shortest forecast horizon covering the selected range's length"""
+    from app_core.forecast import HORIZONS, cash_forecast
+
+    span = (end_date - start_date).days + 1
+    days = next((h for h in HORIZONS if h >= span), HORIZONS[-1])
+    forecast = cash_forecast(request.organization, days=days).display()
+
+    return {
+        'labels': forecast['labels'],
+        'datasets': [
+            {
+                'label': 'Projected balance',
+                'data': forecast['balance'],
+                'borderColor': '#3b82f6',
+                'backgroundColor': 'rgba(59, 130, 246, 0.1)',
+                'fill': True
+            },
+            {
+                'label': 'Recurring',
+                'data': forecast['recurring'],
+                'borderColor': '#8b5cf6',
+                'backgroundColor': 'rgba(139, 92, 246, 0.1)',
+                'fill': False
+            },
+            {
+                'label': 'Invoices due',
+                'data': forecast['invoices'],
+                'borderColor': '#10b981',
+                'backgroundColor': 'rgba(16, 185, 129, 0.1)',
+                'fill': False
+            }
+        ],
+        'opening': forecast['opening'],
+        'closing': forecast['closing'],
+        'low_point': forecast['low_point'],
+        'overdue': forecast['overdue'],
+    }
+
+
 def get_chart_waterfall(request, start_date, end_date):
     """Cash flow waterfall chart"""
     # Simplified waterfall - starting balance, income, expenses, ending
-    income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    frame = org_frame(request.organization)
+    period = frame.window(start_date, end_date).totals()
 
     # Get balance before period
-    prev_income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__lt=start_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    prev_expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__lt=start_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    starting = prev_income - prev_expenses
-    ending = starting + income - expenses
+    starting = frame.window(None, start_date - timedelta(days=1)).totals()['net']
+    ending = starting + period['net']
 
     return {
         'labels': ['Starting Balance', 'Income', 'Expenses', 'Ending Balance'],
-        'data': [
-            float(starting),
-            float(income),
-            -float(expenses),
-            float(ending)
-        ]
+        'data': to_display([starting, period['inflow'], -period['outflow'], ending])
     }
 
 
@@ -868,95 +900,100 @@ def get_list_recent_invoices(request, start_date, end_date):
 
 def get_summary_financial(request, start_date, end_date):
     """Financial summary card"""
-    income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=start_date,
-        date__lte=end_date
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    net = income - expenses
-    txn_count = Transaction.objects.filter(
-        organization=request.organization,
-        date__gte=start_date,
-        date__lte=end_date
-    ).count()
+    totals = org_frame(request.organization).window(start_date, end_date).totals()
+    txn_count = totals['count']
 
-    avg = (income + expenses) / txn_count if txn_count else 0
+    avg = (totals['inflow'] + totals['outflow']) / txn_count if txn_count else 0
 
     return {
-        'income': float(income),
-        'expenses': float(expenses),
-        'net': float(net),
+        'income': to_display(totals['inflow']),
+        'expenses': to_display(totals['outflow']),
+        'net': to_display(totals['net']),
         'transaction_count': txn_count,
-        'avg_transaction': float(avg),
+        'avg_transaction': round(avg / PENCE, 2),
         'currency': '£'
     }
 
 
 def get_summary_month_comparison(request, start_date, end_date):
     """Month-over-month comparison"""
+    frame = org_frame(request.organization)
+
     # This month
     today = date.today()
     this_month_start = today.replace(day=1)
-
-    this_income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=this_month_start,
-        date__lte=today
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    this_expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=this_month_start,
-        date__lte=today
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    this_month = frame.window(this_month_start, today).totals()
 
     # Last month
     last_month_end = this_month_start - timedelta(days=1)
     last_month_start = last_month_end.replace(day=1)
-
-    last_income = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.INFLOW,
-        date__gte=last_month_start,
-        date__lte=last_month_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    last_expenses = Transaction.objects.filter(
-        organization=request.organization,
-        direction=Transaction.OUTFLOW,
-        date__gte=last_month_start,
-        date__lte=last_month_end
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-    income_change = ((this_income - last_income) / last_income * 100) if last_income else 0
-    expense_change = ((this_expenses - last_expenses) / last_expenses * 100) if last_expenses else 0
+    last_month = frame.window(last_month_start, last_month_end).totals()
 
     return {
         'this_month': {
-            'income': float(this_income),
-            'expenses': float(this_expenses),
-            'net': float(this_income - this_expenses)
+            'income': to_display(this_month['inflow']),
+            'expenses': to_display(this_month['outflow']),
+            'net': to_display(this_month['net'])
         },
         'last_month': {
-            'income': float(last_income),
-            'expenses': float(last_expenses),
-            'net': float(last_income - last_expenses)
+            'income': to_display(last_month['inflow']),
+            'expenses': to_display(last_month['outflow']),
+            'net': to_display(last_month['net'])
         },
         'changes': {
-            'income_pct': float(income_change),
-            'expense_pct': float(expense_change)
+            'income_pct': pct_change(this_month['inflow'], last_month['inflow']),
+            'expense_pct': pct_change(this_month['outflow'], last_month['outflow'])
         },
         'currency': '£'
     }
 
+
+def get_summary_ar_aging(request, start_date, end_date):
+    """Outstanding receivables by days past due (as of today, not the date range)"""
+    aging = ar_aging(request.organization)
+    org = aging['organization']
+
+    return {
+        'buckets': [{'label': label, 'value': float(org[key])} for key, label in aging['buckets']],
+        'total': float(org['total']),
+        'invoice_count': org['invoice_count'],
+        'currency': '£'
+    }
+
+
+# Route widget ids to their data functions
+WIDGET_DATA_FUNCTIONS = {
+    # KPI Widgets
+    'kpi-total-income': get_kpi_total_income,
+    'kpi-total-expenses': get_kpi_total_expenses,
+    'kpi-net-cash-flow': get_kpi_net_cash_flow,
+    'kpi-avg-transaction': get_kpi_avg_transaction,
+    'kpi-transaction-count': get_kpi_transaction_count,
+    'kpi-budget-progress': get_kpi_budget_progress,
+    'kpi-burn-rate': get_kpi_burn_rate,
+    'kpi-active-projects': get_kpi_active_projects,
+    'kpi-pending-invoices': get_kpi_pending_invoices,
+    'kpi-overdue-invoices': get_kpi_overdue_invoices,
+
+    # Chart Widgets
+    'chart-revenue-expense': get_chart_revenue_expense,
+    'chart-expense-pie': get_chart_expense_pie,
+    'chart-income-pie': get_chart_income_pie,
+    'chart-trend-line': get_chart_trend_line,
+    'chart-waterfall': get_chart_waterfall,
+    'chart-budget-performance': get_chart_budget_performance,
+    'chart-category-heatmap': get_chart_category_heatmap,
+    'chart-money-flow-sankey': get_chart_money_flow_sankey,
+    'chart-cash-forecast': get_chart_cash_forecast,
+
+    # List Widgets
+    'list-recent-transactions': get_list_recent_transactions,
+    'list-upcoming-bills': get_list_upcoming_bills,
+    'list-budget-alerts': get_list_budget_alerts,
+    'list-recent-invoices': get_list_recent_invoices,
+
+    # Summary Widgets
+    'summary-financial': get_summary_financial,
+    'summary-month-comparison': get_summary_month_comparison,
+    'summary-ar-aging': get_summary_ar_aging,
+}
@@ -15,6 +15,33 @@
 
   function initializeKanban() {
     setupDragAndDrop();
+    if (window.pollTaskBoard) {
+      window.pollTaskBoard(applyBoard);
+    }
+  }
+
+  // Move cards to match the server's columns; reload when tasks were added or removed
+  function applyBoard(board) {
+    if (draggedElement) return;
+
+    const cards = {};
+    document.querySelectorAll('.task-card').forEach(card => { cards[card.dataset.taskId] = card; });
+    const known = new Set(Object.keys(cards));
+    const current = board.tasks.map(task => String(task.id));
+    if (current.length !== known.size || current.some(id => !known.has(id))) {
+      window.location.reload();
+      return;
+    }
+
+    Object.entries(board.columns).forEach(([status, ids]) => {
+      const column = document.querySelector(`.kanban-cards[data-status="${status}"]`);
+      if (!column) return;
+      ids.forEach(id => {
+        const card = cards[String(id)];
+        if (card && card.parentElement !== column) column.appendChild(card);
+      });
+      updateColumnCount(column);
+    });
   }
 
   function setupDragAndDrop() {
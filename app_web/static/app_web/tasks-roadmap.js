@@ -17,6 +17,32 @@
     renderTimeline();
     positionTaskBars();
     positionTodayMarker();
+    if (window.pollTaskBoard) {
+      window.pollTaskBoard(applyBoard);
+    }
+  }
+
+  // Update bar dates/status in place; reload when the set of dated tasks changed
+  function applyBoard(board) {
+    const rows = document.querySelectorAll('.timeline-row');
+    const shown = Array.from(rows).map(row => row.dataset.taskId);
+    const roadmap = board.roadmap.map(String);
+    if (shown.length !== roadmap.length || shown.some((id, i) => id !== roadmap[i])) {
+      window.location.reload();
+      return;
+    }
+
+    const tasks = {};
+    board.tasks.forEach(task => { tasks[String(task.id)] = task; });
+    rows.forEach(row => {
+      const task = tasks[row.dataset.taskId];
+      const bar = row.querySelector('.timeline-bar');
+      if (!task || !bar) return;
+      bar.dataset.start = task.start_date;
+      bar.dataset.end = task.due_date;
+      bar.className = bar.className.replace(/status-\S+/, `status-${task.status}`);
+    });
+    positionTaskBars();
   }
 
   window.zoomTimeline = function(zoom) {
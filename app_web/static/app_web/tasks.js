@@ -653,5 +653,34 @@
     window.location.href = currentUrl.toString();
   };
 
+  // ========== BOARD REFRESH ==========
+
+  // Poll the board JSON and call onChange(board) only when it changed.
+  // The server answers 304 while its ETag still matches.
+  const BOARD_POLL_MS = 30000;
+
+  window.pollTaskBoard = function(onChange) {
+    let etag = null;
+
+    function poll() {
+      if (document.hidden) return;
+      const headers = etag ? { 'If-None-Match': etag } : {};
+      fetch(`/projects/${window.projectId}/tasks/board/`, { headers, cache: 'no-store' })
+        .then(response => {
+          if (response.status === 304 || !response.ok) return null;
+          const first = etag === null;
+          etag = response.headers.get('ETag');
+          // The first response describes what the page was rendered from
+          return response.json().then(board => (first ? null : board));
+        })
+        .then(board => { if (board) onChange(board); })
+        .catch(error => console.error('Error refreshing board:', error));
+    }
+
+    poll();
+    setInterval(poll, BOARD_POLL_MS);
+    document.addEventListener('visibilitychange', poll);
+  };
+
 })();
 
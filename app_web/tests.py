@@ -1,3 +1,174 @@
-from django.test import TestCase
+import csv
+import io
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from app_core import export
+from app_core.models import Invoice, Transaction
+from app_core.profiling import Budget, QueryBudgetExceeded
+from app_core.synthetic import Scale, generate_organization
+from app_web import views
+
+# Every view with a @query_budget, requested with the org's seeded data
+BUDGETED_VIEWS = [
+    ("dashboard", {}),
+    ("get_dashboard_layout", {}),
+    ("transactions", {}),
+    ("transactions", {"q": "coffee", "sort": "amount"}),
+    ("invoices", {}),
+    ("cash_forecast_data", {"days": 365}),
+    *[
+        (f"report_{report}{suffix}", {})
+        for report in ("pnl", "cashflow", "expenses", "income", "tax", "budget_performance", "project_performance")
+        for suffix in ("", "_download")
+    ],
+]
+
+
+@override_settings(PROFILING_ENFORCE_BUDGETS=True)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.generated = generate_organization(Scale.for_transactions(2000, members=2), seed=7)
+
+    def setUp(self):
+        self.client.force_login(self.generated.owner)
+        session = self.client.session
+        session["current_organization_id"] = self.generated.organization.pk
+        session.save()
+
+    def get(self, name, params):
+        response = self.client.get(reverse(f"app_web:{name}"), params)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def test_budgeted_views_stay_within_budget(self):
+        for name, params in BUDGETED_VIEWS:
+            with self.subTest(view=name, params=params):
+                self.assertEqual(self.get(name, params).status_code, 200)
+
+    def test_exceeding_a_budget_fails(self):
+        with mock.patch.object(views.invoices_view, "query_budget", Budget(queries=1)):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.get("invoices", {})
+
+
+class TransactionFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.generated = generate_organization(Scale.for_transactions(50, members=1), seed=3)
+
+    def setUp(self):
+        self.client.force_login(self.generated.owner)
+        session = self.client.session
+        session["current_organization_id"] = self.generated.organization.pk
+        session.save()
+
+    def test_invalid_label_is_ignored_when_listing_and_exporting(self):
+        for name in ("transactions", "transactions_export"):
+            with self.subTest(view=name):
+                response = self.client.get(reverse(f"app_web:{name}"), {"label": "abc"})
+                self.assertEqual(response.status_code, 200)
+
+    def test_bulk_operations_refuse_an_invalid_label(self):
+        before = Transaction.objects.count()
+        for name in ("transaction_bulk_delete", "transaction_bulk_edit"):
+            with self.subTest(view=name):
+                response = self.client.post(
+                    reverse(f"app_web:{name}"), {"select_all": "1", "next": "label=abc", "category": "Moved"},
+                    HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(Transaction.objects.count(), before)
+        self.assertFalse(Transaction.objects.filter(category="Moved").exists())
+
+
+@override_settings(CHANGEFEED_MAX_STREAM_SECONDS=0)
+class DashboardChangesTests(TestCase):
+    # The owner's only organization becomes the request's organization
+    @classmethod
+    def setUpTestData(cls):
+        cls.generated = generate_organization(Scale.for_transactions(50, members=1), seed=5)
+
+    def test_wsgi_requests_are_refused_so_the_dashboard_polls(self):
+        self.client.force_login(self.generated.owner)
+        self.assertEqual(self.client.get(reverse("app_web:dashboard_changes")).status_code, 204)
+
+    async def test_asgi_requests_stream_events(self):
+        await self.async_client.aforce_login(self.generated.owner)
+        response = await self.async_client.get(reverse("app_web:dashboard_changes"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b"event: ready", body)
+
+
+class TransactionExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.generated = generate_organization(Scale.for_transactions(50, members=1), seed=11)
+        cls.count = Transaction.objects.filter(organization=cls.generated.organization).count()
+
+    def setUp(self):
+        self.client.force_login(self.generated.owner)
+
+    def export(self, fmt, **params):
+        response = self.client.get(reverse("app_web:transactions_export"), {"format": fmt, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn(f'.{fmt}"', response["Content-Disposition"])
+        return b"".join(response.streaming_content)
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export("csv").decode())))
+        self.assertEqual(rows[0], export.headers())
+        self.assertEqual(len(rows) - 1, self.count)
+
+        inflows = Transaction.objects.filter(organization=self.generated.organization, direction="inflow").count()
+        rows = list(csv.reader(io.StringIO(self.export("csv", direction="inflow").decode())))
+        self.assertEqual(len(rows) - 1, inflows)
+
+    def test_xlsx_starts_a_new_sheet_at_the_row_limit(self):
+        from openpyxl import load_workbook
+
+        self.assertEqual(export.XLSX_MAX_ROWS, 1_048_576)  # Excel's limit, header included
+        with mock.patch.object(export, "XLSX_MAX_ROWS", 11):
+            workbook = load_workbook(io.BytesIO(self.export("xlsx")), read_only=True)
+        sheets = [list(sheet.values) for sheet in workbook.worksheets]
+        self.assertEqual(workbook.sheetnames[:2], ["Transactions", "Transactions 2"])
+        self.assertEqual(len(sheets), -(-self.count // 10))
+        self.assertTrue(all(list(rows[0]) == export.headers() for rows in sheets))
+        self.assertTrue(all(len(rows) <= 11 for rows in sheets))
+        self.assertEqual(sum(len(rows) - 1 for rows in sheets), self.count)
+
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(self.export("parquet")))
+        self.assertEqual(table.column_names, export.headers())
+        self.assertEqual(table.num_rows, self.count)
+
+
+class InvoiceBulkSendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.generated = generate_organization(Scale.for_transactions(50, members=1), seed=13)
+
+    def setUp(self):
+        self.client.force_login(self.generated.owner)
+
+    def send(self, body):
+        return self.client.post(reverse("app_web:invoice_bulk_send"), body, content_type="application/json")
+
+    def test_invoice_ids_must_be_ids(self):
+        for ids in (["abc"], [1.5], [None], [[1]], "1,2", {"id": 1}):
+            with self.subTest(invoice_ids=ids):
+                self.assertEqual(self.send({"invoice_ids": ids}).status_code, 400)
+
+    def test_numeric_strings_are_accepted(self):
+        invoice = Invoice.objects.filter(organization=self.generated.organization).order_by("id").first()
+        response = self.send({"invoice_ids": [str(invoice.pk)], "kind": "reminder"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d["invoice_id"] for d in response.json()["deliveries"]], [invoice.pk])
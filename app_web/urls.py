@@ -1,18 +1,24 @@
 from django.urls import path, include
 from .views import upload_view, health_view, signup_view, home_view, profile_view, settings_view, transactions_view, pricing_view, demo_view, about_view
-from .views import transaction_edit_view, transaction_delete_view, transaction_bulk_edit_view
-from .views import transaction_columns_view
+from .views import transaction_edit_view, transaction_delete_view, transaction_bulk_edit_view, transaction_bulk_delete_view
+from .views import transaction_columns_view, transactions_export_view
 from .views import budgets_view, budget_widget_data, budget_list_data
-from .views import projects_view, project_detail_view, project_list_data, project_detail_data
-from .views import invoices_view, clients_view, clients_list_api, invoice_create_view, invoice_edit_view, invoice_delete_view
+from .views import projects_view, project_detail_view, project_list_data, project_detail_data, project_time_data, time_utilisation_data
+from .views import invoices_view, ar_aging_view, cash_forecast_data, clients_view, clients_list_api, invoice_create_view, invoice_edit_view, invoice_delete_view
 from .views import invoice_send_view, invoice_payment_view, invoice_detail_view, invoice_reminder_view
-from .views import invoice_pdf_view, invoice_pdf_download
+from .views import invoice_pdf_view, invoice_pdf_download, invoice_bulk_send_view, invoice_dispatch_status_view
 from .views import invoice_templates_view, template_create_view, template_edit_view, template_delete_view, template_use_view, template_detail_view
-from .views import client_create_view, client_edit_view, client_delete_view
+from .views import client_create_view, client_edit_view, client_delete_view, client_detail_api
 from .views import reports_view, report_pnl_view, report_pnl_download
-from .views import debug_organization_view
 from .views import (
-    project_tasks, task_create, task_update, task_delete, task_details,
+    report_cashflow_view, report_cashflow_download, report_expenses_view, report_expenses_download,
+    report_income_view, report_income_download, report_tax_view, report_tax_download,
+    report_budget_performance_view, report_budget_performance_download,
+    report_project_performance_view, report_project_performance_download,
+)
+from .views import debug_organization_view, profiling_stats_view
+from .views import (
+    project_tasks, project_tasks_board, task_create, task_update, task_delete, task_details,
     task_update_status, task_bulk_delete, task_comment_create, task_time_entry_create
 )
 
@@ -22,7 +28,7 @@ from .views import dashboard_view as dashboard_legacy_view
 # NEW: Dashboard widgets is now the main dashboard
 from .dashboard_views import (
     dashboard_view as dashboard_view, get_dashboard_layout, save_dashboard_layout,
-    reset_dashboard_layout, get_widget_data
+    reset_dashboard_layout, get_widget_data, get_widgets_batch, dashboard_changes
 )
 
 # Team collaboration views
@@ -49,6 +55,8 @@ urlpatterns = [
     path("api/dashboard/layout/save/", save_dashboard_layout, name="save_dashboard_layout"),
     path("api/dashboard/layout/reset/", reset_dashboard_layout, name="reset_dashboard_layout"),
     path("api/dashboard/widget/<str:widget_id>/", get_widget_data, name="get_widget_data"),
+    path("api/dashboard/widgets/", get_widgets_batch, name="get_widgets_batch"),
+    path("api/dashboard/changes/", dashboard_changes, name="dashboard_changes"),
 
     # OLD: Keep legacy dashboard for reference at /dashboard/legacy/
     path("dashboard/legacy/", dashboard_legacy_view, name="dashboard_legacy"),
@@ -60,7 +68,9 @@ urlpatterns = [
     path("transactions/<int:tx_id>/edit/", transaction_edit_view, name="transaction_edit"),
     path("transactions/<int:tx_id>/delete/", transaction_delete_view, name="transaction_delete"),
     path("transactions/bulk_edit/", transaction_bulk_edit_view, name="transaction_bulk_edit"),
+    path("transactions/bulk_delete/", transaction_bulk_delete_view, name="transaction_bulk_delete"),
     path("transactions/columns/", transaction_columns_view, name="transaction_columns"),
+    path("transactions/export/", transactions_export_view, name="transactions_export"),
     path("budgets/", budgets_view, name="budgets"),
     path("api/budget-widget/", budget_widget_data, name="budget_widget_data"),
     path("api/budget-list/", budget_list_data, name="budget_list_data"),
@@ -68,10 +78,16 @@ urlpatterns = [
     path("projects/<int:project_id>/", project_detail_view, name="project_detail"),
     path("api/project-list/", project_list_data, name="project_list_data"),
     path("api/project-detail/<int:project_id>/", project_detail_data, name="project_detail_data"),
+    path("api/project-time/<int:project_id>/", project_time_data, name="project_time_data"),
+    path("api/time-utilisation/", time_utilisation_data, name="time_utilisation_data"),
 
     # Invoicing & Billing
     path("invoices/", invoices_view, name="invoices"),
     path("invoices/create/", invoice_create_view, name="invoice_create"),
+    path("invoices/aging/", ar_aging_view, name="ar_aging"),
+    path("api/cash-forecast/", cash_forecast_data, name="cash_forecast_data"),
+    path("invoices/send-bulk/", invoice_bulk_send_view, name="invoice_bulk_send"),
+    path("invoices/dispatch/<str:batch_id>/", invoice_dispatch_status_view, name="invoice_dispatch_status"),
     path("invoices/<int:invoice_id>/edit/", invoice_edit_view, name="invoice_edit"),
     path("invoices/<int:invoice_id>/delete/", invoice_delete_view, name="invoice_delete"),
     path("invoices/<int:invoice_id>/send/", invoice_send_view, name="invoice_send"),
@@ -93,6 +109,7 @@ urlpatterns = [
     path("clients/", clients_view, name="clients"),
     path("api/clients/", clients_list_api, name="clients_list_api"),
     path("clients/create/", client_create_view, name="client_create"),
+    path("clients/<int:client_id>/", client_detail_api, name="client_detail_api"),
     path("clients/<int:client_id>/edit/", client_edit_view, name="client_edit"),
     path("clients/<int:client_id>/delete/", client_delete_view, name="client_delete"),
 
@@ -100,19 +117,18 @@ urlpatterns = [
     path("reports/", reports_view, name="reports"),
     path("reports/pnl/", report_pnl_view, name="report_pnl"),
     path("reports/pnl/download/", report_pnl_download, name="report_pnl_download"),
-    # TODO: Implement these report views
-    # path("reports/cashflow/", report_cashflow_view, name="report_cashflow"),
-    # path("reports/cashflow/download/", report_cashflow_download, name="report_cashflow_download"),
-    # path("reports/expenses/", report_expenses_view, name="report_expenses"),
-    # path("reports/expenses/download/", report_expenses_download, name="report_expenses_download"),
-    # path("reports/income/", report_income_view, name="report_income"),
-    # path("reports/income/download/", report_income_download, name="report_income_download"),
-    # path("reports/tax/", report_tax_view, name="report_tax"),
-    # path("reports/tax/download/", report_tax_download, name="report_tax_download"),
-    # path("reports/budget-performance/", report_budget_performance_view, name="report_budget_performance"),
-    # path("reports/budget-performance/download/", report_budget_performance_download, name="report_budget_performance_download"),
-    # path("reports/project-performance/", report_project_performance_view, name="report_project_performance"),
-    # path("reports/project-performance/download/", report_project_performance_download, name="report_project_performance_download"),
+    path("reports/cashflow/", report_cashflow_view, name="report_cashflow"),
+    path("reports/cashflow/download/", report_cashflow_download, name="report_cashflow_download"),
+    path("reports/expenses/", report_expenses_view, name="report_expenses"),
+    path("reports/expenses/download/", report_expenses_download, name="report_expenses_download"),
+    path("reports/income/", report_income_view, name="report_income"),
+    path("reports/income/download/", report_income_download, name="report_income_download"),
+    path("reports/tax/", report_tax_view, name="report_tax"),
+    path("reports/tax/download/", report_tax_download, name="report_tax_download"),
+    path("reports/budget-performance/", report_budget_performance_view, name="report_budget_performance"),
+    path("reports/budget-performance/download/", report_budget_performance_download, name="report_budget_performance_download"),
+    path("reports/project-performance/", report_project_performance_view, name="report_project_performance"),
+    path("reports/project-performance/download/", report_project_performance_download, name="report_project_performance_download"),
 
     # Team collaboration
     path("switch-organization/<int:org_id>/", switch_organization, name="switch_organization"),
@@ -131,6 +147,7 @@ urlpatterns = [
 
     # Task/Progress Management
     path("projects/<int:project_id>/tasks/", project_tasks, name="project_tasks"),
+    path("projects/<int:project_id>/tasks/board/", project_tasks_board, name="project_tasks_board"),
     path("tasks/create/<int:project_id>/", task_create, name="task_create"),
     path("tasks/<int:task_id>/update/", task_update, name="task_update"),
     path("tasks/<int:task_id>/delete/", task_delete, name="task_delete"),
@@ -142,6 +159,7 @@ urlpatterns = [
 
     # Debug
     path("debug/org/", debug_organization_view, name="debug_org"),
+    path("ops/profiling/", profiling_stats_view, name="profiling_stats"),
 
     path("health/", health_view, name="health"),
     path("", home_view, name="home"),
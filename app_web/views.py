@@ -3,6 +3,7 @@ import base64, io
 
 # pandas is not used in this module; removed unused import
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
 from .forms import UploadFileForm, TransactionForm
@@ -13,21 +14,23 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db.models import Q
 from app_core.models import Transaction
-from app_core.metrics import queryset_to_df, kpis as kpi_calc, timeseries, by_category
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from .models import UserTableSetting
 from django.db.models import Sum
 
 import math
 import json
 import datetime
-import calendar
 import logging
 from django.utils.safestring import mark_safe
 
 from app_core.insights import generate_insights
+from app_core.permissions import has_permission
+from app_core.db_router import replica_reads
+from app_core.profiling import query_budget
+from app_core.data_version import bump_data_version
 
-from django.http import HttpResponse, JsonResponse, HttpResponseNotFound
+from django.http import HttpResponse, JsonResponse, HttpResponseNotFound, QueryDict
 
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
@@ -70,10 +73,11 @@ def upload_view(request):
         df = _read_any(fobj, filename)
         df, _ = _coerce_types(df)
 
-        # dataframe_to_transactions signature is (df, user)
-        rows = dataframe_to_transactions(df, request.user)  # pass the User instance
+        rows = dataframe_to_transactions(df, request.user, organization=request.organization)
         with dbtxn.atomic():
             Transaction.objects.bulk_create(rows, batch_size=1000)
+        # bulk_create sends no signals; invalidate cached analytics for the org
+        bump_data_version(request.organization, {r.date for r in rows})
 
         context.update({
             "saved": True,
@@ -220,28 +224,24 @@ def upload_view(request):
     return render(request, "app_web/upload.html", context)
 
 @login_required
+@replica_reads
 def dashboard_view(request):
     """
     Simple dashboard for user_id=1 (MVP). Supports optional ?freq=D|W|M
     """
+    from app_core.frames import frame_for
+    from app_core.kpi_engine import dashboard_metrics, dashboard_windows
+
     user = request.user
     freq = request.GET.get("freq", "D").upper()
     if freq not in {"D", "W", "M", "Y"}:
         freq = "D"
 
-    # Filter by organization instead of user for multi-tenant support
-    org = request.organization
-    if not org:
-        # Fallback to user if no organization (shouldn't happen)
-        q = Q(user=user)
-    else:
-        q = Q(organization=org)
-
     # Optional quick date filters (?days=30) + new start/end and category filters
     days = request.GET.get("days")
+    since = None
     if days and str(days).isdigit():
         since = timezone.now().date() - datetime.timedelta(days=int(days))
-        q &= Q(date__gte=since)
 
     # New: explicit start/end date range and category filter from query params
     # Accept either 'start'/'end' (dashboard form) or fallback to 'start_date'/'end_date' (if present)
@@ -265,6 +265,14 @@ def dashboard_view(request):
         return d - datetime.timedelta(days=d.weekday())
     def sunday_of(d):
         return monday_of(d) + datetime.timedelta(days=6)
+    def months_back_11(d):
+        # first day of the month 11 months before d
+        m_back = d.month - 11
+        y_back = d.year
+        if m_back <= 0:
+            m_back += 12
+            y_back -= 1
+        return datetime.date(y_back, m_back, 1)
 
     if not start and not end:
         # Chart defaults per user's request:
@@ -273,81 +281,49 @@ def dashboard_view(request):
         # M -> last 12 months (month-aligned, include current month up to today)
         # Y -> Year-to-date (Jan 1 -> today)
         if freq == 'D':
-            week_start = monday_of(today)
-            week_end = sunday_of(today)
-            start = week_start.isoformat()
-            end = week_end.isoformat()
+            start = monday_of(today).isoformat()
+            end = sunday_of(today).isoformat()
         elif freq == 'W':
             # last 4 weeks including current week
-            curr_monday = monday_of(today)
-            start_dt = curr_monday - datetime.timedelta(weeks=3)
-            end_dt = sunday_of(today)
-            start = start_dt.isoformat()
-            end = end_dt.isoformat()
+            start = (monday_of(today) - datetime.timedelta(weeks=3)).isoformat()
+            end = sunday_of(today).isoformat()
         elif freq == 'M':
             # last 12 months: start = first day of month 11 months ago; end = today
-            month = today.month
-            year = today.year
-            # compute year/month for 11 months ago
-            m_back = month - 11
-            y_back = year
-            if m_back <= 0:
-                m_back += 12
-                y_back -= 1
-            start_dt = datetime.date(y_back, m_back, 1)
-            start = start_dt.isoformat()
+            start = months_back_11(today).isoformat()
             end = today.isoformat()
         elif freq == 'Y':
             # Year-to-date
-            start_dt = datetime.date(today.year, 1, 1)
-            start = start_dt.isoformat()
+            start = datetime.date(today.year, 1, 1).isoformat()
             end = today.isoformat()
 
     # Apply start/end (support both YYYY-MM-DD strings)
     if start:
         try:
             sd = datetime.date.fromisoformat(start)
-            q &= Q(date__gte=sd)
         except Exception:
             sd = None
     if end:
         try:
             ed = datetime.date.fromisoformat(end)
-            q &= Q(date__lte=ed)
         except Exception:
             ed = None
 
-    # Apply category
-    if category:
-        q &= Q(category=category)
-
-    qs = Transaction.objects.filter(q).order_by("date")
+    chart_start = sd
+    if since:
+        chart_start = max(sd, since) if sd else since
 
     # collect distinct categories for dropdown (exclude empty)
     categories_qs = Transaction.objects.filter(user=user).exclude(category__isnull=True).exclude(category__exact='').values_list('category', flat=True).distinct().order_by('category')
     categories = list(categories_qs)
 
-    # DataFrame used for charts (respects the chart start/end defaults or explicit range)
-    df = queryset_to_df(qs)
-
     # Compute KPI range: if the user supplied explicit start/end, KPIs use that range as well.
     # Otherwise compute KPI ranges depending on freq:
-    #  - D: today only
-    #  - W: week-to-date (Mon -> today)
-    #  - M: month-to-date
-    #  - Y: last 365 days
+    #  - D: current week (Mon-Sun)
+    #  - W: last 4 weeks
+    #  - M: last 12 months
+    #  - Y: year to date
     explicit_range = bool(start_raw or end_raw)
-    # Use organization filter for KPIs
-    if not org:
-        kpi_q = Q(user=user)
-    else:
-        kpi_q = Q(organization=org)
     if explicit_range:
-        # reuse sd/ed parsed above
-        if sd:
-            kpi_q &= Q(date__gte=sd)
-        if ed:
-            kpi_q &= Q(date__lte=ed)
         # set KPI bounds so previous-period comparison can be computed for explicit ranges
         # only set when both start and end are present (we need a full window)
         if sd and ed:
@@ -368,278 +344,59 @@ def dashboard_view(request):
     else:
         # choose kpi window based on freq
         if freq == 'D':
-            # KPI for current week (Mon-Sun)
             ksd = monday_of(today)
             ked = sunday_of(today)
             kpi_window_label = 'Current week'
         elif freq == 'W':
-            # KPI for last 4 weeks (including current week)
-            curr_monday = monday_of(today)
-            ksd = curr_monday - datetime.timedelta(weeks=3)
+            ksd = monday_of(today) - datetime.timedelta(weeks=3)
             ked = sunday_of(today)
             kpi_window_label = 'Last 4 weeks'
         elif freq == 'M':
-            # KPI for last 12 months (month-aligned)
-            month = today.month
-            year = today.year
-            m_back = month - 11
-            y_back = year
-            if m_back <= 0:
-                m_back += 12
-                y_back -= 1
-            ksd = datetime.date(y_back, m_back, 1)
+            ksd = months_back_11(today)
             ked = today
             kpi_window_label = 'Last 12 months'
         elif freq == 'Y':
-            # Year-to-date
             ksd = datetime.date(today.year, 1, 1)
             ked = today
             kpi_window_label = 'Year to date'
-        else:
-            ksd = None
-            ked = None
-        if ksd:
-            kpi_q &= Q(date__gte=ksd)
-        if ked:
-            kpi_q &= Q(date__lte=ked)
-
-    qs_kpi = Transaction.objects.filter(kpi_q).order_by('date')
-    df_kpi = queryset_to_df(qs_kpi)
-    kpi = kpi_calc(df_kpi)
-
-    # ---- Prior period KPIs (for delta/compare) ----
-    # Compute previous period range with same length as kpi range
-    kpi_prev = None
-    kpi_delta = {}
-    prev_start = None
-    prev_end = None
-    try:
-        if ksd and ked:
-            period_len = (ked - ksd).days + 1
-            # If the selected window is exactly a calendar month, compare with previous calendar month
-            is_full_month = False
-            try:
-                if ksd.day == 1 and ksd.month == ked.month and ksd.year == ked.year:
-                    last_day = calendar.monthrange(ksd.year, ksd.month)[1]
-                    if ked.day == last_day:
-                        is_full_month = True
-            except Exception:
-                is_full_month = False
-
-            if is_full_month:
-                # previous calendar month
-                prev_month = ksd.month - 1
-                prev_year = ksd.year
-                if prev_month == 0:
-                    prev_month = 12
-                    prev_year -= 1
-                prev_start = datetime.date(prev_year, prev_month, 1)
-                prev_end = datetime.date(prev_year, prev_month, calendar.monthrange(prev_year, prev_month)[1])
-            else:
-                # previous continuous window of same length immediately before ksd
-                prev_end = ksd - datetime.timedelta(days=1)
-                prev_start = prev_end - datetime.timedelta(days=period_len - 1)
-
-        # Use organization filter for prior period (same as current period)
-        if not org:
-            prev_q = Q(user=user)
-        else:
-            prev_q = Q(organization=org)
-        # Apply same category filter to prior period so KPIs compare apples-to-apples
-        if category:
-            prev_q &= Q(category=category)
-        prev_q &= Q(date__gte=prev_start)
-        prev_q &= Q(date__lte=prev_end)
-        qs_prev = Transaction.objects.filter(prev_q).order_by('date')
-        df_prev = queryset_to_df(qs_prev)
-        prev_kpi = kpi_calc(df_prev)
-        kpi_prev = prev_kpi
-        # compute deltas for inflow/outflow/net
-        def _delta(cur, prev):
-            abs_delta = round(cur - prev, 2)
-            pct = None
-            try:
-                if prev != 0:
-                    pct = round((abs_delta / abs(prev)) * 100.0, 1)
-            except Exception:
-                pct = None
-            return {"abs": abs_delta, "pct": pct}
-        kpi_delta = {
-            'inflow': _delta(kpi.get('inflow', 0.0), prev_kpi.get('inflow', 0.0)),
-            'outflow': _delta(kpi.get('outflow', 0.0), prev_kpi.get('outflow', 0.0)),
-            'net': _delta(kpi.get('net', 0.0), prev_kpi.get('net', 0.0)),
-        }
-    except Exception:
-        kpi_prev = None
-        kpi_delta = {}
 
-    # ---- Top Category Share ----
-    # Compute top 3 outflow categories and top 3 inflow categories for the KPI window
-    top_outflows = []
-    top_inflows = []
-    try:
-        # Use organization filter for categories
-        if not org:
-            cat_q = Q(user=user)
-        else:
-            cat_q = Q(organization=org)
-        if ksd:
-            cat_q &= Q(date__gte=ksd)
-        if ked:
-            cat_q &= Q(date__lte=ked)
-        if category:
-            cat_q &= Q(category=category)
-
-        # Outflows
-        out_totals_qs = Transaction.objects.filter(cat_q & Q(direction=Transaction.OUTFLOW))
-        total_out = float(out_totals_qs.aggregate(total=Sum('amount')).get('total') or 0.0)
-        out_totals = out_totals_qs.values('category').annotate(total=Sum('amount')).order_by('-total')[:3]
-
-        # Prepare previous-period totals for change calculation
-        prev_out_map = {}
-        prev_total_out = 0.0
-        if ksd is not None and ked is not None:
-            period_len = (ked - ksd).days + 1
-            prev_end = ksd - datetime.timedelta(days=1)
-            prev_start = prev_end - datetime.timedelta(days=period_len - 1)
-            # Use organization filter for previous period
-            if not org:
-                prev_q = Q(user=user, date__gte=prev_start, date__lte=prev_end)
-            else:
-                prev_q = Q(organization=org, date__gte=prev_start, date__lte=prev_end)
-            if category:
-                prev_q &= Q(category=category)
-            prev_out_qs = Transaction.objects.filter(prev_q & Q(direction=Transaction.OUTFLOW))
-            prev_total_out = float(prev_out_qs.aggregate(total=Sum('amount')).get('total') or 0.0)
-            for r in prev_out_qs.values('category').annotate(total=Sum('amount')):
-                prev_out_map[r.get('category') or 'Uncategorised'] = float(r.get('total') or 0.0)
-
-        for t in out_totals:
-            name = t.get('category') or 'Uncategorised'
-            value = float(t.get('total') or 0.0)
-            pct = round((value / total_out) * 100.0, 1) if total_out > 0 else None
-            # compute change in share compared to prev period (percentage points)
-            change = None
-            if name in prev_out_map and prev_total_out > 0 and pct is not None:
-                prev_pct = round((prev_out_map.get(name, 0.0) / prev_total_out) * 100.0, 1)
-                change = round(pct - prev_pct, 1)
-            elif prev_total_out == 0 and (prev_out_map.get(name, 0.0) == 0) and pct is not None:
-                # previous period had zero total -> change defined as None (no baseline)
-                change = None
-            top_outflows.append({'name': name, 'value': round(value,2), 'percent': pct, 'change': change, 'change_abs': (round(abs(change),1) if change is not None else None)})
-
-        # Inflows
-        in_totals_qs = Transaction.objects.filter(cat_q & Q(direction=Transaction.INFLOW))
-        total_in = float(in_totals_qs.aggregate(total=Sum('amount')).get('total') or 0.0)
-        in_totals = in_totals_qs.values('category').annotate(total=Sum('amount')).order_by('-total')[:3]
-
-        # previous-period inflow map
-        prev_in_map = {}
-        prev_total_in = 0.0
-        if ksd is not None and ked is not None:
-            period_len = (ked - ksd).days + 1
-            prev_end = ksd - datetime.timedelta(days=1)
-            prev_start = prev_end - datetime.timedelta(days=period_len - 1)
-            # Use organization filter for previous period inflows
-            if not org:
-                prev_q = Q(user=user, date__gte=prev_start, date__lte=prev_end)
-            else:
-                prev_q = Q(organization=org, date__gte=prev_start, date__lte=prev_end)
-            if category:
-                prev_q &= Q(category=category)
-            prev_in_qs = Transaction.objects.filter(prev_q & Q(direction=Transaction.INFLOW))
-            prev_total_in = float(prev_in_qs.aggregate(total=Sum('amount')).get('total') or 0.0)
-            for r in prev_in_qs.values('category').annotate(total=Sum('amount')):
-                prev_in_map[r.get('category') or 'Uncategorised'] = float(r.get('total') or 0.0)
-
-        for t in in_totals:
-            name = t.get('category') or 'Uncategorised'
-            value = float(t.get('total') or 0.0)
-            pct = round((value / total_in) * 100.0, 1) if total_in > 0 else None
-            change = None
-            if name in prev_in_map and prev_total_in > 0 and pct is not None:
-                prev_pct = round((prev_in_map.get(name, 0.0) / prev_total_in) * 100.0, 1)
-                change = round(pct - prev_pct, 1)
-            top_inflows.append({'name': name, 'value': round(value,2), 'percent': pct, 'change': change, 'change_abs': (round(abs(change),1) if change is not None else None)})
-    except Exception:
-        top_outflows = []
-        top_inflows = []
+    # Every figure below comes from one frame covering the union of the chart,
+    # KPI, prior-period and sparkline windows (see app_core.kpi_engine)
+    windows = dashboard_windows(
+        chart=(chart_start, ed),
+        kpi=(sd, ed) if explicit_range else (ksd, ked),
+        top=(ksd, ked),
+        today=today,
+    )
+    frame = frame_for(request, *windows["span"])
+    metrics = dashboard_metrics(frame, windows, category=category, freq=freq, series=(sd, ed))
 
-    # ---- Time series (NaN-safe) ----
-    # pass parsed start/end (sd, ed) so timeseries covers the full requested range
-    ts = timeseries(df, freq=freq, start=sd, end=ed)
+    kpi = metrics["kpi"]
+    df = metrics["df"]
+    ts = metrics["ts"]
 
-    ts_labels = [str(d) for d in ts.get("date", []).tolist()] if not ts.empty else []
-    def _clean_nums(seq):
-        out = []
-        for x in seq:
-            try:
-                v = float(x)
-                if math.isnan(v):
-                    v = 0.0
-            except Exception:
-                v = 0.0
-            out.append(round(v, 2))
-        return out
-
-    ts_in  = _clean_nums(ts.get("inflow", []).tolist()  if not ts.empty else [])
-    ts_out = _clean_nums(ts.get("outflow", []).tolist() if not ts.empty else [])
-    ts_net = _clean_nums(ts.get("net", []).tolist()     if not ts.empty else [])
-
-    # ---- Categories (NaN-safe) ----
-    # Compute signed sums per category so frontend can color inflow vs outflow
-    if df.empty:
-        cat_labels = []
-        cat_vals = []
-        cat_signs = []
-        bc = by_category(df).head(10)
-    else:
-        # group by category and sum signed amounts (signed_amount already has sign)
-        signed = df.groupby(df["category"].fillna("Uncategorised"))["signed_amount"].sum()
-        # Order by absolute value descending and take top 10
-        signed_abs = signed.abs().sort_values(ascending=False).head(10)
-        # labels in display order
-        cat_labels = [str(x) for x in signed_abs.index.tolist()]
-        # absolute amounts for display
-        cat_vals = _clean_nums(signed_abs.tolist())
-        # derive sign per displayed label from the original signed series (preserve sign)
-        cat_signs = []
-        for lab in signed_abs.index.tolist():
-             v = signed.get(lab, 0.0)
-             try:
-                 fv = float(v)
-             except Exception:
-                 fv = 0.0
-             if fv > 0:
-                 cat_signs.append(1)
-             elif fv < 0:
-                 cat_signs.append(-1)
-             else:
-                 cat_signs.append(0)
-        # build bc DataFrame expected by insights (category, amount)
-        try:
-            bc = signed_abs.reset_index(name='amount')
-            # ensure column name for category
-            bc.rename(columns={bc.columns[0]: 'category'}, inplace=True)
-        except Exception:
-            bc = by_category(df).head(10)
+    series = metrics["series"].display()
 
-    insights = generate_insights(df,ts,bc)
+    insights = generate_insights(df, ts, metrics["bc"])
+    if request.organization and not df.empty:
+        # Org-wide anomalies from incrementally maintained statistics
+        from app_core.insight_stats import anomaly_insights
+        insights += anomaly_insights(request.organization, today=today)
     payload = {
-        "ts_labels": ts_labels,
-        "ts_in": ts_in,
-        "ts_out": ts_out,
-        "ts_net": ts_net,
-        "cat_labels": cat_labels,
-        "cat_vals": cat_vals,
-        "cat_signs": cat_signs,
+        "ts_labels": series["labels"],
+        "ts_in": series["inflow"],
+        "ts_out": series["outflow"],
+        "ts_net": series["net"],
+        "cat_labels": metrics["cat_labels"],
+        "cat_vals": metrics["cat_vals"],
+        "cat_signs": metrics["cat_signs"],
     }
 
     # Ensure no NaN reaches the browser (JSON doesn’t allow it)
     chart_payload = json.dumps(payload, allow_nan=False)
 
     # flag when no transactions match filters
-    no_results = (df.empty if hasattr(df, 'empty') else (len(df) == 0))
+    no_results = df.empty
 
     # build base querystring (preserve all GET except freq and page) for frequency links
     params_copy = request.GET.copy()
@@ -652,11 +409,10 @@ def dashboard_view(request):
     context = {
         "title": "Dashboard",
         "kpi": kpi,
-        "kpi_prev": kpi_prev,
-        "kpi_delta": kpi_delta,
-        # "top_category": top_category,
-        "top_outflows": top_outflows,
-        "top_inflows": top_inflows,
+        "kpi_prev": metrics["kpi_prev"],
+        "kpi_delta": metrics["kpi_delta"],
+        "top_outflows": metrics["top_outflows"],
+        "top_inflows": metrics["top_inflows"],
         "freq": freq,
         "tx_count": kpi.get("tx_count", 0),
         "chart_payload": mark_safe(chart_payload),
@@ -670,7 +426,11 @@ def dashboard_view(request):
         'categories': categories,
         'no_results': no_results,
         'base_qs': base_qs,
-        'kpi_window_label': kpi_window_label,  # <-- add to context
+        'kpi_window_label': kpi_window_label,
+        # sparkline data (last 7 days) for KPI cards
+        'sparkline_outflow': json.dumps(metrics["sparkline"]["outflow"]),
+        'sparkline_inflow': json.dumps(metrics["sparkline"]["inflow"]),
+        'sparkline_net': json.dumps(metrics["sparkline"]["net"]),
     }
 
     # Get budget summary for widget (top 3 at-risk budgets)
@@ -681,74 +441,6 @@ def dashboard_view(request):
     except Exception:
         context['budget_summary'] = []
 
-    # Generate sparkline data (last 7 days) for KPI cards
-    try:
-        import logging
-        from collections import defaultdict
-        logger = logging.getLogger(__name__)
-
-        sparkline_days = 7
-        sparkline_end = today
-        sparkline_start = sparkline_end - datetime.timedelta(days=sparkline_days - 1)
-
-        logger.info(f"Generating sparklines from {sparkline_start} to {sparkline_end}")
-
-        # Use organization filter for sparklines
-        if not org:
-            sparkline_q = Q(user=user)
-        else:
-            sparkline_q = Q(organization=org)
-        sparkline_q &= Q(date__gte=sparkline_start, date__lte=sparkline_end)
-
-        # Apply same category filter if present
-        if category:
-            sparkline_q &= Q(category=category)
-
-        sparkline_qs = Transaction.objects.filter(sparkline_q).order_by('date')
-        logger.info(f"Found {sparkline_qs.count()} transactions for sparklines")
-
-        # Use dictionaries to aggregate by date (simpler than pandas)
-        daily_outflow = defaultdict(float)
-        daily_inflow = defaultdict(float)
-        daily_net = defaultdict(float)
-
-        for tx in sparkline_qs:
-            date_key = tx.date
-            if tx.direction == Transaction.OUTFLOW:
-                daily_outflow[date_key] += float(tx.amount or 0)
-                daily_net[date_key] -= float(tx.amount or 0)
-            else:  # INFLOW
-                daily_inflow[date_key] += float(tx.amount or 0)
-                daily_net[date_key] += float(tx.amount or 0)
-
-        # Generate arrays for all 7 days (fill missing days with 0)
-        sparkline_outflow = []
-        sparkline_inflow = []
-        sparkline_net = []
-
-        current_date = sparkline_start
-        for i in range(sparkline_days):
-            sparkline_outflow.append(round(daily_outflow.get(current_date, 0.0), 2))
-            sparkline_inflow.append(round(daily_inflow.get(current_date, 0.0), 2))
-            sparkline_net.append(round(daily_net.get(current_date, 0.0), 2))
-            current_date += datetime.timedelta(days=1)
-
-        logger.info(f"Sparkline data generated: outflow={sparkline_outflow}, inflow={sparkline_inflow}, net={sparkline_net}")
-
-        context['sparkline_outflow'] = json.dumps(sparkline_outflow)
-        context['sparkline_inflow'] = json.dumps(sparkline_inflow)
-        context['sparkline_net'] = json.dumps(sparkline_net)
-    except Exception as e:
-        # Log the error and fallback to empty arrays
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error generating sparklines: {str(e)}", exc_info=True)
-
-        # Still provide empty arrays so the frontend doesn't break
-        context['sparkline_outflow'] = '[]'
-        context['sparkline_inflow'] = '[]'
-        context['sparkline_net'] = '[]'
-
     return render(request, "app_web/dashboard.html", context)
 
 
@@ -924,11 +616,70 @@ def settings_view(request):
         return redirect("app_web:settings")
     return render(request, "app_web/settings.html", {"title": "Settings"})
 
+def _valid_label_filter(value):
+    """True for no label filter, 'none' or a label id."""
+    return not value or value.lower() == 'none' or value.isdigit()
+
+
+def _filter_transactions(request, params, ranked=True):
+    """Apply the transactions list filters (q, label, account, direction, start_date,
+    end_date, sort) from ``params`` to the requester's transactions.
+
+    Shared by the list view, export and bulk operations so they always agree on
+    which rows "the current filter" means. Returns (queryset, cleaned filters).
+    """
+    qs = Transaction.objects.filter(organization=request.organization).order_by('-date') if request.organization else Transaction.objects.filter(user=request.user).order_by('-date')
+
+    # indexed full-text search (ranked, prefix matching) plus label/account filters
+    q = params.get('q', '').strip()
+    label_filter = params.get('label', '').strip()
+    if not _valid_label_filter(label_filter):
+        label_filter = ''
+    account_filter = params.get('account', '').strip()
+    if q or label_filter or account_filter:
+        from app_core.search import search_transactions
+        qs = search_transactions(qs, q, label=label_filter, account=account_filter, ranked=ranked)
+
+    # direction filter
+    direction = params.get('direction', '').strip()
+    if direction in {Transaction.INFLOW, Transaction.OUTFLOW}:
+        qs = qs.filter(direction=direction)
+
+    # date range filters (optional)
+    start_date = params.get('start_date', '').strip()
+    end_date = params.get('end_date', '').strip()
+    try:
+        if start_date:
+            qs = qs.filter(date__gte=datetime.date.fromisoformat(start_date))
+    except Exception:
+        pass
+    try:
+        if end_date:
+            qs = qs.filter(date__lte=datetime.date.fromisoformat(end_date))
+    except Exception:
+        pass
+
+    sort = params.get('sort', '')
+    if sort:
+        # allow 'date' or 'amount' with optional '-' prefix
+        if sort.lstrip('-') in {'date', 'amount'}:
+            qs = qs.order_by(sort)
+
+    filters = {
+        'q': q, 'label': label_filter, 'account': account_filter, 'direction': direction,
+        'start_date': start_date, 'end_date': end_date, 'sort': sort,
+    }
+    return qs, filters
+
+
 @login_required
+@query_budget(queries=15)
 def transactions_view(request):
     """List transactions with search (description/category), sort, and pagination.
     Query params:
-      q=text search
+      q=text search (description/category/account, prefix match, best matches first)
+      label= label id, or 'none' for unlabelled (optional)
+      account= exact account name (optional)
       sort= date or amount (prefix - for desc)
       page=page number
       direction= inflow|outflow (optional)
@@ -1027,38 +778,14 @@ def transactions_view(request):
                     return JsonResponse({'ok': False, 'errors': [f'Failed to save transaction: {e}']}, status=500)
                 messages.error(request, 'Failed to save transaction: %s' % e)
 
-    qs = Transaction.objects.filter(organization=request.organization).order_by('-date') if request.organization else Transaction.objects.filter(user=request.user).order_by('-date')
-
-    q = request.GET.get('q', '').strip()
-    if q:
-        qs = qs.filter(Q(description__icontains=q) | Q(category__icontains=q))
-
-    # direction filter
-    direction = request.GET.get('direction', '').strip()
-    if direction in {Transaction.INFLOW, Transaction.OUTFLOW}:
-        qs = qs.filter(direction=direction)
-
-    # date range filters (optional)
-    start_date = request.GET.get('start_date', '').strip()
-    end_date = request.GET.get('end_date', '').strip()
-    try:
-        if start_date:
-            sd = datetime.date.fromisoformat(start_date)
-            qs = qs.filter(date__gte=sd)
-    except Exception:
-        sd = None
-    try:
-        if end_date:
-            ed = datetime.date.fromisoformat(end_date)
-            qs = qs.filter(date__lte=ed)
-    except Exception:
-        ed = None
-
-    sort = request.GET.get('sort', '')
-    if sort:
-        # allow 'date' or 'amount' with optional '-' prefix
-        if sort.lstrip('-') in {'date', 'amount'}:
-            qs = qs.order_by(sort)
+    qs, filters = _filter_transactions(request, request.GET)
+    q = filters['q']
+    label_filter = filters['label']
+    account_filter = filters['account']
+    direction = filters['direction']
+    start_date = filters['start_date']
+    end_date = filters['end_date']
+    sort = filters['sort']
 
     # pagination
     paginator = Paginator(qs, 20)
@@ -1094,6 +821,8 @@ def transactions_view(request):
         'title': 'Transactions',
         'page': page,
         'q': q,
+        'label_filter': label_filter,
+        'account_filter': account_filter,
         'sort': sort,
         'direction': direction,
         'params': params.urlencode(),
@@ -1106,6 +835,38 @@ def transactions_view(request):
     return render(request, 'app_web/transactions.html', context)
 
 
+@login_required
+def transactions_export_view(request):
+    """Stream the filtered transactions list as CSV, XLSX or Parquet.
+
+    Accepts the same query params as transactions_view plus format=csv|xlsx|parquet.
+    Rows are read with a server-side cursor so memory stays flat for large exports,
+    and only once the response is streaming (see app_core.export).
+    """
+    from django.http import StreamingHttpResponse
+    from app_core.export import EXPORT_FORMATS, ExportUnavailable, export_stream
+
+    fmt = request.GET.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'ok': False, 'error': f'Unsupported format: {fmt}'}, status=400)
+
+    # ranking is pointless for an export; keep the plain date ordering
+    qs, _ = _filter_transactions(request, request.GET, ranked=False)
+
+    try:
+        stream = export_stream(qs, fmt)
+    except ExportUnavailable as e:
+        return JsonResponse({'ok': False, 'error': str(e)}, status=501)
+
+    content_type, ext = EXPORT_FORMATS[fmt]
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    filename = f"transactions_{datetime.date.today().isoformat()}.{ext}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # stop proxies (e.g. nginx) from buffering the whole body before sending
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def transaction_edit_view(request, tx_id):
     tx = get_object_or_404(Transaction, id=tx_id, user=request.user)
@@ -1174,12 +935,14 @@ def transaction_bulk_edit_view(request):
 
     ids_raw = request.POST.get('ids', '')
     next_params = request.POST.get('next', '')
-    if not ids_raw:
+    # select_all=1 applies the edit to every row matching the list filters in `next`
+    select_all = request.POST.get('select_all') == '1'
+    if not ids_raw and not select_all:
         messages.error(request, 'No transactions selected for bulk edit')
         return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
 
     ids = [int(x) for x in ids_raw.split(',') if x.strip().isdigit()]
-    if not ids:
+    if not ids and not select_all:
         messages.error(request, 'No valid transactions selected')
         return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
 
@@ -1223,11 +986,24 @@ def transaction_bulk_edit_view(request):
         messages.error(request, 'No fields provided to update')
         return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
 
+    if select_all:
+        if request.organization and not has_permission(request.user, request.organization, 'can_edit_transactions'):
+            return _bulk_denied(request, next_params)
+        invalid = _bulk_invalid_filter(request, next_params)
+        if invalid:
+            return invalid
+        from app_core.bulk import bulk_update_transactions
+        qs, _ = _filter_transactions(request, QueryDict(next_params), ranked=False)
+        progress = bulk_update_transactions(qs, updates, organization=request.organization, user=request.user, request=request)
+        return _bulk_response(request, progress, next_params, 'Updated {processed} transaction(s)')
+
     # Apply updates only to transactions owned by the user
     qs = Transaction.objects.filter(id__in=ids, user=request.user)
     # Ensure updated_at is updated for bulk operations
     updates['updated_at'] = timezone.now()
+    changed_days = set(qs.values_list('date', flat=True)) | ({updates['date']} if 'date' in updates else set())
     count = qs.update(**updates)
+    bump_data_version(request.organization, changed_days)
     # For AJAX requests, return JSON with list of affected ids and applied updates so the frontend can update rows
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         # Make applied values JSON-serializable (dates/decimals -> strings)
@@ -1248,6 +1024,91 @@ def transaction_bulk_edit_view(request):
     messages.success(request, f'Updated {count} transaction(s)')
     return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
 
+def _bulk_denied(request, next_params):
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'ok': False, 'errors': {'__all__': ['Permission denied']}}, status=403)
+    messages.error(request, 'You do not have permission to perform this action.')
+    return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
+
+
+def _bulk_invalid_filter(request, next_params):
+    """Refuse a select-all operation whose filter would be silently widened."""
+    if _valid_label_filter(QueryDict(next_params).get('label', '').strip()):
+        return None
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'ok': False, 'errors': {'label': ['Invalid label filter']}}, status=400)
+    messages.error(request, 'Invalid label filter')
+    return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
+
+
+def _bulk_response(request, progress, next_params, success_message):
+    """Drive a chunked bulk operation (see app_core.bulk).
+
+    With stream=1 the progress of each chunk is streamed as newline-delimited JSON
+    so the page can show a progress bar; otherwise the operation runs to completion
+    and returns JSON (AJAX) or redirects back to the list.
+    """
+    if request.POST.get('stream') == '1':
+        from django.http import StreamingHttpResponse
+
+        def _lines():
+            try:
+                for p in progress:
+                    yield json.dumps({'ok': True, **p}) + '\n'
+            except Exception as e:
+                logger.exception('Bulk transaction operation failed')
+                yield json.dumps({'ok': False, 'done': True, 'error': str(e)}) + '\n'
+
+        response = StreamingHttpResponse(_lines(), content_type='application/x-ndjson')
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    last = {'processed': 0, 'total': 0}
+    try:
+        for last in progress:
+            pass
+    except Exception as e:
+        logger.exception('Bulk transaction operation failed')
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'ok': False, 'errors': {'__all__': [str(e)]}, 'processed': last['processed']}, status=500)
+        messages.error(request, f'Bulk operation stopped after {last["processed"]} transaction(s): {e}')
+        return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'ok': True, 'processed': last['processed'], 'total': last['total']})
+    messages.success(request, success_message.format(**last))
+    return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
+
+
+@login_required
+@require_http_methods(['POST'])
+def transaction_bulk_delete_view(request):
+    """Delete selected transactions ('ids', comma-separated) or, with select_all=1, every
+    transaction matching the list filters carried in 'next'. Runs in id-range chunks."""
+    from app_core.bulk import bulk_delete_transactions
+
+    next_params = request.POST.get('next', '')
+    if request.POST.get('select_all') == '1':
+        if request.organization and not has_permission(request.user, request.organization, 'can_delete_transactions'):
+            return _bulk_denied(request, next_params)
+        invalid = _bulk_invalid_filter(request, next_params)
+        if invalid:
+            return invalid
+        qs, _ = _filter_transactions(request, QueryDict(next_params), ranked=False)
+    else:
+        ids = [int(x) for x in request.POST.get('ids', '').split(',') if x.strip().isdigit()]
+        if not ids:
+            if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                return JsonResponse({'ok': False, 'errors': {'__all__': ['No transactions selected']}}, status=400)
+            messages.error(request, 'No transactions selected for deletion')
+            return redirect('/transactions/' + (f'?{next_params}' if next_params else ''))
+        # same ownership rule as the single-row delete view
+        qs = Transaction.objects.filter(id__in=ids, user=request.user)
+
+    progress = bulk_delete_transactions(qs, organization=request.organization, user=request.user, request=request)
+    return _bulk_response(request, progress, next_params, 'Deleted {processed} transaction(s)')
+
+
 @login_required
 @require_http_methods(['GET', 'POST'])
 def transaction_columns_view(request):
@@ -1511,6 +1372,7 @@ def budgets_view(request):
 
 
 @login_required
+@replica_reads
 def budget_widget_data(request):
     """AJAX endpoint to get budget widget data for dashboard."""
     from app_core.budgets import get_budget_summary
@@ -1934,15 +1796,75 @@ def project_detail_data(request, project_id):
     })
 
 
+@login_required
+def project_time_data(request, project_id):
+    """Weekly burn-up/burn-down series for a project, or one milestone with ?milestone=<id>."""
+    from app_core.models import Project, ProjectMilestone
+    from app_core.time_rollups import burn_series
+
+    project = get_object_or_404(Project, id=project_id, organization=request.organization)
+    milestone = None
+    if request.GET.get('milestone'):
+        milestone = get_object_or_404(ProjectMilestone, id=request.GET['milestone'], project=project)
+
+    return JsonResponse({
+        'ok': True,
+        'project_id': project.id,
+        'milestone_id': milestone.id if milestone else None,
+        **burn_series(project, milestone),
+    })
+
+
+@login_required
+@replica_reads
+def time_utilisation_data(request):
+    """Hours logged per member per week against weekly capacity (?weeks=, default 12)."""
+    from app_core.time_rollups import utilisation
+
+    try:
+        weeks = min(max(int(request.GET.get('weeks', 12)), 1), 104)
+    except ValueError:
+        return JsonResponse({'ok': False, 'error': 'weeks must be a number'}, status=400)
+
+    return JsonResponse({'ok': True, **utilisation(request.organization, weeks=weeks)})
+
+
 # ==================== INVOICING & BILLING VIEWS ====================
 
+INVOICES_PER_PAGE = 50
+
+
+def _serialize_invoice(inv):
+    """Invoice row for the list page / JSON API (client and project pre-selected)."""
+    from app_core.models import Invoice
+    status = Invoice.STATUS_OVERDUE if inv.is_overdue else inv.status
+    return {
+        'id': inv.id,
+        'invoice_number': inv.invoice_number,
+        'client': {
+            'id': inv.client.id,
+            'name': inv.client.name,
+            'company': inv.client.company,
+        },
+        'invoice_date': inv.invoice_date.isoformat(),
+        'due_date': inv.due_date.isoformat(),
+        'status': status,
+        'status_display': dict(Invoice.STATUS_CHOICES).get(status, status),
+        'total': float(inv.total),
+        'paid_amount': float(inv.paid_amount),
+        'balance_due': float(inv.balance_due),
+        'currency': inv.currency,
+        'is_overdue': inv.is_overdue,
+        'project': {'id': inv.project.id, 'name': inv.project.name} if inv.project else None,
+    }
+
+
 @login_required
+@query_budget(queries=12)
 def invoices_view(request):
     """Main invoices list page"""
     from app_core.models import Invoice, Client
-    from app_core.invoicing import get_invoice_statistics
-    from datetime import date
-    from decimal import Decimal
+    from app_core.invoicing import get_invoice_statistics, overdue_q
 
     # Get filter parameters
     status_filter = request.GET.get('status', '')
@@ -1955,7 +1877,9 @@ def invoices_view(request):
     invoices = Invoice.objects.filter(organization=request.organization).select_related('client', 'project')
 
     # Apply filters
-    if status_filter:
+    if status_filter == Invoice.STATUS_OVERDUE:
+        invoices = invoices.filter(overdue_q())
+    elif status_filter:
         invoices = invoices.filter(status=status_filter)
 
     if client_filter:
@@ -1976,45 +1900,34 @@ def invoices_view(request):
             Q(notes__icontains=search_query)
         )
 
-    # Update overdue invoices
-    today = date.today()
-    overdue_invoices = invoices.filter(
-        status__in=[Invoice.STATUS_SENT, Invoice.STATUS_PARTIALLY_PAID],
-        due_date__lt=today
-    )
-    overdue_invoices.update(status=Invoice.STATUS_OVERDUE)
-
-    # Get stats
+    # Overdue status is flagged by the sweep_overdue_invoices command, not here;
+    # past-due invoices it has not reached yet are shown as overdue anyway
     stats = get_invoice_statistics(request.organization)
 
     # Get all clients for filter dropdown
     clients = Client.objects.filter(organization=request.organization, active=True).order_by('name')
 
-    # Serialize invoices
-    invoices_list = []
-    for inv in invoices:
-        invoices_list.append({
-            'id': inv.id,
-            'invoice_number': inv.invoice_number,
-            'client': {
-                'id': inv.client.id,
-                'name': inv.client.name,
-                'company': inv.client.company,
-            },
-            'invoice_date': inv.invoice_date.isoformat(),
-            'due_date': inv.due_date.isoformat(),
-            'status': inv.status,
-            'status_display': inv.get_status_display(),
-            'total': float(inv.total),
-            'paid_amount': float(inv.paid_amount),
-            'balance_due': float(inv.balance_due),
-            'currency': inv.currency,
-            'is_overdue': inv.is_overdue,
-            'project': {'id': inv.project.id, 'name': inv.project.name} if inv.project else None,
+    paginator = Paginator(invoices, INVOICES_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    invoices_list = [_serialize_invoice(inv) for inv in page.object_list]
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'ok': True,
+            'invoices': invoices_list,
+            'stats': {k: float(v) if isinstance(v, Decimal) else v for k, v in stats.items()},
+            'page': page.number,
+            'num_pages': paginator.num_pages,
+            'count': paginator.count,
         })
 
+    params_copy = request.GET.copy()
+    params_copy.pop('page', None)
+
     context = {
         'invoices': invoices_list,
+        'page': page,
+        'params': params_copy.urlencode(),
         'clients': list(clients.values('id', 'name', 'company')),
         'stats': stats,
         'status_filter': status_filter,
@@ -2027,17 +1940,73 @@ def invoices_view(request):
     return render(request, "app_web/invoices.html", context)
 
 
+@login_required
+@replica_reads
+def ar_aging_view(request):
+    """Accounts-receivable aging by client (?format=csv or json for exports)"""
+    from app_core.aging import BUCKET_KEYS, aging_csv, aging_display, ar_aging
+
+    aging = ar_aging(request.organization)
+    fmt = request.GET.get('format', '')
+
+    if fmt == 'json':
+        return JsonResponse({'ok': True, **aging_display(aging)})
+    if fmt == 'csv':
+        response = HttpResponse(aging_csv(aging), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="ar_aging_{aging["as_of"].isoformat()}.csv"'
+        return response
+
+    org = aging['organization']
+    context = {
+        'aging': aging,
+        'totals': [{'label': label, 'amount': org[key]} for key, label in aging['buckets']],
+        'rows': [
+            {
+                'client_id': c['client_id'],
+                'name': c['name'],
+                'company': c['company'],
+                'cells': [c[key] for key in BUCKET_KEYS],
+                'total': c['total'],
+                'invoice_count': c['invoice_count'],
+            }
+            for c in aging['clients']
+        ],
+    }
+    return render(request, "app_web/ar_aging.html", context)
+
+
+@login_required
+@query_budget(queries=12)
+@replica_reads
+def cash_forecast_data(request):
+    """Projected daily balance from run rate, recurring templates and open invoices (?days=90|180|365)."""
+    from app_core.forecast import HORIZONS, cash_forecast
+
+    try:
+        days = int(request.GET.get('days', HORIZONS[0]))
+    except ValueError:
+        days = None
+    if days not in HORIZONS:
+        return JsonResponse(
+            {'ok': False, 'error': f"days must be one of {', '.join(map(str, HORIZONS))}"}, status=400,
+        )
+
+    return JsonResponse({'ok': True, **cash_forecast(request.organization, days=days).display()})
+
+
 @login_required
 def clients_view(request):
     """Clients management page"""
     from app_core.models import Client
-    from app_core.invoicing import get_client_statistics
+    from app_core.invoice_stats import empty_stats, invoice_stats
 
     clients = Client.objects.filter(organization=request.organization).order_by('name')
+    # One grouped query (cached) for every client's figures
+    client_stats = invoice_stats(request.organization)['clients']
 
     clients_list = []
     for client in clients:
-        stats = get_client_statistics(client)
+        stats = client_stats.get(client.id) or empty_stats()
         clients_list.append({
             'id': client.id,
             'name': client.name,
@@ -2057,6 +2026,36 @@ def clients_view(request):
     return render(request, "app_web/clients.html", {'clients': clients_list})
 
 
+@login_required
+def client_detail_api(request, client_id):
+    """Client details, invoice statistics and most recent invoices"""
+    from app_core.models import Client
+    from app_core.invoicing import get_client_statistics
+
+    try:
+        client = Client.objects.get(id=client_id, organization=request.organization)
+    except Client.DoesNotExist:
+        return JsonResponse({'ok': False, 'error': 'Client not found'}, status=404)
+
+    stats = get_client_statistics(client)
+    recent = client.invoices.select_related('client', 'project').order_by('-invoice_date', '-id')[:10]
+
+    return JsonResponse({
+        'ok': True,
+        'client': {
+            'id': client.id,
+            'name': client.name,
+            'email': client.email,
+            'company': client.company,
+            'currency': client.currency,
+            'payment_terms': client.payment_terms,
+            'active': client.active,
+        },
+        'stats': {k: float(v) if isinstance(v, Decimal) else v for k, v in stats.items()},
+        'invoices': [_serialize_invoice(inv) for inv in recent],
+    })
+
+
 @login_required
 def clients_list_api(request):
     """API endpoint to get list of clients for dropdowns"""
@@ -2298,6 +2297,63 @@ def invoice_reminder_view(request, invoice_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@login_required
+@require_http_methods(["POST"])
+def invoice_bulk_send_view(request):
+    """
+    Email many invoices or payment reminders over one mail connection.
+
+    Body: {"invoice_ids": [...]} or {"overdue": true} (every overdue invoice),
+    plus optional "kind" ('invoice' or 'reminder') and "custom_message".
+    At most REQUEST_MAX_INVOICES per request; larger batches belong to
+    `manage.py send_invoice_emails`.
+    """
+    from app_core.models import Invoice, InvoiceDelivery
+    from app_core.invoice_dispatch import REQUEST_MAX_INVOICES, dispatch_invoices, delivery_summary, overdue_invoices
+    import json
+
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        return JsonResponse({'ok': False, 'error': 'Invalid JSON'}, status=400)
+
+    kind = data.get('kind', InvoiceDelivery.KIND_INVOICE)
+    if kind not in dict(InvoiceDelivery.KIND_CHOICES):
+        return JsonResponse({'ok': False, 'error': 'Unknown kind'}, status=400)
+
+    if data.get('overdue'):
+        invoices = overdue_invoices(request.organization)
+    else:
+        ids = data.get('invoice_ids') or []
+        if not ids:
+            return JsonResponse({'ok': False, 'error': 'No invoices selected'}, status=400)
+        if not isinstance(ids, list) or not all(str(i).isdecimal() for i in ids):
+            return JsonResponse({'ok': False, 'error': 'invoice_ids must be a list of invoice ids'}, status=400)
+        invoices = Invoice.objects.filter(organization=request.organization, id__in=[int(i) for i in ids])
+
+    count = invoices.count()
+    if count > REQUEST_MAX_INVOICES:
+        return JsonResponse({
+            'ok': False,
+            'error': f'{count} invoices selected; send at most {REQUEST_MAX_INVOICES} at a time',
+        }, status=400)
+
+    batch_id, deliveries = dispatch_invoices(invoices, kind=kind, custom_message=data.get('custom_message'))
+    return JsonResponse({'ok': True, 'batch_id': batch_id, **delivery_summary(deliveries)})
+
+
+@login_required
+def invoice_dispatch_status_view(request, batch_id):
+    """Per-invoice delivery status for a dispatch batch"""
+    from app_core.models import InvoiceDelivery
+    from app_core.invoice_dispatch import delivery_summary
+
+    deliveries = list(InvoiceDelivery.objects.filter(organization=request.organization, batch_id=batch_id).order_by('id'))
+    if not deliveries:
+        return JsonResponse({'ok': False, 'error': 'Batch not found'}, status=404)
+    return JsonResponse({'ok': True, 'batch_id': batch_id, **delivery_summary(deliveries)})
+
+
 @login_required
 @require_http_methods(["POST"])
 def invoice_payment_view(request, invoice_id):
@@ -2522,205 +2578,16 @@ def invoice_pdf_view(request, invoice_id):
 
 @login_required
 def invoice_pdf_download(request, invoice_id):
-    """Generate and download invoice as PDF using ReportLab"""
+    """Generate and download invoice as PDF, streamed from a spool file"""
     from app_core.models import Invoice
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib import colors
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-    from io import BytesIO
-    from datetime import date
+    from app_core.invoice_pdf import invoice_pdf_data, invoice_pdf_response
 
+    invoice = get_object_or_404(
+        Invoice.objects.select_related('client', 'user'), id=invoice_id, organization=request.organization,
+    )
     try:
-        invoice = get_object_or_404(Invoice, id=invoice_id, organization=request.organization)
-
-        # Create PDF buffer
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
-
-        # Container for PDF elements
-        elements = []
-
-        # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2563eb'),
-            spaceAfter=6,
-            alignment=TA_LEFT
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#374151'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#111827')
-        )
-
-        small_style = ParagraphStyle(
-            'CustomSmall',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.HexColor('#6b7280')
-        )
-
-        # Title
-        elements.append(Paragraph("INVOICE", title_style))
-        elements.append(Paragraph(f"#{invoice.invoice_number}", heading_style))
-        elements.append(Spacer(1, 0.2*inch))
-
-        # Status badge text
-        status_text = invoice.get_status_display()
-        status_para = Paragraph(f"<b>Status:</b> {status_text}", normal_style)
-        elements.append(status_para)
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Bill To and Invoice Details side by side
-        info_data = [
-            [
-                Paragraph("<b>BILL TO</b>", heading_style),
-                Paragraph("<b>INVOICE DETAILS</b>", heading_style)
-            ],
-            [
-                Paragraph(f"<b>{invoice.client.name}</b><br/>"
-                         f"{invoice.client.company if invoice.client.company else ''}<br/>"
-                         f"{invoice.client.email}<br/>"
-                         f"{invoice.client.phone if invoice.client.phone else ''}", normal_style),
-                Paragraph(f"<b>Invoice Date:</b> {invoice.invoice_date.strftime('%B %d, %Y')}<br/>"
-                         f"<b>Due Date:</b> {invoice.due_date.strftime('%B %d, %Y')}<br/>"
-                         f"<b>Payment Terms:</b> {invoice.client.payment_terms}", normal_style)
-            ]
-        ]
-
-        info_table = Table(info_data, colWidths=[3*inch, 3*inch])
-        info_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-        ]))
-        elements.append(info_table)
-        elements.append(Spacer(1, 0.4*inch))
-
-        # Line Items Table
-        items_data = [['Description', 'Qty', 'Unit Price', 'Amount']]
-
-        for item in invoice.items.all():
-            items_data.append([
-                item.description,
-                str(item.quantity),
-                f"{invoice.currency} {item.unit_price:.2f}",
-                f"{invoice.currency} {item.amount:.2f}"
-            ])
-
-        items_table = Table(items_data, colWidths=[3*inch, 0.75*inch, 1.25*inch, 1.25*inch])
-        items_table.setStyle(TableStyle([
-            # Header row
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#374151')),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('TOPPADDING', (0, 0), (-1, 0), 12),
-
-            # Data rows
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-
-            # Alignment
-            ('ALIGN', (1, 0), (1, -1), 'CENTER'),  # Qty center
-            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),  # Price and Amount right
-
-            # Grid
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
-            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#e5e7eb')),
-        ]))
-        elements.append(items_table)
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Totals
-        totals_data = [
-            ['Subtotal:', f"{invoice.currency} {invoice.subtotal:.2f}"],
-        ]
-
-        if invoice.tax_rate > 0:
-            totals_data.append(['Tax ({:.1f}%):'.format(invoice.tax_rate), f"{invoice.currency} {invoice.tax_amount:.2f}"])
-
-        if invoice.discount > 0:
-            totals_data.append(['Discount:', f"-{invoice.currency} {invoice.discount:.2f}"])
-
-        totals_data.append(['<b>Total:</b>', f"<b>{invoice.currency} {invoice.total:.2f}</b>"])
-
-        if invoice.paid_amount > 0:
-            totals_data.append(['Paid:', f"-{invoice.currency} {invoice.paid_amount:.2f}"])
-            totals_data.append(['<b>Balance Due:</b>', f"<b>{invoice.currency} {invoice.balance_due:.2f}</b>"])
-
-        # Convert to Paragraphs for bold support
-        totals_data_formatted = []
-        for label, value in totals_data:
-            totals_data_formatted.append([
-                Paragraph(label, normal_style if '<b>' not in label else heading_style),
-                Paragraph(value, normal_style if '<b>' not in value else heading_style)
-            ])
-
-        totals_table = Table(totals_data_formatted, colWidths=[4.5*inch, 1.75*inch])
-        totals_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('LINEABOVE', (0, -2), (-1, -2), 1, colors.HexColor('#d1d5db')),
-        ]))
-        elements.append(totals_table)
-
-        # Notes
-        if invoice.notes:
-            elements.append(Spacer(1, 0.3*inch))
-            elements.append(Paragraph("<b>Notes:</b>", heading_style))
-            elements.append(Paragraph(invoice.notes, normal_style))
-
-        # Terms
-        if invoice.terms:
-            elements.append(Spacer(1, 0.2*inch))
-            elements.append(Paragraph("<b>Payment Terms & Conditions:</b>", heading_style))
-            elements.append(Paragraph(invoice.terms, normal_style))
-
-        # Footer
-        elements.append(Spacer(1, 0.5*inch))
-        footer_text = f"<i>Thank you for your business!<br/>For questions about this invoice, please contact {request.user.email}</i>"
-        elements.append(Paragraph(footer_text, small_style))
-
-        # Build PDF
-        doc.build(elements)
-
-        # Get PDF from buffer
-        pdf = buffer.getvalue()
-        buffer.close()
-
-        # Create response
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="Invoice_{invoice.invoice_number}.pdf"'
-
-        return response
-
-    except Invoice.DoesNotExist:
-        return HttpResponse('Invoice not found', status=404)
+        return invoice_pdf_response(invoice_pdf_data(invoice, request.user.email),
+                                    f"Invoice_{invoice.invoice_number}.pdf")
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -2941,6 +2808,7 @@ def template_detail_view(request, template_id):
 # ==================== REPORTS VIEWS ====================
 
 @login_required
+@replica_reads
 def reports_view(request):
     """Reports overview page with key insights for the current week"""
     from django.shortcuts import render
@@ -2958,28 +2826,28 @@ def reports_view(request):
     prev_week_start = start_of_week - timedelta(days=7)
     prev_week_end = end_of_week - timedelta(days=7)
 
-    # Current week transactions
-    current_txns = Transaction.objects.filter(
-        user=request.user,
+    # Current week transactions: the organization's, like every other report (the
+    # label sums below are then index-only), or the user's without an organization
+    txns = Transaction.objects.filter(organization=request.organization) if request.organization else Transaction.objects.filter(user=request.user)
+    current_txns = txns.filter(
         date__gte=start_of_week,
         date__lte=end_of_week
     )
 
-    # Previous week transactions
-    prev_txns = Transaction.objects.filter(
-        user=request.user,
-        date__gte=prev_week_start,
-        date__lte=prev_week_end
-    )
+    # Both weeks bucketed in one pass: [previous week, current week]
+    from app_core.buckets import bucket_series
+    from app_core.frames import frame_for
+    from app_core.money import from_pence
+    weeks = bucket_series(frame_for(request, prev_week_start, end_of_week), prev_week_start, end_of_week, 'W')
 
     # Calculate totals
-    total_income = current_txns.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    total_expenses = current_txns.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    total_income = from_pence(weeks.inflow[1])
+    total_expenses = from_pence(weeks.outflow[1])
     net_profit = total_income - total_expenses
 
     # Previous week totals for comparison
-    prev_income = prev_txns.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    prev_expenses = prev_txns.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    prev_income = from_pence(weeks.inflow[0])
+    prev_expenses = from_pence(weeks.outflow[0])
     prev_net_profit = prev_income - prev_expenses
 
     # Calculate changes
@@ -3091,914 +2959,149 @@ def reports_view(request):
 
 
 
-@login_required
-def report_pnl_view(request):
-    """Profit & Loss (P&L) report - aggregates transactions by labels and direction"""
-    from django.shortcuts import render
-    from app_core.models import Transaction, Label
-    from django.db.models import Sum
-    from datetime import datetime, date, timedelta
-
-    # Parse date range filters
-    start = request.GET.get('start')
-    end = request.GET.get('end')
-
-    try:
-        start_date = datetime.fromisoformat(start).date() if start else None
-    except Exception:
-        start_date = None
-
-    try:
-        end_date = datetime.fromisoformat(end).date() if end else None
-    except Exception:
-        end_date = None
-
-    today = date.today()
-    # Normalize single-side inputs: if only one provided, treat as single-day range
-    if start_date and not end_date:
-        end_date = start_date
-    if end_date and not start_date:
-        start_date = end_date
-
-    # Default range: last 12 months (month-aligned) if nothing provided
-    if not start_date and not end_date:
-        # last 12 months: start = first day of month 11 months ago; end = today
-        m = today.month
-        y = today.year
-        m_back = m - 11
-        y_back = y
-        if m_back <= 0:
-            m_back += 12
-            y_back -= 1
-        start_date = date(y_back, m_back, 1)
-        end_date = today
-
-    # Compute previous same-length window (month/year-aware)
-    import calendar as _cal
-    try:
-        period_len = (end_date - start_date).days + 1
-    except Exception:
-        period_len = 1
-    last_day_of_month = _cal.monthrange(start_date.year, start_date.month)[1]
-    is_full_year = (start_date.month == 1 and start_date.day == 1 and end_date.month == 12 and end_date.day == 31 and start_date.year == end_date.year)
-    is_full_month = (start_date.day == 1 and end_date.day == last_day_of_month and start_date.month == end_date.month and start_date.year == end_date.year)
-
-    if is_full_year:
-        prev_start = date(start_date.year - 1, 1, 1)
-        prev_end = date(start_date.year - 1, 12, 31)
-    elif is_full_month:
-        prev_month = start_date.month - 1
-        prev_year = start_date.year
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        prev_start = date(prev_year, prev_month, 1)
-        prev_end = date(prev_year, prev_month, _cal.monthrange(prev_year, prev_month)[1])
-    else:
-        prev_end = start_date - timedelta(days=1)
-        prev_start = prev_end - timedelta(days=period_len - 1)
-
-    # Human-friendly labels for the two columns
-    def _friendly(d):
-        try:
-            return d.strftime('%b %d, %Y')
-        except Exception:
-            return ''
-
-    # Compact label helper: if range is whole year -> '2025', if whole month -> 'Dec 25', else full range
-    def _compact_label(start_d, end_d):
-        try:
-            # whole single year
-            if start_d.month == 1 and start_d.day == 1 and end_d.month == 12 and end_d.day == 31 and start_d.year == end_d.year:
-                return f"{start_d.year}"
-            # whole single month
-            import calendar as _cal
-            last = _cal.monthrange(start_d.year, start_d.month)[1]
-            if start_d.day == 1 and end_d.day == last and start_d.month == end_d.month and start_d.year == end_d.year:
-                return start_d.strftime('%b %y')
-        except Exception:
-            pass
-        return f"{_friendly(start_d)} – {_friendly(end_d)}"
+def _build_report(request, key, frame=None):
+    """Run a report spec (see app_core.reports) over the request's date range."""
+    from app_core.frames import frame_for
+    from app_core.reports import REPORTS, build_report, report_range
 
-    curr_label = _compact_label(start_date, end_date)
-    prev_label = _compact_label(prev_start, prev_end)
+    spec = REPORTS[key]
+    start_date, end_date = report_range(spec, request.GET.get('start'), request.GET.get('end'))
+    return build_report(spec, frame if frame is not None else frame_for(request), start_date, end_date,
+                        organization=getattr(request, 'organization', None))
 
-    # Querysets for current and previous windows
-    qs_cur = Transaction.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-    qs_prev = Transaction.objects.filter(user=request.user, date__gte=prev_start, date__lte=prev_end)
 
-    # Totals (inflow/outflow) for each window
-    income_total = qs_cur.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    expense_total = qs_cur.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
+def _report_page(request, key):
+    report = _build_report(request, key)
+    return render(request, report.spec.template, report.context)
 
-    income_total_prev = qs_prev.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    expense_total_prev = qs_prev.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
 
-    # Build revenue and expense rows separately (use inflows for revenue, outflows for expenses)
-    labels = Label.objects.filter(user=request.user).order_by('name')
-    revenue_rows = []
-    expense_rows = []
-
-    def _pct_change(cur, prev):
-        try:
-            if prev == 0:
-                return None
-            return (float(cur) - float(prev)) / abs(float(prev)) * 100.0
-        except Exception:
-            return None
-
-    for lbl in labels:
-        cur_in = qs_cur.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_in = qs_prev.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_in or prev_in:
-            change_amt = (cur_in or 0) - (prev_in or 0)
-            change_pct = _pct_change(cur_in or 0, prev_in or 0)
-            revenue_rows.append({
-                'label': lbl.name,
-                'cur': cur_in,
-                'prev': prev_in,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-        cur_out = qs_cur.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_out = qs_prev.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_out or prev_out:
-            change_amt = (cur_out or 0) - (prev_out or 0)
-            change_pct = _pct_change(cur_out or 0, prev_out or 0)
-            expense_rows.append({
-                'label': lbl.name,
-                'cur': cur_out,
-                'prev': prev_out,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-    # Uncategorized as revenue/expense if present
-    unc_cur_in = qs_cur.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_in = qs_prev.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_in or unc_prev_in:
-        revenue_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_in, 'prev': unc_prev_in, 'change': (unc_cur_in or 0) - (unc_prev_in or 0), 'pct': _pct_change(unc_cur_in or 0, unc_prev_in or 0)
-        })
-    unc_cur_out = qs_cur.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_out = qs_prev.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_out or unc_prev_out:
-        expense_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_out, 'prev': unc_prev_out, 'change': (unc_cur_out or 0) - (unc_prev_out or 0), 'pct': _pct_change(unc_cur_out or 0, unc_prev_out or 0)
-        })
-
-    # Totals and net change
-    total_revenue_cur = sum(r['cur'] for r in revenue_rows)
-    total_revenue_prev = sum(r['prev'] for r in revenue_rows)
-    total_expense_cur = sum(e['cur'] for e in expense_rows)
-    total_expense_prev = sum(e['prev'] for e in expense_rows)
-
-    income_before_tax = (total_revenue_cur or 0) - (total_expense_cur or 0)
-    income_before_tax_prev = (total_revenue_prev or 0) - (total_expense_prev or 0)
-    net_change = (income_before_tax or 0) - (income_before_tax_prev or 0)
-
-    # For now, tax amount placeholder = 0 (we can wire tax rules later)
-    tax_amount = 0.0
-
-    # Net profit values (compute here so template doesn't do arithmetic)
-    net_profit = (income_before_tax or 0) - (tax_amount or 0)
-    net_profit_prev = (income_before_tax_prev or 0) - 0
-
-    # totals change and percent
-    total_revenue_change = (total_revenue_cur or 0) - (total_revenue_prev or 0)
-    total_revenue_pct = _pct_change(total_revenue_cur or 0, total_revenue_prev or 0)
-    total_expense_change = (total_expense_cur or 0) - (total_expense_prev or 0)
-    total_expense_pct = _pct_change(total_expense_cur or 0, total_expense_prev or 0)
-
-    context = {
-        'title': 'Profit & Loss (P&L)',
-        'active_report': 'pnl',
-        'revenue_rows': revenue_rows,
-        'expense_rows': expense_rows,
-        'total_revenue_cur': total_revenue_cur,
-        'total_revenue_prev': total_revenue_prev,
-        'total_revenue_change': total_revenue_change,
-        'total_revenue_pct': total_revenue_pct,
-        'total_expense_cur': total_expense_cur,
-        'total_expense_prev': total_expense_prev,
-        'total_expense_change': total_expense_change,
-        'total_expense_pct': total_expense_pct,
-        'income_before_tax': income_before_tax,
-        'income_before_tax_prev': income_before_tax_prev,
-        'net_profit': net_profit,
-        'net_profit_prev': net_profit_prev,
-        'tax_amount': tax_amount,
-        'net_change': net_change,
-        'start_date': start_date,
-        'end_date': end_date,
-        'curr_label': curr_label,
-        'prev_label': prev_label,
-    }
-
-    return render(request, 'app_web/report_pnl.html', context)
+def _report_download(request, key):
+    """
+    Report as a PDF streamed from a spool file, or CSV with ?format=csv.
+    ?appendix=1 adds the window's transactions after the report.
+    """
+    from app_core.frames import frame_for
+    from app_core.reports import COMPANY_NAME, report_csv, report_pdf_response
+
+    frame = frame_for(request)
+    report = _build_report(request, key, frame)
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(report_csv(report), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{report.filename("csv")}"'
+        return response
+    appendix = frame.window(report.start, report.end) if request.GET.get('appendix') else None
+    org = getattr(request, 'organization', None)
+    return report_pdf_response(
+        report,
+        company_name=org.name if org else COMPANY_NAME,
+        generated_by=request.user.get_full_name() or request.user.username,
+        appendix=appendix,
+    )
 
 
 @login_required
-def report_pnl_download(request):
-    """Generate a downloadable P&L PDF for the given date range (A4) matching the on-screen layout."""
-    from app_core.models import Transaction, Label
-    from django.db.models import Sum
-    from datetime import datetime, date, timedelta
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-
-    # Parse dates robustly (accept ISO and common human formats like 'Jan 1, 2025' or 'Jan. 1, 2025')
-    def _parse_date(s):
-        if not s:
-            return None
-        # Already a date object
-        if isinstance(s, datetime):
-            return s.date()
-        if isinstance(s, date):
-            return s
-        s = str(s).strip()
-        # Try ISO first
-        try:
-            return datetime.fromisoformat(s).date()
-        except Exception:
-            pass
-        # Try common formats
-        common = ['%b %d, %Y', '%b. %d, %Y', '%B %d, %Y', '%d %b %Y', '%Y-%m-%d']
-        for fmt in common:
-            try:
-                return datetime.strptime(s, fmt).date()
-            except Exception:
-                continue
-        # As a last resort, try parsing numbers (e.g. '1 Jan 2025')
-        try:
-            return datetime.strptime(s, '%d %B %Y').date()
-        except Exception:
-            return None
-
-    start = request.GET.get('start')
-    end = request.GET.get('end')
-    start_date = _parse_date(start)
-    end_date = _parse_date(end)
-
-    # today's date used for header and default ranges
-    today = date.today()
-    # Normalize single-side inputs: if only one side provided, treat as single-day range
-    if start_date and not end_date:
-        end_date = start_date
-    if end_date and not start_date:
-        start_date = end_date
-
-    # Default range: last 12 months (month-aligned) if nothing provided
-    if not start_date and not end_date:
-        # last 12 months: start = first day of month 11 months ago; end = today
-        m = today.month
-        y = today.year
-        m_back = m - 11
-        y_back = y
-        if m_back <= 0:
-            m_back += 12
-            y_back -= 1
-        start_date = date(y_back, m_back, 1)
-        end_date = today
-
-    # Compute previous same-length window (month/year-aware)
-    import calendar as _cal
-    try:
-        period_len = (end_date - start_date).days + 1
-    except Exception:
-        period_len = 1
-    last_day_of_month = _cal.monthrange(start_date.year, start_date.month)[1]
-    is_full_year = (start_date.month == 1 and start_date.day == 1 and end_date.month == 12 and end_date.day == 31 and start_date.year == end_date.year)
-    is_full_month = (start_date.day == 1 and end_date.day == last_day_of_month and start_date.month == end_date.month and start_date.year == end_date.year)
-
-    if is_full_year:
-        prev_start = date(start_date.year - 1, 1, 1)
-        prev_end = date(start_date.year - 1, 12, 31)
-    elif is_full_month:
-        prev_month = start_date.month - 1
-        prev_year = start_date.year
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        prev_start = date(prev_year, prev_month, 1)
-        prev_end = date(prev_year, prev_month, _cal.monthrange(prev_year, prev_month)[1])
-    else:
-        prev_end = start_date - timedelta(days=1)
-        prev_start = prev_end - timedelta(days=period_len - 1)
-
-    # Human-friendly labels for the two columns
-    def _friendly(d):
-        try:
-            return d.strftime('%b %d, %Y')
-        except Exception:
-            return ''
-
-    # Compact label helper: if range is whole year -> '2025', if whole month -> 'Dec 25', else full range
-    def _compact_label(start_d, end_d):
-        try:
-            # whole single year
-            if start_d.month == 1 and start_d.day == 1 and end_d.month == 12 and end_d.day == 31 and start_d.year == end_d.year:
-                return f"{start_d.year}"
-            # whole single month
-            import calendar as _cal
-            last = _cal.monthrange(start_d.year, start_d.month)[1]
-            if start_d.day == 1 and end_d.day == last and start_d.month == end_d.month and start_d.year == end_d.year:
-                return start_d.strftime('%b %y')
-        except Exception:
-            pass
-        return f"{_friendly(start_d)} – {_friendly(end_d)}"
-
-    curr_label = _compact_label(start_date, end_date)
-    prev_label = _compact_label(prev_start, prev_end)
-
-    # Querysets for current and previous windows
-    qs_cur = Transaction.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-    qs_prev = Transaction.objects.filter(user=request.user, date__gte=prev_start, date__lte=prev_end)
-
-    # Totals (inflow/outflow) for each window
-    income_total = qs_cur.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    expense_total = qs_cur.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-
-    income_total_prev = qs_prev.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    expense_total_prev = qs_prev.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-
-    # Build revenue and expense rows separately (use inflows for revenue, outflows for expenses)
-    labels = Label.objects.filter(user=request.user).order_by('name')
-    revenue_rows = []
-    expense_rows = []
-
-    def _pct_change(cur, prev):
-        try:
-            if prev == 0:
-                return None
-            return (float(cur) - float(prev)) / abs(float(prev)) * 100.0
-        except Exception:
-            return None
-
-    for lbl in labels:
-        cur_in = qs_cur.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_in = qs_prev.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_in or prev_in:
-            change_amt = (cur_in or 0) - (prev_in or 0)
-            change_pct = _pct_change(cur_in or 0, prev_in or 0)
-            revenue_rows.append({
-                'label': lbl.name,
-                'cur': cur_in,
-                'prev': prev_in,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-        cur_out = qs_cur.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_out = qs_prev.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_out or prev_out:
-            change_amt = (cur_out or 0) - (prev_out or 0)
-            change_pct = _pct_change(cur_out or 0, prev_out or 0)
-            expense_rows.append({
-                'label': lbl.name,
-                'cur': cur_out,
-                'prev': prev_out,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-    # Uncategorized as revenue/expense if present
-    unc_cur_in = qs_cur.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_in = qs_prev.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_in or unc_prev_in:
-        revenue_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_in, 'prev': unc_prev_in, 'change': (unc_cur_in or 0) - (unc_prev_in or 0), 'pct': _pct_change(unc_cur_in or 0, unc_prev_in or 0)
-        })
-    unc_cur_out = qs_cur.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_out = qs_prev.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_out or unc_prev_out:
-        expense_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_out, 'prev': unc_prev_out, 'change': (unc_cur_out or 0) - (unc_prev_out or 0), 'pct': _pct_change(unc_cur_out or 0, unc_prev_out or 0)
-        })
-
-    # Totals and net change
-    total_revenue_cur = sum(r['cur'] for r in revenue_rows)
-    total_revenue_prev = sum(r['prev'] for r in revenue_rows)
-    total_expense_cur = sum(e['cur'] for e in expense_rows)
-    total_expense_prev = sum(e['prev'] for e in expense_rows)
-
-    income_before_tax = (total_revenue_cur or 0) - (total_expense_cur or 0)
-    income_before_tax_prev = (total_revenue_prev or 0) - (total_expense_prev or 0)
-    net_change = (income_before_tax or 0) - (income_before_tax_prev or 0)
-
-    # For now, tax amount placeholder = 0 (we can wire tax rules later)
-    tax_amount = 0.0
-
-    # Net profit values (compute here so template doesn't do arithmetic)
-    net_profit = (income_before_tax or 0) - (tax_amount or 0)
-    net_profit_prev = (income_before_tax_prev or 0) - 0
-
-    # totals change and percent
-    total_revenue_change = (total_revenue_cur or 0) - (total_revenue_prev or 0)
-    total_revenue_pct = _pct_change(total_revenue_cur or 0, total_revenue_prev or 0)
-    total_expense_change = (total_expense_cur or 0) - (total_expense_prev or 0)
-    total_expense_pct = _pct_change(total_expense_cur or 0, total_expense_prev or 0)
-
-    context = {
-        'title': 'Profit & Loss (P&L)',
-        'active_report': 'pnl',
-        'revenue_rows': revenue_rows,
-        'expense_rows': expense_rows,
-        'total_revenue_cur': total_revenue_cur,
-        'total_revenue_prev': total_revenue_prev,
-        'total_revenue_change': total_revenue_change,
-        'total_revenue_pct': total_revenue_pct,
-        'total_expense_cur': total_expense_cur,
-        'total_expense_prev': total_expense_prev,
-        'total_expense_change': total_expense_change,
-        'total_expense_pct': total_expense_pct,
-        'income_before_tax': income_before_tax,
-        'income_before_tax_prev': income_before_tax_prev,
-        'net_profit': net_profit,
-        'net_profit_prev': net_profit_prev,
-        'tax_amount': tax_amount,
-        'net_change': net_change,
-        'start_date': start_date,
-        'end_date': end_date,
-        'curr_label': curr_label,
-        'prev_label': prev_label,
-    }
-
-    return render(request, 'app_web/report_pnl.html', context)
+@query_budget(queries=10)
+@replica_reads
+def report_pnl_view(request):
+    """Profit & Loss (P&L): revenue and expenses by label against the previous window"""
+    return _report_page(request, 'pnl')
 
 
 @login_required
+@query_budget(queries=10)
+@replica_reads
 def report_pnl_download(request):
-    """Generate a downloadable P&L PDF for the given date range (A4) matching the on-screen layout."""
-    from app_core.models import Transaction, Label
-    from django.db.models import Sum
-    from datetime import datetime, date, timedelta
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-
-    # Parse dates robustly (accept ISO and common human formats like 'Jan 1, 2025' or 'Jan. 1, 2025')
-    def _parse_date(s):
-        if not s:
-            return None
-        # Already a date object
-        if isinstance(s, datetime):
-            return s.date()
-        if isinstance(s, date):
-            return s
-        s = str(s).strip()
-        # Try ISO first
-        try:
-            return datetime.fromisoformat(s).date()
-        except Exception:
-            pass
-        # Try common formats
-        common = ['%b %d, %Y', '%b. %d, %Y', '%B %d, %Y', '%d %b %Y', '%Y-%m-%d']
-        for fmt in common:
-            try:
-                return datetime.strptime(s, fmt).date()
-            except Exception:
-                continue
-        # As a last resort, try parsing numbers (e.g. '1 Jan 2025')
-        try:
-            return datetime.strptime(s, '%d %B %Y').date()
-        except Exception:
-            return None
-
-    start = request.GET.get('start')
-    end = request.GET.get('end')
-    start_date = _parse_date(start)
-    end_date = _parse_date(end)
-
-    # today's date used for header and default ranges
-    today = date.today()
-    # Normalize single-side inputs: if only one provided, treat as single-day range
-    if start_date and not end_date:
-        end_date = start_date
-    if end_date and not start_date:
-        start_date = end_date
-
-    # Default range: last 12 months (month-aligned) if nothing provided
-    if not start_date and not end_date:
-        # last 12 months: start = first day of month 11 months ago; end = today
-        m = today.month
-        y = today.year
-        m_back = m - 11
-        y_back = y
-        if m_back <= 0:
-            m_back += 12
-            y_back -= 1
-        start_date = date(y_back, m_back, 1)
-        end_date = today
-
-    # Compute previous same-length window (month/year-aware)
-    import calendar as _cal
-    try:
-        period_len = (end_date - start_date).days + 1
-    except Exception:
-        period_len = 1
-    last_day_of_month = _cal.monthrange(start_date.year, start_date.month)[1]
-    is_full_year = (start_date.month == 1 and start_date.day == 1 and end_date.month == 12 and end_date.day == 31 and start_date.year == end_date.year)
-    is_full_month = (start_date.day == 1 and end_date.day == last_day_of_month and start_date.month == end_date.month and start_date.year == end_date.year)
-
-    if is_full_year:
-        prev_start = date(start_date.year - 1, 1, 1)
-        prev_end = date(start_date.year - 1, 12, 31)
-    elif is_full_month:
-        prev_month = start_date.month - 1
-        prev_year = start_date.year
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        prev_start = date(prev_year, prev_month, 1)
-        prev_end = date(prev_year, prev_month, _cal.monthrange(prev_year, prev_month)[1])
-    else:
-        prev_end = start_date - timedelta(days=1)
-        prev_start = prev_end - timedelta(days=period_len - 1)
-
-    # Human-friendly labels for the two columns
-    def _friendly(d):
-        try:
-            return d.strftime('%b %d, %Y')
-        except Exception:
-            return ''
-
-    # Compact label helper: if range is whole year -> '2025', if whole month -> 'Dec 25', else full range
-    def _compact_label(start_d, end_d):
-        try:
-            # whole single year
-            if start_d.month == 1 and start_d.day == 1 and end_d.month == 12 and end_d.day == 31 and start_d.year == end_d.year:
-                return f"{start_d.year}"
-            # whole single month
-            import calendar as _cal
-            last = _cal.monthrange(start_d.year, start_d.month)[1]
-            if start_d.day == 1 and end_d.day == last and start_d.month == end_d.month and start_d.year == end_d.year:
-                return start_d.strftime('%b %y')
-        except Exception:
-            pass
-        return f"{_friendly(start_d)} – {_friendly(end_d)}"
+    return _report_download(request, 'pnl')
 
-    curr_label = _compact_label(start_date, end_date)
-    prev_label = _compact_label(prev_start, prev_end)
 
-    # Querysets for current and previous windows
-    qs_cur = Transaction.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-    qs_prev = Transaction.objects.filter(user=request.user, date__gte=prev_start, date__lte=prev_end)
-
-    # Totals (inflow/outflow) for each window
-    income_total = qs_cur.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    expense_total = qs_cur.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-
-    income_total_prev = qs_prev.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    expense_total_prev = qs_prev.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-
-    # Build revenue and expense rows separately (use inflows for revenue, outflows for expenses)
-    labels = Label.objects.filter(user=request.user).order_by('name')
-    revenue_rows = []
-    expense_rows = []
-
-    def _pct_change(cur, prev):
-        try:
-            if prev == 0:
-                return None
-            return (float(cur) - float(prev)) / abs(float(prev)) * 100.0
-        except Exception:
-            return None
-
-    for lbl in labels:
-        cur_in = qs_cur.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_in = qs_prev.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_in or prev_in:
-            change_amt = (cur_in or 0) - (prev_in or 0)
-            change_pct = _pct_change(cur_in or 0, prev_in or 0)
-            revenue_rows.append({
-                'label': lbl.name,
-                'cur': cur_in,
-                'prev': prev_in,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-        cur_out = qs_cur.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_out = qs_prev.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_out or prev_out:
-            change_amt = (cur_out or 0) - (prev_out or 0)
-            change_pct = _pct_change(cur_out or 0, prev_out or 0)
-            expense_rows.append({
-                'label': lbl.name,
-                'cur': cur_out,
-                'prev': prev_out,
-                'change': change_amt,
-                'pct': change_pct,
-            })
-
-    # Uncategorized as revenue/expense if present
-    unc_cur_in = qs_cur.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_in = qs_prev.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_in or unc_prev_in:
-        revenue_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_in, 'prev': unc_prev_in, 'change': (unc_cur_in or 0) - (unc_prev_in or 0), 'pct': _pct_change(unc_cur_in or 0, unc_prev_in or 0)
-        })
-    unc_cur_out = qs_cur.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_out = qs_prev.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_out or unc_prev_out:
-        expense_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_out, 'prev': unc_prev_out, 'change': (unc_cur_out or 0) - (unc_prev_out or 0), 'pct': _pct_change(unc_cur_out or 0, unc_prev_out or 0)
-        })
-
-    # Totals and net change
-    total_revenue_cur = sum(r['cur'] for r in revenue_rows)
-    total_revenue_prev = sum(r['prev'] for r in revenue_rows)
-    total_expense_cur = sum(e['cur'] for e in expense_rows)
-    total_expense_prev = sum(e['prev'] for e in expense_rows)
-
-    income_before_tax = (total_revenue_cur or 0) - (total_expense_cur or 0)
-    income_before_tax_prev = (total_revenue_prev or 0) - (total_expense_prev or 0)
-    net_change = (income_before_tax or 0) - (income_before_tax_prev or 0)
-
-    # For now, tax amount placeholder = 0 (we can wire tax rules later)
-    tax_amount = 0.0
-
-    # Net profit values (compute here so template doesn't do arithmetic)
-    net_profit = (income_before_tax or 0) - (tax_amount or 0)
-    net_profit_prev = (income_before_tax_prev or 0) - 0
-
-    # totals change and percent
-    total_revenue_change = (total_revenue_cur or 0) - (total_revenue_prev or 0)
-    total_revenue_pct = _pct_change(total_revenue_cur or 0, total_revenue_prev or 0)
-    total_expense_change = (total_expense_cur or 0) - (total_expense_prev or 0)
-    total_expense_pct = _pct_change(total_expense_cur or 0, total_expense_prev or 0)
-
-    context = {
-        'title': 'Profit & Loss (P&L)',
-        'active_report': 'pnl',
-        'revenue_rows': revenue_rows,
-        'expense_rows': expense_rows,
-        'total_revenue_cur': total_revenue_cur,
-        'total_revenue_prev': total_revenue_prev,
-        'total_revenue_change': total_revenue_change,
-        'total_revenue_pct': total_revenue_pct,
-        'total_expense_cur': total_expense_cur,
-        'total_expense_prev': total_expense_prev,
-        'total_expense_change': total_expense_change,
-        'total_expense_pct': total_expense_pct,
-        'income_before_tax': income_before_tax,
-        'income_before_tax_prev': income_before_tax_prev,
-        'net_profit': net_profit,
-        'net_profit_prev': net_profit_prev,
-        'tax_amount': tax_amount,
-        'net_change': net_change,
-        'start_date': start_date,
-        'end_date': end_date,
-        'curr_label': curr_label,
-        'prev_label': prev_label,
-    }
-
-    return render(request, 'app_web/report_pnl.html', context)
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_cashflow_view(request):
+    """Cash flow statement: monthly inflows, outflows and running balance"""
+    return _report_page(request, 'cashflow')
 
 
 @login_required
-def report_pnl_download(request):
-    """Generate a downloadable P&L PDF for the given date range (A4) matching the on-screen layout."""
-    from app_core.models import Transaction, Label
-    from django.db.models import Sum
-    from datetime import datetime, date, timedelta
-    from io import BytesIO
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-    from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-
-    # Parse dates robustly (accept ISO and common human formats like 'Jan 1, 2025' or 'Jan. 1, 2025')
-    def _parse_date(s):
-        if not s:
-            return None
-        # Already a date object
-        if isinstance(s, datetime):
-            return s.date()
-        if isinstance(s, date):
-            return s
-        s = str(s).strip()
-        # Try ISO first
-        try:
-            return datetime.fromisoformat(s).date()
-        except Exception:
-            pass
-        # Try common formats
-        common = ['%b %d, %Y', '%b. %d, %Y', '%B %d, %Y', '%d %b %Y', '%Y-%m-%d']
-        for fmt in common:
-            try:
-                return datetime.strptime(s, fmt).date()
-            except Exception:
-                continue
-        # As a last resort, try parsing numbers (e.g. '1 Jan 2025')
-        try:
-            return datetime.strptime(s, '%d %B %Y').date()
-        except Exception:
-            return None
+@query_budget(queries=10)
+@replica_reads
+def report_cashflow_download(request):
+    return _report_download(request, 'cashflow')
 
-    start = request.GET.get('start')
-    end = request.GET.get('end')
-    start_date = _parse_date(start)
-    end_date = _parse_date(end)
 
-    # today's date used for header and default ranges
-    today = date.today()
-    # Normalize single-side inputs: if only one provided, treat as single-day range
-    if start_date and not end_date:
-        end_date = start_date
-    if end_date and not start_date:
-        start_date = end_date
-
-    # Default range: last 12 months (month-aligned) if nothing provided
-    if not start_date and not end_date:
-        # last 12 months: start = first day of month 11 months ago; end = today
-        m = today.month
-        y = today.year
-        m_back = m - 11
-        y_back = y
-        if m_back <= 0:
-            m_back += 12
-            y_back -= 1
-        start_date = date(y_back, m_back, 1)
-        end_date = today
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_expenses_view(request):
+    """Expenses by label with each label's share"""
+    return _report_page(request, 'expenses')
 
-    # Compute previous same-length window (month/year-aware)
-    import calendar as _cal
-    try:
-        period_len = (end_date - start_date).days + 1
-    except Exception:
-        period_len = 1
-    last_day_of_month = _cal.monthrange(start_date.year, start_date.month)[1]
-    is_full_year = (start_date.month == 1 and start_date.day == 1 and end_date.month == 12 and end_date.day == 31 and start_date.year == end_date.year)
-    is_full_month = (start_date.day == 1 and end_date.day == last_day_of_month and start_date.month == end_date.month and start_date.year == end_date.year)
-
-    if is_full_year:
-        prev_start = date(start_date.year - 1, 1, 1)
-        prev_end = date(start_date.year - 1, 12, 31)
-    elif is_full_month:
-        prev_month = start_date.month - 1
-        prev_year = start_date.year
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-        prev_start = date(prev_year, prev_month, 1)
-        prev_end = date(prev_year, prev_month, _cal.monthrange(prev_year, prev_month)[1])
-    else:
-        prev_end = start_date - timedelta(days=1)
-        prev_start = prev_end - timedelta(days=period_len - 1)
 
-    # Human-friendly labels for the two columns
-    def _friendly(d):
-        try:
-            return d.strftime('%b %d, %Y')
-        except Exception:
-            return ''
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_expenses_download(request):
+    return _report_download(request, 'expenses')
 
-    # Compact label helper: if range is whole year -> '2025', if whole month -> 'Dec 25', else full range
-    def _compact_label(start_d, end_d):
-        try:
-            # whole single year
-            if start_d.month == 1 and start_d.day == 1 and end_d.month == 12 and end_d.day == 31 and start_d.year == end_d.year:
-                return f"{start_d.year}"
-            # whole single month
-            import calendar as _cal
-            last = _cal.monthrange(start_d.year, start_d.month)[1]
-            if start_d.day == 1 and end_d.day == last and start_d.month == end_d.month and start_d.year == end_d.year:
-                return start_d.strftime('%b %y')
-        except Exception:
-            pass
-        return f"{_friendly(start_d)} – {_friendly(end_d)}"
 
-    curr_label = _compact_label(start_date, end_date)
-    prev_label = _compact_label(prev_start, prev_end)
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_income_view(request):
+    """Income by label with each label's share"""
+    return _report_page(request, 'income')
 
-    # Querysets for current and previous windows
-    qs_cur = Transaction.objects.filter(user=request.user, date__gte=start_date, date__lte=end_date)
-    qs_prev = Transaction.objects.filter(user=request.user, date__gte=prev_start, date__lte=prev_end)
 
-    # Totals (inflow/outflow) for each window
-    income_total = qs_cur.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    expense_total = qs_cur.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_income_download(request):
+    return _report_download(request, 'income')
 
-    income_total_prev = qs_prev.filter(direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    expense_total_prev = qs_prev.filter(direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
 
-    # Build revenue and expense rows separately (use inflows for revenue, outflows for expenses)
-    labels = Label.objects.filter(user=request.user).order_by('name')
-    revenue_rows = []
-    expense_rows = []
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_tax_view(request):
+    """Simplified income tax and VAT summary"""
+    return _report_page(request, 'tax')
 
-    def _pct_change(cur, prev):
-        try:
-            if prev == 0:
-                return None
-            return (float(cur) - float(prev)) / abs(float(prev)) * 100.0
-        except Exception:
-            return None
-
-    for lbl in labels:
-        cur_in = qs_cur.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_in = qs_prev.filter(label=lbl, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_in or prev_in:
-            change_amt = (cur_in or 0) - (prev_in or 0)
-            change_pct = _pct_change(cur_in or 0, prev_in or 0)
-            revenue_rows.append({
-                'label': lbl.name,
-                'cur': cur_in,
-                'prev': prev_in,
-                'change': change_amt,
-                'pct': change_pct,
-            })
 
-        cur_out = qs_cur.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-        prev_out = qs_prev.filter(label=lbl, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-        if cur_out or prev_out:
-            change_amt = (cur_out or 0) - (prev_out or 0)
-            change_pct = _pct_change(cur_out or 0, prev_out or 0)
-            expense_rows.append({
-                'label': lbl.name,
-                'cur': cur_out,
-                'prev': prev_out,
-                'change': change_amt,
-                'pct': change_pct,
-            })
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_tax_download(request):
+    return _report_download(request, 'tax')
 
-    # Uncategorized as revenue/expense if present
-    unc_cur_in = qs_cur.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_in = qs_prev.filter(label__isnull=True, direction=Transaction.INFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_in or unc_prev_in:
-        revenue_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_in, 'prev': unc_prev_in, 'change': (unc_cur_in or 0) - (unc_prev_in or 0), 'pct': _pct_change(unc_cur_in or 0, unc_prev_in or 0)
-        })
-    unc_cur_out = qs_cur.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount'))['total'] or 0
-    unc_prev_out = qs_prev.filter(label__isnull=True, direction=Transaction.OUTFLOW).aggregate(total=Sum('amount')).get('total') or 0
-    if unc_cur_out or unc_prev_out:
-        expense_rows.append({
-            'label': 'Uncategorized', 'cur': unc_cur_out, 'prev': unc_prev_out, 'change': (unc_cur_out or 0) - (unc_prev_out or 0), 'pct': _pct_change(unc_cur_out or 0, unc_prev_out or 0)
-        })
 
-    # Totals and net change
-    total_revenue_cur = sum(r['cur'] for r in revenue_rows)
-    total_revenue_prev = sum(r['prev'] for r in revenue_rows)
-    total_expense_cur = sum(e['cur'] for e in expense_rows)
-    total_expense_prev = sum(e['prev'] for e in expense_rows)
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_budget_performance_view(request):
+    """Budgeted vs actual spending for active budgets overlapping the range"""
+    return _report_page(request, 'budget_performance')
 
-    income_before_tax = (total_revenue_cur or 0) - (total_expense_cur or 0)
-    income_before_tax_prev = (total_revenue_prev or 0) - (total_expense_prev or 0)
-    net_change = (income_before_tax or 0) - (income_before_tax_prev or 0)
 
-    # For now, tax amount placeholder = 0 (we can wire tax rules later)
-    tax_amount = 0.0
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_budget_performance_download(request):
+    return _report_download(request, 'budget_performance')
 
-    # Net profit values (compute here so template doesn't do arithmetic)
-    net_profit = (income_before_tax or 0) - (tax_amount or 0)
-    net_profit_prev = (income_before_tax_prev or 0) - 0
 
-    # totals change and percent
-    total_revenue_change = (total_revenue_cur or 0) - (total_revenue_prev or 0)
-    total_revenue_pct = _pct_change(total_revenue_cur or 0, total_revenue_prev or 0)
-    total_expense_change = (total_expense_cur or 0) - (total_expense_prev or 0)
-    total_expense_pct = _pct_change(total_expense_cur or 0, total_expense_prev or 0)
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_project_performance_view(request):
+    """Project budgets vs actual spending (sub-projects rolled up)"""
+    return _report_page(request, 'project_performance')
 
-    context = {
-        'title': 'Profit & Loss (P&L)',
-        'active_report': 'pnl',
-        'revenue_rows': revenue_rows,
-        'expense_rows': expense_rows,
-        'total_revenue_cur': total_revenue_cur,
-        'total_revenue_prev': total_revenue_prev,
-        'total_revenue_change': total_revenue_change,
-        'total_revenue_pct': total_revenue_pct,
-        'total_expense_cur': total_expense_cur,
-        'total_expense_prev': total_expense_prev,
-        'total_expense_change': total_expense_change,
-        'total_expense_pct': total_expense_pct,
-        'income_before_tax': income_before_tax,
-        'income_before_tax_prev': income_before_tax_prev,
-        'net_profit': net_profit,
-        'net_profit_prev': net_profit_prev,
-        'tax_amount': tax_amount,
-        'net_change': net_change,
-        'start_date': start_date,
-        'end_date': end_date,
-        'curr_label': curr_label,
-        'prev_label': prev_label,
-    }
 
-    return render(request, 'app_web/report_pnl.html', context)
+@login_required
+@query_budget(queries=10)
+@replica_reads
+def report_project_performance_download(request):
+    return _report_download(request, 'project_performance')
 
 
 @login_required
@@ -4008,9 +3111,25 @@ def debug_organization_view(request):
     return render(request, "app_web/debug_org.html", context)
 
 
+@staff_member_required
+@require_http_methods(["GET", "POST"])
+def profiling_stats_view(request):
+    """Per-view SQL/latency percentiles from this process (see app_core.profiling); POST resets them."""
+    from app_core.profiling import enforce_budgets, sample_rate, stats
+
+    if request.method == "POST":
+        stats.reset()
+    return JsonResponse({
+        "sample_rate": sample_rate(),
+        "enforce_budgets": enforce_budgets(),
+        "views": stats.summary(),
+    })
+
+
 # ==================== TASK/PROGRESS VIEWS ====================
 
 from app_core.task_models import Task, TaskComment, TaskTimeEntry, TaskActivity
+from app_core.task_board import TaskBoard, board_etag, board_payload
 from app_core.models import Project, ProjectMilestone, Label
 from app_core.team_models import OrganizationMember
 
@@ -4022,13 +3141,8 @@ def project_tasks(request, project_id):
     # Get view preference
     view = request.GET.get('view', 'table')
 
-    # Get all tasks for this project
-    tasks = Task.objects.filter(
-        project=project,
-        organization=request.organization
-    ).select_related(
-        'assignee', 'milestone', 'parent_task', 'created_by'
-    ).prefetch_related('labels', 'sub_tasks', 'comments')
+    # One fetch (plus labels) serves the table, every kanban column and the roadmap
+    board = TaskBoard.for_project(project)
 
     # Get team members for assignee dropdown
     team_members = OrganizationMember.objects.filter(
@@ -4042,28 +3156,12 @@ def project_tasks(request, project_id):
     # Get labels
     labels = Label.objects.filter(organization=request.organization)
 
-    # Group tasks by status for kanban view
-    tasks_by_status = {
-        'backlog': tasks.filter(status='backlog'),
-        'todo': tasks.filter(status='todo'),
-        'in_progress': tasks.filter(status='in_progress'),
-        'review': tasks.filter(status='review'),
-        'done': tasks.filter(status='done'),
-        'blocked': tasks.filter(status='blocked'),
-    }
-
-    # Get tasks with dates for roadmap view
-    tasks_with_dates = tasks.filter(
-        start_date__isnull=False,
-        due_date__isnull=False
-    )
-
     context = {
         'title': f'{project.name} - Progress',
         'project': project,
-        'tasks': tasks,
-        'tasks_by_status': tasks_by_status,
-        'tasks_with_dates': tasks_with_dates,
+        'tasks': board.tasks,
+        'tasks_by_status': board.by_status,
+        'tasks_with_dates': board.with_dates,
         'team_members': team_members,
         'milestones': milestones,
         'labels': labels,
@@ -4074,6 +3172,24 @@ def project_tasks(request, project_id):
     return render(request, 'app_web/tasks.html', context)
 
 
+def _project_board_etag(request, project_id):
+    project = Project.objects.filter(id=project_id, organization=request.organization).only('id', 'organization_id').first()
+    return board_etag(project) if project else None
+
+
+@login_required
+@require_http_methods(["GET"])
+@condition(etag_func=_project_board_etag)
+def project_tasks_board(request, project_id):
+    """
+    Board data (tasks, kanban columns, roadmap) as JSON. Sends an ETag, so
+    polling with If-None-Match gets a 304 until a task changes.
+    """
+    project = get_object_or_404(Project, id=project_id, organization=request.organization)
+    board = TaskBoard.for_project(project)
+    return JsonResponse({'ok': True, **board_payload(board)})
+
+
 @login_required
 @require_http_methods(["POST"])
 def task_create(request, project_id):
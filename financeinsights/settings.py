@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 import dj_database_url
 from django.conf.global_settings import LOGIN_URL
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the queries of every middleware below count towards the request
+    "app_core.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -60,6 +64,7 @@ MIDDLEWARE = [
     # Team collaboration middleware
     "app_core.middleware.OrganizationMiddleware",
     "app_core.middleware.ActivityLoggingMiddleware",
+    "app_core.middleware.ReplicaPinMiddleware",
 ]
 
 ROOT_URLCONF = "financeinsights.urls"
@@ -83,6 +88,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "financeinsights.wsgi.application"
+# The Procfile serves ASGI; dashboard change streams (SSE) are refused under WSGI
+ASGI_APPLICATION = "financeinsights.asgi.application"
 
 
 # Database
@@ -93,10 +100,80 @@ db_url = os.getenv("DATABASE_URL", "").strip()
 if not db_url:
     db_url = f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
 
+# PostgreSQL connection pooling (psycopg_pool, via psycopg[pool]) with
+# DATABASE_POOL=true. A pool replaces persistent connections (CONN_MAX_AGE),
+# so each worker process keeps between MIN and MAX connections per database
+DATABASE_POOL = os.getenv("DATABASE_POOL", "").lower() == "true"
+
+
+def database_config(url):
+    config = dj_database_url.parse(url, conn_max_age=600)
+    if DATABASE_POOL and config["ENGINE"] == "django.db.backends.postgresql":
+        config["CONN_MAX_AGE"] = 0
+        config.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        }
+    return config
+
+
 DATABASES = {
-    "default": dj_database_url.parse(db_url, conn_max_age=600),
+    "default": database_config(db_url),
 }
 
+# Read replica (app_core.db_router): with REPLICA_DATABASE_URL set, analytics
+# views (dashboard widgets, reports, metrics) read from it, and a user's or an
+# organization's reads stay on the primary for REPLICA_STICKY_SECONDS after
+# they write. To try it locally with SQLite, point it at a second file and
+# copy the primary into it with `manage.py refresh_replica`
+replica_url = os.getenv("REPLICA_DATABASE_URL", "").strip()
+if replica_url:
+    DATABASES["replica"] = {
+        **database_config(replica_url),
+        # Tests use the primary's test database, so routing still runs
+        "TEST": {"MIRROR": "default"},
+    }
+elif sys.argv[1:2] == ["test"]:
+    # A second alias for the routing tests (app_core.tests), which switch
+    # routing on with REPLICA_DATABASE_ALIAS; other tests read the primary
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    REPLICA_DATABASE_ALIAS = None
+DATABASE_ROUTERS = ["app_core.db_router.ReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+# Cache: per-org data versions (app_core.data_version) live here, and the
+# dashboard change stream (app_core.changefeed) watches them, so every web
+# worker and the background worker must share it, and bumps need an atomic
+# incr. Outside DEBUG that means Redis (REDIS_URL): the database cache's incr
+# is a get-then-set, so concurrent writes could get the same version. The
+# per-process LocMemCache is only for single-process development
+redis_url = os.getenv("REDIS_URL", "").strip()
+if redis_url:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": redis_url,
+        }
+    }
+elif not DEBUG:
+    raise ImproperlyConfigured("Set REDIS_URL: data versions need a shared cache with an atomic incr")
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "financeinsights",
+        }
+    }
+
+
+# Request profiling (app_core.profiling): the share of requests profiled, and
+# whether views' query budgets raise (on under `manage.py test`) or only log.
+# Stats are at /ops/profiling/ for staff
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "1.0" if DEBUG else "0.05"))
+PROFILING_ENFORCE_BUDGETS = (
+    os.getenv("PROFILING_ENFORCE_BUDGETS", "").lower() == "true" or sys.argv[1:2] == ["test"]
+)
 
 
 # Password validation
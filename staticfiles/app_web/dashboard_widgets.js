@@ -11,6 +11,8 @@
   // Global state
   let grid;
   let widgets = {};
+  let widgetEtags = {}; // widgetId -> { query, etag } of the data on screen
+  let changeStreamOpen = false;
   let charts = {};
   let saveTimeout;
   let currentDateRange = 'last7days'; // Default to current week (Daily view)
@@ -41,6 +43,7 @@
     'chart-budget-performance': { title: 'Budget Performance', w: 6, h: 8, type: 'chart', minW: 4, minH: 6 },
     'chart-category-heatmap': { title: 'Category Heatmap', w: 6, h: 8, type: 'chart', minW: 3, minH: 6 },
     'chart-money-flow-sankey': { title: 'Money Flow', w: 6, h: 8, type: 'chart', minW: 3, minH: 6 },
+    'chart-cash-forecast': { title: 'Cash Forecast', w: 6, h: 8, type: 'chart', minW: 4, minH: 6 },
 
     // List Widgets - 4 columns wide × 8 cells tall (8 × 50px = 400px)
     'list-recent-transactions': { title: 'Recent Transactions', w: 4, h: 8, type: 'list', minW: 3, minH: 4 },
@@ -51,6 +54,7 @@
     // Summary Widgets - 4 columns × 6 cells (6 × 50px = 300px)
     'summary-financial': { title: 'Financial Summary', w: 4, h: 6, type: 'summary', minW: 3, minH: 4 },
     'summary-month-comparison': { title: 'Month Comparison', w: 4, h: 6, type: 'summary', minW: 3, minH: 4 },
+    'summary-ar-aging': { title: 'Receivables Aging', w: 4, h: 6, type: 'summary', minW: 3, minH: 4 },
   };
 
   // Configure Chart.js defaults for modern tooltips
@@ -163,8 +167,12 @@
     // Initialize edit mode as disabled
     setEditMode(false);
 
-    // Setup auto-refresh (30 seconds)
-    setInterval(refreshAllWidgets, 30000);
+    // Refresh widgets when their data changes; poll every 30 seconds only
+    // while the change stream is unavailable
+    connectChangeStream();
+    setInterval(() => {
+      if (!changeStreamOpen) refreshAllWidgets();
+    }, 30000);
   }
 
   function setDefaultDates() {
@@ -308,6 +316,7 @@
         // Clear existing widgets
         grid.removeAll();
         widgets = {};
+        widgetEtags = {};
 
         // Add widgets from layout - filter out invalid entries
         for (const widgetConfig of result.layout.widgets) {
@@ -323,8 +332,9 @@
             continue;
           }
 
-          await addWidgetToGrid(widgetConfig);
+          await addWidgetToGrid(widgetConfig, false);
         }
+        await loadWidgets(Object.keys(widgets));
       } else {
         // No layout found or empty - load some default widgets
         console.log('No saved layout found, loading defaults');
@@ -347,11 +357,12 @@
     ];
 
     for (const config of defaultWidgets) {
-      await addWidgetToGrid(config);
+      await addWidgetToGrid(config, false);
     }
+    await loadWidgets(Object.keys(widgets));
   }
 
-  async function addWidgetToGrid(config) {
+  async function addWidgetToGrid(config, load = true) {
     const widgetId = config.id;
     const meta = WIDGET_META[widgetId];
 
@@ -392,9 +403,63 @@
 
     // Store reference
     widgets[widgetId] = widgetEl;
+    delete widgetEtags[widgetId];
 
-    // Load widget data
-    await loadWidgetData(widgetId);
+    // Load widget data (callers adding several widgets load them in one batch)
+    if (load) await loadWidgetData(widgetId);
+  }
+
+  function widgetQuery() {
+    // Custom dates from the inputs win over the preset range
+    const startInput = document.getElementById('start_date');
+    const endInput = document.getElementById('end_date');
+    if (startInput && endInput && startInput.value && endInput.value) {
+      return `start=${startInput.value}&end=${endInput.value}`;
+    }
+    return `dateRange=${currentDateRange}`;
+  }
+
+  async function loadWidgets(widgetIds) {
+    if (widgetIds.length <= 1) {
+      widgetIds.forEach(widgetId => loadWidgetData(widgetId));
+      return;
+    }
+
+    // One request; the server computes the widgets concurrently and skips
+    // those whose data on screen is still current
+    const query = widgetQuery();
+    const known = {};
+    widgetIds.forEach(widgetId => {
+      const shown = widgetEtags[widgetId];
+      known[widgetId] = shown && shown.query === query ? shown.etag : null;
+    });
+
+    try {
+      const response = await fetch(`/api/dashboard/widgets/?${query}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
+        body: JSON.stringify({ widgets: known }),
+        cache: 'no-store'
+      });
+      const result = await response.json();
+      if (!result.success) throw new Error(result.error || 'Batch load failed');
+
+      Object.entries(result.widgets).forEach(([widgetId, item]) => {
+        const bodyEl = document.getElementById(`widget-body-${widgetId}`);
+        if (!bodyEl || item.not_modified) return;
+        if (item.error) {
+          console.error('Widget load failed:', widgetId, item.error);
+          delete widgetEtags[widgetId];
+          bodyEl.innerHTML = `<div class="widget-error">${item.error}</div>`;
+          return;
+        }
+        renderWidget(widgetId, item.data);
+        widgetEtags[widgetId] = { query, etag: item.etag };
+      });
+    } catch (error) {
+      console.error('Batch widget load failed, loading one by one:', error);
+      widgetIds.forEach(widgetId => loadWidgetData(widgetId));
+    }
   }
 
   async function loadWidgetData(widgetId) {
@@ -402,42 +467,34 @@
     if (!bodyEl) return;
 
     try {
-      // Get date range - use currentDateRange or custom from inputs
-      let dateRange = currentDateRange;
-
-      // If custom dates are set, use those
-      const startInput = document.getElementById('start_date');
-      const endInput = document.getElementById('end_date');
-
-      if (startInput && endInput && startInput.value && endInput.value) {
-        // Custom date range - pass as query params
-        const url = `/api/dashboard/widget/${widgetId}/?start=${startInput.value}&end=${endInput.value}`;
-        console.log('Loading widget with custom dates:', widgetId, url);
-        const response = await fetch(url);
-        const result = await response.json();
-
-        if (result.success) {
-          renderWidget(widgetId, result.data);
+      const query = widgetQuery();
+      const url = `/api/dashboard/widget/${widgetId}/?${query}`;
+
+      // Revalidate what is on screen: the server answers 304, without
+      // recomputing, until the widget's data or date range changes
+      const shown = widgetEtags[widgetId];
+      const headers = shown && shown.query === query ? { 'If-None-Match': shown.etag } : {};
+      const response = await fetch(url, { headers, cache: 'no-store' });
+      if (response.status === 304) return;
+
+      const result = await response.json();
+
+      if (result.success) {
+        renderWidget(widgetId, result.data);
+        const etag = response.headers.get('ETag');
+        if (etag) {
+          widgetEtags[widgetId] = { query, etag };
         } else {
-          console.error('Widget load failed:', widgetId, result.error);
-          bodyEl.innerHTML = `<div class="widget-error">${result.error || 'Failed to load widget'}</div>`;
+          delete widgetEtags[widgetId];
         }
       } else {
-        // Use preset date range
-        const url = `/api/dashboard/widget/${widgetId}/?dateRange=${dateRange}`;
-        console.log('Loading widget with preset range:', widgetId, dateRange, url);
-        const response = await fetch(url);
-        const result = await response.json();
-
-        if (result.success) {
-          renderWidget(widgetId, result.data);
-        } else {
-          console.error('Widget load failed:', widgetId, result.error);
-          bodyEl.innerHTML = `<div class="widget-error">${result.error || 'Failed to load widget'}</div>`;
-        }
+        console.error('Widget load failed:', widgetId, result.error);
+        delete widgetEtags[widgetId];
+        bodyEl.innerHTML = `<div class="widget-error">${result.error || 'Failed to load widget'}</div>`;
       }
     } catch (error) {
       console.error(`Error loading widget ${widgetId}:`, error);
+      delete widgetEtags[widgetId];
       bodyEl.innerHTML = `<div class="widget-error">Error loading widget</div>`;
     }
   }
@@ -554,6 +611,7 @@
           charts[widgetId] = renderPieChart(ctx, data);
           break;
         case 'chart-trend-line':
+        case 'chart-cash-forecast':
           charts[widgetId] = renderLineChart(ctx, data);
           break;
         case 'chart-waterfall':
@@ -941,6 +999,8 @@
       renderFinancialSummary(bodyEl, data);
     } else if (widgetId === 'summary-month-comparison') {
       renderMonthComparison(bodyEl, data);
+    } else if (widgetId === 'summary-ar-aging') {
+      renderArAging(bodyEl, data);
     }
   }
 
@@ -997,6 +1057,25 @@
     bodyEl.innerHTML = html;
   }
 
+  function renderArAging(bodyEl, data) {
+    const rows = data.buckets.map((bucket, i) => `
+        <div class="summary-stat">
+          <span class="summary-stat-label">${bucket.label}</span>
+          <span class="summary-stat-value" style="color: ${i > 0 && bucket.value > 0 ? '#ef4444' : '#111827'}">${data.currency}${formatNumber(bucket.value)}</span>
+        </div>`).join('');
+    const html = `
+      <div class="summary-widget">
+        ${rows}
+        <div class="summary-stat">
+          <span class="summary-stat-label"><a href="/invoices/aging/">Total (${data.invoice_count} invoices)</a></span>
+          <span class="summary-stat-value">${data.currency}${formatNumber(data.total)}</span>
+        </div>
+      </div>
+    `;
+
+    bodyEl.innerHTML = html;
+  }
+
   // ==================== WIDGET MANAGEMENT ====================
 
   let currentDraggedWidget = null;
@@ -1059,6 +1138,8 @@
     const widgetId = element.getAttribute('gs-id');
     if (widgetId) {
       setTimeout(() => {
+        // Re-render even if the data is unchanged
+        delete widgetEtags[widgetId];
         loadWidgetData(widgetId);
       }, 100);
     }
@@ -1133,6 +1214,7 @@
     // Remove from grid
     grid.removeWidget(widgetEl);
     delete widgets[widgetId];
+    delete widgetEtags[widgetId];
 
     saveLayout();
   };
@@ -1315,8 +1397,24 @@
   // ==================== REFRESH FUNCTIONS ====================
 
   function refreshAllWidgets() {
-    Object.keys(widgets).forEach(widgetId => {
-      loadWidgetData(widgetId);
+    return loadWidgets(Object.keys(widgets));
+  }
+
+  function connectChangeStream() {
+    if (!window.EventSource) return;
+
+    // The server names the widgets whose data changed; EventSource reconnects
+    // by itself and the server reports anything missed in between
+    const source = new EventSource('/api/dashboard/changes/');
+    source.addEventListener('open', () => {
+      changeStreamOpen = true;
+    });
+    source.addEventListener('error', () => {
+      changeStreamOpen = false;
+    });
+    source.addEventListener('change', (event) => {
+      const changed = JSON.parse(event.data).widgets || [];
+      loadWidgets(changed.filter(widgetId => widgets[widgetId]));
     });
   }
 
@@ -72,11 +72,56 @@
       const selectAll = qs('#select-all');
       const rowCheckboxes = ()=> Array.from(document.querySelectorAll('.row-select'));
 
+      // "Select all N matching": bulk actions then target the filter, not an id list
+      const matchingBanner = qs('#select-all-matching');
+      const matchingTotal = matchingBanner ? parseInt(matchingBanner.dataset.total || '0', 10) : 0;
+      const pageCount = matchingBanner ? parseInt(matchingBanner.dataset.pageCount || '0', 10) : 0;
+      let allMatching = false;
+      function setAllMatching(on){
+        allMatching = on;
+        qsa('.bulk-select-all').forEach(el=> el.value = on ? '1' : '');
+        const text = qs('#select-all-matching-text'); const btn = qs('#select-all-matching-btn');
+        if(text) text.textContent = on ? ('All ' + matchingTotal + ' matching transactions are selected.') : ('All ' + pageCount + ' transactions on this page are selected.');
+        if(btn) btn.style.display = on ? 'none' : '';
+      }
+      function selectedCount(){ return allMatching ? matchingTotal : rowCheckboxes().filter(cb=>cb.checked).length; }
+
       function updateActionButtons(){
         const selected = rowCheckboxes().filter(cb=>cb.checked).map(cb=>cb.dataset.id);
         const editBtn = qs('#edit-selected'); const delBtn = qs('#delete-selected');
         if(editBtn) editBtn.disabled = selected.length === 0;
         if(delBtn) delBtn.disabled = selected.length === 0;
+        const allOnPage = selected.length > 0 && selected.length === rowCheckboxes().length;
+        if(!allOnPage && allMatching) setAllMatching(false);
+        if(matchingBanner) matchingBanner.style.display = (allOnPage && matchingTotal > pageCount) ? '' : 'none';
+      }
+      const matchingBtn = qs('#select-all-matching-btn'); if(matchingBtn) matchingBtn.addEventListener('click', ()=> setAllMatching(true));
+
+      // Submit a chunked bulk operation and render its NDJSON progress stream
+      function runBulk(url, fd, modalId){
+        fd.append('stream', '1');
+        hideModal(modalId);
+        const wrap = qs('#bulk-progress'); const bar = qs('#bulk-progress-bar'); const text = qs('#bulk-progress-text');
+        if(wrap) wrap.style.display = '';
+        return fetch(url, { method:'POST', headers: {'X-Requested-With':'XMLHttpRequest','X-CSRFToken': csrftoken }, body: fd }).then(async r=>{
+          if(!r.ok){ const j = await r.json().catch(()=>null); throw new Error(j && j.errors ? JSON.stringify(j.errors) : ('HTTP ' + r.status)); }
+          const reader = r.body.getReader(); const decoder = new TextDecoder(); let buf = ''; let last = null;
+          for(;;){
+            const { value, done } = await reader.read();
+            if(done) break;
+            buf += decoder.decode(value, { stream:true });
+            let nl;
+            while((nl = buf.indexOf('\n')) >= 0){
+              const line = buf.slice(0, nl).trim(); buf = buf.slice(nl + 1);
+              if(!line) continue;
+              last = JSON.parse(line);
+              if(last.ok === false) throw new Error(last.error || 'Bulk operation failed');
+              if(bar) bar.value = last.percent || 0;
+              if(text) text.textContent = last.processed + ' / ' + last.total + ' processed';
+            }
+          }
+          return last;
+        }).then(()=> window.location.reload()).catch(err=>{ alert('Bulk operation failed: ' + err.message); window.location.reload(); });
       }
 
       // set initial state of action buttons
@@ -123,10 +168,10 @@
 
       // Delete selected
       const delBtn = qs('#delete-selected');
-      if(delBtn){ delBtn.addEventListener('click', function(){ const selected = rowCheckboxes().filter(cb=>cb.checked).map(cb=>cb.dataset.id); if(!selected.length) return; const delIds = qs('#delete-ids'); const delCount = qs('#delete-modal-count'); if(delIds) delIds.value = selected.join(','); if(delCount) delCount.textContent = selected.length + ' transactions will be deleted'; showModal('delete-modal'); }); }
+      if(delBtn){ delBtn.addEventListener('click', function(){ const selected = rowCheckboxes().filter(cb=>cb.checked).map(cb=>cb.dataset.id); if(!selected.length) return; const delIds = qs('#delete-ids'); const delCount = qs('#delete-modal-count'); if(delIds) delIds.value = selected.join(','); if(delCount) delCount.textContent = selectedCount() + ' transactions will be deleted'; showModal('delete-modal'); }); }
       const delCancel = qs('#delete-cancel'); if(delCancel) delCancel.addEventListener('click', ()=> hideModal('delete-modal'));
       const delForm = qs('#delete-form');
-      if(delForm){ delForm.addEventListener('submit', function(e){ e.preventDefault(); const ids = (qs('#delete-ids').value || '').split(',').map(s=>s.trim()).filter(Boolean); if(!ids.length) return hideModal('delete-modal'); Promise.all(ids.map(id=> fetch('/transactions/'+id+'/delete/', { method:'POST', headers:{ 'X-CSRFToken': csrftoken } }))).then(()=> window.location.reload()).catch(()=> { alert('Failed to delete'); window.location.reload(); }); }); }
+      if(delForm){ delForm.addEventListener('submit', function(e){ e.preventDefault(); const ids = (qs('#delete-ids').value || '').split(',').map(s=>s.trim()).filter(Boolean); if(!ids.length && !allMatching) return hideModal('delete-modal'); runBulk(delForm.action, new FormData(delForm), 'delete-modal'); }); }
 
       // Edit selected -> reuse bulk-edit modal
       const editBtn = qs('#edit-selected');
@@ -134,7 +179,7 @@
         editBtn.addEventListener('click', function(){
           const selected = rowCheckboxes().filter(cb=>cb.checked).map(cb=>cb.dataset.id);
           if(!selected.length) return;
-          const beIds = qs('#bulk-edit-ids'); const beCount = qs('#bulk-edit-count'); if(beIds) beIds.value = selected.join(','); if(beCount) beCount.textContent = selected.length + ' transactions selected';
+          const beIds = qs('#bulk-edit-ids'); const beCount = qs('#bulk-edit-count'); if(beIds) beIds.value = selected.join(','); if(beCount) beCount.textContent = selectedCount() + ' transactions selected';
           const form = qs('#bulk-edit-form'); if(!form) return;
           ['date','amount','description','direction','category','subcategory'].forEach(name=>{ const el = form.querySelector('[name="'+name+'"]'); if(el){ el.value = ''; const err = el.parentElement.querySelector('.field-error'); if(err) err.remove(); } });
           if(selected.length === 1){ const id = selected[0]; const cb = qs('.row-select[data-id="'+id+'"]'); if(cb){ if(form.querySelector('[name="date"]')) form.querySelector('[name="date"]').value = cb.dataset.date || ''; if(form.querySelector('[name="amount"]')) form.querySelector('[name="amount"]').value = cb.dataset.amount || ''; if(form.querySelector('[name="description"]')) form.querySelector('[name="description"]').value = cb.dataset.description || ''; if(form.querySelector('[name="direction"]')) form.querySelector('[name="direction"]').value = cb.dataset.direction || ''; if(form.querySelector('[name="category"]')) form.querySelector('[name="category"]').value = cb.dataset.category || ''; if(form.querySelector('[name="subcategory"]')) form.querySelector('[name="subcategory"]').value = cb.dataset.subcategory || ''; const title = qs('#bulk-edit-title'); if(title) title.textContent = 'Edit transaction'; } }
@@ -146,7 +191,7 @@
       // AJAX submit for bulk-edit-form
       const bulkForm = qs('#bulk-edit-form');
       if(bulkForm){
-        bulkForm.addEventListener('submit', function(e){ e.preventDefault(); const fd = new FormData(bulkForm); fetch(bulkForm.action, { method:'POST', headers: {'X-Requested-With':'XMLHttpRequest','X-CSRFToken': csrftoken }, body: fd }).then(r=> r.json()).then(json=>{ if(json && json.ok){ const updated = json.updated_ids || []; const applied = json.applied || {}; if(updated.length === 1){ const id = String(updated[0]); const cb = qs('.row-select[data-id="'+id+'"]'); if(cb){ const row = cb.closest('tr'); Object.keys(applied).forEach(function(k){ const v = applied[k]; if(['date','amount','direction','category','subcategory','description'].includes(k)){ if(k === 'date') cb.dataset.date = v; else if(k === 'amount') cb.dataset.amount = v; else if(k === 'direction') cb.dataset.direction = v; else if(k === 'category') cb.dataset.category = v; else if(k === 'subcategory') cb.dataset.subcategory = v; else if(k === 'description') cb.dataset.description = v; const td = row.querySelector('td[data-col="'+k+'"]'); if(td){ if(k === 'date'){ try{ const d = new Date(v); td.textContent = d.toLocaleDateString(undefined,{month:'short', day:'numeric', year:'numeric'}); }catch(e){ td.textContent = v; } } else { td.textContent = v; } } } }); } hideModal('bulk-edit-modal'); } else { window.location.reload(); } } else { if(json && json.errors){ Object.keys(json.errors).forEach(function(field){ const input = bulkForm.querySelector('[name="'+field+'"]'); if(input){ let el = input.parentElement.querySelector('.field-error'); if(!el){ el = document.createElement('div'); el.className = 'field-error'; input.parentElement.appendChild(el); } el.textContent = Array.isArray(json.errors[field])? json.errors[field].join('; '): String(json.errors[field]); } }); } else { alert('Failed to apply changes'); } } }).catch(err=>{ alert('Network error'); console.error(err); }); });
+        bulkForm.addEventListener('submit', function(e){ e.preventDefault(); const fd = new FormData(bulkForm); if(allMatching) return runBulk(bulkForm.action, fd, 'bulk-edit-modal'); fetch(bulkForm.action, { method:'POST', headers: {'X-Requested-With':'XMLHttpRequest','X-CSRFToken': csrftoken }, body: fd }).then(r=> r.json()).then(json=>{ if(json && json.ok){ const updated = json.updated_ids || []; const applied = json.applied || {}; if(updated.length === 1){ const id = String(updated[0]); const cb = qs('.row-select[data-id="'+id+'"]'); if(cb){ const row = cb.closest('tr'); Object.keys(applied).forEach(function(k){ const v = applied[k]; if(['date','amount','direction','category','subcategory','description'].includes(k)){ if(k === 'date') cb.dataset.date = v; else if(k === 'amount') cb.dataset.amount = v; else if(k === 'direction') cb.dataset.direction = v; else if(k === 'category') cb.dataset.category = v; else if(k === 'subcategory') cb.dataset.subcategory = v; else if(k === 'description') cb.dataset.description = v; const td = row.querySelector('td[data-col="'+k+'"]'); if(td){ if(k === 'date'){ try{ const d = new Date(v); td.textContent = d.toLocaleDateString(undefined,{month:'short', day:'numeric', year:'numeric'}); }catch(e){ td.textContent = v; } } else { td.textContent = v; } } } }); } hideModal('bulk-edit-modal'); } else { window.location.reload(); } } else { if(json && json.errors){ Object.keys(json.errors).forEach(function(field){ const input = bulkForm.querySelector('[name="'+field+'"]'); if(input){ let el = input.parentElement.querySelector('.field-error'); if(!el){ el = document.createElement('div'); el.className = 'field-error'; input.parentElement.appendChild(el); } el.textContent = Array.isArray(json.errors[field])? json.errors[field].join('; '): String(json.errors[field]); } }); } else { alert('Failed to apply changes'); } } }).catch(err=>{ alert('Network error'); console.error(err); }); });
         const bulkCancel = qs('#bulk-edit-cancel'); if(bulkCancel) bulkCancel.addEventListener('click', ()=> hideModal('bulk-edit-modal'));
       }
 